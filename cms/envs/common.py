@@ -75,6 +75,12 @@ from lms.envs.common import (
     # constants for redirects app
     REDIRECT_CACHE_TIMEOUT,
     REDIRECT_CACHE_KEY_PREFIX,
+
+    # Timeout of html with rewritten urls cached by static_replace.replace_urls
+    STATIC_REPLACE_CACHE_TIMEOUT,
+
+    # Node-local cache of asset contents served by contentserver.middleware
+    CONTENTSERVER_NODE_CACHE,
 )
 from path import Path as path
 from warnings import simplefilter
@@ -206,6 +212,11 @@ FEATURES = {
 
     # Show Language selector
     'SHOW_LANGUAGE_SELECTOR': False,
+
+    # Back the Block Structure cache with durable storage so that cache
+    # misses read the collected data from the database instead of
+    # re-collecting it from the modulestore.
+    'ENABLE_BLOCK_STRUCTURE_STORAGE': False,
 }
 
 ENABLE_JASMINE = False
@@ -443,6 +454,11 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Maximum total size, in bytes, of the uncompressed course structures kept in
+# an in-process LRU cache in front of the 'course_structure_cache' cache of the
+# split modulestore. 0 disables the in-process cache.
+COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE = 0
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -883,6 +899,7 @@ INSTALLED_APPS = (
 
     'openedx.core.djangoapps.content.course_overviews',
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.block_structure',
 
     # Credit courses
     'openedx.core.djangoapps.credit',
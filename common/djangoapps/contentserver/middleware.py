@@ -6,9 +6,10 @@ import logging
 import datetime
 import newrelic.agent
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from student.models import CourseEnrollment
+from contentserver import node_cache
 from contentserver.models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 from header_control import force_header_for_response
@@ -102,6 +103,10 @@ class StaticContentServer(object):
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
+            if node_cache.is_enabled() and actual_digest is not None:
+                if request.META.get('HTTP_IF_NONE_MATCH') == get_etag(actual_digest):
+                    return HttpResponseNotModified()
+
             last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
             if 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
@@ -144,7 +149,10 @@ class StaticContentServer(object):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            if isinstance(content, node_cache.NodeCachedContent):
+                                response = StreamingHttpResponse(content.stream_data_in_range(first, last))
+                            else:
+                                response = HttpResponse(content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -160,7 +168,11 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, node_cache.NodeCachedContent):
+                    # Let the server send the file itself, e.g. with sendfile.
+                    response = FileResponse(content.asset_file)
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
 
             newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
@@ -203,6 +215,10 @@ class StaticContentServer(object):
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
 
+        content_digest = getattr(content, "content_digest", None)
+        if node_cache.is_enabled() and content_digest is not None:
+            response['ETag'] = get_etag(content_digest)
+
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
@@ -260,6 +276,8 @@ class StaticContentServer(object):
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
         """
+        if node_cache.is_enabled():
+            return node_cache.load_asset(location)
 
         # See if we can load this item from cache.
         content = get_cached_content(location)
@@ -280,6 +298,13 @@ class StaticContentServer(object):
         return content
 
 
+def get_etag(content_digest):
+    """
+    Returns the value of the ETag header of an asset with the given digest.
+    """
+    return '"{}"'.format(content_digest)
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
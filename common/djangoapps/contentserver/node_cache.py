@@ -0,0 +1,300 @@
+"""
+A node-local cache of the contents of course assets served by the contentserver.
+
+Asset contents are stored in files in a directory on the node's local disk,
+shared by all of the node's processes and keyed on the asset's location and
+content digest, so that a new version of an asset is never served from the
+file of an older one. The metadata of the assets is kept in the Django cache,
+without their contents, until the asset changes.
+
+Full responses are served from the files through the server's
+wsgi.file_wrapper, which typically sends them with sendfile, and ranges are
+streamed from memory maps of the files, so that assets are never read into
+Python memory as a whole.
+
+Once the total size of the files exceeds
+settings.CONTENTSERVER_NODE_CACHE['MAX_SIZE'] bytes, the least recently served
+files are evicted. Each process tracks the total size from the files it adds,
+and only scans the directory when the size exceeds the maximum or its last
+scan is older than SWEEP_INTERVAL seconds, which accounts for the files added
+and evicted by the node's other processes. Assets larger than
+settings.CONTENTSERVER_NODE_CACHE['MAX_ASSET_SIZE'] bytes, or without a
+content digest, are streamed from the contentstore as before.
+"""
+import errno
+from hashlib import md5
+import logging
+import mmap
+import os
+import tempfile
+import time
+
+from django.conf import settings
+
+from cache_toolbox.core import get_cached_content_metadata, set_cached_content_metadata
+from xmodule.assetstore.assetmgr import AssetManager
+from xmodule.contentstore.content import StaticContent
+
+
+log = logging.getLogger(__name__)
+
+# Size, in bytes, of the chunks in which asset contents are written to and
+# streamed from the cache.
+CHUNK_SIZE = 64 * 1024
+
+# Prefix of the names of files that are still being written, which are never
+# evicted unless they are older than TEMPORARY_FILE_MAX_AGE seconds.
+TEMPORARY_FILE_PREFIX = '.tmp-'
+TEMPORARY_FILE_MAX_AGE = 60 * 60
+
+# Number of seconds after which a process scans the directory again, even if
+# the size it tracks is under the maximum.
+SWEEP_INTERVAL = 60
+
+_NODE_CACHE = []
+
+
+def is_enabled():
+    """
+    Returns whether asset contents are served from the node-local cache.
+    """
+    return settings.FEATURES.get('ENABLE_CONTENTSERVER_NODE_CACHE', False)
+
+
+def get_node_cache():
+    """
+    Returns the NodeAssetCache configured by settings.CONTENTSERVER_NODE_CACHE.
+    """
+    if not _NODE_CACHE:
+        config = settings.CONTENTSERVER_NODE_CACHE
+        _NODE_CACHE.append(NodeAssetCache(config['DIRECTORY'], config['MAX_SIZE'], config['MAX_ASSET_SIZE']))
+    return _NODE_CACHE[0]
+
+
+def load_asset(location):
+    """
+    Loads the asset at the given location.
+
+    Returns a NodeCachedContent whose contents are served from the node-local
+    cache, filling it if needed, or, if the asset can't be cached, a
+    StaticContentStream from the contentstore.
+
+    Raises ItemNotFoundError or NotFoundError if the asset doesn't exist.
+    """
+    node_cache = get_node_cache()
+    stream = None
+    content = get_cached_content_metadata(location)
+    if content is None:
+        stream = AssetManager.find(location, as_stream=True)
+        content = _copy_metadata(stream)
+        set_cached_content_metadata(content)
+
+    if not node_cache.can_cache(content):
+        return stream or AssetManager.find(location, as_stream=True)
+
+    asset_file = node_cache.open(location, content.content_digest)
+    if asset_file is None:
+        if stream is None:
+            stream = AssetManager.find(location, as_stream=True)
+            if stream.content_digest != content.content_digest:
+                # The asset changed since its metadata was cached.
+                content = _copy_metadata(stream)
+                set_cached_content_metadata(content)
+                if not node_cache.can_cache(content):
+                    return stream
+        try:
+            asset_file = node_cache.add(location, content.content_digest, stream.stream_data())
+        finally:
+            stream.close()
+
+    return NodeCachedContent(content, asset_file)
+
+
+class NodeAssetCache(object):
+    """
+    Asset contents stored in files in a directory, keyed on the assets'
+    locations and content digests.
+    """
+    def __init__(self, directory, max_size, max_asset_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_asset_size = max_asset_size
+        # Total size of the files as of the last scan, plus the sizes of the
+        # files added since by this process, or None before the first scan.
+        self.size = None
+        self.last_sweep = None
+
+    def can_cache(self, content):
+        """
+        Returns whether the contents of the given asset can be cached.
+        """
+        return bool(content.content_digest) and content.length is not None and content.length <= self.max_asset_size
+
+    def open(self, location, digest):
+        """
+        Returns the open file of the contents of the given version of the
+        asset, or None if they are not cached.
+        """
+        path = self._get_path(location, digest)
+        try:
+            asset_file = open(path, 'rb')
+        except IOError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            return None
+
+        # Files are evicted in the order they were last served.
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return asset_file
+
+    def add(self, location, digest, chunks):
+        """
+        Writes the given chunks of the contents of the given version of the
+        asset to the cache, and returns the open file of the contents.
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError as error:
+                if error.errno != errno.EEXIST:
+                    raise
+
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=TEMPORARY_FILE_PREFIX, delete=False) as temp_file:
+            try:
+                for chunk in chunks:
+                    temp_file.write(chunk)
+            except Exception:
+                os.remove(temp_file.name)
+                raise
+
+        # Renaming is atomic, so other processes either find the complete file
+        # or none at all.
+        path = self._get_path(location, digest)
+        os.rename(temp_file.name, path)
+        asset_file = open(path, 'rb')
+        self._track_added(os.fstat(asset_file.fileno()).st_size)
+        return asset_file
+
+    def _track_added(self, size):
+        """
+        Adds the size of a file added to the cache to the tracked size, and
+        evicts files if it exceeds the maximum size or the last scan is older
+        than SWEEP_INTERVAL seconds.
+        """
+        if self.size is not None:
+            self.size += size
+        if self.size is None or self.size > self.max_size or time.time() - self.last_sweep > SWEEP_INTERVAL:
+            self.evict()
+
+    def evict(self):
+        """
+        Scans the directory, removing the least recently served files until
+        the total size of the cache is under its maximum size.
+        """
+        now = time.time()
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # The file was evicted by another process.
+                continue
+            if name.startswith(TEMPORARY_FILE_PREFIX):
+                if now - stat.st_mtime > TEMPORARY_FILE_MAX_AGE:
+                    _remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size > self.max_size:
+            for __, size, path in sorted(entries):
+                _remove(path)
+                total_size -= size
+                if total_size <= self.max_size:
+                    break
+            log.info(u'Evicted contentserver node cache files to %d bytes.', total_size)
+
+        self.size = total_size
+        self.last_sweep = now
+
+    def _get_path(self, location, digest):
+        """
+        Returns the path of the file of the contents of the given version of
+        the asset.
+        """
+        key = u'{}|{}'.format(location, digest).encode('utf-8')
+        return os.path.join(self.directory, md5(key).hexdigest())
+
+
+class NodeCachedContent(StaticContent):
+    """
+    An asset whose contents are served from an open file of the node-local
+    cache.
+    """
+    def __init__(self, content, asset_file):
+        super(NodeCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self.asset_file = asset_file
+
+    @property
+    def data(self):
+        self.asset_file.seek(0)
+        return self.asset_file.read()
+
+    def stream_data(self):
+        self.asset_file.seek(0)
+        while True:
+            chunk = self.asset_file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        self.close()
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included) from a
+        memory map of the file.
+        """
+        contents = mmap.mmap(self.asset_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for position in xrange(first_byte, last_byte + 1, CHUNK_SIZE):
+                yield buffer(contents, position, min(CHUNK_SIZE, last_byte + 1 - position))
+        finally:
+            contents.close()
+            self.close()
+
+    def close(self):
+        self.asset_file.close()
+
+
+def _copy_metadata(content):
+    """
+    Returns a StaticContent of the metadata of the given asset, without its
+    contents.
+    """
+    return StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=content.locked,
+        content_digest=content.content_digest,
+    )
+
+
+def _remove(path):
+    """
+    Removes the file at the given path, if it still exists. Processes that
+    have it open keep reading its contents.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
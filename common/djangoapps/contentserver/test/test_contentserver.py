@@ -6,10 +6,14 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -24,6 +28,7 @@ from xmodule.assetstore.assetmgr import AssetManager
 from opaque_keys import InvalidKeyError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
+from contentserver import node_cache
 from contentserver.middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
@@ -367,6 +372,155 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(is_from_cdn, True)
 
 
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_CONTENTSERVER_NODE_CACHE': True})
+@override_settings(CONTENTSTORE=TEST_DATA_CONTENTSTORE)
+class NodeCacheToyCourseTest(SharedModuleStoreTestCase):
+    """
+    Tests of serving the assets of the toy course from the node-local cache.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(NodeCacheToyCourseTest, cls).setUpClass()
+
+        cls.contentstore = contentstore()
+        cls.modulestore = modulestore()
+        cls.course_key = cls.modulestore.make_course_key('edX', 'toy', '2012_Fall')
+        import_course_from_xml(
+            cls.modulestore, 1, TEST_DATA_DIR, ['toy'],
+            static_content_store=cls.contentstore, verbose=True
+        )
+
+        cls.unlocked_asset = cls.course_key.make_asset_key('asset', 'another_static.txt')
+        cls.url_unlocked = unicode(cls.unlocked_asset)
+        content = cls.contentstore.find(cls.unlocked_asset)
+        cls.data_unlocked = content.data
+        cls.digest_unlocked = content.content_digest
+
+    def setUp(self):
+        super(NodeCacheToyCourseTest, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(CONTENTSERVER_NODE_CACHE={
+            'DIRECTORY': directory,
+            'MAX_SIZE': 1024 * 1024,
+            'MAX_ASSET_SIZE': 1024 * 1024,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        node_cache_patcher = patch.object(node_cache, '_NODE_CACHE', [])
+        node_cache_patcher.start()
+        self.addCleanup(node_cache_patcher.stop)
+
+        # The metadata of assets is kept in the Django cache, which is a
+        # DummyCache in tests.
+        cache = LocMemCache('contentserver_node_cache', {})
+        self.addCleanup(cache.clear)
+        cache_patcher = patch('cache_toolbox.core.cache', cache)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        self.client = Client()
+
+    def test_full_response(self):
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(''.join(resp.streaming_content), self.data_unlocked)
+        self.assertEqual(resp['Content-Length'], str(len(self.data_unlocked)))
+        self.assertEqual(resp['ETag'], '"{}"'.format(self.digest_unlocked))
+
+    def test_range_response(self):
+        first_byte = len(self.data_unlocked) / 4
+        last_byte = len(self.data_unlocked) / 2
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
+            first=first_byte, last=last_byte))
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(''.join(resp.streaming_content), self.data_unlocked[first_byte:last_byte + 1])
+        self.assertEqual(resp['Content-Length'], str(last_byte - first_byte + 1))
+
+    def test_if_none_match(self):
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"{}"'.format(self.digest_unlocked))
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_served_from_node_cache(self):
+        self.client.get(self.url_unlocked)
+        with patch('contentserver.node_cache.AssetManager.find') as mock_find:
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(''.join(resp.streaming_content), self.data_unlocked)
+        self.assertFalse(mock_find.called)
+
+    def test_asset_too_large(self):
+        node_cache.get_node_cache().max_asset_size = len(self.data_unlocked) - 1
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, self.data_unlocked)
+        self.assertEqual(os.listdir(node_cache.get_node_cache().directory), [])
+
+
+class NodeAssetCacheTestCase(unittest.TestCase):
+    """
+    Tests of the files of the node-local cache.
+    """
+    def setUp(self):
+        super(NodeAssetCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.node_cache = node_cache.NodeAssetCache(self.directory, max_size=10, max_asset_size=10)
+
+    def add(self, name, data):
+        """
+        Adds an asset with the given name and contents to the cache.
+        """
+        asset_file = self.node_cache.add(name, 'digest', [data[:2], data[2:]])
+        asset_file.close()
+
+    def test_add_and_open(self):
+        self.assertIsNone(self.node_cache.open('asset', 'digest'))
+        self.add('asset', 'abcd')
+        self.assertEqual(self.node_cache.open('asset', 'digest').read(), 'abcd')
+        self.assertIsNone(self.node_cache.open('asset', 'other_digest'))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_evicts_least_recently_served(self):
+        self.add('first', 'abcd')
+        self.add('second', 'efgh')
+        # Serve the first asset after the second.
+        os.utime(self.node_cache._get_path('second', 'digest'), (0, 0))  # pylint: disable=protected-access
+        self.node_cache.open('first', 'digest').close()
+
+        self.add('third', 'ijkl')
+        self.assertIsNone(self.node_cache.open('second', 'digest'))
+        self.assertIsNotNone(self.node_cache.open('first', 'digest'))
+        self.assertIsNotNone(self.node_cache.open('third', 'digest'))
+
+    def test_tracks_size_between_scans(self):
+        self.add('first', 'ab')
+        with patch('contentserver.node_cache.os.listdir') as mock_listdir:
+            self.add('second', 'cd')
+        self.assertFalse(mock_listdir.called)
+        self.assertEqual(self.node_cache.size, 4)
+
+    def test_scans_periodically(self):
+        self.add('first', 'ab')
+        # A file added by another process.
+        with open(os.path.join(self.directory, 'other'), 'wb') as other_file:
+            other_file.write('cdef')
+        self.node_cache.last_sweep -= node_cache.SWEEP_INTERVAL + 1
+        self.add('second', 'gh')
+        self.assertEqual(self.node_cache.size, 8)
+
+    def test_can_cache(self):
+        content = StaticContent(None, 'asset', 'text/plain', None, length=10, content_digest='digest')
+        self.assertTrue(self.node_cache.can_cache(content))
+        content.length = 11
+        self.assertFalse(self.node_cache.can_cache(content))
+        content = StaticContent(None, 'asset', 'text/plain', None, length=10)
+        self.assertFalse(self.node_cache.can_cache(content))
+
+
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
     """
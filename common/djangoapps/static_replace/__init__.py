@@ -1,9 +1,11 @@
+import hashlib
 import logging
 import re
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
+from django.core.cache import cache
 
 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from xmodule.modulestore.django import modulestore
@@ -15,6 +17,14 @@ from opaque_keys.edx.locator import AssetLocator
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Compiled regexes of replace_urls, keyed on the prefixes they match.
+_REPLACE_URLS_REGEXES = {}
+
+# Results of staticfiles_storage lookups made by replace_urls, and the number
+# of results kept before they are discarded.
+_STATICFILES_LOOKUPS = {}
+STATICFILES_LOOKUPS_MAX_SIZE = 10000
+
 
 def _url_replace_regex(prefix):
     """
@@ -163,52 +173,197 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         """
         Replace a single matched url.
         """
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            return original
+        return _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path)
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def _replace_static_url(
+        original, prefix, quote, rest, data_directory, course_id, static_asset_path,
+        base_url=None, excluded_exts=None, staticfiles_lookup=None,
+):
+    """
+    Replace a single matched static url, as described in replace_static_urls.
+
+    base_url and excluded_exts are the asset configuration, looked up for the url if None.
+    staticfiles_lookup, if given, is called with the name of a staticfiles_storage method
+    and a path instead of calling the method.
+    """
+    if staticfiles_lookup is None:
+        staticfiles_lookup = _staticfiles_lookup
+
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return original
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_lookup('exists', rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_lookup('url', rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            if base_url is None:
                 base_url = AssetBaseUrlConfig.get_base_url()
+            if excluded_exts is None:
                 excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_lookup('exists', rest):
+                url = staticfiles_lookup('url', rest)
+            else:
+                url = staticfiles_lookup('url', course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    return "".join([quote, url, quote])
 
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
 
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Apply replace_static_urls, then replace_course_urls if course_id is given and
+    replace_jump_to_id_urls if jump_to_id_base_url is given, in a single pass over the text.
+
+    Unless settings.DEBUG is set, the results of staticfiles_storage lookups are kept for
+    the lifetime of the process, and the rewritten text is cached for
+    settings.STATIC_REPLACE_CACHE_TIMEOUT seconds, keyed on the text and the substitutions.
+    Rewritten course asset urls may thus be stale for up to that long after an asset is
+    locked, unlocked or replaced.
+    """
+    prefixes = [settings.STATIC_URL, '/static/']
+    if course_id:
+        prefixes.append('/course/')
+    if jump_to_id_base_url is not None:
+        prefixes.append('/jump_to_id/')
+    if not any(prefix in text for prefix in prefixes):
+        return text
+
+    data_dir = static_asset_path or data_directory
+    base_url = excluded_exts = None
+    if course_id and not static_asset_path:
+        base_url = AssetBaseUrlConfig.get_base_url()
+        excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+
+    cache_key = None
+    staticfiles_lookup = None
+    if not settings.DEBUG:
+        staticfiles_lookup = _cached_staticfiles_lookup
+        cache_key = _get_replace_urls_cache_key(
+            text, data_directory, course_id, static_asset_path, jump_to_id_base_url, base_url, excluded_exts
+        )
+        cached_text = cache.get(cache_key)
+        if cached_text is not None:
+            return cached_text
+
+    if course_id:
+        course_url = '/courses/' + course_id.to_deprecated_string() + '/'
+
+    def replace_url(match):
+        """
+        Replace a single matched url according to the prefix it matched.
+        """
+        original = match.group(0)
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+
+        if match.group('static') is not None:
+            # Don't rewrite XBlock resource links, see process_static_urls.
+            if (prefix + rest).startswith(XBLOCK_STATIC_RESOURCE_PREFIX):
+                return original
+            return _replace_static_url(
+                original, prefix, quote, rest, data_directory, course_id, static_asset_path,
+                base_url=base_url, excluded_exts=excluded_exts, staticfiles_lookup=staticfiles_lookup,
+            )
+        elif match.group('course') is not None:
+            return "".join([quote, course_url, rest, quote])
         else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
+            return "".join([quote, jump_to_id_base_url + rest, quote])
 
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+    regex = _get_replace_urls_regex(data_dir, bool(course_id), jump_to_id_base_url is not None)
+    text = regex.sub(replace_url, text)
 
-        return "".join([quote, url, quote])
+    if cache_key is not None:
+        cache.set(cache_key, text, settings.STATIC_REPLACE_CACHE_TIMEOUT)
+    return text
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+def _get_replace_urls_regex(data_dir, course_urls, jump_to_id_urls):
+    """
+    Return the compiled regex matching the urls substituted by replace_urls, in which the
+    matched prefix is captured by a group named for its substitution.
+    """
+    key = (settings.STATIC_URL, data_dir, course_urls, jump_to_id_urls)
+    regex = _REPLACE_URLS_REGEXES.get(key)
+    if regex is None:
+        prefixes = [u'(?P<static>(?:{static_url}|/static/)(?!{data_dir}))'.format(
+            static_url=settings.STATIC_URL,
+            data_dir=data_dir,
+        )]
+        if course_urls:
+            prefixes.append(u'(?P<course>/course/)')
+        if jump_to_id_urls:
+            prefixes.append(u'(?P<jump>/jump_to_id/)')
+        regex = re.compile(_url_replace_regex(u'|'.join(prefixes)))
+        _REPLACE_URLS_REGEXES[key] = regex
+    return regex
+
+
+def _staticfiles_lookup(method, path):
+    """
+    Return the result of calling the named staticfiles_storage method with the given path.
+    """
+    return getattr(staticfiles_storage, method)(path)
+
+
+def _cached_staticfiles_lookup(method, path):
+    """
+    Return the result of calling the named staticfiles_storage method with the given path,
+    kept for the lifetime of the process since pipeline assets only change on deployment.
+    """
+    key = (method, path)
+    try:
+        return _STATICFILES_LOOKUPS[key]
+    except KeyError:
+        result = _staticfiles_lookup(method, path)
+        if len(_STATICFILES_LOOKUPS) >= STATICFILES_LOOKUPS_MAX_SIZE:
+            _STATICFILES_LOOKUPS.clear()
+        _STATICFILES_LOOKUPS[key] = result
+        return result
+
+
+def _get_replace_urls_cache_key(text, *args):
+    """
+    Return the cache key of the result of replace_urls for the given text and substitutions.
+    """
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    substitutions = u'|'.join([settings.STATIC_URL] + [unicode(arg) for arg in args]).encode('utf-8')
+    return 'static_replace.replace_urls.{}.{}'.format(
+        hashlib.md5(substitutions).hexdigest(),
+        hashlib.md5(text).hexdigest(),
+    )
@@ -4,6 +4,7 @@
 import ddt
 import re
 
+from django.core.cache.backends.locmem import LocMemCache
 from django.utils.http import urlquote, urlencode
 from urlparse import urlparse, urlunparse, parse_qsl
 from PIL import Image
@@ -12,12 +13,16 @@ from nose.tools import assert_equals, assert_true, assert_false  # pylint: disab
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
+    _STATICFILES_LOOKUPS,
     process_static_urls,
     make_static_urls_absolute
 )
 from mock import patch, Mock
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from request_cache.middleware import RequestCache
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore import ModuleStoreEnum
@@ -211,6 +216,67 @@ def test_static_url_with_xblock_resource(mock_modulestore, mock_storage):
     assert_equals(post_text, replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY))
 
 
+@patch.dict('static_replace._STATICFILES_LOOKUPS', clear=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.AssetBaseUrlConfig.get_base_url', Mock(return_value=u''))
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', Mock(return_value=['.html']))
+def test_replace_urls(mock_storage):
+    """
+    Make sure that replace_urls makes the substitutions of replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls in a single pass.
+    """
+    mock_storage.exists.side_effect = lambda path: path.startswith('js/')
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+
+    pre_text = (
+        '<script src="/static/js/file.js"/><img src="/static/file.png"/><a href="/course/info">'
+        '<a href="/jump_to_id/abc"><img src=\'/static/xblock/resources/x.png\'/><a href="/static/file.png?raw">'
+    )
+    sequential_text = replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY)
+    sequential_text = replace_course_urls(sequential_text, COURSE_KEY)
+    sequential_text = replace_jump_to_id_urls(sequential_text, COURSE_KEY, '/jump_to/')
+    mock_storage.reset_mock()
+
+    assert_equals(sequential_text, replace_urls(pre_text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url='/jump_to/'))
+    assert_equals(mock_storage.exists.call_count, 2)
+
+
+@patch.dict('static_replace._STATICFILES_LOOKUPS', clear=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls_memoizes_staticfiles_lookups(mock_storage):
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/hashed/file.png'
+
+    for __ in range(2):
+        assert_equals('"/static/hashed/file.png"', replace_urls(STATIC_SOURCE, DATA_DIRECTORY))
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_storage.url.assert_called_once_with('file.png')
+
+
+@patch.dict('static_replace._STATICFILES_LOOKUPS', clear=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls_cached(mock_storage):
+    mock_storage.exists.return_value = False
+    mock_storage.url.return_value = '/static/data_dir/file.png'
+
+    with patch('static_replace.cache', LocMemCache('static_replace', {})):
+        assert_equals('"/static/data_dir/file.png"', replace_urls(STATIC_SOURCE, DATA_DIRECTORY))
+        _STATICFILES_LOOKUPS.clear()
+        assert_equals('"/static/data_dir/file.png"', replace_urls(STATIC_SOURCE, DATA_DIRECTORY))
+        mock_storage.exists.assert_called_once_with('file.png')
+
+        # The cached text is keyed on the substitutions.
+        replace_urls(STATIC_SOURCE, 'other_dir')
+        assert_equals(mock_storage.exists.call_count, 2)
+
+
+@patch('static_replace.AssetBaseUrlConfig.get_base_url')
+def test_replace_urls_without_urls(mock_get_base_url):
+    text = '<p>No urls here.</p>'
+    assert_equals(text, replace_urls(text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url='/jump_to/'))
+    assert_false(mock_get_base_url.called)
+
+
 @ddt.ddt
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
@@ -749,3 +815,46 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             print expected
             print asset_path
             self.assertIsNotNone(re.match(expected, asset_path))
+
+    @ddt.data('split', 'old')
+    def test_canonical_asset_path_from_asset_index(self, prefix):
+        exts = ['.html', '.tm']
+        course_key = self.courses[prefix].id
+        paths = [
+            name.format(prfx=prefix) for name in (
+                u'{prfx}_ünlöck.png',
+                u'{prfx}_lock.png',
+                u'/static/special/{prfx}_ünlöck.png',
+                u'weird {prfx}_ünlöck.png',
+                u'{prfx}_excluded.html',
+                u'{prfx}_not_excluded.htm',
+                u'{prfx}_missing.png',
+                u'/static/{prfx}_lock.png?foo=/static/{prfx}_ünlöck.png',
+            )
+        ]
+        expected = [
+            StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', exts) for path in paths
+        ]
+
+        RequestCache.clear_request_cache()
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_ASSET_INDEX': True}):
+            # The index is loaded once, and no asset is loaded.
+            with check_mongo_calls(1):
+                asset_paths = [
+                    StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', exts) for path in paths
+                ]
+        self.assertEqual(asset_paths, expected)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ASSET_INDEX': True})
+    def test_asset_index_invalidated_on_lock(self):
+        exts = ['.html', '.tm']
+        course_key = self.courses['split'].id
+        path = u'split_not_excluded.htm'
+        asset_path = StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', exts)
+        self.assertTrue(asset_path.startswith('//dev/'))
+
+        asset_key = StaticContent.compute_location(course_key, path)
+        contentstore().set_attr(asset_key, 'locked', True)
+        self.addCleanup(contentstore().set_attr, asset_key, 'locked', False)
+        asset_path = StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', exts)
+        self.assertFalse(asset_path.startswith('//dev/'))
@@ -0,0 +1,205 @@
+"""
+Precomputed documents of the data rendered on the learner dashboard.
+
+Rendering the dashboard computes data for each of the learner's enrollments,
+such as their certificate status and whether the course is blocked by an
+unpaid invoice, which costs several queries per enrollment. A document of
+this data is stored per learner in the cache, so that the dashboard is
+rendered from a few reads, and only stale entries are computed again.
+
+A document holds:
+
+  * an entry per enrollment, which is stale once the course's overview or the
+    enrollment's mode changes, the course ends, settings.DASHBOARD_DOCUMENT_TIMEOUT
+    seconds pass, or it is invalidated, and
+  * sections of data that is computed for all enrollments at once, such as the
+    learner's credit statuses, which are stale once the timeout passes or they
+    are invalidated.
+
+Entries and sections are invalidated by the signal handlers in
+student.dashboard_signals when the underlying enrollments, certificates,
+credit requests or invoices change.
+
+Each entry and section is stored under its own cache key, so that
+invalidating one doesn't rewrite the others. Invalidation also replaces the
+learner's generation token, and a document doesn't store the data it
+computed if the token changed since it was loaded, as that data may have been
+computed before the change.
+"""
+from datetime import datetime, timedelta
+import logging
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from pytz import UTC
+
+
+log = logging.getLogger(__name__)
+
+# Version of the format of the documents.  Increment it whenever the format
+# or the computed data changes.
+DOCUMENT_VERSION = 2
+
+
+def is_enabled():
+    """
+    Returns whether the learner dashboard is rendered from precomputed
+    documents.
+    """
+    return settings.FEATURES.get('ENABLE_DASHBOARD_DOCUMENT', False)
+
+
+class DashboardDocument(object):
+    """
+    The precomputed dashboard data of a learner.
+
+    Stale data is computed again by the callers' functions, and stored by
+    save().
+    """
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.generation = cache.get(_get_generation_key(user_id))
+        # The entries and sections computed again, by cache key.
+        self.updated_data = {}
+
+    def get_entries(self, course_enrollments, compute_entries):
+        """
+        Returns a dict mapping the course keys of the given enrollments to
+        their entries.
+
+        Arguments:
+            course_enrollments (list[CourseEnrollment]): the enrollments,
+                whose course_overview is loaded.
+            compute_entries (function): given a list of enrollments, returns
+                a dict mapping their course keys to their entries.
+        """
+        now = datetime.now(UTC)
+        cache_keys = {
+            enrollment.course_id: _get_entry_cache_key(self.user_id, enrollment.course_id)
+            for enrollment in course_enrollments
+        }
+        stored_entries = cache.get_many(cache_keys.values())
+        entries = {}
+        stale_enrollments = []
+        for enrollment in course_enrollments:
+            stored_entry = stored_entries.get(cache_keys[enrollment.course_id])
+            if stored_entry is not None and stored_entry['key'] == _get_entry_key(enrollment) and \
+                    stored_entry['valid_until'] > now:
+                entries[enrollment.course_id] = stored_entry['data']
+            else:
+                stale_enrollments.append(enrollment)
+
+        if stale_enrollments:
+            computed_entries = compute_entries(stale_enrollments)
+            for enrollment in stale_enrollments:
+                data = computed_entries[enrollment.course_id]
+                entries[enrollment.course_id] = data
+                self.updated_data[cache_keys[enrollment.course_id]] = {
+                    'key': _get_entry_key(enrollment),
+                    'valid_until': _get_entry_valid_until(enrollment, now),
+                    'data': data,
+                }
+        return entries
+
+    def get_section(self, name, compute_section):
+        """
+        Returns the named section, computing it with compute_section if it is
+        stale.
+        """
+        now = datetime.now(UTC)
+        cache_key = _get_section_cache_key(self.user_id, name)
+        stored_section = cache.get(cache_key)
+        if stored_section is not None and stored_section['valid_until'] > now:
+            return stored_section['data']
+
+        data = compute_section()
+        self.updated_data[cache_key] = {
+            'valid_until': now + timedelta(seconds=settings.DASHBOARD_DOCUMENT_TIMEOUT),
+            'data': data,
+        }
+        return data
+
+    def save(self):
+        """
+        Stores the entries and sections that were computed again, unless the
+        learner's document was invalidated since it was loaded.
+        """
+        if not self.updated_data:
+            return
+        if cache.get(_get_generation_key(self.user_id)) == self.generation:
+            cache.set_many(self.updated_data, settings.DASHBOARD_DOCUMENT_TIMEOUT)
+        else:
+            log.debug(u'Discarded dashboard data of user %s computed before an invalidation.', self.user_id)
+        self.updated_data = {}
+
+
+def invalidate_entry(user_id, course_key):
+    """
+    Invalidates the entry of the given learner's enrollment in the given
+    course.
+    """
+    _reset_generation(user_id)
+    cache.delete(_get_entry_cache_key(user_id, course_key))
+    log.debug(u'Invalidated dashboard entry of user %s in course %s.', user_id, course_key)
+
+
+def invalidate_section(user_id, name):
+    """
+    Invalidates the named section of the given learner's document.
+    """
+    _reset_generation(user_id)
+    cache.delete(_get_section_cache_key(user_id, name))
+    log.debug(u'Invalidated dashboard section %s of user %s.', name, user_id)
+
+
+def _reset_generation(user_id):
+    """
+    Stores a new generation token for the given learner's document.
+    """
+    cache.set(_get_generation_key(user_id), uuid4().hex, settings.DASHBOARD_DOCUMENT_TIMEOUT)
+
+
+def _get_generation_key(user_id):
+    """
+    Returns the cache key of the generation token of the given learner's
+    document.
+    """
+    return u'student.dashboard_document.v{}.{}.generation'.format(DOCUMENT_VERSION, user_id)
+
+
+def _get_entry_cache_key(user_id, course_key):
+    """
+    Returns the cache key of the entry of the given learner's enrollment in
+    the given course.
+    """
+    return u'student.dashboard_document.v{}.{}.entry.{}'.format(DOCUMENT_VERSION, user_id, course_key)
+
+
+def _get_section_cache_key(user_id, name):
+    """
+    Returns the cache key of the named section of the given learner's
+    document.
+    """
+    return u'student.dashboard_document.v{}.{}.section.{}'.format(DOCUMENT_VERSION, user_id, name)
+
+
+def _get_entry_key(enrollment):
+    """
+    Returns the values of the given enrollment that its entry is computed
+    from, other than the learner's data.
+    """
+    return (enrollment.mode, enrollment.is_active, enrollment.course_overview.modified)
+
+
+def _get_entry_valid_until(enrollment, now):
+    """
+    Returns the time until which the entry of the given enrollment, computed
+    now, is valid.
+    """
+    valid_until = now + timedelta(seconds=settings.DASHBOARD_DOCUMENT_TIMEOUT)
+    # Certificates are shown once the course ends.
+    end = enrollment.course_overview.end
+    if end is not None and now < end < valid_until:
+        valid_until = end
+    return valid_until
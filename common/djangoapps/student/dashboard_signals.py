@@ -0,0 +1,87 @@
+"""
+Signal handlers for invalidating the precomputed learner dashboard documents.
+
+These handlers depend on LMS apps, so this module is imported by lms.startup.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+from certificates.models import GeneratedCertificate
+from openedx.core.djangoapps.credit.models import CreditEligibility, CreditRequest
+from shoppingcart.models import Invoice, RegistrationCodeRedemption
+from student import dashboard_document
+from student.models import CourseEnrollment, CourseEnrollmentAttribute
+
+
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def _listen_for_enrollment_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the dashboard entry of an enrollment, and the user's credit
+    statuses, when the enrollment changes.
+    """
+    if dashboard_document.is_enabled():
+        dashboard_document.invalidate_entry(instance.user_id, instance.course_id)
+        dashboard_document.invalidate_section(instance.user_id, 'credit_statuses')
+
+
+@receiver(post_save, sender=CourseEnrollmentAttribute)
+def _listen_for_enrollment_attribute_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the credit statuses of a user when the attributes of their
+    enrollments, such as the provider of purchased credit, change.
+    """
+    if dashboard_document.is_enabled():
+        dashboard_document.invalidate_section(instance.enrollment.user_id, 'credit_statuses')
+
+
+@receiver(post_save, sender=GeneratedCertificate)
+@receiver(post_delete, sender=GeneratedCertificate)
+def _listen_for_certificate_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the dashboard entry of a user in a course when their
+    certificate changes.
+    """
+    if dashboard_document.is_enabled():
+        dashboard_document.invalidate_entry(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=CreditEligibility)
+@receiver(post_delete, sender=CreditEligibility)
+@receiver(post_save, sender=CreditRequest)
+@receiver(post_delete, sender=CreditRequest)
+def _listen_for_credit_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the credit statuses of a user when their credit eligibility
+    or requests change.
+    """
+    if dashboard_document.is_enabled():
+        for user_id in User.objects.filter(username=instance.username).values_list('id', flat=True):
+            dashboard_document.invalidate_section(user_id, 'credit_statuses')
+
+
+@receiver(post_save, sender=RegistrationCodeRedemption)
+def _listen_for_registration_code_redemption(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the dashboard entry of a user in a course when they redeem a
+    registration code for it, as the course is blocked if its invoice is
+    unpaid.
+    """
+    if dashboard_document.is_enabled():
+        dashboard_document.invalidate_entry(instance.redeemed_by_id, instance.registration_code.course_id)
+
+
+@receiver(post_save, sender=Invoice)
+def _listen_for_invoice_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the dashboard entries of the users who redeemed registration
+    codes of an invoice when the invoice changes, as its validity determines
+    whether their courses are blocked.
+    """
+    if dashboard_document.is_enabled():
+        redemptions = RegistrationCodeRedemption.objects.filter(
+            registration_code__invoice_item__invoice=instance,
+        ).values_list('redeemed_by_id', 'registration_code__course_id')
+        for user_id, course_id in redemptions:
+            dashboard_document.invalidate_entry(user_id, course_id)
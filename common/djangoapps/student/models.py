@@ -46,6 +46,7 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from simple_history.models import HistoricalRecords
 from track import contexts
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
+import request_cache
 
 from lms.djangoapps.badges.utils import badges_enabled
 from certificates.models import GeneratedCertificate
@@ -108,6 +109,10 @@ TRANSITION_STATES = (
 )
 
 
+# Number of users whose anonymous ids are read and saved in one query.
+ANONYMOUS_ID_BATCH_SIZE = 1000
+
+
 class AnonymousUserId(models.Model):
     """
     This table contains user, course_Id and anonymous_user_id
@@ -144,18 +149,7 @@ def anonymous_id_for_user(user, course_id, save=True):
     if cached_id is not None:
         return cached_id
 
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(unicode(user.id))
-    if course_id:
-        hasher.update(unicode(course_id).encode('utf-8'))
-    digest = hasher.hexdigest()
-
-    if not hasattr(user, '_anonymous_id'):
-        user._anonymous_id = {}  # pylint: disable=protected-access
-
-    user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    digest = _compute_anonymous_id(user, course_id)
 
     if save is False:
         return digest
@@ -185,6 +179,92 @@ def anonymous_id_for_user(user, course_id, save=True):
     return digest
 
 
+def _compute_anonymous_id(user, course_id):
+    """
+    Computes the anonymous id of the given user in the given course, and
+    caches it on the user.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    hasher.update(unicode(user.id))
+    if course_id:
+        hasher.update(unicode(course_id).encode('utf-8'))
+    digest = hasher.hexdigest()
+
+    if not hasattr(user, '_anonymous_id'):
+        user._anonymous_id = {}  # pylint: disable=protected-access
+
+    user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    return digest
+
+
+def anonymous_ids_for_users(users, course_id, save=True, batch_size=ANONYMOUS_ID_BATCH_SIZE):
+    """
+    Return a dict mapping the ids of the given users to their unique ids in
+    the given course, like anonymous_id_for_user, but for many users at once.
+
+    Anonymous users are left out.
+
+    Keyword arguments:
+    save -- Whether the ids should be saved in AnonymousUserId objects. The
+        missing objects are created with a single query for each batch of
+        batch_size users.
+    """
+    anonymous_ids = {}
+    for user in users:
+        if user.is_anonymous():
+            continue
+        cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
+        anonymous_ids[user.id] = cached_id if cached_id is not None else _compute_anonymous_id(user, course_id)
+
+    if save is False:
+        return anonymous_ids
+
+    user_ids = anonymous_ids.keys()
+    for batch_start in xrange(0, len(user_ids), batch_size):
+        batch_user_ids = user_ids[batch_start:batch_start + batch_size]
+        stored_ids = dict(
+            AnonymousUserId.objects.filter(
+                user_id__in=batch_user_ids,
+                course_id=course_id,
+            ).values_list('user_id', 'anonymous_user_id')
+        )
+        for user_id, stored_id in stored_ids.iteritems():
+            if stored_id != anonymous_ids[user_id]:
+                log.error(
+                    u"Stored anonymous user id %(anonymous_user_id)r for "
+                    u"user %(user_id)r in course %(course_id)r doesn't match "
+                    u"computed id %(digest)r", {
+                        "anonymous_user_id": stored_id,
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "digest": anonymous_ids[user_id],
+                    }
+                )
+
+        missing_ids = [
+            AnonymousUserId(user_id=user_id, course_id=course_id, anonymous_user_id=anonymous_ids[user_id])
+            for user_id in batch_user_ids if user_id not in stored_ids
+        ]
+        if not missing_ids:
+            continue
+        try:
+            with transaction.atomic():
+                AnonymousUserId.objects.bulk_create(missing_ids)
+        except IntegrityError:
+            # Another thread has already created some of these entries, so
+            # create the rest one at a time.
+            for anonymous_user_id in missing_ids:
+                try:
+                    with transaction.atomic():
+                        anonymous_user_id.save()
+                except IntegrityError:
+                    pass
+
+    return anonymous_ids
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -203,6 +283,24 @@ def user_by_anonymous_id(uid):
         return None
 
 
+def users_by_anonymous_ids(uids, batch_size=ANONYMOUS_ID_BATCH_SIZE):
+    """
+    Return a dict mapping the given anonymous user ids to their users, like
+    user_by_anonymous_id, but with a single query for each batch of
+    batch_size ids.
+
+    Ids without a user are left out.
+    """
+    uids = list(set(uid for uid in uids if uid is not None))
+    users = {}
+    for batch_start in xrange(0, len(uids), batch_size):
+        for anonymous_user_id in AnonymousUserId.objects.filter(
+                anonymous_user_id__in=uids[batch_start:batch_start + batch_size],
+        ).select_related('user'):
+            users[anonymous_user_id.anonymous_user_id] = anonymous_user_id.user
+    return users
+
+
 class UserStanding(models.Model):
     """
     This table contains a student's account's status.
@@ -1007,6 +1105,10 @@ class CourseEnrollment(models.Model):
     # cache key format e.g enrollment.<username>.<course_key>.mode = 'honor'
     COURSE_ENROLLMENT_CACHE_KEY = u"enrollment.{}.{}.mode"
 
+    # cache key format e.g enrollment_snapshot.v2.<user_id>, see enrollment_snapshot
+    ENROLLMENT_SNAPSHOT_CACHE_KEY = u"enrollment_snapshot.v2.{}"
+    ENROLLMENT_SNAPSHOT_REQUEST_CACHE_NAME = u"student.enrollment_snapshot"
+
     class Meta(object):
         unique_together = (('user', 'course_id'),)
         ordering = ('user', 'course_id')
@@ -1389,6 +1491,10 @@ class CourseEnrollment(models.Model):
         if not user.is_authenticated():
             return False
 
+        if cls._use_enrollment_snapshot(user):
+            record = cls.enrollment_snapshot(user).get(unicode(course_key))
+            return record is not None and record['is_active']
+
         try:
             record = cls.objects.get(user=user, course_id=course_key)
             return record.is_active
@@ -1435,6 +1541,12 @@ class CourseEnrollment(models.Model):
             and is_active is whether the enrollment is active.
         Returns (None, None) if the courseenrollment record does not exist.
         """
+        if cls._use_enrollment_snapshot(user):
+            record = cls.enrollment_snapshot(user).get(unicode(course_id))
+            if record is None:
+                return (None, None)
+            return (record['mode'], record['is_active'])
+
         try:
             record = cls.objects.get(user=user, course_id=course_id)
             return (record.mode, record.is_active)
@@ -1445,6 +1557,61 @@ class CourseEnrollment(models.Model):
     def enrollments_for_user(cls, user):
         return cls.objects.filter(user=user, is_active=1)
 
+    @classmethod
+    def enrollment_snapshot(cls, user):
+        """
+        Returns a snapshot of all of the user's enrollments, active or not,
+        loaded in a single query.
+
+        The snapshot is a dict mapping unicode course ids to dicts of the
+        'mode' and 'is_active' values of the enrollments. It only answers
+        is_enrolled and enrollment_mode_for_user, as enrollments that may be
+        saved are read from the database by get_enrollment. It is kept for
+        the rest of the request, and for
+        ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT seconds in the cache, until one of
+        the user's enrollments is saved or deleted.
+
+        `user` is a saved Django User object
+        """
+        request_snapshots = request_cache.get_cache(cls.ENROLLMENT_SNAPSHOT_REQUEST_CACHE_NAME)
+        snapshot = request_snapshots.get(user.id)
+        if snapshot is not None:
+            return snapshot
+
+        cache_key = cls.enrollment_snapshot_cache_key_name(user.id)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            records = cls.objects.filter(user_id=user.id).values_list('course_id', 'mode', 'is_active')
+            snapshot = {
+                unicode(course_id): {'mode': mode, 'is_active': is_active}
+                for course_id, mode, is_active in records
+            }
+            cache.set(cache_key, snapshot, settings.ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT)
+
+        request_snapshots[user.id] = snapshot
+        return snapshot
+
+    @classmethod
+    def invalidate_enrollment_snapshot(cls, user_id):
+        """
+        Discards the snapshot of the enrollments of the user with the given id.
+        """
+        cache.delete(cls.enrollment_snapshot_cache_key_name(user_id))
+        request_cache.get_cache(cls.ENROLLMENT_SNAPSHOT_REQUEST_CACHE_NAME).pop(user_id, None)
+
+    @classmethod
+    def enrollment_snapshot_cache_key_name(cls, user_id):
+        """Return the cache key name of the snapshot of the user's enrollments."""
+        return cls.ENROLLMENT_SNAPSHOT_CACHE_KEY.format(user_id)
+
+    @classmethod
+    def _use_enrollment_snapshot(cls, user):
+        """
+        Returns whether enrollments of the given user are read from the
+        snapshot of their enrollments.
+        """
+        return settings.FEATURES.get('ENABLE_ENROLLMENT_SNAPSHOT_CACHE', False) and user.id is not None
+
     def is_paid_course(self):
         """
         Returns True, if course is paid
@@ -1564,12 +1731,8 @@ class CourseEnrollment(models.Model):
         Returns: bool
 
         """
-        enrollment = cls.get_enrollment(user, course_key)
-        return (
-            enrollment is not None and
-            enrollment.is_active and
-            enrollment.is_verified_enrollment()
-        )
+        mode, is_active = cls.enrollment_mode_for_user(user, course_key)
+        return bool(is_active) and CourseMode.is_verified_slug(mode)
 
     @classmethod
     def cache_key_name(cls, user_id, course_key):
@@ -1596,6 +1759,16 @@ def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: dis
     cache.delete(cache_key)
 
 
+@receiver(models.signals.post_save, sender=CourseEnrollment)
+@receiver(models.signals.post_delete, sender=CourseEnrollment)
+def invalidate_enrollment_snapshot(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the snapshot of the user's enrollments when one of them is
+    created, updated (e.g. by update_enrollment) or deleted.
+    """
+    CourseEnrollment.invalidate_enrollment_snapshot(instance.user_id)
+
+
 class ManualEnrollmentAudit(models.Model):
     """
     Table for tracking which enrollments were performed through manual enrollment.
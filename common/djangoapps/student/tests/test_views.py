@@ -5,8 +5,10 @@ import unittest
 
 import ddt
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.urlresolvers import reverse
 from django.test import TestCase
+from django.test.utils import override_settings
 from edx_oauth2_provider.constants import AUTHORIZED_CLIENTS_SESSION_KEY
 from edx_oauth2_provider.tests.factories import ClientFactory, TrustedClientFactory
 from mock import patch
@@ -14,6 +16,7 @@ from pyquery import PyQuery as pq
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
+from certificates.tests.factories import GeneratedCertificateFactory
 from student.helpers import DISABLE_UNENROLL_CERT_STATES
 from student.models import CourseEnrollment, LogoutViewConfiguration
 from student.tests.factories import UserFactory, CourseEnrollmentFactory
@@ -111,6 +114,83 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
             self.assertEqual(response.status_code, 200)
 
 
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_DASHBOARD_DOCUMENT': True})
+class TestStudentDashboardDocument(SharedModuleStoreTestCase):
+    """
+    Test that the student dashboard is rendered from the precomputed dashboard document.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestStudentDashboardDocument, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.other_course = CourseFactory.create()
+
+    def setUp(self):
+        super(TestStudentDashboardDocument, self).setUp()
+        self.user = UserFactory()
+        CourseEnrollmentFactory(course_id=self.course.id, user=self.user)
+        CourseEnrollmentFactory(course_id=self.other_course.id, user=self.user)
+        self.client.login(username=self.user.username, password=PASSWORD)
+        cache = LocMemCache('dashboard_document', {})
+        self.addCleanup(cache.clear)
+        patcher = patch('student.dashboard_document.cache', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_dashboard(self):
+        """
+        Renders the dashboard, returning the courses whose certificate info was computed.
+        """
+        with patch('student.views.cert_info', return_value={}) as mock_cert_info:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return set(args[1].id for args, __ in mock_cert_info.call_args_list)
+
+    def test_entries_are_reused(self):
+        self.assertEqual(self.get_dashboard(), {self.course.id, self.other_course.id})
+        self.assertEqual(self.get_dashboard(), set())
+
+    def test_certificate_change(self):
+        self.get_dashboard()
+        GeneratedCertificateFactory(user=self.user, course_id=self.course.id)
+        self.assertEqual(self.get_dashboard(), {self.course.id})
+
+    def test_enrollment_change(self):
+        self.get_dashboard()
+        CourseEnrollment.objects.get(user=self.user, course_id=self.other_course.id).update_enrollment(mode='verified')
+        self.assertEqual(self.get_dashboard(), {self.other_course.id})
+
+    def test_change_during_render(self):
+        def create_certificate(user, course_overview, course_mode):  # pylint: disable=unused-argument
+            """
+            Changes the certificate of the learner while their entry is computed.
+            """
+            if course_overview.id == self.course.id:
+                GeneratedCertificateFactory(user=self.user, course_id=self.course.id)
+            return {}
+
+        with patch('student.views.cert_info', side_effect=create_certificate):
+            self.client.get(reverse('dashboard'))
+        self.assertEqual(self.get_dashboard(), {self.course.id, self.other_course.id})
+        self.assertEqual(self.get_dashboard(), set())
+
+    def test_blocked_courses_opted_out_on_each_render(self):
+        with patch('student.views._is_registration_blocked', return_value=True):
+            self.get_dashboard()
+        with patch('student.views._opt_out_of_blocked_course') as mock_opt_out:
+            self.assertEqual(self.get_dashboard(), set())
+        self.assertEqual(
+            set(args[1] for args, __ in mock_opt_out.call_args_list),
+            {self.course.id, self.other_course.id},
+        )
+
+    def test_timeout(self):
+        with override_settings(DASHBOARD_DOCUMENT_TIMEOUT=0):
+            self.get_dashboard()
+        self.assertEqual(self.get_dashboard(), {self.course.id, self.other_course.id})
+
+
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class LogoutTests(TestCase):
     """ Tests for the logout functionality. """
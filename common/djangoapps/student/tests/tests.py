@@ -17,14 +17,16 @@ from pyquery import PyQuery as pq
 
 from django.conf import settings
 from django.contrib.auth.models import User, AnonymousUser
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.client import Client
 
 from course_modes.models import CourseMode
+from request_cache.middleware import RequestCache
 from student.models import (
-    anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment,
-    unique_id_for_user, LinkedInAddToProfileConfiguration, UserAttribute
+    anonymous_id_for_user, anonymous_ids_for_users, user_by_anonymous_id, users_by_anonymous_ids,
+    AnonymousUserId, CourseEnrollment, unique_id_for_user, LinkedInAddToProfileConfiguration, UserAttribute
 )
 from student.views import (
     process_survey_link,
@@ -770,6 +772,67 @@ class EnrollInCourseTest(EnrollmentEventTestMixin, TestCase):
         self.assert_enrollment_mode_change_event_was_emitted(user, course_id, "audit")
 
 
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_ENROLLMENT_SNAPSHOT_CACHE': True})
+class EnrollmentSnapshotTest(TestCase):
+    """Tests reading enrollments from the snapshot of a user's enrollments."""
+
+    def setUp(self):
+        super(EnrollmentSnapshotTest, self).setUp()
+        self.user = UserFactory.create()
+        self.course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.other_course_id = SlashSeparatedCourseKey("edX", "Test102", "2013")
+        CourseEnrollment.enroll(self.user, self.course_id, "verified")
+
+        snapshot_cache = LocMemCache('enrollment_snapshot', {})
+        self.addCleanup(snapshot_cache.clear)
+        patcher = patch('student.models.cache', snapshot_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("verified", True))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.other_course_id), (None, None))
+            self.assertTrue(CourseEnrollment.is_enrolled_as_verified(self.user, self.course_id))
+            self.assertFalse(CourseEnrollment.is_enrolled_as_verified(self.user, self.other_course_id))
+
+    def test_get_enrollment_reads_database(self):
+        CourseEnrollment.is_enrolled(self.user, self.course_id)
+        with self.assertNumQueries(1):
+            enrollment = CourseEnrollment.get_enrollment(self.user, self.course_id)
+        self.assertEqual(enrollment, CourseEnrollment.objects.get(user=self.user, course_id=self.course_id))
+        self.assertIsNotNone(enrollment.created)
+
+    def test_reused_across_requests(self):
+        CourseEnrollment.is_enrolled(self.user, self.course_id)
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+    def test_update_enrollment(self):
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("verified", True))
+        enrollment = CourseEnrollment.get_enrollment(self.user, self.course_id)
+        enrollment.update_enrollment(mode="audit", is_active=False)
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("audit", False))
+        self.assertEqual(CourseEnrollment.objects.get(user=self.user, course_id=self.course_id).mode, "audit")
+
+    def test_new_enrollment(self):
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+        CourseEnrollment.enroll(self.user, self.other_course_id)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ENROLLMENT_SNAPSHOT_CACHE': False})
+    def test_disabled(self):
+        CourseEnrollment.is_enrolled(self.user, self.course_id)
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+
+
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class ChangeEnrollmentViewTest(ModuleStoreTestCase):
     """Tests the student.views.change_enrollment view"""
@@ -888,6 +951,34 @@ class AnonymousLookupTable(ModuleStoreTestCase):
         self.assertEqual(self.user, real_user)
         self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, course2.id, save=False))
 
+    def test_bulk_roundtrip(self):
+        users = [self.user, UserFactory(), UserFactory(), AnonymousUser()]
+        existing_id = anonymous_id_for_user(users[1], self.course.id)
+        fresh_users = [User.objects.get(id=user.id) for user in users[:3]] + [AnonymousUser()]
+        with patch.object(
+            AnonymousUserId.objects, 'bulk_create', wraps=AnonymousUserId.objects.bulk_create
+        ) as mock_bulk_create:
+            anonymous_ids = anonymous_ids_for_users(fresh_users, self.course.id, batch_size=10)
+        # The missing ids are created at once
+        self.assertEqual(mock_bulk_create.call_count, 1)
+        self.assertEqual(len(mock_bulk_create.call_args[0][0]), 2)
+        self.assertEqual(AnonymousUserId.objects.filter(course_id=self.course.id).count(), 3)
+        self.assertEqual(anonymous_ids[users[1].id], existing_id)
+        self.assertEqual(
+            anonymous_ids,
+            {user.id: anonymous_id_for_user(user, self.course.id, save=False) for user in users[:3]},
+        )
+
+        with self.assertNumQueries(1):
+            real_users = users_by_anonymous_ids(anonymous_ids.values() + ['unknown', None])
+        self.assertEqual(real_users, {anonymous_ids[user.id]: user for user in users[:3]})
+
+    def test_bulk_without_save(self):
+        with self.assertNumQueries(0):
+            anonymous_ids = anonymous_ids_for_users([self.user], self.course.id, save=False)
+        self.assertEqual(anonymous_ids, {self.user.id: anonymous_id_for_user(self.user, self.course.id, save=False)})
+        self.assertEqual(users_by_anonymous_ids(anonymous_ids.values()), {})
+
 
 # TODO: Clean up these tests so that they use program factories.
 @attr('shard_3')
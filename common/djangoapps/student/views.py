@@ -111,6 +111,7 @@ from student.helpers import (
     auth_pipeline_urls, get_next_url_for_login_page,
     DISABLE_UNENROLL_CERT_STATES,
 )
+from student import dashboard_document
 from student.cookies import set_logged_in_cookies, delete_logged_in_cookies
 from student.models import anonymous_id_for_user, UserAttribute, EnrollStatusChange
 from shoppingcart.models import DonationConfiguration, CourseRegistrationCode
@@ -520,31 +521,45 @@ def complete_course_mode_info(course_id, enrollment, modes=None):
 
 def is_course_blocked(request, redeemed_registration_codes, course_key):
     """Checking either registration is blocked or not ."""
-    blocked = False
+    blocked = _is_registration_blocked(redeemed_registration_codes)
+    if blocked:
+        _opt_out_of_blocked_course(request, course_key)
+    return blocked
+
+
+def _is_registration_blocked(redeemed_registration_codes):
+    """
+    Returns whether one of the given redeemed registration codes was
+    generated for an invoice that is not valid.
+    """
     for redeemed_registration in redeemed_registration_codes:
         # registration codes may be generated via Bulk Purchase Scenario
         # we have to check only for the invoice generated registration codes
         # that their invoice is valid or not
         if redeemed_registration.invoice_item:
             if not redeemed_registration.invoice_item.invoice.is_valid:
-                blocked = True
-                # disabling email notifications for unpaid registration courses
-                Optout.objects.get_or_create(user=request.user, course_id=course_key)
-                log.info(
-                    u"User %s (%s) opted out of receiving emails from course %s",
-                    request.user.username,
-                    request.user.email,
-                    course_key,
-                )
-                track.views.server_track(
-                    request,
-                    "change-email1-settings",
-                    {"receive_emails": "no", "course": course_key.to_deprecated_string()},
-                    page='dashboard',
-                )
-                break
+                return True
+    return False
 
-    return blocked
+
+def _opt_out_of_blocked_course(request, course_key):
+    """
+    Disables email notifications of the current user for the given course,
+    whose registration is blocked as it has not been paid.
+    """
+    Optout.objects.get_or_create(user=request.user, course_id=course_key)
+    log.info(
+        u"User %s (%s) opted out of receiving emails from course %s",
+        request.user.username,
+        request.user.email,
+        course_key,
+    )
+    track.views.server_track(
+        request,
+        "change-email1-settings",
+        {"receive_emails": "no", "course": course_key.to_deprecated_string()},
+        page='dashboard',
+    )
 
 
 @login_required
@@ -645,9 +660,24 @@ def dashboard(request):
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
     verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
+
+    # Compute the per-enrollment data, unless it is found in the user's
+    # precomputed dashboard document.
+    if dashboard_document.is_enabled():
+        document = dashboard_document.DashboardDocument(user.id)
+        dashboard_entries = document.get_entries(
+            course_enrollments,
+            lambda enrollments: _dashboard_entries(request, enrollments),
+        )
+        credit_statuses = document.get_section('credit_statuses', lambda: _credit_statuses(user, course_enrollments))
+        document.save()
+    else:
+        dashboard_entries = _dashboard_entries(request, course_enrollments)
+        credit_statuses = _credit_statuses(user, course_enrollments)
+
     cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
-        for enrollment in course_enrollments
+        course_id: dashboard_entry['cert_status']
+        for course_id, dashboard_entry in dashboard_entries.iteritems()
     }
 
     # only show email settings for Mongo course and when bulk email is turned on
@@ -671,16 +701,14 @@ def dashboard(request):
     )
 
     block_courses = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if is_course_blocked(
-            request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
-            enrollment.course_id
-        )
+        course_id for course_id, dashboard_entry in dashboard_entries.iteritems()
+        if dashboard_entry['is_blocked']
     )
+    # Only whether a course is blocked is part of its dashboard entry, so
+    # blocked courses are opted out of emails on each render, as they were
+    # before entries were reused.
+    for course_id in block_courses:
+        _opt_out_of_blocked_course(request, course_id)
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
@@ -723,7 +751,7 @@ def dashboard(request):
         'show_courseware_links_for': show_courseware_links_for,
         'all_course_modes': course_mode_info,
         'cert_statuses': cert_statuses,
-        'credit_statuses': _credit_statuses(user, course_enrollments),
+        'credit_statuses': credit_statuses,
         'show_email_settings_for': show_email_settings_for,
         'reverifications': reverifications,
         'verification_status': verification_status,
@@ -756,6 +784,33 @@ def dashboard(request):
     return render_to_response('dashboard.html', context)
 
 
+def _dashboard_entries(request, course_enrollments):
+    """
+    Computes the data displayed on the dashboard for each of the given
+    enrollments of the current user.
+
+    Returns:
+        dict: Mapping of course keys to dictionaries with keys:
+            'cert_status': the certificate info, see cert_info
+            'is_blocked': whether the course is blocked, see is_course_blocked
+
+    Unlike is_course_blocked, this doesn't opt the user out of emails for
+    blocked courses, which the dashboard view does on each render.
+    """
+    return {
+        enrollment.course_id: {
+            'cert_status': cert_info(request.user, enrollment.course_overview, enrollment.mode),
+            'is_blocked': _is_registration_blocked(
+                CourseRegistrationCode.objects.filter(
+                    course_id=enrollment.course_id,
+                    registrationcoderedemption__redeemed_by=request.user
+                ),
+            ),
+        }
+        for enrollment in course_enrollments
+    }
+
+
 def _create_recent_enrollment_message(course_enrollments, course_modes):  # pylint: disable=invalid-name
     """
     Builds a recent course enrollment message.
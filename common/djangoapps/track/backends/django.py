@@ -75,9 +75,21 @@ class DjangoBackend(BaseBackend):
         self.name = name
 
     def send(self, event):
-        field_values = {x: event.get(x, '') for x in LOGFIELDS}
-        tldat = TrackingLog(**field_values)
+        tldat = self._get_tracking_log(event)
         try:
             tldat.save(using=self.name)
         except Exception as e:  # pylint: disable=broad-except
             log.exception(e)
+
+    def send_batch(self, events):
+        """Insert the events in to the database in a single query"""
+        tldats = [self._get_tracking_log(event) for event in events]
+        try:
+            TrackingLog.objects.using(self.name).bulk_create(tldats)
+        except Exception as e:  # pylint: disable=broad-except
+            log.exception(e)
+
+    def _get_tracking_log(self, event):
+        """Returns an unsaved TrackingLog of the event"""
+        field_values = {x: event.get(x, '') for x in LOGFIELDS}
+        return TrackingLog(**field_values)
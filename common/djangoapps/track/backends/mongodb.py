@@ -97,3 +97,12 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """Insert the events in to the Mongo collection in a single bulk insert"""
+        try:
+            # Keep inserting the rest of the batch when an event fails.
+            self.collection.insert(events, manipulate=False, continue_on_error=True)
+        except (PyMongoError, BSONError):
+            msg = 'Error inserting a batch to MongoDB event tracker backend'
+            log.exception(msg)
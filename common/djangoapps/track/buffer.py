@@ -0,0 +1,236 @@
+"""
+Buffered dispatch of analytics events to the event tracking backends.
+
+Instead of sending each event to the backends within the request, the
+events are put on a bounded in-process queue, and background flusher
+threads send them to the backends in batches using their send_batch
+method, once FLUSH_SIZE events are queued or FLUSH_INTERVAL seconds pass.
+
+The buffer can be configured using Django settings as the example below::
+
+  TRACKING_BUFFER = {
+      'MAX_QUEUE_SIZE': 10000,
+      'FLUSH_SIZE': 100,
+      'FLUSH_INTERVAL': 1.0,
+      'FLUSHER_THREADS': 1,
+      'ENQUEUE_TIMEOUT': 0.1,
+  }
+
+When the queue is full, sending an event waits up to ENQUEUE_TIMEOUT
+seconds for room in the queue, which is counted as backpressure, and the
+event is dropped if there is still none. The remaining events are flushed
+when the process exits.
+
+"""
+
+import logging
+import os
+import threading
+import time
+import Queue
+
+from dogapi import dog_stats_api
+from django.db import close_old_connections
+
+
+log = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    'MAX_QUEUE_SIZE': 10000,
+    'FLUSH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'FLUSHER_THREADS': 1,
+    'ENQUEUE_TIMEOUT': 0.1,
+}
+
+STAT_NAMES = ('queued', 'sent', 'backpressure', 'dropped', 'failed')
+
+
+class EventBuffer(object):
+    """
+    A bounded queue of events, flushed to the given backends in batches
+    by background threads.
+
+    The flusher threads are started by the first event sent in each
+    process, so that processes forked from the one that created the buffer
+    get their own queue and threads.
+    """
+    def __init__(self, backends, max_queue_size, flush_size, flush_interval, flusher_threads, enqueue_timeout):
+        """
+        :Parameters:
+
+          - `backends`: dict of the backends to send events to, by name.
+          - `max_queue_size`: maximum number of events waiting to be sent.
+          - `flush_size`: maximum number of events sent in a batch.
+          - `flush_interval`: maximum number of seconds an event waits for
+            its batch to fill up.
+          - `flusher_threads`: number of threads sending batches.
+          - `enqueue_timeout`: number of seconds to wait for room in the
+            queue before dropping an event.
+
+        """
+        self.backends = backends
+        self.max_queue_size = max_queue_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.flusher_threads = flusher_threads
+        self.enqueue_timeout = enqueue_timeout
+
+        self.queue = None
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self._pid = None
+        self._threads = []
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def put(self, event):
+        """
+        Queues the event to be sent by the flusher threads. Returns whether
+        it was queued or sent, as it is sent synchronously once the buffer
+        is stopped.
+        """
+        if self._stopped.is_set():
+            self.send_batch([event])
+            return True
+
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(event)
+        except Queue.Full:
+            self._increment_stat('backpressure')
+            try:
+                self.queue.put(event, timeout=self.enqueue_timeout)
+            except Queue.Full:
+                self._increment_stat('dropped')
+                return False
+
+        self._increment_stat('queued')
+        return True
+
+    def flush(self):
+        """
+        Sends all of the queued events to the backends in the calling thread.
+        """
+        while True:
+            batch = []
+            while len(batch) < self.flush_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except (Queue.Empty, AttributeError):
+                    # The queue is missing if the buffer was never started.
+                    break
+            if not batch:
+                break
+            self.send_batch(batch)
+
+    def stop(self, timeout=None):
+        """
+        Stops the flusher threads, waiting up to timeout seconds for each of
+        them to send its current batch, and flushes the remaining events.
+        Events sent afterwards are sent synchronously.
+        """
+        self._stopped.set()
+        if self._pid == os.getpid():
+            for thread in self._threads:
+                thread.join(timeout)
+            self.flush()
+
+    def send_batch(self, batch):
+        """
+        Sends the batch of events to all the backends.
+        """
+        for name, backend in self.backends.items():
+            with dog_stats_api.timer('track.send_batch.backend.{0}'.format(name)):
+                try:
+                    backend.send_batch(batch)
+                except Exception:  # pylint: disable=broad-except
+                    # Keep the flusher threads alive and the other backends
+                    # sending when a backend fails.
+                    log.exception(u'Error sending a batch of events to the %s event tracking backend', name)
+                    self._increment_stat('failed', len(batch))
+        self._increment_stat('sent', len(batch))
+
+    def get_stats(self):
+        """
+        Returns a dict of the numbers of events that were queued, sent,
+        dropped, or failed to be sent to a backend, and of the times that
+        sending an event waited for room in the queue ('backpressure').
+        """
+        with self._lock:
+            return dict(self.stats)
+
+    def _ensure_started(self):
+        """
+        Starts the queue and the flusher threads, if they weren't started in
+        the current process.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # Events queued in the parent of a forked process are sent by the
+            # parent.
+            self.queue = Queue.Queue(self.max_queue_size)
+            self._threads = [
+                threading.Thread(target=self._run, name='track-flusher-{0}'.format(index))
+                for index in xrange(self.flusher_threads)
+            ]
+            for thread in self._threads:
+                thread.daemon = True
+                thread.start()
+            self._pid = pid
+
+    def _run(self):
+        """
+        Sends batches of queued events until the buffer is stopped.
+        """
+        while not self._stopped.is_set():
+            batch = self._get_batch()
+            if batch:
+                self.send_batch(batch)
+                # Like a request would, release database connections that
+                # are broken or past their maximum age.
+                close_old_connections()
+
+    def _get_batch(self):
+        """
+        Returns up to flush_size queued events, waiting up to flush_interval
+        seconds for them.
+        """
+        batch = []
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.flush_size and not self._stopped.is_set():
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except Queue.Empty:
+                break
+        return batch
+
+    def _increment_stat(self, name, value=1):
+        """
+        Increments the named counter, both locally and in datadog.
+        """
+        with self._lock:
+            self.stats[name] += value
+        dog_stats_api.increment('track.buffer.{0}'.format(name), value)
+
+
+def create_event_buffer(backends, options):
+    """
+    Returns an EventBuffer sending events to the given backends, configured
+    by the given options, which default to DEFAULT_OPTIONS.
+    """
+    options = dict(DEFAULT_OPTIONS, **options)
+    return EventBuffer(
+        backends,
+        max_queue_size=options['MAX_QUEUE_SIZE'],
+        flush_size=options['FLUSH_SIZE'],
+        flush_interval=options['FLUSH_INTERVAL'],
+        flusher_threads=options['FLUSHER_THREADS'],
+        enqueue_timeout=options['ENQUEUE_TIMEOUT'],
+    )
@@ -0,0 +1,223 @@
+"""
+A Django command that measures the throughput of the event processors of
+the routing backends in EVENT_TRACKING_BACKENDS, such as the tracking logs'
+track.shim processors, over a corpus of the shapes of commonly emitted
+events.
+
+Each event shape is processed by the processors of each backend the given
+number of times, and the number of events processed per second is reported
+per shape and per backend, so that the event throughput of a worker can be
+compared across changes to the processors.
+
+    manage.py lms benchmark_event_processors --iterations 10000 tracking_logs
+"""
+from copy import deepcopy
+from datetime import datetime
+from optparse import make_option
+from textwrap import dedent
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from eventtracking.processors.exceptions import EventEmissionExit
+from pytz import UTC
+
+
+TIMESTAMP = datetime(2016, 3, 14, 15, 9, 26, tzinfo=UTC)
+
+SERVER_CONTEXT = {
+    'accept_language': 'en-US,en;q=0.8',
+    'agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/49.0 Safari/537.36',
+    'client_id': '1180123406.1457968166',
+    'course_id': 'course-v1:edX+DemoX+Demo_Course',
+    'host': 'courses.example.com',
+    'ip': '203.0.113.7',
+    'org_id': 'edX',
+    'path': '/courses/course-v1:edX+DemoX+Demo_Course/xblock/block-v1:edX+DemoX+Demo_Course+type@problem+block@'
+            'a0effb954cca4759994f1ac9e9434bf4/handler/xmodule_handler/problem_check',
+    'referer': 'https://courses.example.com/courses/course-v1:edX+DemoX+Demo_Course/courseware/',
+    'session': '3f2c6a5a4d2b8e1f9c0d7b6a5e4f3d2c',
+    'user_id': 42,
+    'username': 'learner',
+}
+
+BROWSER_CONTEXT = dict(
+    SERVER_CONTEXT,
+    event_source='browser',
+    page='https://courses.example.com/courses/course-v1:edX+DemoX+Demo_Course/courseware/interactive_demonstrations/',
+    path='/event',
+)
+
+MOBILE_CONTEXT = dict(
+    SERVER_CONTEXT,
+    application={'name': 'edx.mobileapp.android', 'version': '2.3.1', 'component': 'videoplayer'},
+    event_source='mobile',
+    open_in_browser_url='https://courses.example.com/courses/course-v1:edX+DemoX+Demo_Course/jump_to/'
+                        'block-v1:edX+DemoX+Demo_Course+type@video+block@0b9e39477cf34507a7a48f74be381fdd',
+    path='/segmentio/event',
+)
+
+VIDEO_ID = 'block-v1:edX+DemoX+Demo_Course+type@video+block@0b9e39477cf34507a7a48f74be381fdd'
+
+# Shapes of commonly emitted events, as passed to the processors, by name.
+EVENT_CORPUS = [
+    ('server problem_check', {
+        'name': 'problem_check',
+        'context': dict(SERVER_CONTEXT, module={
+            'display_name': 'Multiple Choice Questions',
+            'usage_key': 'block-v1:edX+DemoX+Demo_Course+type@problem+block@a0effb954cca4759994f1ac9e9434bf4',
+        }),
+        'data': {
+            'answers': {'a0effb954cca4759994f1ac9e9434bf4_2_1': 'choice_2'},
+            'attempts': 1,
+            'correct_map': {
+                'a0effb954cca4759994f1ac9e9434bf4_2_1': {
+                    'correctness': 'correct', 'hint': '', 'hintmode': None, 'msg': '',
+                    'npoints': None, 'queuestate': None,
+                },
+            },
+            'grade': 1,
+            'max_grade': 1,
+            'problem_id': 'block-v1:edX+DemoX+Demo_Course+type@problem+block@a0effb954cca4759994f1ac9e9434bf4',
+            'state': {'done': None, 'correct_map': {}, 'seed': 1, 'student_answers': {}, 'input_state': {}},
+            'submission': {
+                'a0effb954cca4759994f1ac9e9434bf4_2_1': {
+                    'answer': 'Indonesia', 'correct': True, 'input_type': 'choicegroup',
+                    'question': 'Which of the following countries has the largest population?',
+                    'response_type': 'multiplechoiceresponse', 'variant': '',
+                },
+            },
+            'success': 'correct',
+        },
+        'timestamp': TIMESTAMP,
+    }),
+    ('server enrollment', {
+        'name': 'edx.course.enrollment.activated',
+        'context': SERVER_CONTEXT,
+        'data': {'course_id': 'course-v1:edX+DemoX+Demo_Course', 'user_id': 42, 'mode': 'audit'},
+        'timestamp': TIMESTAMP,
+    }),
+    ('browser page_close', {
+        'name': 'page_close',
+        'context': BROWSER_CONTEXT,
+        'data': '',
+        'timestamp': TIMESTAMP,
+    }),
+    ('browser play_video', {
+        'name': 'play_video',
+        'context': BROWSER_CONTEXT,
+        'data': {'id': '0b9e39477cf34507a7a48f74be381fdd', 'currentTime': 0, 'code': 'html5'},
+        'timestamp': TIMESTAMP,
+    }),
+    ('browser sequence next_selected', {
+        'name': 'edx.ui.lms.sequence.next_selected',
+        'context': BROWSER_CONTEXT,
+        'data': {
+            'current_tab': 2,
+            'tab_count': 5,
+            'id': 'block-v1:edX+DemoX+Demo_Course+type@sequential+block@basic_questions',
+            'widget_placement': 'top',
+        },
+        'timestamp': TIMESTAMP,
+    }),
+    ('browser outline selected', {
+        'name': 'edx.ui.lms.outline.selected',
+        'context': BROWSER_CONTEXT,
+        'data': {'current_url': BROWSER_CONTEXT['page'], 'target_name': 'Homework', 'widget_placement': 'accordion'},
+        'timestamp': TIMESTAMP,
+    }),
+    ('mobile video played', {
+        'name': 'edx.video.played',
+        'context': MOBILE_CONTEXT,
+        'data': {'current_time': 132.134456, 'module_id': VIDEO_ID, 'code': 'mobile'},
+        'timestamp': TIMESTAMP,
+    }),
+    ('mobile video seeked', {
+        'name': 'edx.video.position.changed',
+        'context': MOBILE_CONTEXT,
+        'data': {
+            'old_time': 132.134456, 'new_time': 102.134456, 'requested_skip_interval': -30, 'seek_type': 'skip',
+            'module_id': VIDEO_ID, 'code': 'mobile',
+        },
+        'timestamp': TIMESTAMP,
+    }),
+    ('mobile video closed captions', {
+        'name': 'edx.video.closed_captions.shown',
+        'context': MOBILE_CONTEXT,
+        'data': {'current_time': 132.134456, 'module_id': VIDEO_ID, 'code': 'mobile'},
+        'timestamp': TIMESTAMP,
+    }),
+]
+
+
+class Command(BaseCommand):
+    """
+    Measures the number of events per second processed by the processors
+    of the given routing backends.
+    """
+    args = "<backend_name backend_name ...>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--iterations',
+                    action='store',
+                    type='int',
+                    default=1000,
+                    help='Number of times each event shape is processed'),
+    )
+
+    def handle(self, *args, **options):
+        backend_names = args or sorted(
+            name for name, config in settings.EVENT_TRACKING_BACKENDS.iteritems()
+            if 'processors' in config.get('OPTIONS', {})
+        )
+        iterations = options['iterations']
+
+        for backend_name in backend_names:
+            try:
+                processor_configs = settings.EVENT_TRACKING_BACKENDS[backend_name]['OPTIONS']['processors']
+            except KeyError:
+                raise CommandError("{} is not a routing backend with processors".format(backend_name))
+            processors = settings.EVENT_TRACKING_PROCESSORS + processor_configs
+            processors = [
+                import_string(config['ENGINE'])(**config.get('OPTIONS', {}))
+                for config in processors
+            ]
+
+            self.stdout.write(u'{}:'.format(backend_name))
+            total_seconds = 0
+            for shape_name, event in EVENT_CORPUS:
+                seconds = self.time_processors(processors, event, iterations)
+                total_seconds += seconds
+                self.stdout.write(u'  {:<32} {:>10.0f} events/s'.format(shape_name, _rate(iterations, seconds)))
+            self.stdout.write(u'  {:<32} {:>10.0f} events/s'.format(
+                'all', _rate(iterations * len(EVENT_CORPUS), total_seconds)
+            ))
+
+    def time_processors(self, processors, event, iterations):
+        """
+        Returns the number of seconds taken to process the given number of
+        copies of the event by the processors, in order, as a routing
+        backend does.
+        """
+        # The processors modify the events, so each iteration is given a
+        # copy, made before the processing is timed.
+        events = [deepcopy(event) for __ in xrange(iterations)]
+
+        start = timeit.default_timer()
+        for processed_event in events:
+            try:
+                for processor in processors:
+                    modified_event = processor(processed_event)
+                    if modified_event is not None:
+                        processed_event = modified_event
+            except EventEmissionExit:
+                pass
+        return timeit.default_timer() - start
+
+
+def _rate(count, seconds):
+    """
+    Returns the number of events per second.
+    """
+    return count / seconds if seconds else float('inf')
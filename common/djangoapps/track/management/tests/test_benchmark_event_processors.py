@@ -0,0 +1,29 @@
+"""
+Tests of the benchmark_event_processors command.
+"""
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from track.management.commands.benchmark_event_processors import EVENT_CORPUS
+
+
+class BenchmarkEventProcessorsTest(TestCase):
+    """
+    Tests of the benchmark_event_processors command.
+    """
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_event_processors', 'tracking_logs', 'segmentio', iterations=2, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn('tracking_logs:', output)
+        self.assertIn('segmentio:', output)
+        for shape_name, __ in EVENT_CORPUS:
+            self.assertEqual(output.count(shape_name), 2)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_event_processors', 'unknown', iterations=1, stdout=StringIO())
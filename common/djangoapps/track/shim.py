@@ -15,6 +15,11 @@ CONTEXT_FIELDS_TO_INCLUDE = [
     'accept_language'
 ]
 
+# These fields are present elsewhere in the event once it is mapped, and
+# client_id is only used for Segment web analytics and does not concern
+# researchers.
+CONTEXT_FIELDS_TO_REMOVE = frozenset(CONTEXT_FIELDS_TO_INCLUDE + ['client_id'])
+
 
 class LegacyFieldMappingProcessor(object):
     """Ensures all required fields are included in emitted events"""
@@ -64,11 +69,7 @@ def remove_shim_context(event):
     """
     if 'context' in event:
         context = event['context']
-        # These fields are present elsewhere in the event at this point
-        context_fields_to_remove = set(CONTEXT_FIELDS_TO_INCLUDE)
-        # This field is only used for Segment web analytics and does not concern researchers
-        context_fields_to_remove.add('client_id')
-        for field in context_fields_to_remove:
+        for field in CONTEXT_FIELDS_TO_REMOVE:
             if field in context:
                 del context[field]
 
@@ -101,10 +102,15 @@ class PrefixedEventProcessor(object):
         """
         If the event is registered with the EventTransformerRegistry, transform
         it.  Otherwise do nothing to it, and continue processing.
+
+        The transformer of each event name is only looked up once, and the
+        event is only copied into a transformer if the transformer modifies
+        it.
         """
-        try:
-            event = EventTransformerRegistry.create_transformer(event)
-        except KeyError:
+        name = event.get(u'name')
+        transformer = EventTransformerRegistry.get_transformer(name)
+        if transformer is None or not transformer.handles(name):
             return
+        event = transformer(event)
         event.transform()
         return event
@@ -258,6 +258,22 @@ class EventTransformerRegistryTestCase(EventTrackingTestCase):
         event = {'name': event_name}
         with self.assertRaises(KeyError):
             self.registry.create_transformer(event)
+        self.assertIsNone(self.registry.get_transformer(event_name))
+
+    def test_registration_after_lookup(self):
+        mapping = transformers.DottedPathMapping()
+        mapping[u'edx.ui.'] = sentinel.ui
+        self.assertEqual(mapping[u'edx.ui.lms.sequence.foo'], sentinel.ui)
+        self.assertNotIn(u'edx.video.played', mapping)
+
+        # Lookups are memoized until the mapping changes.
+        mapping[u'edx.ui.lms.sequence.'] = sentinel.sequence
+        mapping[u'edx.video.played'] = sentinel.played
+        self.assertEqual(mapping[u'edx.ui.lms.sequence.foo'], sentinel.sequence)
+        self.assertEqual(mapping.get(u'edx.video.played'), sentinel.played)
+
+        del mapping[u'edx.ui.lms.sequence.']
+        self.assertEqual(mapping[u'edx.ui.lms.sequence.foo'], sentinel.ui)
 
 
 @ddt.ddt
@@ -301,6 +317,10 @@ class PrefixedEventProcessorTestCase(EventTrackingTestCase):
             self.assertNotIn(u'old', result[u'event'])
             self.assertNotIn(u'new', result[u'event'])
 
+    def test_untransformed_video_event(self):
+        event = {u'name': u'edx.video.closed_captions.shown', u'event': u'{}'}
+        self.assertIsNone(PrefixedEventProcessor()(event))
+
     def test_sequence_tab_navigation(self):
         event_name = u'edx.ui.lms.sequence.tab_selected'
         event = {
@@ -1,9 +1,11 @@
 from django.conf import settings
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 
 import track.tracker as tracker
 from track.backends import BaseBackend
+from track.buffer import EventBuffer
 
 
 SIMPLE_SETTINGS = {
@@ -107,11 +109,90 @@ class TestTrackerDjangoInstantiation(TestCase):
         return tracker.backends
 
 
+@override_settings(TRACKING_BACKENDS=MULTI_SETTINGS.copy(), TRACKING_BUFFER={'FLUSH_SIZE': 3})
+class TestBufferedTracker(TestCase):
+    """Test that events are sent to the backends in batches when buffered."""
+    def setUp(self):
+        # pylint: disable=protected-access
+        super(TestBufferedTracker, self).setUp()
+        # Stop buffering once the feature is disabled again.
+        self.addCleanup(tracker._initialize_backends_from_django_settings)
+        features_patcher = patch.dict(settings.FEATURES, {'ENABLE_BUFFERED_TRACKING': True})
+        features_patcher.start()
+        self.addCleanup(features_patcher.stop)
+
+        tracker._initialize_backends_from_django_settings()
+
+    def test_events_sent_in_batches(self):
+        event_count = 10
+        for _ in xrange(event_count):
+            tracker.send({})
+
+        tracker.event_buffer.stop()
+
+        for backend in tracker.backends.values():
+            self.assertEqual(backend.count, event_count)
+            self.assertTrue(all(size <= 3 for size in backend.batch_sizes))
+        stats = tracker.event_buffer.get_stats()
+        self.assertEqual(stats['queued'], event_count)
+        self.assertEqual(stats['sent'], event_count)
+        self.assertEqual(stats['dropped'], 0)
+
+    def test_events_sent_synchronously_once_stopped(self):
+        tracker.event_buffer.stop()
+        tracker.send({})
+        for backend in tracker.backends.values():
+            self.assertEqual(backend.count, 1)
+
+    def test_failing_backend(self):
+        backends = tracker.backends.values()
+        with patch.object(backends[0], 'send_batch', side_effect=Exception):
+            tracker.send({})
+            tracker.event_buffer.stop()
+        self.assertEqual(backends[1].count, 1)
+        self.assertEqual(tracker.event_buffer.get_stats()['failed'], 1)
+
+
+class TestEventBuffer(TestCase):
+    """Test the bounds of the event buffer."""
+    def setUp(self):
+        super(TestEventBuffer, self).setUp()
+        self.backend = DummyBackend()
+        self.event_buffer = EventBuffer(
+            {'dummy': self.backend}, max_queue_size=2, flush_size=10, flush_interval=1.0,
+            flusher_threads=0, enqueue_timeout=0.01,
+        )
+
+    def test_drops_events_when_full(self):
+        self.assertTrue(self.event_buffer.put({}))
+        self.assertTrue(self.event_buffer.put({}))
+        self.assertFalse(self.event_buffer.put({}))
+
+        stats = self.event_buffer.get_stats()
+        self.assertEqual(stats['queued'], 2)
+        self.assertEqual(stats['backpressure'], 1)
+        self.assertEqual(stats['dropped'], 1)
+
+        self.event_buffer.flush()
+        self.assertEqual(self.backend.count, 2)
+        self.assertEqual(self.backend.batch_sizes, [2])
+
+    def test_stop_flushes_events(self):
+        self.event_buffer.put({})
+        self.event_buffer.stop()
+        self.assertEqual(self.backend.count, 1)
+
+
 class DummyBackend(BaseBackend):
     def __init__(self, **options):
         super(DummyBackend, self).__init__(**options)
         self.flag = options.get('flag', False)
         self.count = 0
+        self.batch_sizes = []
 
     def send(self, event):
         self.count += 1
+
+    def send_batch(self, events):
+        self.batch_sizes.append(len(events))
+        super(DummyBackend, self).send_batch(events)
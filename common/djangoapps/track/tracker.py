@@ -16,8 +16,13 @@ below::
       }
   }
 
+When FEATURES['ENABLE_BUFFERED_TRACKING'] is set, events are sent to the
+backends in batches by background threads instead, as configured by the
+TRACKING_BUFFER setting (see track.buffer).
+
 """
 
+import atexit
 import inspect
 from importlib import import_module
 
@@ -26,6 +31,7 @@ from dogapi import dog_stats_api
 from django.conf import settings
 
 from track.backends import BaseBackend
+from track.buffer import create_event_buffer
 
 
 __all__ = ['send']
@@ -33,6 +39,8 @@ __all__ = ['send']
 
 backends = {}
 
+event_buffer = None
+
 
 def _initialize_backends_from_django_settings():
     """
@@ -40,6 +48,9 @@ def _initialize_backends_from_django_settings():
     configuration in django settings
 
     """
+    # Send the events buffered for the previous backends.
+    _flush_event_buffer()
+
     backends.clear()
 
     config = getattr(settings, 'TRACKING_BACKENDS', {})
@@ -51,6 +62,21 @@ def _initialize_backends_from_django_settings():
             options = values.get('OPTIONS', {})
             backends[name] = _instantiate_backend_from_name(engine, options)
 
+    _initialize_event_buffer_from_django_settings()
+
+
+def _initialize_event_buffer_from_django_settings():
+    """
+    Initialize the buffer of events sent to the backends in batches, if
+    enabled in django settings.
+
+    """
+    global event_buffer  # pylint: disable=global-statement
+
+    event_buffer = None
+    if settings.FEATURES.get('ENABLE_BUFFERED_TRACKING', False):
+        event_buffer = create_event_buffer(backends, getattr(settings, 'TRACKING_BUFFER', {}))
+
 
 def _instantiate_backend_from_name(name, options):
     """
@@ -91,9 +117,24 @@ def send(event):
     """
     dog_stats_api.increment('track.send.count')
 
+    if event_buffer is not None:
+        event_buffer.put(event)
+        return
+
     for name, backend in backends.iteritems():
         with dog_stats_api.timer('track.send.backend.{0}'.format(name)):
             backend.send(event)
 
 
+def _flush_event_buffer():
+    """
+    Flush the events that are still buffered, for instance when the
+    process exits.
+
+    """
+    if event_buffer is not None:
+        event_buffer.stop()
+
+
 _initialize_backends_from_django_settings()
+atexit.register(_flush_event_buffer)
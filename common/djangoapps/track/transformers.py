@@ -22,58 +22,57 @@ class DottedPathMapping(object):
     prefix.  Any value whose prefix matches the dotted path can be used
     as a key for that value, but only the most specific match will
     be used.
+
+    The value found for each key is memoized until the mapping changes, so
+    that the prefixes are only searched once per key.
     """
 
-    # TODO: The current implementation of the prefix registry requires
-    # O(number of prefix event transformers) to access an event.  If we get a
-    # large number of EventTransformers, it may be worth writing a tree-based
-    # map structure where each node is a segment of the match key, which would
-    # reduce access time to O(len(match.key.split('.'))), or essentially constant
-    # time.
+    # Maximum number of memoized keys.  Event names are sent by clients, so
+    # the memo is emptied once it reaches this size.
+    MAX_MEMOIZED_KEYS = 10000
+
+    _NOT_FOUND = object()
 
     def __init__(self, registry=None):
         self._match_registry = {}
         self._prefix_registry = {}
+        # Prefixes reverse-sorted, to find the longest matching prefix first.
+        self._sorted_prefixes = []
+        self._memoized = {}
         self.update(registry or {})
 
     def __contains__(self, key):
-        try:
-            _ = self[key]
-            return True
-        except KeyError:
-            return False
+        return self._find(key) is not self._NOT_FOUND
 
     def __getitem__(self, key):
-        if key in self._match_registry:
-            return self._match_registry[key]
-        if isinstance(key, basestring):
-            # Reverse-sort the keys to find the longest matching prefix.
-            for prefix in sorted(self._prefix_registry, reverse=True):
-                if key.startswith(prefix):
-                    return self._prefix_registry[prefix]
-        raise KeyError('Key {} not found in {}'.format(key, type(self)))
+        value = self._find(key)
+        if value is self._NOT_FOUND:
+            raise KeyError('Key {} not found in {}'.format(key, type(self)))
+        return value
 
     def __setitem__(self, key, value):
         if key.endswith('.'):
             self._prefix_registry[key] = value
         else:
             self._match_registry[key] = value
+        self._registry_changed()
 
     def __delitem__(self, key):
         if key.endswith('.'):
             del self._prefix_registry[key]
         else:
             del self._match_registry[key]
+        self._registry_changed()
 
     def get(self, key, default=None):
         """
         Return `self[key]` if it exists, otherwise, return `None` or `default`
         if it is specified.
         """
-        try:
-            self[key]
-        except KeyError:
+        value = self._find(key)
+        if value is self._NOT_FOUND:
             return default
+        return value
 
     def update(self, dict_):
         """
@@ -89,6 +88,34 @@ class DottedPathMapping(object):
         """
         return self._match_registry.keys() + self._prefix_registry.keys()
 
+    def _find(self, key):
+        """
+        Return the value of the key, memoizing it, or `_NOT_FOUND`.
+        """
+        try:
+            return self._memoized[key]
+        except KeyError:
+            pass
+
+        value = self._match_registry.get(key, self._NOT_FOUND)
+        if value is self._NOT_FOUND and isinstance(key, basestring):
+            for prefix in self._sorted_prefixes:
+                if key.startswith(prefix):
+                    value = self._prefix_registry[prefix]
+                    break
+
+        if len(self._memoized) >= self.MAX_MEMOIZED_KEYS:
+            self._memoized.clear()
+        self._memoized[key] = value
+        return value
+
+    def _registry_changed(self):
+        """
+        Update the sorted prefixes and forget the memoized values.
+        """
+        self._sorted_prefixes = sorted(self._prefix_registry, reverse=True)
+        self._memoized.clear()
+
 
 class EventTransformerRegistry(object):
     """
@@ -120,6 +147,14 @@ class EventTransformerRegistry(object):
         name = event.get(u'name')
         return cls.mapping[name](event)
 
+    @classmethod
+    def get_transformer(cls, name):
+        """
+        Return the EventTransformer class registered to handle events with
+        the given name, or None.
+        """
+        return cls.mapping.get(name)
+
 
 class EventTransformer(dict):
     """
@@ -185,6 +220,15 @@ class EventTransformer(dict):
         super(EventTransformer, self).__init__(*args, **kwargs)
         self.load_payload()
 
+    @classmethod
+    def handles(cls, name):
+        """
+        Return whether the transformer modifies events with the given name.
+        Override this to skip creating transformers of the events that
+        `transform()` would leave unchanged.
+        """
+        return True
+
     # Properties to be overridden
 
     is_legacy_event = False
@@ -380,6 +424,13 @@ class VideoEventTransformer(EventTransformer):
 
     is_legacy_event = True
 
+    @classmethod
+    def handles(cls, name):
+        """
+        Only the expected types of events are transformed.
+        """
+        return name in cls.name_to_event_type_map
+
     @property
     def legacy_event_type(self):
         """
@@ -1,12 +1,16 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main function as of now is evaluator(). Expressions
+evaluated repeatedly can be parsed once with compile_expression().
 """
 
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -61,6 +65,19 @@ DEFAULT_VARIABLES = {
     'q': scipy.constants.e  # Fund. Charge: 1.602176565e-19 (Coulombs)
 }
 
+# Functions which apply elementwise to numpy arrays, in addition to numpy's
+# ufuncs, so that expressions using them can be evaluated over many samples at
+# once.
+VECTORIZABLE_FUNCTIONS = frozenset([
+    functions.sec, functions.csc, functions.cot,
+    functions.arcsec, functions.arccsc,
+    functions.sech, functions.csch, functions.coth,
+    functions.arcsech, functions.arccsch, functions.arccoth,
+])
+
+# Maximum number of compiled expressions kept by compile_expression().
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
 # We eliminated the following extreme suffixes:
 #   P (1e15), E (1e18), Z (1e21), Y (1e24),
 #   f (1e-15), a (1e-18), z (1e-21), y (1e-24)
@@ -200,6 +217,78 @@ def eval_product(parse_result):
     return prod
 
 
+# The following variants of the evaluation actions above also accept numpy
+# arrays, which hold the values of a node for many samples at once.
+
+def _is_value(token):
+    """
+    Return whether the token is a value (as opposed to an operator string).
+    """
+    return not isinstance(token, basestring)
+
+
+def eval_atom_vector(parse_result):
+    """
+    Like eval_atom, also accepting numpy arrays.
+    """
+    return next(k for k in parse_result if _is_value(k))
+
+
+def eval_power_vector(parse_result):
+    """
+    Like eval_power, also accepting numpy arrays.
+    """
+    parse_result = reversed([k for k in parse_result if _is_value(k)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def eval_parallel_vector(parse_result):
+    """
+    Like eval_parallel, also accepting numpy arrays.
+    """
+    values = [k for k in parse_result if _is_value(k)]
+    if len(values) == 1:
+        return values[0]
+    result = 1. / sum(1. / value for value in values)
+    has_zero = reduce(numpy.logical_or, [numpy.equal(value, 0) for value in values])
+    return numpy.where(has_zero, float('nan'), result)
+
+
+def eval_sum_vector(parse_result):
+    """
+    Like eval_sum, also accepting numpy arrays.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.add if token == '+' else operator.sub
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def eval_product_vector(parse_result):
+    """
+    Like eval_product, also accepting numpy arrays.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.mul if token == '*' else operator.truediv
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+def is_vectorizable(function):
+    """
+    Return whether the function applies elementwise to numpy arrays.
+    """
+    return isinstance(function, numpy.ufunc) or function in VECTORIZABLE_FUNCTIONS
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -224,38 +313,161 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+_compiled_expressions = OrderedDict()  # pylint: disable=invalid-name
+_compiled_expressions_lock = threading.Lock()  # pylint: disable=invalid-name
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Parse an expression into a CompiledExpression, which can then be evaluated
+    for any number of variable values without being parsed again.
+
+    The COMPILED_EXPRESSION_CACHE_SIZE most recently used compiled expressions
+    are cached. Raise a pyparsing.ParseException if the expression is invalid.
+    """
+    cache_key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled_expression = _compiled_expressions.pop(cache_key, None)
+        if compiled_expression is not None:
+            _compiled_expressions[cache_key] = compiled_expression
+            return compiled_expression
+
+    compiled_expression = CompiledExpression(math_expr, case_sensitive)
+
+    with _compiled_expressions_lock:
+        _compiled_expressions[cache_key] = compiled_expression
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled_expression
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression, which can be evaluated repeatedly.
+
+    Use compile_expression() to get one, rather than instantiating it.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.math_interpreter = None
+
+        # An empty expression evaluates to NaN, no need to parse it.
+        if math_expr.strip() != "":
+            self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+            self.math_interpreter.parse_algebra()
+
+    def casify(self, name):
+        """
+        Return the name as looked up in the dictionaries of variables and functions.
+        """
+        return name if self.case_sensitive else name.lower()  # Lowercase for case insens.
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression, like evaluator().
+
+        -Variables are passed as a dictionary from string to value. They must be
+         python numbers.
+        -Unary functions are passed as a dictionary from string to function.
+        """
+        if self.math_interpreter is None:
+            return float('nan')
+
+        # Get our variables together...
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        # ...and check them
+        self.math_interpreter.check_variables(all_variables, all_functions)
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[self.casify(x[0])],
+            'function': lambda x: all_functions[self.casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+        return self.math_interpreter.reduce_tree(evaluate_actions)
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the dictionaries of variables in
+        `variables_list`, returning the list of results.
+
+        This gives the same results (and raises the same errors) as calling
+        evaluate() for each of them, but when all the functions used in the
+        expression are vectorizable, it evaluates the expression over numpy
+        arrays of all the samples at once.
+        """
+        variables_list = list(variables_list)
+        results = None
+        if len(variables_list) > 1 and self.math_interpreter is not None:
+            results = self._evaluate_vectorized(variables_list, functions)
+        if results is None:
+            results = [self.evaluate(variables, functions) for variables in variables_list]
+        return results
+
+    def _evaluate_vectorized(self, variables_list, functions):
+        """
+        Evaluate the expression over numpy arrays of the values of the
+        variables, and return the list of results, or None if the expression
+        or the variables can't be vectorized.
+
+        Results that aren't finite are evaluated again one by one, so that
+        overflows, divisions by zero, values outside of the domain of a
+        function and the like are handled as in evaluate().
+        """
+        variables_used = set(self.casify(name) for name in self.math_interpreter.variables_used)
+        functions_used = set(self.casify(name) for name in self.math_interpreter.functions_used)
+
+        all_functions = None
+        values_by_variable = {name: [] for name in variables_used}
+        for variables in variables_list:
+            all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+            for name, values in values_by_variable.iteritems():
+                value = all_variables.get(name)
+                if not isinstance(value, numbers.Number):
+                    return None
+                values.append(value)
+
+        if not functions_used.issubset(all_functions):
+            return None
+        if not all(is_vectorizable(all_functions[name]) for name in functions_used):
+            return None
+
+        vectors = {}
+        for name, values in values_by_variable.iteritems():
+            dtype = complex if any(isinstance(value, complex) for value in values) else float
+            vectors[name] = numpy.array(values, dtype=dtype)
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: vectors[self.casify(x[0])],
+            'function': lambda x: all_functions[self.casify(x[0])](x[1]),
+            'atom': eval_atom_vector,
+            'power': eval_power_vector,
+            'parallel': eval_parallel_vector,
+            'product': eval_product_vector,
+            'sum': eval_sum_vector
+        }
+        try:
+            with numpy.errstate(all='ignore'):
+                result = numpy.asarray(self.math_interpreter.reduce_tree(evaluate_actions))
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if result.shape != (len(variables_list),):
+            # The expression doesn't depend on the variables.
+            return None
+
+        results = list(result)
+        for index in numpy.flatnonzero(~numpy.isfinite(result)):
+            results[index] = self.evaluate(variables_list[index], functions)
+        return results
 
 
 class ParseAugmenter(object):
@@ -559,3 +559,72 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and CompiledExpression.evaluate_many
+    """
+    def test_compiled_expressions_are_cached(self):
+        compiled = calc.compile_expression('x^2 + 1')
+        self.assertIs(compiled, calc.compile_expression('x^2 + 1'))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + 1', case_sensitive=True))
+
+    def test_cache_is_bounded(self):
+        original_size = calc.calc.COMPILED_EXPRESSION_CACHE_SIZE
+        calc.calc.COMPILED_EXPRESSION_CACHE_SIZE = 2
+        try:
+            compiled = calc.compile_expression('1+1')
+            calc.compile_expression('1+2')
+            calc.compile_expression('1+3')
+            self.assertIsNot(compiled, calc.compile_expression('1+1'))
+        finally:
+            calc.calc.COMPILED_EXPRESSION_CACHE_SIZE = original_size
+
+    def test_invalid_expression(self):
+        with self.assertRaises(ParseException):
+            calc.compile_expression('1+*2')
+
+    def assert_evaluate_many(self, math_expr, variables_list, functions=None):
+        """
+        Assert that evaluate_many gives the same results as evaluator for each of the variables.
+        """
+        functions = functions or {}
+        results = calc.compile_expression(math_expr).evaluate_many(variables_list, functions)
+        expected_results = [calc.evaluator(variables, functions, math_expr) for variables in variables_list]
+        self.assertEqual(len(results), len(expected_results))
+        for result, expected_result in zip(results, expected_results):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(result, expected_result)
+
+    def test_evaluate_many(self):
+        variables_list = [{'x': x, 'y': 0.5 * x + 1} for x in (0.5, 1.0, 2.0, 3.5)]
+        self.assert_evaluate_many('x^2 + 3*y - x/y', variables_list)
+        self.assert_evaluate_many('sin(x)*sec(y) + sqrt(x)', variables_list)
+        self.assert_evaluate_many('x || y', variables_list)
+        self.assert_evaluate_many('-x^y^2 + 2', variables_list)
+        self.assert_evaluate_many('x*i + e^(pi*y)', variables_list)
+        self.assert_evaluate_many('3', variables_list)
+
+    def test_evaluate_many_not_vectorizable(self):
+        variables_list = [{'x': x} for x in (1, 2, 3)]
+        self.assert_evaluate_many('fact(x)', variables_list)
+        self.assert_evaluate_many('arccot(x)', variables_list)
+        self.assert_evaluate_many('f(x)', variables_list, {'f': lambda x: x + 1})
+
+    def test_evaluate_many_out_of_domain(self):
+        variables_list = [{'x': x} for x in (-1.0, 0.0, 1.0)]
+        self.assert_evaluate_many('x || 2', variables_list)
+        self.assert_evaluate_many('sqrt(x)', variables_list)
+        with self.assertRaises(ZeroDivisionError):
+            calc.compile_expression('1/x').evaluate_many(variables_list, {})
+
+    def test_evaluate_many_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.compile_expression('x+y').evaluate_many([{'x': 1.0}, {'x': 2.0}], {})
+
+    def test_evaluate_many_empty(self):
+        results = calc.compile_expression('  ').evaluate_many([{}, {}], {})
+        self.assertTrue(all(numpy.isnan(result) for result in results))
@@ -13,11 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
 from lxml import etree
 from pytz import UTC
@@ -58,6 +61,93 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# maximum number of parsed problem templates kept by each process
+PROBLEM_TEMPLATE_CACHE_SIZE = 256
+
+#-----------------------------------------------------------------------------
+# cache of parsed problems
+
+
+class ProblemTemplate(object):
+    """
+    The part of a capa Problem that does not depend on its seed: the problem
+    XML tree, with includes processed and IDs assigned to its responses and
+    input fields, and the layout of its responses.
+
+    A template is never modified once built; each problem works on a clone.
+    """
+    def __init__(self, tree, response_layout, cacheable=True):
+        """
+        Arguments:
+            tree: the XML tree of the problem.
+            response_layout: a list of (response, inputfields) pairs, in
+                document order, for the responses of the tree.
+            cacheable (bool): whether the template may be reused by other
+                problems. Templates built from included files are not, since
+                those files may change.
+        """
+        self.tree = tree
+        self.cacheable = cacheable
+        elements = list(tree.iter())
+        positions = {element: index for index, element in enumerate(elements)}
+        self.response_layout = [
+            (positions[response], [positions[inputfield] for inputfield in inputfields])
+            for response, inputfields in response_layout
+        ]
+
+    def clone(self):
+        """
+        Returns a copy of the tree of this template, along with its response
+        layout as a list of (response, inputfields) pairs of the copied tree.
+        """
+        tree = deepcopy(self.tree)
+        elements = list(tree.iter())
+        response_layout = [
+            (elements[response], [elements[inputfield] for inputfield in inputfields])
+            for response, inputfields in self.response_layout
+        ]
+        return tree, response_layout
+
+
+_problem_templates = OrderedDict()
+_problem_templates_lock = threading.Lock()
+
+
+def get_problem_template(problem_id, problem_text, build):
+    """
+    Returns the cached ProblemTemplate of the given problem, calling
+    build() to create it if not cached.
+
+    Templates are keyed on the problem id and text, so editing a problem
+    creates a new template. The least recently used templates are evicted
+    once more than PROBLEM_TEMPLATE_CACHE_SIZE are cached.
+    """
+    if isinstance(problem_text, unicode):
+        problem_text = problem_text.encode('utf-8')
+    key = (problem_id, hashlib.sha1(problem_text).hexdigest())
+    with _problem_templates_lock:
+        template = _problem_templates.pop(key, None)
+        if template is not None:
+            _problem_templates[key] = template
+            return template
+
+    template = build()
+    if template.cacheable:
+        with _problem_templates_lock:
+            _problem_templates[key] = template
+            while len(_problem_templates) > PROBLEM_TEMPLATE_CACHE_SIZE:
+                _problem_templates.popitem(last=False)
+    return template
+
+
+def clear_problem_templates():
+    """
+    Empties the cache of problem templates.
+    """
+    with _problem_templates_lock:
+        _problem_templates.clear()
+
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -161,22 +251,20 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, with ID's assigned to its
+        # responses and inputs.  This does not depend on the seed, so the parsed
+        # tree is cached and each problem works on a copy of it.
+        template = get_problem_template(self.problem_id, problem_text, self._build_template)
+        self.tree, response_layout = template.clone()
 
         # construct script processor context (eg for customresponse problems)
         self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self._preprocess_problem(self.tree)
+        # Pre-parse the XML tree: performs some in-place transformations.  This also
+        # creates the dict (self.responders) of Response instances for each question
+        # in the problem. The dict has keys = xml subtree of Response, values = Response
+        # instance
+        self._preprocess_problem(self.tree, response_layout)
 
         if not self.student_answers:  # True when student_answers is an empty dict
             self.set_initial_display()
@@ -396,13 +484,18 @@ class LoncapaProblem(object):
         """
         return all('filesubmission' not in responder.allowed_inputfields for responder in self.responders.values())
 
-    def rescore_existing_answers(self):
+    def rescore_existing_answers(self, grading_memo=None):
         """
         Rescore student responses.  Called by capa_module.rescore_problem.
+
+        `grading_memo` is a dict shared by the rescoring of many problems, in which
+        the grades of responses that only depend on the answers and the correct
+        answers are kept, so that identical answers are graded once (see
+        LoncapaResponse.evaluate_answers_batch).
         """
-        return self._grade_answers(None)
+        return self._grade_answers(None, grading_memo)
 
-    def _grade_answers(self, student_answers):
+    def _grade_answers(self, student_answers, grading_memo=None):
         """
         Internal grading call used for checking new 'student_answers' and also
         rescoring existing student_answers.
@@ -412,7 +505,8 @@ class LoncapaProblem(object):
         (the string before the first "_").  Thus, for example,
         input_ID123 -> ID123, and input_fromjs_ID123 -> fromjs_ID123.
 
-        For rescoring, `student_answers` is None.
+        For rescoring, `student_answers` is None, and `grading_memo` may be given as
+        for rescore_existing_answers.
 
         Calls the Response for each question in this problem, to do the actual grading.
         """
@@ -436,6 +530,8 @@ class LoncapaProblem(object):
             # submission that would not exist in the persisted "student_answers".
             if 'filesubmission' in responder.allowed_inputfields and student_answers is not None:
                 results = responder.evaluate_answers(student_answers, oldcmap)
+            elif grading_memo is not None:
+                results = responder.evaluate_answers_batch([self.student_answers], [oldcmap], grading_memo)[0]
             else:
                 results = responder.evaluate_answers(self.student_answers, oldcmap)
             newcmap.update(results)
@@ -576,6 +672,21 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
+    def _build_template(self):
+        """
+        Parses the problem text and returns its ProblemTemplate.
+        """
+        self.tree = etree.XML(self.problem_text)
+
+        self.make_xml_compatible(self.tree)
+
+        # handle any <include file="foo"> tags
+        has_includes = bool(self.tree.findall('.//include'))
+        self._process_includes()
+
+        response_layout = self._assign_ids(self.tree)
+        return ProblemTemplate(self.tree, response_layout, cacheable=not has_includes)
+
     def _process_includes(self):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
@@ -824,19 +935,16 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree):  # private
+    def _assign_ids(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns a list of (response, inputfields) pairs, in document order
         """
+        response_layout = []
         response_id = 1
-        self.responders = {}
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             response_id_str = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -857,6 +965,21 @@ class LoncapaProblem(object):
                 entry.attrib['id'] = "%s_%i_%i" % (self.problem_id, response_id, answer_id)
                 answer_id = answer_id + 1
 
+            response_layout.append((response, inputfields))
+        return response_layout
+
+    def _preprocess_problem(self, tree, response_layout):  # private
+        """
+        Annoted correctness and value
+        In-place transformation
+
+        Create capa Response instances for each responsetype of response_layout, as
+        returned by _assign_ids, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        self.responders = {}
+        for response, inputfields in response_layout:
             # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(response, inputfields, self.context, self.capa_system, self.capa_module)
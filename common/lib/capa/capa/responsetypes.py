@@ -37,7 +37,7 @@ from shapely.geometry import Point, MultiPoint
 import dogstats_wrapper as dog_stats_api
 
 # specific library imports
-from calc import evaluator, UndefinedVariable
+from calc import compile_expression, evaluator, UndefinedVariable
 from . import correctmap
 from .registry import TagRegistry
 from datetime import datetime
@@ -59,6 +59,9 @@ registry = TagRegistry()
 CorrectMap = correctmap.CorrectMap
 CORRECTMAP_PY = None
 
+# Maximum number of grades kept by evaluate_answers_batch in its memo
+GRADING_MEMO_MAX_SIZE = 10000
+
 # Make '_' a no-op so we can scrape strings. Using lambda instead of
 #  `django.utils.translation.ugettext_noop` because Django cannot be imported in this file
 _ = lambda text: text
@@ -153,6 +156,11 @@ class LoncapaResponse(object):
     # By default, we set this to False, allowing subclasses to override as appropriate.
     multi_device_support = False
 
+    # Overridable field that specifies whether the grade of student answers to this capa
+    # response type depends only on the answers and on the seed of the problem, so that
+    # identical answers can be graded once (see evaluate_answers_batch).
+    deterministic_grading = False
+
     def __init__(self, xml, inputfields, context, system, capa_module):
         """
         Init is passed the following arguments:
@@ -282,6 +290,63 @@ class LoncapaResponse(object):
             student_answers), new_cmap, old_cmap)
         return new_cmap
 
+    def evaluate_answers_batch(self, student_answers_list, old_cmaps=None, memo=None):
+        """
+        Evaluates many student answers to this response, as evaluate_answers does for
+        each of them with the matching CorrectMap of `old_cmaps`, if any.
+
+        The answers with the same grading_key are only evaluated once.  `memo` is a dict
+        of the CorrectMap dicts already evaluated, by grading key, which may be shared
+        by the responses of the problem bound to other students.  At most GRADING_MEMO_MAX_SIZE
+        grades are kept in it.
+
+        Returns the list of new CorrectMaps.
+        """
+        if old_cmaps is None:
+            old_cmaps = [CorrectMap() for __ in student_answers_list]
+        if memo is None:
+            memo = {}
+
+        new_cmaps = []
+        for student_answers, old_cmap in zip(student_answers_list, old_cmaps):
+            key = self.grading_key(student_answers)
+            if key is None:
+                new_cmaps.append(self.evaluate_answers(student_answers, old_cmap))
+                continue
+            if key in memo:
+                new_cmap = CorrectMap()
+                new_cmap.set_dict(memo[key])
+            else:
+                new_cmap = self.evaluate_answers(student_answers, old_cmap)
+                if len(memo) < GRADING_MEMO_MAX_SIZE:
+                    memo[key] = new_cmap.get_dict()
+            new_cmaps.append(new_cmap)
+        return new_cmaps
+
+    def grading_key(self, student_answers):
+        """
+        Returns a key identifying the grade of the given student answers to this response,
+        or None if the grade may depend on more than the answers and the correct answers
+        of the response, e.g. when hints are computed by a hint function.
+
+        The correct answers are contextualized, so they reflect the seed of the problem.
+        When the problem has script code, which may compute anything from the
+        anonymous_student_id it is given, the key is specific to the student.
+        """
+        if not self.deterministic_grading:
+            return None
+        hintgroup = self.xml.find('hintgroup')
+        if hintgroup is not None and hintgroup.get('hintfn') is not None:
+            return None
+        answers = [student_answers.get(answer_id) for answer_id in self.answer_ids]
+        anonymous_student_id = self.context.get('anonymous_student_id') if self.context.get('script_code') else None
+        return (
+            self.id,
+            json.dumps(self.get_answers(), sort_keys=True),
+            anonymous_student_id,
+            json.dumps(answers, sort_keys=True),
+        )
+
     def make_hint_div(self, hint_node, correct, student_answer, question_tag,
                       label=None, hint_log=None, multiline_mode=False, log_extra=None):
         """
@@ -828,6 +893,7 @@ class ChoiceResponse(LoncapaResponse):
     allowed_inputfields = ['checkboxgroup', 'radiogroup']
     correct_choices = None
     multi_device_support = True
+    deterministic_grading = True
 
     def setup_response(self):
         self.assign_choice_names()
@@ -1153,6 +1219,7 @@ class MultipleChoiceResponse(LoncapaResponse):
     allowed_inputfields = ['choicegroup']
     correct_choices = None
     multi_device_support = True
+    deterministic_grading = True
 
     def setup_response(self):
         """
@@ -1592,6 +1659,7 @@ class OptionResponse(LoncapaResponse):
     allowed_inputfields = ['optioninput']
     answer_fields = None
     multi_device_support = True
+    deterministic_grading = True
 
     def setup_response(self):
         self.answer_fields = self.inputfields
@@ -1667,6 +1735,7 @@ class NumericalResponse(LoncapaResponse):
     required_attributes = ['answer']
     max_inputfields = 1
     multi_device_support = True
+    deterministic_grading = True
 
     def __init__(self, *args, **kwargs):
         self.correct_answer = ''
@@ -1981,6 +2050,7 @@ class StringResponse(LoncapaResponse):
     max_inputfields = 1
     correct_answer = []
     multi_device_support = True
+    deterministic_grading = True
 
     def setup_response_backward(self):
         self.correct_answer = [
@@ -3209,56 +3279,55 @@ class FormulaResponse(LoncapaResponse):
         """
         _ = self.capa_system.i18n.ugettext
 
-        out = []
-        for var_dict in var_dict_list:
-            try:
-                out.append(evaluator(
-                    var_dict,
-                    dict(),
-                    answer,
-                    case_sensitive=self.case_sensitive,
-                ))
-            except UndefinedVariable as err:
+        if not var_dict_list:
+            return []
+
+        # The answer is parsed once, and evaluated for all the test cases at once.
+        try:
+            return compile_expression(answer, case_sensitive=self.case_sensitive).evaluate_many(
+                var_dict_list,
+                dict(),
+            )
+        except UndefinedVariable as err:
+            log.debug(
+                'formularesponse: undefined variable in formula=%s',
+                cgi.escape(answer)
+            )
+            raise StudentInputError(
+                _("Invalid input: {bad_input} not permitted in answer.").format(bad_input=err.message)
+            )
+        except ValueError as err:
+            if 'factorial' in err.message:
+                # This is thrown when fact() or factorial() is used in a formularesponse answer
+                #   that tests on negative and/or non-integer inputs
+                # err.message will be: `factorial() only accepts integral values` or
+                # `factorial() not defined for negative values`
                 log.debug(
-                    'formularesponse: undefined variable in formula=%s',
+                    ('formularesponse: factorial function used in response '
+                     'that tests negative and/or non-integer inputs. '
+                     'Provided answer was: %s'),
                     cgi.escape(answer)
                 )
                 raise StudentInputError(
-                    _("Invalid input: {bad_input} not permitted in answer.").format(bad_input=err.message)
+                    _("factorial function not permitted in answer "
+                      "for this problem. Provided answer was: "
+                      "{bad_input}").format(bad_input=cgi.escape(answer))
                 )
-            except ValueError as err:
-                if 'factorial' in err.message:
-                    # This is thrown when fact() or factorial() is used in a formularesponse answer
-                    #   that tests on negative and/or non-integer inputs
-                    # err.message will be: `factorial() only accepts integral values` or
-                    # `factorial() not defined for negative values`
-                    log.debug(
-                        ('formularesponse: factorial function used in response '
-                         'that tests negative and/or non-integer inputs. '
-                         'Provided answer was: %s'),
-                        cgi.escape(answer)
-                    )
-                    raise StudentInputError(
-                        _("factorial function not permitted in answer "
-                          "for this problem. Provided answer was: "
-                          "{bad_input}").format(bad_input=cgi.escape(answer))
-                    )
-                # If non-factorial related ValueError thrown, handle it the same as any other Exception
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
-                        bad_input=cgi.escape(answer)
-                    )
+            # If non-factorial related ValueError thrown, handle it the same as any other Exception
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
+                    bad_input=cgi.escape(answer)
                 )
-            except Exception as err:
-                # traceback.print_exc()
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula").format(
-                        bad_input=cgi.escape(answer)
-                    )
+            )
+        except Exception as err:
+            # traceback.print_exc()
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula").format(
+                    bad_input=cgi.escape(answer)
                 )
-        return out
+            )
 
     def randomize_variables(self, samples):
         """
@@ -0,0 +1,538 @@
+"""
+A pool of warm, sandboxed Python worker processes for safe_exec.
+
+codejail starts a new sandboxed Python process for every execution, which then
+has to import the modules the code uses (numpy, scipy, ...).  Under load, that
+dominates the time it takes to check answers.  Instead, a SandboxPool keeps a
+bounded number of sandboxed processes running, with the ASSUMED_IMPORTS of
+capa already imported, and sends them the code to execute.
+
+Workers are started with the same command and resource limits as codejail,
+so they run in the same sandbox.  The CPU limit applies to each execution, and
+an execution that does not end within the timeout of the pool, which is
+always finite, is an error.  Workers are replaced after `max_executions`
+executions, on any error, including errors in the executed code, and after
+any execution that leaves threads or child processes behind, which could read
+the requests of, or forge the responses to, later executions.
+
+Each execution starts with the modules, `sys.path` and working directory the
+worker had after starting, but workers are shared by the executions of all
+learners and courses: changes that code makes to the state of the preloaded
+modules last until the worker is replaced, and so do processes it detaches
+from the worker if the codejail NPROC limit allows them.  This loss of
+isolation between executions is accepted in exchange for the speed of the
+pool, which is disabled by default; `max_executions` bounds how long it lasts.
+
+The pool is used by safe_exec once configured with `configure`.  Executions
+that the pool cannot handle fall back to one process per execution:
+
+  * when codejail is not configured,
+  * when the code needs files of the course that are not in `extra_files`, and
+  * when no worker becomes idle within `queue_timeout` seconds.
+"""
+from functools import partial
+import json
+import logging
+import os
+import Queue
+import resource
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from codejail import jail_code
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+from codejail.safe_exec import json_safe, SafeExecException
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# Seconds a worker may take to start and import the ASSUMED_IMPORTS.
+STARTUP_TIMEOUT = 60
+
+# Seconds an execution may take beyond the codejail CPU limit, when the pool
+# has no timeout and codejail no REALTIME limit.
+TIMEOUT_MARGIN = 1
+
+# Seconds an execution may take when codejail limits neither its CPU nor its
+# real time.
+DEFAULT_TIMEOUT = 10
+
+# The main loop of a worker, run by the sandboxed Python.  It reads a JSON
+# request per line on stdin, and writes a JSON response per line on the
+# original stdout, after a first line telling that it is ready.  The executed
+# code's output is discarded.  Each execution may use the CPU seconds given
+# as second argument, if any, on top of what the worker already used, and
+# runs in a directory holding its extra files, which the pool writes.
+WORKER_CODE = r"""
+import json
+import os
+import resource
+import sys
+import threading
+import traceback
+
+cpu_limit = json.loads(sys.argv[2])
+
+for modname in json.loads(sys.argv[1]):
+    try:
+        __import__(modname)
+    except Exception:
+        pass
+
+requests = sys.stdin
+responses = os.fdopen(os.dup(1), 'w')
+devnull = open(os.devnull, 'w')
+os.dup2(devnull.fileno(), 1)
+sys.stdout = devnull
+
+base_path = list(sys.path)
+base_modules = dict(sys.modules)
+base_cwd = os.getcwd()
+
+responses.write(json.dumps({'ready': True}) + '\n')
+responses.flush()
+
+
+def jsonable(value):
+    try:
+        json.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def limit_cpu():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    __, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime) + 1 + cpu_limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def count_threads():
+    try:
+        return len(os.listdir('/proc/self/task'))
+    except OSError:
+        return threading.active_count()
+
+
+base_num_threads = count_threads()
+
+
+def is_tainted():
+    if count_threads() > base_num_threads:
+        return True
+    try:
+        os.waitpid(-1, os.WNOHANG)
+    except OSError:
+        # No child processes
+        return False
+    return True
+
+
+while True:
+    line = requests.readline()
+    if not line:
+        break
+    request = json.loads(line)
+    try:
+        os.chdir(request['run_dir'])
+        sys.path.extend(request['python_path'])
+        g_dict = request['globals']
+        if cpu_limit:
+            limit_cpu()
+        exec compile(request['code'], '<jailed code>', 'exec', 0, True) in g_dict
+        response = {'globals': dict(
+            (key, value) for key, value in g_dict.iteritems() if key != '__builtins__' and jsonable(value)
+        )}
+    except BaseException:
+        response = {'error': traceback.format_exc()}
+    finally:
+        os.chdir(base_cwd)
+        sys.path[:] = base_path
+        for name in list(sys.modules):
+            if name not in base_modules:
+                del sys.modules[name]
+        sys.modules.update(base_modules)
+        sys.stdout = devnull
+    response['id'] = request['id']
+    response['tainted'] = is_tainted()
+    responses.write(json.dumps(response) + '\n')
+    responses.flush()
+"""
+
+_pool = None
+
+
+def configure(size, max_executions=100, timeout=None, queue_timeout=1):
+    """
+    Configures the pool used by safe_exec, with `size` workers.  A `size` of
+    0 disables the pool.
+
+    See SandboxPool for the other arguments.  Workers are started on first
+    use, so that each forked process gets its own.
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is not None:
+        _pool.close()
+    _pool = SandboxPool(size, max_executions, timeout, queue_timeout) if size else None
+
+
+def get_pool():
+    """
+    Returns the SandboxPool used by safe_exec, or None if not configured.
+    """
+    return _pool
+
+
+def pooled_safe_exec(code, globals_dict, python_path=None, extra_files=None, slug=None):
+    """
+    Executes code like codejail.safe_exec.safe_exec, with a worker of the
+    configured pool if possible.
+    """
+    python_path = python_path or []
+    extra_files = extra_files or []
+    extra_file_names = set(name for name, __ in extra_files)
+    if (
+            _pool is None or
+            not jail_code.is_configured('python') or
+            any(path not in extra_file_names for path in python_path)
+    ):
+        return codejail_safe_exec(
+            code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug,
+        )
+
+    try:
+        result = _pool.execute(code, globals_dict, python_path, extra_files)
+    except PoolBusyError:
+        log.info("No idle safe_exec worker for %s, executing in a new process", slug)
+        return codejail_safe_exec(
+            code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug,
+        )
+    globals_dict.update(result)
+
+
+class PoolBusyError(Exception):
+    """
+    Raised when no worker of a SandboxPool becomes idle in time.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process executing code sent to it.
+    """
+    def __init__(self, command, preload, limits, max_executions):
+        """
+        Arguments:
+            command: a dict with the 'cmdline_start' and 'user' of the sandboxed
+                Python, as configured in codejail.
+            preload: the names of the modules to import when starting.
+            limits: a dict of codejail limits.  The 'CPU' limit applies to
+                each execution, the others to the process as a whole.
+            max_executions: the number of executions the CPU time of the
+                process is limited for.
+        """
+        self.executions = 0
+        # Whether an execution left threads or child processes behind.
+        self.tainted = False
+        self.tmpdir = tempfile.mkdtemp(prefix='codejail-')
+        os.chmod(self.tmpdir, 0777)
+        worker_path = os.path.join(self.tmpdir, 'jailed_worker.py')
+        with open(worker_path, 'w') as worker_file:
+            worker_file.write(WORKER_CODE)
+
+        cmd = []
+        if command.get('user'):
+            cmd.extend(['sudo', '-u', command['user']])
+        cmd.extend(command['cmdline_start'])
+        cmd.extend([worker_path, json.dumps(preload), json.dumps(limits.get('CPU') or 0)])
+        with open(os.devnull, 'w') as devnull:
+            self.process = subprocess.Popen(
+                cmd,
+                cwd=self.tmpdir,
+                # OpenBLAS would fail to start threads under the NPROC limit.
+                env={'TMPDIR': self.tmpdir, 'OPENBLAS_NUM_THREADS': '1'},
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull,
+                close_fds=True,
+                preexec_fn=partial(_set_process_limits, limits, max_executions),
+            )
+
+    def wait_until_ready(self, timeout=STARTUP_TIMEOUT):
+        """
+        Waits for the worker to have imported the modules to preload.
+
+        Raises:
+            SafeExecException if the worker did not start within `timeout`
+                seconds.
+        """
+        self._read_response(timeout)
+
+    def execute(self, code, globals_dict, python_path, extra_files, timeout=None):
+        """
+        Executes code in the worker, and returns the resulting JSON-safe globals.
+
+        Raises:
+            SafeExecException if the execution failed or did not end within
+                `timeout` seconds.
+        """
+        self.executions += 1
+        # The worker can't write files under the FSIZE limit.
+        run_dir = os.path.join(self.tmpdir, 'run{}'.format(self.executions))
+        os.mkdir(run_dir)
+        os.chmod(run_dir, 0777)
+        try:
+            for name, content in extra_files:
+                with open(os.path.join(run_dir, name), 'wb') as extra_file:
+                    extra_file.write(content)
+            request_id = uuid.uuid4().hex
+            request = json.dumps({
+                'id': request_id,
+                'code': code,
+                'globals': json_safe(globals_dict),
+                'python_path': python_path,
+                'run_dir': run_dir,
+            })
+            try:
+                self.process.stdin.write(request + '\n')
+                self.process.stdin.flush()
+            except IOError as err:
+                raise SafeExecException("Couldn't execute jailed code: {}".format(err))
+
+            response = self._read_response(timeout)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+        # Anything else the worker wrote was forged by the executed code.
+        extra_output, __, __ = select.select([self.process.stdout], [], [], 0)
+        if response.get('id') != request_id or extra_output:
+            raise SafeExecException("Couldn't execute jailed code: unexpected output from the worker")
+        self.tainted = response['tainted']
+        if 'error' in response:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response['error']))
+        return response['globals']
+
+    def _read_response(self, timeout):
+        """
+        Returns the next response of the worker, waiting for `timeout` seconds
+        at most.
+        """
+        ready, __, __ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise SafeExecException("Couldn't execute jailed code: timed out after {} seconds".format(timeout))
+        line = self.process.stdout.readline()
+        if not line:
+            raise SafeExecException("Couldn't execute jailed code: the worker exited")
+        return json.loads(line)
+
+    def close(self):
+        """
+        Stops the worker.
+        """
+        try:
+            self.process.stdin.close()
+            self.process.terminate()
+        except OSError:
+            pass
+        self.process.wait()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+def _set_process_limits(limits, max_executions):
+    """
+    Sets the resource limits of a worker process, in the child process, as
+    codejail does for each of its processes.
+
+    The worker lowers its CPU limit before each execution, to the CPU time it
+    used so far plus the 'CPU' limit.  The hard limit bounds the CPU time of
+    the startup and of `max_executions` such executions, in case the executed
+    code raises its own limit.
+    """
+    cpu = limits.get('CPU')
+    if cpu:
+        cpu_budget = STARTUP_TIMEOUT + max_executions * (cpu + 1)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_budget, cpu_budget))
+
+    # No subprocesses, unless codejail allows some.
+    nproc = limits.get('NPROC', 0)
+    resource.setrlimit(resource.RLIMIT_NPROC, (nproc, nproc))
+
+    # Size of written files.  Can be zero (nothing can be written).
+    fsize = limits.get('FSIZE', 0)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+    vmem = limits.get('VMEM')
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+
+
+class SandboxPool(object):
+    """
+    A bounded pool of SandboxWorkers.
+    """
+    def __init__(self, size, max_executions=100, timeout=None, queue_timeout=1, command=None):
+        """
+        Arguments:
+            size: the number of workers.
+            max_executions: the number of executions after which a worker is
+                replaced.
+            timeout: the seconds an execution may take, defaulting to the
+                codejail 'REALTIME' limit, or else to its 'CPU' limit plus
+                TIMEOUT_MARGIN.
+            queue_timeout: the seconds to wait for an idle worker.
+            command: the command of the sandboxed Python, defaulting to the
+                one configured in codejail.
+        """
+        # Imported here to avoid a circular import.
+        from .safe_exec import ASSUMED_IMPORTS
+
+        self.size = size
+        self.max_executions = max_executions
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.command = command
+        self.preload = [modname for __, modname in ASSUMED_IMPORTS]
+
+        # Idle workers.  None stands for a worker that could not be started.
+        self._idle = Queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._num_waiting = 0
+
+    def execute(self, code, globals_dict, python_path, extra_files):
+        """
+        Executes code with a worker of the pool, and returns the resulting
+        JSON-safe globals.
+
+        Raises:
+            PoolBusyError if no worker became idle within queue_timeout.
+            SafeExecException if the execution failed.
+        """
+        self._start()
+        worker = self._checkout()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+            return worker.execute(code, globals_dict, python_path, extra_files, self._get_timeout())
+        except Exception:
+            self._recycle(worker, 'error')
+            worker = None
+            raise
+        finally:
+            if worker is not None:
+                if worker.tainted:
+                    self._recycle(worker, 'tainted')
+                elif worker.executions >= self.max_executions:
+                    self._recycle(worker, 'max_executions')
+                else:
+                    self._idle.put(worker)
+
+    def close(self):
+        """
+        Stops the idle workers of the pool.
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except Queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+    def _start(self):
+        """
+        Starts the workers of the pool in the background, on first use.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for __ in range(self.size):
+            self._replace_in_background()
+
+    def _checkout(self):
+        """
+        Returns an idle worker, waiting for queue_timeout seconds at most.
+        """
+        with self._lock:
+            self._num_waiting += 1
+            dog_stats_api.histogram('capa.safe_exec.pool.queue_depth', self._num_waiting)
+        start_time = time.time()
+        try:
+            return self._idle.get(timeout=self.queue_timeout)
+        except Queue.Empty:
+            dog_stats_api.increment('capa.safe_exec.pool.busy')
+            raise PoolBusyError()
+        finally:
+            with self._lock:
+                self._num_waiting -= 1
+            dog_stats_api.histogram('capa.safe_exec.pool.wait_time', time.time() - start_time)
+
+    def _recycle(self, worker, reason):
+        """
+        Stops the given worker and starts another one in its place.
+        """
+        dog_stats_api.increment('capa.safe_exec.pool.recycled', tags=['reason:{}'.format(reason)])
+        self._replace_in_background(worker)
+
+    def _replace_in_background(self, worker=None):
+        """
+        Stops the given worker, if any, and starts another one in a
+        background thread, making it idle.
+        """
+        thread = threading.Thread(target=self._replace, args=(worker,))
+        thread.daemon = True
+        thread.start()
+
+    def _replace(self, worker=None):
+        """
+        Stops the given worker, if any, and starts another one, making it
+        idle.
+        """
+        if worker is not None:
+            worker.close()
+        try:
+            worker = self._start_worker()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Couldn't start a safe_exec worker")
+            worker = None
+        self._idle.put(worker)
+
+    def _start_worker(self):
+        """
+        Returns a new, ready SandboxWorker.
+        """
+        worker = SandboxWorker(
+            self.command or jail_code.COMMANDS['python'],
+            self.preload,
+            getattr(jail_code, 'LIMITS', {}),
+            self.max_executions,
+        )
+        try:
+            worker.wait_until_ready()
+        except SafeExecException:
+            worker.close()
+            raise
+        return worker
+
+    def _get_timeout(self):
+        """
+        Returns the seconds an execution may take.
+        """
+        if self.timeout:
+            return self.timeout
+        limits = getattr(jail_code, 'LIMITS', {})
+        if limits.get('REALTIME'):
+            return limits['REALTIME']
+        if limits.get('CPU'):
+            return limits['CPU'] + TIMEOUT_MARGIN
+        return DEFAULT_TIMEOUT
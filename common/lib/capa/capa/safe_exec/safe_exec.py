@@ -4,6 +4,7 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import pool
 from dogapi import dog_stats_api
 
 import hashlib
@@ -130,6 +131,8 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif pool.get_pool() is not None:
+        exec_fn = pool.pooled_safe_exec
     else:
         exec_fn = codejail_safe_exec
 
@@ -0,0 +1,122 @@
+"""Test pool.py"""
+
+import sys
+import unittest
+
+from mock import patch
+
+from capa.safe_exec import pool, safe_exec
+from codejail.safe_exec import SafeExecException
+
+# Workers of the pools under test run unsandboxed.
+PYTHON_COMMAND = {'cmdline_start': [sys.executable, '-E', '-B'], 'user': None}
+
+
+class TestSandboxPool(unittest.TestCase):
+    """Test the execution of code by a SandboxPool."""
+
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        self.pool = pool.SandboxPool(1, max_executions=2, timeout=5, queue_timeout=30, command=PYTHON_COMMAND)
+        self.addCleanup(self.pool.close)
+
+    def test_execute(self):
+        result = self.pool.execute("b = a * 2\nprint 'ignored'", {'a': 17}, [], [])
+        self.assertEqual(result, {'a': 17, 'b': 34})
+
+    def test_preloaded_modules(self):
+        result = self.pool.execute("import sys\nloaded = 'numpy' in sys.modules", {}, [], [])
+        self.assertTrue(result['loaded'])
+
+    def test_modules_are_restored(self):
+        self.pool.execute("import sys, json\nsys.modules['json'] = None", {}, [], [])
+        result = self.pool.execute("import json\na = json.dumps(17)", {}, [], [])
+        self.assertEqual(result['a'], '17')
+
+    def test_extra_files(self):
+        result = self.pool.execute(
+            "import constant\na = constant.VALUE", {}, ['.'], [('constant.py', 'VALUE = 17\n')]
+        )
+        self.assertEqual(result['a'], 17)
+
+    def test_error_recycles_worker(self):
+        with self.assertRaisesRegexp(SafeExecException, "ZeroDivisionError"):
+            self.pool.execute("a = 1 / 0", {}, [], [])
+        result = self.pool.execute("a = 17", {}, [], [])
+        self.assertEqual(result, {'a': 17})
+
+    def test_timeout(self):
+        self.pool.timeout = 0.5
+        with self.assertRaisesRegexp(SafeExecException, "timed out"):
+            self.pool.execute("while True: pass", {}, [], [])
+
+    @patch.dict('capa.safe_exec.pool.jail_code.LIMITS', {'REALTIME': 0, 'CPU': 3})
+    def test_default_timeout(self):
+        self.pool.timeout = None
+        self.assertEqual(self.pool._get_timeout(), 3 + pool.TIMEOUT_MARGIN)  # pylint: disable=protected-access
+
+    def test_cpu_limit(self):
+        self.pool.timeout = 30
+        with patch.dict('capa.safe_exec.pool.jail_code.LIMITS', {'CPU': 1}):
+            with self.assertRaisesRegexp(SafeExecException, "exited"):
+                self.pool.execute("while True: pass", {}, [], [])
+
+    @patch.dict('capa.safe_exec.pool.jail_code.LIMITS', {'NPROC': 1000})
+    def test_leftover_thread_recycles_worker(self):
+        pid = self.pool.execute(
+            "import os, threading, time\n"
+            "threading.Thread(target=time.sleep, args=(5,)).start()\n"
+            "pid = os.getpid()",
+            {}, [], []
+        )['pid']
+        result = self.pool.execute("import os\npid = os.getpid()", {}, [], [])
+        self.assertNotEqual(result['pid'], pid)
+
+    def test_forged_response(self):
+        with self.assertRaisesRegexp(SafeExecException, "unexpected output"):
+            self.pool.execute(
+                "import __main__, os\n"
+                "os.write(__main__.responses.fileno(), '{\"globals\": {\"a\": 23}}\\n')",
+                {}, [], []
+            )
+
+    def test_max_executions(self):
+        pids = set()
+        for __ in range(4):
+            pids.add(self.pool.execute("import os\npid = os.getpid()", {}, [], [])['pid'])
+        self.assertEqual(len(pids), 2)
+
+    def test_busy(self):
+        busy_pool = pool.SandboxPool(0, queue_timeout=0.1, command=PYTHON_COMMAND)
+        with self.assertRaises(pool.PoolBusyError):
+            busy_pool.execute("a = 17", {}, [], [])
+
+
+class TestPooledSafeExec(unittest.TestCase):
+    """Test that safe_exec uses the configured pool."""
+
+    def setUp(self):
+        super(TestPooledSafeExec, self).setUp()
+        pool.configure(1, queue_timeout=30)
+        pool.get_pool().command = PYTHON_COMMAND
+        self.addCleanup(pool.configure, 0)
+
+    @patch('capa.safe_exec.pool.jail_code.is_configured', return_value=True)
+    def test_safe_exec(self, _mock_is_configured):
+        g = {}
+        safe_exec("a = 1 / 2\nr = random.randint(0, 1000)", g, random_seed=17)
+        self.assertEqual(g['a'], 0.5)
+        self.assertEqual(g['r'], __import__('random').Random(17).randint(0, 1000))
+
+    @patch('capa.safe_exec.pool.jail_code.is_configured', return_value=True)
+    @patch('capa.safe_exec.pool.codejail_safe_exec')
+    def test_python_path_outside_extra_files(self, mock_codejail_safe_exec, _mock_is_configured):
+        safe_exec("a = 17", {}, python_path=['/course/python'])
+        self.assertTrue(mock_codejail_safe_exec.called)
+
+    @patch('capa.safe_exec.pool.jail_code.is_configured', return_value=True)
+    @patch('capa.safe_exec.pool.codejail_safe_exec')
+    def test_busy_pool(self, mock_codejail_safe_exec, _mock_is_configured):
+        with patch.object(pool.SandboxPool, 'execute', side_effect=pool.PoolBusyError):
+            safe_exec("a = 17", {})
+        self.assertTrue(mock_codejail_safe_exec.called)
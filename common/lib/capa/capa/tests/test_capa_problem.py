@@ -0,0 +1,68 @@
+"""
+Tests of the caching of parsed problems by capa_problem.
+"""
+import textwrap
+import unittest
+
+import mock
+
+from capa import capa_problem
+from .response_xml_factory import StringResponseXMLFactory
+from . import new_loncapa_problem
+
+
+class ProblemTemplateTest(unittest.TestCase):
+    """
+    Tests of the ProblemTemplate cache.
+    """
+    def setUp(self):
+        super(ProblemTemplateTest, self).setUp()
+        capa_problem.clear_problem_templates()
+        self.addCleanup(capa_problem.clear_problem_templates)
+        self.xml_str = StringResponseXMLFactory().build_xml(answer="Michigan")
+
+    def test_template_is_reused(self):
+        build_template = capa_problem.LoncapaProblem._build_template  # pylint: disable=protected-access
+        with mock.patch.object(
+            capa_problem.LoncapaProblem, '_build_template', autospec=True, side_effect=build_template,
+        ) as mock_build_template:
+            first_problem = new_loncapa_problem(self.xml_str)
+            second_problem = new_loncapa_problem(self.xml_str)
+        self.assertEqual(mock_build_template.call_count, 1)
+
+        # Each problem works on its own copy of the tree
+        self.assertIsNot(first_problem.tree, second_problem.tree)
+        self.assertEqual(first_problem.get_question_answers(), second_problem.get_question_answers())
+        self.assertEqual(first_problem.get_answer_ids(), second_problem.get_answer_ids())
+        self.assertEqual(len(second_problem.responders), 1)
+        self.assertTrue(all(
+            response.getroottree().getroot() is second_problem.tree
+            for response in second_problem.responders
+        ))
+
+    def test_template_is_not_modified(self):
+        problem = new_loncapa_problem(self.xml_str)
+        problem.tree.set('modified', 'true')
+        self.assertIsNone(new_loncapa_problem(self.xml_str).tree.get('modified'))
+
+    def test_edited_problem(self):
+        new_loncapa_problem(self.xml_str)
+        edited_problem = new_loncapa_problem(StringResponseXMLFactory().build_xml(answer="Ohio"))
+        self.assertEqual(edited_problem.get_question_answers(), {'1_2_1': 'Ohio'})
+
+    def test_problem_with_includes_is_not_cached(self):
+        xml_str = textwrap.dedent("""
+            <problem>
+                <include file="test_include.xml"/>
+            </problem>
+        """)
+        with mock.patch.object(capa_problem.LoncapaProblem, '_process_includes') as mock_process_includes:
+            new_loncapa_problem(xml_str)
+            new_loncapa_problem(xml_str)
+        self.assertEqual(mock_process_includes.call_count, 2)
+
+    def test_cache_size(self):
+        with mock.patch('capa.capa_problem.PROBLEM_TEMPLATE_CACHE_SIZE', 1):
+            new_loncapa_problem(self.xml_str)
+            new_loncapa_problem(StringResponseXMLFactory().build_xml(answer="Ohio"))
+        self.assertEqual(len(capa_problem._problem_templates), 1)  # pylint: disable=protected-access
@@ -21,7 +21,7 @@ from . import new_loncapa_problem, test_capa_system, load_fixture
 import calc
 
 from capa.responsetypes import LoncapaProblemError, \
-    StudentInputError, ResponseError
+    StudentInputError, ResponseError, StringResponse
 from capa.correctmap import CorrectMap
 from capa.tests.response_xml_factory import (
     AnnotationResponseXMLFactory,
@@ -616,6 +616,45 @@ class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
             self.assert_grade(problem, answer.lower(), "correct")
         self.assert_grade(problem, "Other String", "incorrect")
 
+    def test_evaluate_answers_batch(self):
+        problem = self.build_problem(answer="Second")
+        responder = problem.responders.values()[0]
+        memo = {}
+        with mock.patch.object(responder, 'get_score', wraps=responder.get_score) as mock_get_score:
+            cmaps = responder.evaluate_answers_batch(
+                [{'1_2_1': 'Second'}, {'1_2_1': 'Other'}, {'1_2_1': 'Second'}], memo=memo
+            )
+        self.assertEqual(
+            [cmap.get_correctness('1_2_1') for cmap in cmaps], ['correct', 'incorrect', 'correct']
+        )
+        # Identical answers are graded once
+        self.assertEqual(mock_get_score.call_count, 2)
+        self.assertEqual(len(memo), 2)
+
+        # The memo is shared by the rescoring of other problems
+        other_problem = self.build_problem(answer="Second")
+        other_problem.student_answers = {'1_2_1': 'Second'}
+        with mock.patch.object(StringResponse, 'get_score') as mock_get_score:
+            correct_map = other_problem.rescore_existing_answers(grading_memo=memo)
+        self.assertFalse(mock_get_score.called)
+        self.assertEqual(correct_map.get_correctness('1_2_1'), 'correct')
+
+    def test_grading_key_depends_on_correct_answers(self):
+        first_responder = self.build_problem(answer="First").responders.values()[0]
+        second_responder = self.build_problem(answer="Second").responders.values()[0]
+        self.assertNotEqual(
+            first_responder.grading_key({'1_2_1': 'First'}),
+            second_responder.grading_key({'1_2_1': 'First'}),
+        )
+
+    def test_grading_key_with_script(self):
+        problem = self.build_problem(answer="$answer", script="answer = 'Second'")
+        responder = problem.responders.values()[0]
+        key = responder.grading_key({'1_2_1': 'Second'})
+        # Script code may compute the correct answers from the anonymous_student_id
+        responder.context['anonymous_student_id'] = 'other_student'
+        self.assertNotEqual(responder.grading_key({'1_2_1': 'Second'}), key)
+
     def test_regexp(self):
         problem = self.build_problem(answer="Second", case_sensitive=False, regexp=True)
         self.assert_grade(problem, "Second", "correct")
@@ -1662,6 +1701,16 @@ class CustomResponseTest(ResponseTest):  # pylint: disable=missing-docstring
         self.assert_grade(problem, '42', 'correct')
         self.assert_grade(problem, '0', 'incorrect')
 
+    def test_evaluate_answers_batch_not_memoized(self):
+        inline_script = """correct[0] = 'correct' if (answers['1_2_1'] == expect) else 'incorrect'"""
+        problem = self.build_problem(answer=inline_script, expect="42")
+        responder = problem.responders.values()[0]
+        memo = {}
+        cmaps = responder.evaluate_answers_batch([{'1_2_1': '42'}, {'1_2_1': '42'}], memo=memo)
+        self.assertEqual([cmap.get_correctness('1_2_1') for cmap in cmaps], ['correct', 'correct'])
+        # The grade of custom code may depend on more than the answers
+        self.assertEqual(memo, {})
+
     def test_inline_message(self):
         # Inline code can update the global messages list
         # to pass messages to the CorrectMap for a particular input
@@ -14,11 +14,13 @@ Note: Hotfix (PLAT-734) No asset calls find_asset_metadata, and directly accesse
 """
 
 from contracts import contract, new_contract
-from opaque_keys.edx.keys import AssetKey
+from django.conf import settings
+from opaque_keys.edx.keys import AssetKey, CourseKey
 from xmodule.contentstore.django import contentstore
 
 
 new_contract('AssetKey', AssetKey)
+new_contract('CourseKey', CourseKey)
 
 
 class AssetException(Exception):
@@ -58,3 +60,14 @@ class AssetManager(object):
         compressed course structure from the structure cache.
         """
         return contentstore().find(asset_key, throw_on_not_found, as_stream)
+
+    @staticmethod
+    @contract(course_key='CourseKey')
+    def get_asset_index(course_key):
+        """
+        Returns the index of the metadata of the course's assets from the deprecated contentstore,
+        or None if asset indexes are disabled and each asset should be found instead.
+        """
+        if not settings.FEATURES.get('ENABLE_ASSET_INDEX', False):
+            return None
+        return contentstore().get_asset_index(course_key)
@@ -1297,13 +1297,17 @@ class CapaMixin(CapaFields):
 
         return input_metadata
 
-    def rescore_problem(self):
+    def rescore_problem(self, grading_memo=None):
         """
         Checks whether the existing answers to a problem are correct.
 
         This is called when the correct answer to a problem has been changed,
         and the grade should be re-evaluated.
 
+        `grading_memo` may be a dict shared by the rescoring of the problem for
+        many students, so that identical answers are graded once (see
+        LoncapaProblem.rescore_existing_answers).
+
         Returns a dict with one key:
             {'success' : 'correct' | 'incorrect' | AJAX alert msg string }
 
@@ -1334,7 +1338,7 @@ class CapaMixin(CapaFields):
         event_info['orig_total'] = orig_score['total']
 
         try:
-            correct_map = self.lcp.rescore_existing_answers()
+            correct_map = self.lcp.rescore_existing_answers(grading_memo=grading_memo)
 
         except (StudentInputError, ResponseError, LoncapaProblemError) as inst:
             log.warning("Input error in capa_module:problem_rescore", exc_info=True)
@@ -216,7 +216,7 @@ class StaticContent(object):
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
     @staticmethod
-    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
+    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True, asset_index=None):
         """
         Returns a fully-qualified path to a piece of static content.
 
@@ -226,6 +226,7 @@ class StaticContent(object):
         Args:
             course_key: key to the course which owns this asset
             path: the path to said content
+            asset_index: the asset index of the course, if already loaded
 
         Returns:
             string: fully-qualified path to asset
@@ -237,16 +238,24 @@ class StaticContent(object):
         # Convert our path to an asset key if it isn't one already.
         asset_key = StaticContent.get_asset_key_from_path(course_key, relative_path)
 
+        if asset_index is None:
+            asset_index = AssetManager.get_asset_index(course_key)
+
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        if asset_index is not None and asset_key.course_key == course_key:
+            # If the item isn't in the index, just treat it as if it's locked.
+            locked, content_digest, __ = asset_index.get((asset_key.category, asset_key.name), (True, None, None))
+            serve_from_cdn = not locked
+        else:
+            try:
+                content = AssetManager.find(asset_key, as_stream=True)
+                serve_from_cdn = not getattr(content, "locked", True)
+                content_digest = getattr(content, "content_digest", None)
+            except (ItemNotFoundError, NotFoundError):
+                # If we can't find the item, just treat it as if it's locked.
+                serve_from_cdn = False
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -262,7 +271,7 @@ class StaticContent(object):
         for query_name, query_val in query_params:
             if query_val.startswith("/static/"):
                 new_val = StaticContent.get_canonicalized_asset_path(
-                    course_key, query_val, base_url, excluded_exts, encode=False)
+                    course_key, query_val, base_url, excluded_exts, encode=False, asset_index=asset_index)
                 updated_query_params.append((query_name, new_val))
             else:
                 # Make sure we're encoding Unicode strings down to their byte string
@@ -367,6 +376,16 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_asset_index(self, course_key):
+        """
+        Returns an index of the metadata needed to canonicalize the URLs of the course's assets,
+        so that they can be canonicalized without loading each asset.
+
+        The index is a dict mapping the (category, name) of each of the course's assets and
+        thumbnails to a tuple of (locked, content_digest, content_type).
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
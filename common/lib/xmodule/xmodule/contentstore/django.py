@@ -2,6 +2,14 @@ from __future__ import absolute_import
 from importlib import import_module
 
 from django.conf import settings
+from django.core.cache import caches
+
+try:
+    # We may not always have the request_cache module available
+    from request_cache.middleware import RequestCache
+    HAS_REQUEST_CACHE = True
+except ImportError:
+    HAS_REQUEST_CACHE = False
 
 _CONTENTSTORE = {}
 
@@ -25,6 +33,10 @@ def contentstore(name='default'):
         if 'ADDITIONAL_OPTIONS' in settings.CONTENTSTORE:
             if name in settings.CONTENTSTORE['ADDITIONAL_OPTIONS']:
                 options.update(settings.CONTENTSTORE['ADDITIONAL_OPTIONS'][name])
+        options['asset_index_cache'] = caches['default']
+        options['asset_index_timeout'] = getattr(settings, 'ASSET_INDEX_CACHE_TIMEOUT', None)
+        if HAS_REQUEST_CACHE:
+            options['request_cache'] = RequestCache.get_request_cache()
         _CONTENTSTORE[name] = class_(**options)
 
     return _CONTENTSTORE[name]
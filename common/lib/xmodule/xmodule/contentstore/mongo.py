@@ -26,13 +26,22 @@ class MongoContentStore(ContentStore):
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        asset_index_cache=None, asset_index_timeout=None, request_cache=None, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param asset_index_cache: optional Django cache in which the course asset indexes are stored
+        :param asset_index_timeout: timeout, in seconds, of the asset indexes stored in asset_index_cache
+        :param request_cache: optional request cache in which the asset indexes are kept for the rest
+            of the request
         """
+        self.asset_index_cache = asset_index_cache
+        self.asset_index_timeout = asset_index_timeout
+        self.request_cache = request_cache
+
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
         # the AutoReconnect errors.
@@ -100,6 +109,7 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._invalidate_asset_index(content.location.course_key)
         return content
 
     def delete(self, location_or_id):
@@ -107,6 +117,7 @@ class MongoContentStore(ContentStore):
         Delete an asset.
         """
         if isinstance(location_or_id, AssetKey):
+            self._invalidate_asset_index(location_or_id.course_key)
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
@@ -311,6 +322,7 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._invalidate_asset_index(location.course_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -367,6 +379,7 @@ class MongoContentStore(ContentStore):
                 # getattr b/c caching may mean some pickled instances don't have attr
                 locked=asset.get('locked', False)
             )
+        self._invalidate_asset_index(dest_course_key)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -379,6 +392,66 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+        self._invalidate_asset_index(course_key)
+
+    def get_asset_index(self, course_key):
+        """
+        See :meth:`.ContentStore.get_asset_index`
+
+        The index is loaded in a single query, and kept in the request cache and in the
+        asset index cache, if any, until an asset of the course is saved, modified or deleted.
+        """
+        cache_key = self._asset_index_cache_key(course_key)
+        request_indexes = self.request_cache.data.setdefault('asset_index', {}) if self.request_cache else {}
+        asset_index = request_indexes.get(cache_key)
+        if asset_index is not None:
+            return asset_index
+
+        if self.asset_index_cache is not None:
+            asset_index = self.asset_index_cache.get(cache_key)
+        if asset_index is None:
+            asset_index = self._load_asset_index(course_key)
+            if self.asset_index_cache is not None:
+                self.asset_index_cache.set(cache_key, asset_index, self.asset_index_timeout)
+
+        request_indexes[cache_key] = asset_index
+        return asset_index
+
+    @autoretry_read()
+    def _load_asset_index(self, course_key):
+        """
+        Queries the metadata of all of the course's assets and thumbnails, and returns their index.
+        """
+        asset_index = {}
+        items = self.fs_files.find(
+            query_for_course(course_key),
+            projection={'_id': True, 'content_son': True, 'locked': True, 'md5': True, 'contentType': True},
+        )
+        for item in items:
+            asset_id = item.get('content_son', item['_id'])
+            asset_index[(asset_id['category'], asset_id['name'])] = (
+                item.get('locked', False), item.get('md5'), item.get('contentType'),
+            )
+        return asset_index
+
+    def _invalidate_asset_index(self, course_key):
+        """
+        Discards the asset index of the given course, if any.
+        """
+        cache_key = self._asset_index_cache_key(course_key)
+        if self.request_cache is not None:
+            self.request_cache.data.get('asset_index', {}).pop(cache_key, None)
+        if self.asset_index_cache is not None:
+            self.asset_index_cache.delete(cache_key)
+
+    @staticmethod
+    def _asset_index_cache_key(course_key):
+        """
+        Returns the cache key of the asset index of the given course, ignoring any branch or version.
+        """
+        return u'contentstore.asset_index.v1.{}.{}.{}.{}'.format(
+            course_key.org, course_key.course, course_key.run, getattr(course_key, 'deprecated', False)
+        ).encode('utf-8')
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -6,6 +6,8 @@ import sys
 
 from collections import namedtuple
 
+import numpy
+
 log = logging.getLogger("edx.courseware")
 
 # This is a tuple for holding scores, either from problems or sections.
@@ -46,6 +48,48 @@ def aggregate_scores(scores, section_name="summary"):
     return all_total, graded_total
 
 
+# This is a tuple for holding the section scores of a number of students, by
+# section format. sections is the list of section names, and earned and possible
+# are arrays of shape (number of students, number of sections). A section whose
+# possible score is not positive for a student is missing from that student's
+# grade sheet.
+SectionScores = namedtuple("SectionScores", "sections earned possible")
+
+
+def grade_sheet_for_student(section_scores, index):
+    """
+    section_scores: A dict mapping section formats to SectionScores
+    index: The index of a student in the SectionScores arrays
+    returns: The grade sheet of the student, as expected by CourseGrader.grade()
+    """
+    grade_sheet = {}
+    for section_format, scores in section_scores.iteritems():
+        format_scores = [
+            Score(float(earned), float(possible), True, section, None)
+            for section, earned, possible in zip(scores.sections, scores.earned[index], scores.possible[index])
+            if possible > 0
+        ]
+        if format_scores:
+            grade_sheet[section_format] = format_scores
+    return grade_sheet
+
+
+def section_percents(scores, num_students):
+    """
+    scores: A SectionScores, or None
+    returns: An array of shape (num_students, number of sections) containing the
+        percentage of each section, or NaN where the section is missing from the
+        student's grade sheet.
+    """
+    if scores is None:
+        return numpy.zeros((num_students, 0))
+    shape = (num_students, len(scores.sections))
+    earned = numpy.asarray(scores.earned, dtype=float).reshape(shape)
+    possible = numpy.asarray(scores.possible, dtype=float).reshape(shape)
+    present = possible > 0
+    return numpy.where(present, earned / numpy.where(present, possible, 1.0), numpy.nan)
+
+
 def invalid_args(func, argdict):
     """
     Given a function and a dictionary of arguments, returns a set of arguments
@@ -160,6 +204,20 @@ class CourseGrader(object):
         '''Given a grade sheet, return a dict containing grading information'''
         raise NotImplementedError
 
+    def grade_percents(self, section_scores, num_students):
+        """
+        Given a dict mapping section formats to SectionScores for num_students
+        students, return an array with the final percentage of each student.
+
+        This is equivalent to calling grade() with the grade sheet of each
+        student; graders override it to compute the percentages of all
+        students at once.
+        """
+        return numpy.array([
+            self.grade(grade_sheet_for_student(section_scores, index))['percent']
+            for index in xrange(num_students)
+        ], dtype=float).reshape((num_students,))
+
 
 class WeightedSubsectionsGrader(CourseGrader):
     """
@@ -199,6 +257,12 @@ class WeightedSubsectionsGrader(CourseGrader):
                 'section_breakdown': section_breakdown,
                 'grade_breakdown': grade_breakdown}
 
+    def grade_percents(self, section_scores, num_students):
+        total_percents = numpy.zeros(num_students)
+        for subgrader, __, weight in self.sections:
+            total_percents += subgrader.grade_percents(section_scores, num_students) * weight
+        return total_percents
+
 
 class SingleSectionGrader(CourseGrader):
     """
@@ -249,6 +313,20 @@ class SingleSectionGrader(CourseGrader):
                 #No grade_breakdown here
                 }
 
+    def grade_percents(self, section_scores, num_students):
+        percents = numpy.zeros(num_students)
+        scores = section_scores.get(self.type)
+        if scores is None:
+            return percents
+        all_percents = section_percents(scores, num_students)
+        # The first section with a matching name in a student's grade sheet is used,
+        # so iterate in reverse and let earlier sections take precedence.
+        for column in reversed(range(len(scores.sections))):
+            if scores.sections[column] == self.name:
+                found = ~numpy.isnan(all_percents[:, column])
+                percents[found] = all_percents[found, column]
+        return percents
+
 
 class AssignmentFormatGrader(CourseGrader):
     """
@@ -390,3 +468,28 @@ class AssignmentFormatGrader(CourseGrader):
                 'section_breakdown': breakdown,
                 #No grade_breakdown here
                 }
+
+    def grade_percents(self, section_scores, num_students):
+        # Sorting puts the NaNs of missing sections last, so each row starts with
+        # the student's scored sections, followed by placeholder scores of 0 up to
+        # min_count.
+        percents = numpy.sort(section_percents(section_scores.get(self.type), num_students), axis=1)
+        num_scored = (~numpy.isnan(percents)).sum(axis=1)
+        num_sections = numpy.maximum(num_scored, self.min_count)
+
+        width = max(self.min_count, percents.shape[1])
+        padded = numpy.empty((num_students, width))
+        padded.fill(numpy.nan)
+        padded[:, :percents.shape[1]] = percents
+        column = numpy.arange(width)
+        padded = numpy.where(
+            column < num_scored[:, numpy.newaxis],
+            padded,
+            numpy.where(column < num_sections[:, numpy.newaxis], 0.0, numpy.nan),
+        )
+
+        # Drop the lowest scores, and average the rest over the remaining sections
+        kept = numpy.sort(padded, axis=1)[:, max(self.drop_count, 0):]
+        total = numpy.where(numpy.isnan(kept), 0.0, kept).sum(axis=1)
+        num_kept = num_sections - self.drop_count
+        return numpy.where(num_kept > 0, total / numpy.maximum(num_kept, 1), 0.0)
@@ -55,6 +55,10 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         module_data: a dict mapping Location -> json that was cached from the
             underlying modulestore
+
+        The definitions of blocks may be prefetched into `definitions`, a dict
+        mapping definition ids -> definitions, from which the blocks then lazily
+        load their definition (see SplitMongoModuleStore.prefetch_definitions).
         """
         # needed by capa_problem (as runtime.filestore via this.resources_fs)
         if course_entry.course_key.course:
@@ -80,6 +84,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self.course_id = course_entry.course_key
         self.lazy = lazy
         self.module_data = module_data
+        self.definitions = {}
         self.default_class = default_class
         self.local_modules = {}
         self._services['library_tools'] = LibraryToolsService(modulestore)
@@ -191,6 +196,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                definition_cache=self.definitions,
             )
         else:
             definition_loader = None
@@ -8,6 +8,8 @@ import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +17,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -42,6 +45,23 @@ def get_cache(alias):
     return caches[alias]
 
 
+def get_structure_lru():
+    """
+    Return the in-process LRU cache of course structures, or None if it is
+    disabled.
+
+    Its maximum size, in bytes, is the COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE
+    Django setting, which defaults to 0 (disabled).
+    """
+    global _STRUCTURE_LRU  # pylint: disable=global-statement
+    max_size = getattr(settings, 'COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE', 0) if DJANGO_AVAILABLE else 0
+    if not max_size:
+        return None
+    if _STRUCTURE_LRU is None or _STRUCTURE_LRU.max_size != max_size:
+        _STRUCTURE_LRU = SizedLRUCache(max_size)
+    return _STRUCTURE_LRU
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -161,6 +181,49 @@ class QueryTimer(object):
 TIMER = QueryTimer(__name__, 0.01)
 
 
+class SizedLRUCache(object):
+    """
+    A thread-safe, in-process cache of strings which evicts the least
+    recently used entries once the total length of the cached strings
+    exceeds `max_size`.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the string cached for `key`, or None if not found.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Cache the string `value` for `key`, unless it is larger than the
+        whole cache.
+        """
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            previous_value = self._entries.pop(key, None)
+            if previous_value is not None:
+                self._size -= len(previous_value)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_size:
+                _, evicted_value = self._entries.popitem(last=False)
+                self._size -= len(evicted_value)
+
+
+_STRUCTURE_LRU = None
+
+
 def structure_from_mongo(structure, course_context=None):
     """
     Converts the 'blocks' key from a list [block_data] to a map
@@ -228,16 +291,23 @@ class CourseStructureCache(object):
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Since structures are immutable, their uncompressed pickled data is also
+    kept in an in-process LRU cache (see get_structure_lru) in front of the
+    django cache, when one is configured.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.lru = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+            else:
+                self.lru = get_structure_lru()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
@@ -245,17 +315,26 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            pickled_data = None
+            if self.lru is not None:
+                pickled_data = self.lru.get(key)
+                tagger.tag(from_lru=str(pickled_data is not None).lower())
 
-            if compressed_pickled_data is None:
-                # Always log cache misses, because they are unexpected
-                tagger.sample_rate = 1
-                return None
+            if pickled_data is None:
+                compressed_pickled_data = self.cache.get(key)
+                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+                if compressed_pickled_data is None:
+                    # Always log cache misses, because they are unexpected
+                    tagger.sample_rate = 1
+                    return None
+
+                tagger.measure('compressed_size', len(compressed_pickled_data))
+
+                pickled_data = zlib.decompress(compressed_pickled_data)
+                if self.lru is not None:
+                    self.lru.set(key, pickled_data)
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
             return pickle.loads(pickled_data)
@@ -275,6 +354,8 @@ class CourseStructureCache(object):
 
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
+            if self.lru is not None:
+                self.lru.set(key, pickled_data)
 
 
 class MongoConnection(object):
@@ -771,6 +771,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         Load the definitions into each block if lazy is in kwargs and is False;
         otherwise, do not load the definitions - they'll be loaded later when needed.
+        If descendants are requested (depth is not 0), their definitions are
+        prefetched with a single query either way.
         """
         runtime = self._get_cache(course_entry.structure['_id'])
         if runtime is None:
@@ -779,8 +781,59 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             self._add_cache(course_entry.structure['_id'], runtime)
             self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
 
+        if depth != 0:
+            self._prefetch_definitions(runtime, course_entry.course_key, block_keys, depth)
+
         return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
 
+    def prefetch_definitions(self, course_key, usage_keys=None, depth=0):
+        """
+        Load the definitions of the given blocks of the course, and of their
+        descendants out to `depth`, with a single query into the cache of the
+        course's descriptor system, so that their definitions don't have to
+        be fetched one by one when the blocks are accessed later in the request.
+
+        Arguments:
+            course_key (:class:`.CourseLocator`): The course of the blocks.
+            usage_keys (list): The usage keys of the blocks. Defaults to the root block of the course.
+            depth (int): The number of levels of descendants to prefetch
+                (0 => the given blocks only, 1 => their children too, etc...).
+                None prefetches all descendants.
+        """
+        with self.bulk_operations(course_key, emit_signals=False):
+            course_entry = self._lookup_course(course_key)
+            if usage_keys is None:
+                block_keys = [course_entry.structure['root']]
+            else:
+                block_keys = [BlockKey.from_usage_key(usage_key) for usage_key in usage_keys]
+
+            runtime = self._get_cache(course_entry.structure['_id'])
+            if runtime is None:
+                runtime = self.create_runtime(course_entry, lazy=True)
+                self._add_cache(course_entry.structure['_id'], runtime)
+            self._prefetch_definitions(runtime, course_entry.course_key, block_keys, depth)
+
+    def _prefetch_definitions(self, system, course_key, block_keys, depth):
+        """
+        Load the definitions of the given blocks of the CachingDescriptorSystem's
+        structure, and of their descendants out to depth, that aren't loaded yet
+        into the system's definition cache, using a single query.
+        """
+        blocks = {}
+        for block_key in block_keys:
+            blocks = self.descendants(system.course_entry.structure['blocks'], block_key, depth, blocks)
+
+        definition_ids = set(
+            block.definition
+            for block in blocks.itervalues()
+            if block.definition is not None and not block.definition_loaded
+        ).difference(system.definitions)
+        if definition_ids:
+            system.definitions.update(
+                (definition['_id'], definition)
+                for definition in self.get_definitions(course_key, definition_ids)
+            )
+
     def _get_cache(self, course_version_guid):
         """
         Find the descriptor cache for this course if it exists
@@ -16,6 +16,7 @@ from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from mock import Mock
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
 log = logging.getLogger(__name__)
@@ -208,3 +209,37 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         self.assertEqual(count, len(self.course2_files))
+
+    @ddt.data(True, False)
+    def test_asset_index(self, deprecated):
+        """
+        get_asset_index
+        """
+        self.set_up_assets(deprecated)
+        asset_index = self.contentstore.get_asset_index(self.course1_key)
+        self.assertEqual(set(asset_index), {('asset', filename) for filename in self.course1_files})
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            content = self.contentstore.find(asset_key)
+            self.assertEqual(
+                asset_index[('asset', filename)],
+                (content.locked, content.content_digest, content.content_type),
+            )
+
+    @ddt.data(True, False)
+    def test_asset_index_invalidation(self, deprecated):
+        """
+        The asset index is invalidated when assets change
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore.asset_index_cache = Mock(get=Mock(return_value=None))
+        self.contentstore.request_cache = Mock(data={})
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+
+        self.assertFalse(self.contentstore.get_asset_index(self.course1_key)[('asset', self.course1_files[0])][0])
+        self.contentstore.set_attr(asset_key, 'locked', True)
+        self.assertTrue(self.contentstore.get_asset_index(self.course1_key)[('asset', self.course1_files[0])][0])
+
+        self.contentstore.delete(asset_key)
+        self.assertNotIn(('asset', self.course1_files[0]), self.contentstore.get_asset_index(self.course1_key))
+        self.assertEqual(self.contentstore.asset_index_cache.delete.call_count, 2)
@@ -105,10 +105,11 @@ class CountMongoCallsCourseTraversal(TestCase):
         (MIXED_OLD_MONGO_MODULESTORE_BUILDER, None, True, False, 175),
         (MIXED_OLD_MONGO_MODULESTORE_BUILDER, 0, False, False, 359),
         (MIXED_OLD_MONGO_MODULESTORE_BUILDER, 0, True, False, 359),
-        # The line below shows the way this traversal *should* be done
+        # The lines below show the way this traversal *should* be done
         # (if you'll eventually access all the fields and load all the definitions anyway).
+        # With a depth, the definitions are prefetched even when lazy.
         (MIXED_SPLIT_MODULESTORE_BUILDER, None, False, True, 4),
-        (MIXED_SPLIT_MODULESTORE_BUILDER, None, True, True, 38),
+        (MIXED_SPLIT_MODULESTORE_BUILDER, None, True, True, 4),
         (MIXED_SPLIT_MODULESTORE_BUILDER, 0, False, True, 131),
         (MIXED_SPLIT_MODULESTORE_BUILDER, 0, True, True, 38),
         (MIXED_SPLIT_MODULESTORE_BUILDER, None, False, False, 4),
@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -963,6 +964,23 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection._STRUCTURE_LRU', None)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_lru(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with override_settings(COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE=10 * 1024 * 1024):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # the structure is still served from the in-process cache
+            self.cache.clear()
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertIsNot(cached_structure, not_cached_structure)
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
@@ -1053,6 +1071,28 @@ class SplitModuleItemTests(SplitModuleTest):
             modulestore().has_item(locator.for_branch(BRANCH_NAME_PUBLISHED))
         )
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_get_course_prefetches_definitions(self, _from_json):
+        """
+        get_course with a depth loads the definitions of all the blocks with one query
+        """
+        course_locator = CourseLocator(org='testx', course='GreekHero', run='run', branch=BRANCH_NAME_DRAFT)
+        db_connection = modulestore().db_connection
+        with patch.object(db_connection, 'get_definitions', wraps=db_connection.get_definitions) as get_definitions:
+            course = modulestore().get_course(course_locator, depth=None)
+        self.assertEqual(get_definitions.call_count, 1)
+
+        with patch.object(db_connection, 'get_definition') as get_definition:
+            blocks = [course]
+            while blocks:
+                block = blocks.pop()
+                for __, field in block.fields.iteritems():
+                    if field.is_set_on(block):
+                        field.read_from(block)
+                if block.has_children:
+                    blocks.extend(block.get_children())
+        self.assertFalse(get_definition.called)
+
     def test_negative_has_item(self):
         # negative tests--not found
         # no such course or block
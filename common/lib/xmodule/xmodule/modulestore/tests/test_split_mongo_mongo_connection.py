@@ -1,7 +1,7 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, SizedLRUCache
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +17,36 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestSizedLRUCache(unittest.TestCase):
+    """ Test the eviction behavior of SizedLRUCache """
+    def setUp(self):
+        super(TestSizedLRUCache, self).setUp()
+        self.cache = SizedLRUCache(10)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('b', 'bbbb')
+        # Reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(self.cache.get('a'), 'aaaa')
+        self.cache.set('c', 'cccc')
+
+        self.assertEqual(self.cache.get('a'), 'aaaa')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('c'), 'cccc')
+
+    def test_replace(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('a', 'AAAAAA')
+        self.cache.set('b', 'bbbb')
+
+        self.assertEqual(self.cache.get('a'), 'AAAAAA')
+        self.assertEqual(self.cache.get('b'), 'bbbb')
+
+    def test_too_large(self):
+        self.cache.set('a', 'a' * 11)
+        self.assertIsNone(self.cache.get('a'))
@@ -240,3 +240,83 @@ class GraderTest(unittest.TestCase):
 
         # TODO: How do we test failure cases? The parser only logs an error when
         # it can't parse something. Maybe it should throw exceptions?
+
+
+class GradePercentsTest(unittest.TestCase):
+    '''Tests that grading many students at once matches grading each of them'''
+
+    sections = {
+        'Homework': ['hw1', 'hw2', 'hw3'],
+        'Lab': ['lab1', 'lab2', 'lab3', 'lab4', 'lab5'],
+        'Midterm': ['Midterm Exam', 'Midterm Exam'],
+    }
+
+    # For each student, the (earned, possible) scores of each section, in order.
+    # Sections with a possible score of 0 are missing from the grade sheet.
+    students = [
+        {},
+        {
+            'Homework': [(2, 20.0), (16, 16.0), (0, 0)],
+            'Lab': [(1, 2.0), (1, 1.0), (1, 1.0), (5, 25.0), (3, 4.0)],
+            'Midterm': [(50.5, 100), (10, 100)],
+        },
+        {
+            'Homework': [(0, 0), (0, 0), (3, 4.0)],
+            'Lab': [(0, 0), (2, 2.0), (0, 0), (0, 0), (0, 1.0)],
+            'Midterm': [(0, 0), (10, 100)],
+        },
+        {
+            'Homework': [(1, 1.0), (1, 1.0), (1, 1.0)],
+            'Lab': [(1, 1.0), (1, 1.0), (1, 1.0), (1, 1.0), (1, 1.0)],
+            'Midterm': [(100, 100), (0, 0)],
+        },
+    ]
+
+    def _section_scores(self):
+        '''Returns the SectionScores of all students'''
+        section_scores = {}
+        for section_format, sections in self.sections.iteritems():
+            scores = [student.get(section_format, [(0, 0)] * len(sections)) for student in self.students]
+            section_scores[section_format] = graders.SectionScores(
+                sections,
+                [[earned for earned, __ in student_scores] for student_scores in scores],
+                [[possible for __, possible in student_scores] for student_scores in scores],
+            )
+        return section_scores
+
+    def _assert_matches_grade(self, grader):
+        '''Asserts that the grader's percents match grading each student'''
+        section_scores = self._section_scores()
+        percents = grader.grade_percents(section_scores, len(self.students))
+        self.assertEqual(len(percents), len(self.students))
+        for index, percent in enumerate(percents):
+            grade_sheet = graders.grade_sheet_for_student(section_scores, index)
+            self.assertAlmostEqual(percent, grader.grade(grade_sheet)['percent'])
+
+    def test_single_section_grader(self):
+        for grader in [graders.SingleSectionGrader("Midterm", "Midterm Exam"),
+                       graders.SingleSectionGrader("Lab", "lab2"),
+                       graders.SingleSectionGrader("Lab", "lab42"),
+                       graders.SingleSectionGrader("Final", "Final Exam")]:
+            self._assert_matches_grade(grader)
+
+    def test_assignment_format_grader(self):
+        for grader in [graders.AssignmentFormatGrader("Homework", 12, 2),
+                       graders.AssignmentFormatGrader("Homework", 2, 0),
+                       graders.AssignmentFormatGrader("Lab", 3, 2),
+                       graders.AssignmentFormatGrader("Lab", 2, 6),
+                       graders.AssignmentFormatGrader("Midterm", 1, 0),
+                       graders.AssignmentFormatGrader("Final", 0, 0)]:
+            self._assert_matches_grade(grader)
+
+    def test_weighted_subsections_grader(self):
+        self._assert_matches_grade(graders.grader_from_conf([
+            {'type': "Homework", 'min_count': 12, 'drop_count': 2, 'weight': 0.25},
+            {'type': "Lab", 'min_count': 7, 'drop_count': 3, 'weight': 0.25},
+            {'type': "Midterm", 'name': "Midterm Exam", 'weight': 0.5},
+        ]))
+        self._assert_matches_grade(graders.grader_from_conf([]))
+
+    def test_no_students(self):
+        grader = graders.AssignmentFormatGrader("Homework", 12, 2)
+        self.assertEqual(len(grader.grade_percents({}, 0)), 0)
@@ -15,6 +15,7 @@ class ProctoredExamTransformer(FilteringTransformerMixin, BlockStructureTransfor
     declined taking the exam.
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     BLOCK_HAS_PROCTORED_EXAM = 'has_proctored_exam'
 
     @classmethod
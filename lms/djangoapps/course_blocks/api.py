@@ -8,6 +8,7 @@ from openedx.core.lib.block_structure.manager import BlockStructureManager
 from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
 from xmodule.modulestore.django import modulestore
 
+from . import cache as transformed_cache
 from .transformers import (
     library_content,
     start_date,
@@ -56,12 +57,28 @@ def get_course_blocks(
             transformers, the transformed block structure will be
             exactly equivalent to the blocks that the given user has
             access.
+
+    When caching of transformed course blocks is enabled, the result is
+    cached for the user for a short time, and is invalidated whenever the
+    course content or the user's enrollment, group membership or roles
+    change. Results that depend on choices that were not saved, such as a
+    new random selection of library content, are not cached.
     """
     if not transformers:
         transformers = BlockStructureTransformers(COURSE_BLOCK_ACCESS_TRANSFORMERS)
     transformers.usage_info = CourseUsageInfo(starting_block_usage_key.course_key, user)
 
-    return get_block_structure_manager(starting_block_usage_key.course_key).get_transformed(
+    use_cache = user is not None and user.id is not None and transformed_cache.is_enabled()
+    if use_cache:
+        block_structure = transformed_cache.get_transformed(user, starting_block_usage_key, transformers)
+        if block_structure is not None:
+            return block_structure
+
+    block_structure = get_block_structure_manager(starting_block_usage_key.course_key).get_transformed(
         transformers,
         starting_block_usage_key,
     )
+
+    if use_cache and transformers.usage_info.cacheable:
+        transformed_cache.set_transformed(user, starting_block_usage_key, transformers, block_structure)
+    return block_structure
@@ -0,0 +1,147 @@
+"""
+Short-lived cache of transformed course block structures.
+
+Transformed block structures are cached per user, keyed on the starting
+block, the requested transformers (including their versions and
+configuration), and three generation tokens:
+
+  * a course generation, which changes whenever the course's content or
+    its group configuration changes,
+  * a user generation in the course, which changes whenever the user's
+    enrollment, group (including cohort) membership or roles in the course
+    change, and
+  * a user generation across courses, which changes whenever the user's
+    organization-wide or global roles, or global staff status, change.
+
+Invalidation replaces a generation token, so stale entries are never
+read again and simply expire.
+"""
+from hashlib import md5
+from logging import getLogger
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx.core.lib.block_structure.block_structure import BlockStructureModulestoreData
+from openedx.core.lib.block_structure.compact import CompactBlockStructure
+
+
+log = getLogger(__name__)  # pylint: disable=invalid-name
+
+# Version of the format of the cached data.  Increment it whenever the
+# format changes.
+CACHE_VERSION = 2
+
+
+def is_enabled():
+    """
+    Returns whether caching of transformed course blocks is enabled.
+    """
+    return settings.FEATURES.get('ENABLE_COURSE_BLOCKS_TRANSFORMED_CACHE', False)
+
+
+def get_transformed(user, starting_block_usage_key, transformers):
+    """
+    Returns the cached transformed block structure for the given user,
+    starting block and transformers, or None if not found.
+
+    A new copy of the block structure is returned on each call, so
+    callers are free to mutate it.
+    """
+    cache_key = _get_cache_key(user, starting_block_usage_key, transformers)
+    serialized_data = cache.get(cache_key)
+    if serialized_data is None:
+        return None
+    return CompactBlockStructure.deserialize(serialized_data).to_block_structure(BlockStructureModulestoreData)
+
+
+def set_transformed(user, starting_block_usage_key, transformers, block_structure):
+    """
+    Caches the given transformed block structure for the given user,
+    starting block and transformers.
+    """
+    cache.set(
+        _get_cache_key(user, starting_block_usage_key, transformers),
+        CompactBlockStructure.from_block_structure(block_structure).serialize(),
+        settings.COURSE_BLOCKS_TRANSFORMED_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_for_user(user_id, course_key=None):
+    """
+    Invalidates all cached transformed block structures of the given
+    user in the given course, or in all courses if course_key is None.
+    """
+    _reset_generation(_get_user_generation_key(user_id, course_key))
+
+
+def invalidate_for_course(course_key):
+    """
+    Invalidates all cached transformed block structures of all users in
+    the given course.
+    """
+    _reset_generation(_get_course_generation_key(course_key))
+
+
+def _get_cache_key(user, starting_block_usage_key, transformers):
+    """
+    Returns the cache key for the given user, starting block and
+    transformers, reflecting the current generation tokens.
+    """
+    course_key = starting_block_usage_key.course_key
+    key_parts = [unicode(user.id), unicode(starting_block_usage_key)] + _get_generations([
+        _get_course_generation_key(course_key),
+        _get_user_generation_key(user.id, course_key),
+        _get_user_generation_key(user.id),
+    ])
+    for transformer in transformers:
+        key_parts.append(u'{}.{}.{!r}'.format(
+            transformer.name(),
+            transformer.VERSION,
+            sorted(vars(transformer).items()),
+        ))
+    return u'course_blocks.transformed.v{}.{}'.format(
+        CACHE_VERSION,
+        md5(u'|'.join(key_parts).encode('utf-8')).hexdigest(),
+    )
+
+
+def _get_course_generation_key(course_key):
+    """
+    Returns the cache key of the generation token of the given course.
+    """
+    return u'course_blocks.transformed.generation.{}'.format(course_key)
+
+
+def _get_user_generation_key(user_id, course_key=None):
+    """
+    Returns the cache key of the generation token of the given user in
+    the given course, or across courses if course_key is None.
+    """
+    if course_key is None:
+        return u'course_blocks.transformed.generation.user.{}'.format(user_id)
+    return u'course_blocks.transformed.generation.{}.{}'.format(user_id, course_key)
+
+
+def _get_generations(generation_keys):
+    """
+    Returns the list of the generation tokens stored at the given keys,
+    read from the cache in a single round-trip, creating those not found.
+    """
+    found_generations = cache.get_many(generation_keys)
+    return [
+        found_generations.get(generation_key) or _reset_generation(generation_key)
+        for generation_key in generation_keys
+    ]
+
+
+def _reset_generation(generation_key):
+    """
+    Stores and returns a new generation token at the given key.
+    """
+    generation = uuid4().hex
+    # The generation token must outlive the entries keyed on it.
+    cache.set(generation_key, generation, None)
+    log.debug(u'Reset transformed course blocks generation %s.', generation_key)
+    return generation
@@ -0,0 +1,87 @@
+"""
+Signal handlers for invalidating cached transformed course blocks.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+from openedx.core.djangoapps.course_groups.models import CourseUserGroup, CourseUserGroupPartitionGroup
+from student.models import CourseAccessRole, CourseEnrollment
+from xmodule.modulestore.django import SignalHandler
+
+from .cache import invalidate_for_course, invalidate_for_user
+
+
+@receiver(SignalHandler.course_published)
+@receiver(SignalHandler.course_deleted)
+def _listen_for_course_change(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of all users in a course
+    when the course is published or deleted.
+    """
+    invalidate_for_course(course_key)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def _listen_for_enrollment_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of a user in a course when
+    the user's enrollment in the course changes.
+    """
+    invalidate_for_user(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def _listen_for_role_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of a user when their roles
+    change: in the role's course, or in all courses for an organization-wide
+    or global role.
+    """
+    invalidate_for_user(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=User)
+def _listen_for_user_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of a user in all courses
+    when the user changes, as their global staff status may have changed.
+    """
+    invalidate_for_user(instance.id)
+
+
+@receiver(m2m_changed, sender=CourseUserGroup.users.through)
+def _listen_for_group_membership_change(sender, instance, action, reverse, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of users in a course when
+    their membership in any of the course's groups, including cohorts,
+    changes.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        # The instance is a user and pk_set holds group ids.
+        if action == 'pre_clear':
+            groups = instance.course_groups.all()
+        else:
+            groups = CourseUserGroup.objects.filter(pk__in=pk_set)
+        for course_key in set(group.course_id for group in groups):
+            invalidate_for_user(instance.id, course_key)
+    else:
+        # The instance is a group and pk_set holds user ids.
+        user_ids = instance.users.values_list('id', flat=True) if action == 'pre_clear' else pk_set
+        for user_id in user_ids:
+            invalidate_for_user(user_id, instance.course_id)
+
+
+@receiver(post_save, sender=CourseUserGroupPartitionGroup)
+@receiver(post_delete, sender=CourseUserGroupPartitionGroup)
+def _listen_for_group_configuration_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached transformed blocks of all users in a course
+    when a course group's link to a partition group changes.
+    """
+    invalidate_for_course(instance.course_user_group.course_id)
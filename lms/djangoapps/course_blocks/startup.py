@@ -0,0 +1,4 @@
+"""
+Setup the signals on startup.
+"""
+import lms.djangoapps.course_blocks.signals  # pylint: disable=unused-import
@@ -0,0 +1,107 @@
+"""
+Tests for the cache of transformed course blocks.
+"""
+from mock import patch
+
+from django.conf import settings
+from django.test.utils import override_settings
+
+from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from openedx.core.lib.block_structure.manager import BlockStructureManager
+from student.models import CourseEnrollment
+from student.roles import CourseBetaTesterRole, OrgStaffRole
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import get_course_blocks
+from ..transformers.start_date import StartDateTransformer
+
+FEATURES_WITH_CACHE = settings.FEATURES.copy()
+FEATURES_WITH_CACHE['ENABLE_COURSE_BLOCKS_TRANSFORMED_CACHE'] = True
+
+
+@override_settings(FEATURES=FEATURES_WITH_CACHE)
+class TransformedCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for caching of transformed course blocks in get_course_blocks.
+    """
+    def setUp(self):
+        super(TransformedCacheTestCase, self).setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.student = UserFactory.create()
+        CourseEnrollment.enroll(self.student, self.course.id)
+
+    def get_course_blocks_and_verify(self, expect_transformed):
+        """
+        Calls get_course_blocks and verifies whether the transform phase
+        was run.
+        """
+        with patch.object(
+            BlockStructureManager,
+            'get_transformed',
+            autospec=True,
+            side_effect=BlockStructureManager.get_transformed,
+        ) as mock_get_transformed:
+            block_structure = get_course_blocks(self.student, self.course.location)
+        self.assertEqual(mock_get_transformed.called, expect_transformed)
+        self.assertIn(self.chapter.location, block_structure)
+        return block_structure
+
+    def test_cached(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        self.get_course_blocks_and_verify(expect_transformed=False)
+
+    def test_copy_returned(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        block_structure = self.get_course_blocks_and_verify(expect_transformed=False)
+        block_structure.remove_block(self.chapter.location, keep_descendants=False)
+        self.get_course_blocks_and_verify(expect_transformed=False)
+
+    def test_invalidated_on_enrollment_change(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        CourseEnrollment.unenroll(self.student, self.course.id)
+        self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_invalidated_on_group_membership_change(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        cohort = CourseUserGroup.objects.create(
+            name='Cohort', course_id=self.course.id, group_type=CourseUserGroup.COHORT
+        )
+        cohort.users.add(self.student)
+        self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_invalidated_on_course_role_change(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        CourseBetaTesterRole(self.course.id).add_users(self.student)
+        self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_invalidated_on_org_role_change(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        OrgStaffRole(self.course.id.org).add_users(self.student)
+        self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_invalidated_on_global_staff_change(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        self.student.is_staff = True
+        self.student.save()
+        self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_not_cached_if_not_cacheable(self):
+        def transform_block_filters(self, usage_info, block_structure):  # pylint: disable=unused-argument
+            """
+            Marks the result as not cacheable, and filters nothing.
+            """
+            usage_info.cacheable = False
+            return []
+
+        with patch.object(StartDateTransformer, 'transform_block_filters', transform_block_filters):
+            self.get_course_blocks_and_verify(expect_transformed=True)
+            self.get_course_blocks_and_verify(expect_transformed=True)
+
+    def test_invalidated_on_publish(self):
+        self.get_course_blocks_and_verify(expect_transformed=True)
+        self.course.display_name = 'Updated'
+        self.store.update_item(self.course, self.user.id)
+        self.get_course_blocks_and_verify(expect_transformed=True)
@@ -18,6 +18,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     Staff users are *not* exempted from library content pathways.
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -88,6 +89,12 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 block_keys = LibraryContentModule.make_selection(selected, library_children, max_count, mode)
                 selected = block_keys['selected']
 
+                # A selection that differs from the saved one is only saved
+                # when the block is rendered, and may be chosen differently
+                # then, so it must not be cached.
+                if block_keys['invalid'] or block_keys['overlimit'] or block_keys['added']:
+                    usage_info.cacheable = False
+
                 # publish events for analytics
                 self._publish_events(block_structure, block_key, previous_count, max_count, block_keys)
                 all_selected_children.update(usage_info.course_key.make_usage_key(s[0], s[1]) for s in selected)
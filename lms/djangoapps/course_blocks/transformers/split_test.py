@@ -20,6 +20,7 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     'group_access' fields.
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -64,6 +65,10 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             # Set group access for each child using its group_access
             # field so the user partitions transformer enforces it.
             for child_location in xblock.children:
+                # When collecting incrementally, only the affected
+                # children are included in the block structure.
+                if child_location not in block_structure:
+                    continue
                 child = block_structure.get_xblock(child_location)
                 group = child_to_group.get(child_location, None)
                 child.group_access[partition_for_this_block.id] = [group] if group is not None else []
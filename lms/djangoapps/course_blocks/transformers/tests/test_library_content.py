@@ -164,3 +164,21 @@ class ContentLibraryTransformerTestCase(CourseStructureTestCase):
                     'html1'
                 )
             )
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_COURSE_BLOCKS_TRANSFORMED_CACHE': True})
+    def test_unsaved_selection_not_cached(self):
+        """
+        Test that a selection that isn't saved for the user is not cached,
+        and that a saved one is.
+        """
+        get_course_blocks(self.user, self.course.location, self.transformers)
+
+        with mock.patch(
+            'lms.djangoapps.course_blocks.transformers.library_content.ContentLibraryTransformer._get_student_module',
+            return_value=MockedModule('{"selected": [["vertical", "vertical_vertical2"]]}'),
+        ) as mock_get_student_module:
+            for __ in range(2):
+                trans_keys = set(get_course_blocks(self.user, self.course.location, self.transformers).get_block_keys())
+                self.assertIn(self.get_block_key_set(self.blocks, 'vertical2').pop(), trans_keys)
+                self.assertNotIn(self.get_block_key_set(self.blocks, 'vertical3').pop(), trans_keys)
+        self.assertEqual(mock_get_student_module.call_count, 1)
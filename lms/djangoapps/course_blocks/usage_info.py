@@ -22,6 +22,11 @@ class CourseUsageInfo(object):
         # Cached value of whether the user has staff access (bool/None)
         self._has_staff_access = None
 
+        # Whether the transformed block structure may be cached across
+        # requests (bool).  Transformers that make choices for the user
+        # that are not saved, such as random selections, set it to False.
+        self.cacheable = True
+
     @property
     def has_staff_access(self):
         '''
@@ -33,6 +33,7 @@ from xmodule.split_test_module import get_split_user_partitions
 from xmodule.partitions.partitions import NoSuchUserPartitionError, NoSuchUserPartitionGroupError
 
 from external_auth.models import ExternalAuthMap
+from courseware import access_cache
 from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student import auth
@@ -69,6 +70,11 @@ from lms.djangoapps.ccx.models import CustomCourseForEdX
 
 log = logging.getLogger(__name__)
 
+# Actions whose access checks depend on data that does not invalidate the
+# access check cache, such as milestones and enrollment windows, so are
+# only memoized for the rest of the request.
+REQUEST_SCOPED_ACCESS_ACTIONS = frozenset(['enroll', 'load_mobile', 'view_courseware_with_prerequisites'])
+
 
 def has_ccx_coach_role(user, course_key):
     """
@@ -133,6 +139,25 @@ def has_access(user, action, obj, course_key=None):
     if not user:
         user = AnonymousUser()
 
+    if access_cache.is_enabled() and not in_preview_mode():
+        object_key, object_course_key = _get_access_cache_key(obj, course_key)
+        if object_key is not None:
+            return access_cache.get_or_compute(
+                user,
+                action,
+                object_key,
+                object_course_key,
+                lambda: _has_access(user, action, obj, course_key),
+                cross_request=action not in REQUEST_SCOPED_ACCESS_ACTIONS,
+            )
+
+    return _has_access(user, action, obj, course_key)
+
+
+def _has_access(user, action, obj, course_key):
+    """
+    Implements has_access, without memoization.
+    """
     if in_preview_mode():
         if not bool(has_staff_access_to_preview_mode(user=user, obj=obj, course_key=course_key)):
             return ACCESS_DENIED
@@ -173,6 +198,33 @@ def has_access(user, action, obj, course_key=None):
                     .format(type(obj)))
 
 
+def _get_access_cache_key(obj, course_key):
+    """
+    Returns a (object_key, course_key) tuple identifying the given object
+    and its course in memoized access checks, or (None, None) if access
+    checks on the object are not memoized.
+
+    Checks on XModules are delegated to their descriptors, so are memoized
+    as such.
+    """
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
+        return u'{}:{}'.format(type(obj).__name__, obj.id), obj.id
+    if isinstance(obj, (ErrorDescriptor, XModule)):
+        return None, None
+    if isinstance(obj, XBlock):
+        location = getattr(obj, 'location', None)
+        if location is None:
+            return None, None
+        return u'block:{}'.format(location), course_key or location.course_key
+    if isinstance(obj, CourseKey):
+        return u'course_key:{}'.format(obj), obj
+    if isinstance(obj, UsageKey):
+        return u'usage_key:{}'.format(obj), course_key or obj.course_key
+    if isinstance(obj, basestring):
+        return u'string:{}'.format(obj), None
+    return None, None
+
+
 # ================ Implementation helpers ================================
 
 def has_staff_access_to_preview_mode(user, obj, course_key=None):
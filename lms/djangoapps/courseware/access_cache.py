@@ -0,0 +1,203 @@
+"""
+Memoization of the results of courseware.access.has_access.
+
+Access checks are memoized at two levels, keyed on the user, the action, the
+object checked, the course it belongs to and the user's masquerade in that
+course:
+
+  * for the rest of the request, in the request cache, and
+  * for settings.ACCESS_CHECK_CACHE_TIMEOUT seconds, in the Django cache.
+
+Cross-request entries are also keyed on two generation tokens:
+
+  * a course generation, which changes whenever the course is published, and
+  * a user generation, which changes whenever the user's roles, enrollments
+    or group (including cohort) memberships change.
+
+Invalidation replaces a generation token, so stale entries are never read
+again and simply expire, and empties the request cache. Time-based access
+rules, such as start dates, may be stale for up to the timeout.
+
+The generation tokens are read from the Django cache together, once per
+request, and kept in the request cache, so a check missing from the request
+cache costs a single round-trip to the Django cache for its entry. As with
+the request cache of results, invalidations made by other processes are
+seen from their next request.
+
+The number of access checks that were read from either level or computed
+during the request is returned by get_request_stats.
+"""
+from hashlib import md5
+from logging import getLogger
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+import request_cache
+
+from courseware.masquerade import get_course_masquerade
+
+
+log = getLogger(__name__)  # pylint: disable=invalid-name
+
+REQUEST_CACHE_NAME = 'courseware.access'
+REQUEST_STATS_CACHE_NAME = 'courseware.access.stats'
+REQUEST_GENERATIONS_CACHE_NAME = 'courseware.access.generations'
+
+# Version of the format of the cached data.  Increment it whenever the
+# format changes.
+CACHE_VERSION = 1
+
+
+def is_enabled():
+    """
+    Returns whether the results of access checks are memoized.
+    """
+    return settings.FEATURES.get('ENABLE_ACCESS_CHECK_CACHE', False)
+
+
+def get_or_compute(user, action, object_key, course_key, compute, cross_request=True):
+    """
+    Returns the memoized result of the access check of the given action by
+    the given user on the object identified by object_key, calling compute
+    to check access if not found.
+
+    Arguments:
+        object_key (unicode): identifies the object whose access is checked,
+            including its type.
+        course_key (CourseKey|None): the course of the object, if any.
+        compute (function): returns the AccessResponse of the check.
+        cross_request (bool): whether the result may be reused in later
+            requests. If False, it is only memoized for the rest of the
+            request.
+    """
+    key = _get_key(user, action, object_key, course_key)
+    request_results = request_cache.get_cache(REQUEST_CACHE_NAME)
+    result = request_results.get(key)
+    if result is not None:
+        _increment_stat('request_hits')
+        return result
+
+    cache_key = _get_cache_key(key, user, course_key) if cross_request else None
+    if cache_key is not None:
+        result = cache.get(cache_key)
+    if result is not None:
+        _increment_stat('cache_hits')
+    else:
+        result = compute()
+        _increment_stat('computed')
+        if cache_key is not None:
+            cache.set(cache_key, result, settings.ACCESS_CHECK_CACHE_TIMEOUT)
+
+    request_results[key] = result
+    return result
+
+
+def get_request_stats():
+    """
+    Returns a dict with the number of access checks of the current request
+    that were read from the request cache ('request_hits'), read from the
+    Django cache ('cache_hits') or computed ('computed').
+    """
+    stats = request_cache.get_cache(REQUEST_STATS_CACHE_NAME)
+    return {name: stats.get(name, 0) for name in ('request_hits', 'cache_hits', 'computed')}
+
+
+def invalidate_for_user(user_id):
+    """
+    Invalidates the memoized access checks of the given user.
+    """
+    _reset_generation(_get_user_generation_key(user_id))
+    request_cache.get_cache(REQUEST_CACHE_NAME).clear()
+
+
+def invalidate_for_course(course_key):
+    """
+    Invalidates the memoized access checks of all users in the given course.
+    """
+    _reset_generation(_get_course_generation_key(course_key))
+    request_cache.get_cache(REQUEST_CACHE_NAME).clear()
+
+
+def _increment_stat(name):
+    """
+    Increments the named counter of the current request.
+    """
+    stats = request_cache.get_cache(REQUEST_STATS_CACHE_NAME)
+    stats[name] = stats.get(name, 0) + 1
+
+
+def _get_key(user, action, object_key, course_key):
+    """
+    Returns the key of the given access check in the request cache.
+    """
+    masquerade = get_course_masquerade(user, course_key) if course_key is not None else None
+    masquerade_key = (
+        (masquerade.role, masquerade.user_partition_id, masquerade.group_id, masquerade.user_name)
+        if masquerade is not None else None
+    )
+    return (user.id, action, object_key, unicode(course_key), masquerade_key)
+
+
+def _get_cache_key(key, user, course_key):
+    """
+    Returns the key of the given access check in the Django cache,
+    reflecting the current generation tokens, or None if the check is not
+    cached across requests.
+    """
+    if user.id is None:
+        return None
+    generation_keys = [_get_user_generation_key(user.id)]
+    if course_key is not None:
+        generation_keys.append(_get_course_generation_key(course_key))
+    key_parts = [unicode(key)] + _get_generations(generation_keys)
+    return u'courseware.access.v{}.{}'.format(
+        CACHE_VERSION,
+        md5(u'|'.join(key_parts).encode('utf-8')).hexdigest(),
+    )
+
+
+def _get_course_generation_key(course_key):
+    """
+    Returns the cache key of the generation token of the given course.
+    """
+    return u'courseware.access.generation.course.{}'.format(course_key)
+
+
+def _get_user_generation_key(user_id):
+    """
+    Returns the cache key of the generation token of the given user.
+    """
+    return u'courseware.access.generation.user.{}'.format(user_id)
+
+
+def _get_generations(generation_keys):
+    """
+    Returns the list of the generation tokens stored at the given keys,
+    reading those not yet read during the request from the Django cache in
+    a single round-trip, and creating those not found.
+    """
+    request_generations = request_cache.get_cache(REQUEST_GENERATIONS_CACHE_NAME)
+    missing_keys = [key for key in generation_keys if key not in request_generations]
+    if missing_keys:
+        found_generations = cache.get_many(missing_keys)
+        for generation_key in missing_keys:
+            generation = found_generations.get(generation_key)
+            if generation is None:
+                _reset_generation(generation_key)
+            else:
+                request_generations[generation_key] = generation
+    return [request_generations[generation_key] for generation_key in generation_keys]
+
+
+def _reset_generation(generation_key):
+    """
+    Stores and returns a new generation token at the given key.
+    """
+    generation = uuid4().hex
+    # The generation token must outlive the entries keyed on it.
+    cache.set(generation_key, generation, None)
+    request_cache.get_cache(REQUEST_GENERATIONS_CACHE_NAME)[generation_key] = generation
+    log.debug(u'Reset access check generation %s.', generation_key)
+    return generation
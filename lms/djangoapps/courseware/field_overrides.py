@@ -171,6 +171,20 @@ class OverrideFieldData(FieldData):
 
         return wrapped
 
+    @classmethod
+    def overrides_enabled_for(cls, course):
+        """
+        Returns whether any of the override providers configured by the
+        Django setting, `FIELD_OVERRIDE_PROVIDERS`, is enabled for the given
+        course, so that the fields of its blocks may be overridden for users.
+        """
+        if cls.provider_classes is None:
+            cls.provider_classes = tuple(
+                (resolve_dotted(name) for name in
+                 settings.FIELD_OVERRIDE_PROVIDERS))
+
+        return bool(cls._providers_for_course(course))
+
     @classmethod
     def _providers_for_course(cls, course):
         """
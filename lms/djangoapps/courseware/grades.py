@@ -5,13 +5,16 @@ import json
 import logging
 import random
 from collections import defaultdict
+from itertools import islice
 
 import dogstats_wrapper as dog_stats_api
 from course_blocks.api import get_course_blocks
 from courseware import courses
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.test.client import RequestFactory
+import numpy
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import BlockUsageLocator
@@ -20,7 +23,7 @@ from openedx.core.lib.cache_utils import memoized
 from openedx.core.lib.gating import api as gating_api
 from courseware.model_data import FieldDataCache, ScoresClient
 from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
-from student.models import anonymous_id_for_user
+from student.models import anonymous_id_for_user, anonymous_ids_for_users
 from util.db import outer_atomic
 from util.module_utils import yield_dynamic_descriptor_descendants
 from xblock.core import XBlock
@@ -28,13 +31,18 @@ from xmodule import graders, block_metadata_utils
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from . import persistent_grades
+from .models import StudentModule, chunks
 from .module_render import get_module_for_descriptor
 from .transformers.grades import GradesTransformer
 
 
 log = logging.getLogger("edx.courseware")
 
+# Number of students graded at once by iterate_grades_for when the
+# vectorized grading engine is enabled.
+GRADING_BATCH_SIZE = 100
+
 
 class ProgressSummary(object):
     """
@@ -269,7 +277,26 @@ def grade(student, course, keep_raw_scores=False, course_structure=None):
 
     Also sends a signal to update the minimum grade requirement status.
     """
-    grade_summary = _grade(student, course, keep_raw_scores, course_structure)
+    grade_summary = None
+    if persistent_grades.is_enabled():
+        if course_structure is None:
+            course_structure = get_course_blocks(student, course.location)
+        if not keep_raw_scores:
+            grade_summary = _grade_from_storage(student, course, course_structure)
+
+    if grade_summary is None:
+        grade_summary = _grade(student, course, keep_raw_scores, course_structure)
+        if persistent_grades.is_enabled():
+            _store_grades(student, course, grade_summary, course_structure)
+
+    _send_grades_updated(student, course, grade_summary)
+    return grade_summary
+
+
+def _send_grades_updated(student, course, grade_summary):
+    """
+    Sends a signal to update the minimum grade requirement status.
+    """
     responses = GRADES_UPDATED.send_robust(
         sender=None,
         username=student.username,
@@ -281,8 +308,6 @@ def grade(student, course, keep_raw_scores=False, course_structure=None):
     for receiver, response in responses:
         log.info('Signal fired when student grade is calculated. Receiver: %s. Response: %s', receiver, response)
 
-    return grade_summary
-
 
 def _grade(student, course, keep_raw_scores, course_structure=None):
     """
@@ -306,44 +331,226 @@ def _grade(student, course, keep_raw_scores, course_structure=None):
     with outer_atomic():
         scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
 
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
+    submissions_scores = _get_submissions_scores(student, course)
+
+    totaled_scores, raw_scores = _calculate_totaled_scores(
+        student, grading_context_result, submissions_scores, scores_client, keep_raw_scores
+    )
+
+    grade_summary = _grade_totaled_scores(course, totaled_scores)
+    if keep_raw_scores:
+        # way to get all RAW scores out to instructor
+        # so grader can be double-checked
+        grade_summary['raw_scores'] = raw_scores
+
+    return grade_summary
+
+
+def _get_submissions_scores(student, course):
+    """
+    Returns a dict of item_ids -> (earned, possible) point tuples of the
+    student in the course. This *only* grabs scores that were registered with
+    the submissions API, which for the moment means only openassessment
+    (edx-ora2)
+    """
     # We need to import this here to avoid a circular dependency of the form:
     # XBlock --> submissions --> Django Rest Framework error strings -->
     # Django translation --> ... --> courseware --> submissions
     from submissions import api as sub_api  # installed from the edx-submissions repository
 
     with outer_atomic():
-        submissions_scores = sub_api.get_scores(
+        return sub_api.get_scores(
             course.id.to_deprecated_string(),
             anonymous_id_for_user(student, course.id)
         )
 
-    totaled_scores, raw_scores = _calculate_totaled_scores(
-        student, grading_context_result, submissions_scores, scores_client, keep_raw_scores
-    )
 
+def _grade_totaled_scores(course, totaled_scores):
+    """
+    Returns the grade summary for the given totaled scores, as computed by
+    the course grader and augmented with the final letter grade.
+    """
     with outer_atomic():
         # Grading policy might be overriden by a CCX, need to reset it
         course.set_grading_policy(course.grading_policy)
         grade_summary = course.grader.grade(totaled_scores, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
 
-        # We round the grade here, to make sure that the grade is a whole percentage and
-        # doesn't get displayed differently than it gets grades
-        grade_summary['percent'] = round(grade_summary['percent'] * 100 + 0.05) / 100
+        grade_summary['percent'] = _round_percent(grade_summary['percent'])
 
         letter_grade = grade_for_percentage(course.grade_cutoffs, grade_summary['percent'])
         grade_summary['grade'] = letter_grade
         grade_summary['totaled_scores'] = totaled_scores   # make this available, eg for instructor download & debugging
-        if keep_raw_scores:
-            # way to get all RAW scores out to instructor
-            # so grader can be double-checked
-            grade_summary['raw_scores'] = raw_scores
 
     return grade_summary
 
 
+def _graded_section_keys(course_structure):
+    """
+    Returns the usage keys of the graded sections of the given block
+    structure, in course order, see grading_context.
+    """
+    return [
+        section_key
+        for chapter_key in course_structure.get_children(course_structure.root_block_usage_key)
+        for section_key in course_structure.get_children(chapter_key)
+        if getattr(course_structure[section_key], 'graded', False)
+    ]
+
+
+def _grade_from_storage(student, course, course_structure):
+    """
+    Returns the grade summary of the student, computed from their stored
+    subsection grades, or None if the student has no stored course grade
+    that is up to date with the grading policy and graded content, or no
+    stored grade in one of the graded sections of the given block structure
+    of the course for the student, e.g. in a section that was hidden from
+    them when their grades were stored.
+
+    The grade summary doesn't include raw scores.
+    """
+    if persistent_grades.get_course_grade(student.id, course) is None:
+        return None
+
+    subsection_grades = persistent_grades.get_subsection_grades(student.id, course.id)
+
+    totaled_scores = defaultdict(list)
+    for section_key in _graded_section_keys(course_structure):
+        if section_key not in subsection_grades:
+            return None
+        earned, possible = subsection_grades[section_key]
+        # As in _calculate_totaled_scores
+        if possible > 0:
+            section = course_structure[section_key]
+            totaled_scores[getattr(section, 'format', '')].append(
+                Score(earned, possible, True, block_metadata_utils.display_name_with_default(section), section_key)
+            )
+
+    return _grade_totaled_scores(course, dict(totaled_scores))
+
+
+def _store_grades(student, course, grade_summary, course_structure, collected_block_structure=None):
+    """
+    Stores the subsection and course grades of the given grade summary.
+
+    Only the graded sections of the given block structure of the course for
+    the student, that is the ones visible to them, are stored. Those that
+    were not passed to the grader, as they are worth nothing to the student,
+    are stored with a possible score of 0.
+    """
+    section_scores = {
+        score.module_id: score
+        for format_scores in grade_summary['totaled_scores'].itervalues()
+        for score in format_scores
+    }
+    for section_key in _graded_section_keys(course_structure):
+        if section_key not in section_scores:
+            section_scores[section_key] = Score(0.0, 0.0, True, None, section_key)
+
+    with outer_atomic():
+        persistent_grades.save_subsection_grades(student.id, course.id, section_scores.values(), replace_all=True)
+        persistent_grades.save_course_grade(student.id, course, grade_summary, collected_block_structure)
+
+
+def update_stored_grades(student, course, usage_key, score=None):
+    """
+    Updates the stored grades of the student in the graded subsections of the
+    course that contain the given block, and then their course grade.
+
+    If the student has no stored course grade that is up to date with the
+    grading policy and graded content, all their grades are computed and
+    stored first.
+
+    If given, score is the new (earned, possible) score of the student for
+    the block, which is used instead of the one read from the database, as
+    the transaction that changed it may not be committed yet.
+    """
+    if persistent_grades.get_course_grade(student.id, course) is None:
+        grade(student, course)
+        if score is None:
+            return
+
+    course_structure = get_course_blocks(student, course.location)
+    grading_context_result = grading_context(course_structure)
+    section_infos = [
+        section_info
+        for sections in grading_context_result['all_graded_sections'].itervalues()
+        for section_info in sections
+        if any(descendant.location == usage_key for descendant in section_info['scored_descendants'])
+    ]
+    if not section_infos:
+        return
+
+    scorable_locations = [
+        descendant.location
+        for section_info in section_infos
+        for descendant in section_info['scored_descendants']
+    ]
+    with outer_atomic():
+        scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
+    submissions_scores = _get_submissions_scores(student, course)
+    if score is not None:
+        # The new score replaces the block's score from the submissions API
+        # if it has one, which a reset score (0/0) hides, and the block's
+        # StudentModule score otherwise. See get_score.
+        location_url = unicode(usage_key)
+        if location_url in submissions_scores:
+            if score[1]:
+                submissions_scores[location_url] = score
+            else:
+                del submissions_scores[location_url]
+        else:
+            scores_client.set_score(usage_key, *score)
+
+    section_scores = [
+        calculate_section_score(student, section_info, submissions_scores, scores_client)[0]
+        for section_info in section_infos
+    ]
+    with outer_atomic():
+        persistent_grades.save_subsection_grades(student.id, course.id, section_scores)
+
+    grade_summary = _grade_from_storage(student, course, course_structure)
+    if grade_summary is None:
+        # A graded section that has become visible to the student since
+        # their grades were stored has no stored grade yet.
+        grade_summary = _grade(student, course, False, course_structure)
+        _store_grades(student, course, grade_summary, course_structure)
+    else:
+        with outer_atomic():
+            persistent_grades.save_course_grade(student.id, course, grade_summary)
+    _send_grades_updated(student, course, grade_summary)
+
+
+def recompute_outdated_grades(course):
+    """
+    Recomputes and stores the grades of the students in the course whose
+    stored course grade was computed with an outdated grading policy or
+    graded content.
+    """
+    user_ids = persistent_grades.get_outdated_user_ids(course)
+    if not user_ids:
+        return
+
+    log.info(u'Recomputing the stored grades of %d students in course %s.', len(user_ids), course.id)
+    course_structure = get_course_in_cache(course.id)
+    engine = CourseGradingEngine(course, course_structure)
+    for user_ids_batch in chunks(user_ids, GRADING_BATCH_SIZE):
+        students = list(User.objects.filter(id__in=user_ids_batch))
+        grade_summaries = engine.grade_students(students, include_breakdown=False)
+        for student, grade_summary in zip(students, grade_summaries):
+            _store_grades(
+                student, course, grade_summary, get_course_blocks(student, course.location), course_structure
+            )
+            _send_grades_updated(student, course, grade_summary)
+
+
+def _round_percent(percent):
+    """
+    Rounds the grade to make sure that it is a whole percentage and doesn't
+    get displayed differently than it gets graded.
+    """
+    return round(percent * 100 + 0.05) / 100
+
+
 def _calculate_totaled_scores(
         student,
         grading_context_result,
@@ -359,79 +566,93 @@ def _calculate_totaled_scores(
     for section_format, sections in grading_context_result['all_graded_sections'].iteritems():
         format_scores = []
         for section_info in sections:
-            section = section_info['section_block']
-            section_name = block_metadata_utils.display_name_with_default(section)
-
-            with outer_atomic():
-                # Check to
-                # see if any of our locations are in the scores from the submissions
-                # API. If scores exist, we have to calculate grades for this section.
-                should_grade_section = any(
-                    unicode(descendant.location) in submissions_scores
-                    for descendant in section_info['scored_descendants']
+            graded_total, scores = calculate_section_score(
+                student, section_info, submissions_scores, scores_client
+            )
+            if keep_raw_scores:
+                raw_scores += scores
+
+            # Add the graded total to totaled_scores
+            if graded_total.possible > 0:
+                format_scores.append(graded_total)
+            else:
+                log.info(
+                    "Unable to grade a section with a total possible score of zero. " +
+                    str(section_info['section_block'].location)
                 )
 
-                if not should_grade_section:
-                    should_grade_section = any(
-                        descendant.location in scores_client
-                        for descendant in section_info['scored_descendants']
-                    )
+        totaled_scores[section_format] = format_scores
+
+    return totaled_scores, raw_scores
 
-                # If we haven't seen a single problem in the section, we don't have
-                # to grade it at all! We can assume 0%
-                if should_grade_section:
-                    scores = []
-
-                    for descendant in section_info['scored_descendants']:
-
-                        (correct, total) = get_score(
-                            student,
-                            descendant,
-                            scores_client,
-                            submissions_scores,
-                        )
-                        if correct is None and total is None:
-                            continue
-
-                        if settings.GENERATE_PROFILE_SCORES:  # for debugging!
-                            if total > 1:
-                                correct = random.randrange(max(total - 2, 1), total + 1)
-                            else:
-                                correct = total
-
-                        graded = descendant.graded
-                        if not total > 0:
-                            # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                            graded = False
-
-                        scores.append(
-                            Score(
-                                correct,
-                                total,
-                                graded,
-                                block_metadata_utils.display_name_with_default_escaped(descendant),
-                                descendant.location
-                            )
-                        )
-
-                    __, graded_total = graders.aggregate_scores(scores, section_name)
-                    if keep_raw_scores:
-                        raw_scores += scores
-                else:
-                    graded_total = Score(0.0, 1.0, True, section_name, None)
-
-                # Add the graded total to totaled_scores
-                if graded_total.possible > 0:
-                    format_scores.append(graded_total)
-                else:
-                    log.info(
-                        "Unable to grade a section with a total possible score of zero. " +
-                        str(section.location)
+
+def calculate_section_score(student, section_info, submissions_scores, scores_client):
+    """
+    Returns a tuple (graded_total, scores) for the given section of the
+    grading context, where graded_total is the Score of the section that is
+    passed to the grader, and scores is the list of Scores of its graded
+    modules.
+    """
+    section = section_info['section_block']
+    section_name = block_metadata_utils.display_name_with_default(section)
+    scores = []
+
+    with outer_atomic():
+        # Check to
+        # see if any of our locations are in the scores from the submissions
+        # API. If scores exist, we have to calculate grades for this section.
+        should_grade_section = any(
+            unicode(descendant.location) in submissions_scores
+            for descendant in section_info['scored_descendants']
+        )
+
+        if not should_grade_section:
+            should_grade_section = any(
+                descendant.location in scores_client
+                for descendant in section_info['scored_descendants']
+            )
+
+        # If we haven't seen a single problem in the section, we don't have
+        # to grade it at all! We can assume 0%
+        if should_grade_section:
+            for descendant in section_info['scored_descendants']:
+
+                (correct, total) = get_score(
+                    student,
+                    descendant,
+                    scores_client,
+                    submissions_scores,
+                )
+                if correct is None and total is None:
+                    continue
+
+                if settings.GENERATE_PROFILE_SCORES:  # for debugging!
+                    if total > 1:
+                        correct = random.randrange(max(total - 2, 1), total + 1)
+                    else:
+                        correct = total
+
+                graded = descendant.graded
+                if not total > 0:
+                    # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+                    graded = False
+
+                scores.append(
+                    Score(
+                        correct,
+                        total,
+                        graded,
+                        block_metadata_utils.display_name_with_default_escaped(descendant),
+                        descendant.location
                     )
+                )
 
-        totaled_scores[section_format] = format_scores
+            __, graded_total = graders.aggregate_scores(scores, section_name)
+        else:
+            graded_total = Score(0.0, 1.0, True, section_name, None)
 
-    return totaled_scores, raw_scores
+    # Identify the section, so that its score can be stored
+    return graded_total._replace(module_id=section.location), scores
 
 
 def grade_for_percentage(grade_cutoffs, percentage):
@@ -639,7 +860,276 @@ def get_score(user, block, scores_client, submissions_scores_cache):
     return weighted_score(correct, total, block.weight)
 
 
-def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
+class CourseGradingEngine(object):
+    """
+    Grades a batch of students in a course at once.
+
+    The graded sections of the course and the blocks that could be scored
+    within them are read once from the collected block structure of the
+    course, and laid out as the columns of score arrays. The scores of all
+    students in a batch are then loaded in a single query, and the section
+    totals, dropped assignments and final grades are computed with NumPy
+    arrays, using the grading policy of the course's grader.
+
+    A student's grade summary is the same as the one returned by grade().
+    """
+    def __init__(self, course, collected_block_structure=None):
+        self.course = course
+        if collected_block_structure is None:
+            collected_block_structure = get_course_in_cache(course.id)
+
+        # Grading policy might be overriden by a CCX, need to reset it
+        course.set_grading_policy(course.grading_policy)
+
+        context = grading_context(collected_block_structure)
+        self.scorable_locations = [block.location for block in context['all_graded_blocks']]
+
+        # section index -> section block, and section format -> section indices
+        self._sections = []
+        self._section_indices_by_format = {}
+
+        # column index -> block, and section index of each column
+        self._blocks = []
+        column_sections = []
+
+        for section_format, sections in context['all_graded_sections'].iteritems():
+            section_indices = self._section_indices_by_format[section_format] = []
+            for section_info in sections:
+                section_indices.append(len(self._sections))
+                for block in section_info['scored_descendants']:
+                    self._blocks.append(block)
+                    column_sections.append(len(self._sections))
+                self._sections.append(section_info['section_block'])
+
+        # Matrix mapping columns to the sections they belong to, so that
+        # column values are summed into section values with a dot product.
+        self._column_sections = numpy.array(column_sections, dtype=int)
+        self._section_matrix = numpy.zeros((len(self._blocks), len(self._sections)))
+        self._section_matrix[numpy.arange(len(self._blocks)), self._column_sections] = 1.0
+
+        self._graded = numpy.array([bool(getattr(block, 'graded', False)) for block in self._blocks], dtype=bool)
+        self._weights = self._to_array([getattr(block, 'weight', None) for block in self._blocks])
+        self._max_scores = self._to_array([
+            block.transformer_data[GradesTransformer].max_score for block in self._blocks
+        ])
+
+        # A block can be scored in several sections, so each location maps to
+        # a list of columns.
+        self._columns_by_location = defaultdict(list)
+        self._columns_by_location_url = defaultdict(list)
+        for column, block in enumerate(self._blocks):
+            self._columns_by_location[block.location.replace(version=None, branch=None)].append(column)
+            self._columns_by_location_url[unicode(block.location)].append(column)
+
+    @staticmethod
+    def _to_array(values):
+        """
+        Returns a float array of the given values, with NaN for None.
+        """
+        return numpy.array([numpy.nan if value is None else value for value in values], dtype=float)
+
+    def percents(self, students):
+        """
+        Returns an array of the final percentages of the given students.
+        """
+        students = list(students)
+        section_scores, __ = self._get_section_scores(students)
+        return self._get_percents(section_scores, len(students))
+
+    def grade_students(self, students, keep_raw_scores=False, include_breakdown=True):
+        """
+        Returns a list of the grade summaries of the given students, in the
+        same format as the ones returned by grade().
+
+        The final percentages of the whole batch are computed at once by the
+        course's grader. Only the display breakdowns need the grader to be
+        run on each student's grade sheet.
+
+        - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
+          for every graded module
+        - include_breakdown : if False, the summaries don't contain the
+          'section_breakdown' and 'grade_breakdown' keys
+        """
+        students = list(students)
+        section_scores, block_scores = self._get_section_scores(students)
+        percents = self._get_percents(section_scores, len(students))
+
+        grade_summaries = []
+        for index in xrange(len(students)):
+            totaled_scores = self._get_totaled_scores(section_scores, index)
+            grade_summary = self.course.grader.grade(totaled_scores) if include_breakdown else {}
+            grade_summary['percent'] = float(percents[index])
+            grade_summary['grade'] = grade_for_percentage(self.course.grade_cutoffs, grade_summary['percent'])
+            grade_summary['totaled_scores'] = totaled_scores
+            if keep_raw_scores:
+                grade_summary['raw_scores'] = self._get_raw_scores(block_scores, index)
+            grade_summaries.append(grade_summary)
+        return grade_summaries
+
+    def _get_percents(self, section_scores, num_students):
+        """
+        Returns an array of the rounded final percentages of the students
+        with the given section scores.
+        """
+        percents = self.course.grader.grade_percents(section_scores, num_students)
+        # Same as _round_percent, for non-negative percentages.
+        return numpy.floor(percents * 100 + 0.05 + 0.5) / 100
+
+    def _get_totaled_scores(self, section_scores, index):
+        """
+        Returns the totaled scores of the student at the given index, which
+        can be passed to the grader. As in calculate_section_score, the
+        module_id of each score is the usage key of its section.
+        """
+        totaled_scores = graders.grade_sheet_for_student(section_scores, index)
+        for section_format, format_scores in totaled_scores.iteritems():
+            section_keys = [
+                self._sections[section_index].location
+                for section_index, possible in zip(
+                    self._section_indices_by_format[section_format],
+                    section_scores[section_format].possible[index],
+                )
+                if possible > 0
+            ]
+            totaled_scores[section_format] = [
+                score._replace(module_id=section_key) for score, section_key in zip(format_scores, section_keys)
+            ]
+        return totaled_scores
+
+    def _get_section_scores(self, students):
+        """
+        Returns a tuple (section_scores, block_scores) for the given students.
+
+        section_scores is a dict mapping section formats to the
+        graders.SectionScores of the students. block_scores is a tuple of
+        arrays (earned, possible, scored, graded, graded_sections) of shape
+        (number of students, number of columns), except for graded_sections,
+        which has a column per section.
+        """
+        num_students = len(students)
+        num_columns = len(self._blocks)
+
+        visible_blocks = numpy.zeros((num_students, num_columns), dtype=bool)
+        visible_sections = numpy.zeros((num_students, len(self._sections)), dtype=bool)
+        authenticated = numpy.zeros((num_students, 1), dtype=bool)
+        for index, student in enumerate(students):
+            course_structure = get_course_blocks(student, self.course.location)
+            visible_blocks[index] = [block.location in course_structure for block in self._blocks]
+            visible_sections[index] = [section.location in course_structure for section in self._sections]
+            authenticated[index] = student.is_authenticated()
+
+        # Unless a student has a score for a block, they've earned 0 points
+        # out of the block's max score.
+        earned = numpy.zeros((num_students, num_columns))
+        possible = numpy.tile(self._max_scores, (num_students, 1))
+        attempted = numpy.zeros((num_students, num_columns), dtype=bool)
+        from_submissions = numpy.zeros((num_students, num_columns), dtype=bool)
+
+        with outer_atomic():
+            scores_clients = ScoresClient.create_for_users(
+                self.course.id, [student.id for student in students], self.scorable_locations
+            )
+        for index, student in enumerate(students):
+            scores_client = scores_clients[student.id]
+            for location in scores_client:
+                columns = self._columns_by_location.get(location)
+                if not columns:
+                    continue
+                attempted[index, columns] = True
+                score = scores_client.get(location)
+                if score.total is not None:
+                    earned[index, columns] = score.correct if score.correct is not None else 0.0
+                    possible[index, columns] = score.total
+
+        # Scores registered with the submissions API take precedence, and are
+        # not weighted. See _grade.
+        with outer_atomic():
+            anonymous_ids = anonymous_ids_for_users(students, self.course.id)
+            submissions_scores_by_id = _get_submissions_scores_for_users(self.course.id, anonymous_ids.values())
+        for index, student in enumerate(students):
+            submissions_scores = submissions_scores_by_id.get(anonymous_ids.get(student.id), {})
+            for location_url, (submission_earned, submission_possible) in submissions_scores.iteritems():
+                columns = self._columns_by_location_url.get(location_url)
+                if not columns:
+                    continue
+                attempted[index, columns] = True
+                from_submissions[index, columns] = True
+                earned[index, columns] = submission_earned
+                possible[index, columns] = submission_possible
+
+        # See weighted_score. A block without a max score stays unscored.
+        weighted = ~numpy.isnan(self._weights) & ~numpy.isnan(possible) & (possible != 0) & ~from_submissions
+        earned = numpy.where(weighted, earned * self._weights / numpy.where(weighted, possible, 1.0), earned)
+        possible = numpy.where(weighted, self._weights, possible)
+
+        # A block without a max score can't be graded (e.g. an error module),
+        # and nor can a block that is worth nothing.
+        scored = visible_blocks & authenticated & ~numpy.isnan(possible)
+        graded = scored & self._graded & (possible > 0)
+
+        # Only sections the student has attempted are graded; others are
+        # assumed to be 0%.
+        graded_sections = numpy.dot(visible_blocks & attempted, self._section_matrix) > 0
+        section_earned = numpy.where(
+            graded_sections, numpy.dot(numpy.where(graded, earned, 0.0), self._section_matrix), 0.0
+        )
+        section_possible = numpy.where(
+            graded_sections, numpy.dot(numpy.where(graded, possible, 0.0), self._section_matrix), 1.0
+        )
+        section_possible = numpy.where(visible_sections, section_possible, 0.0)
+
+        section_scores = {}
+        for section_format, section_indices in self._section_indices_by_format.iteritems():
+            section_scores[section_format] = graders.SectionScores(
+                [block_metadata_utils.display_name_with_default(self._sections[i]) for i in section_indices],
+                section_earned[:, section_indices],
+                section_possible[:, section_indices],
+            )
+
+        return section_scores, (earned, possible, scored, graded, graded_sections & visible_sections)
+
+    def _get_raw_scores(self, block_scores, index):
+        """
+        Returns the list of Scores of the student at the given index for every
+        graded module.
+        """
+        earned, possible, scored, graded, graded_sections = block_scores
+        return [
+            Score(
+                earned[index, column],
+                possible[index, column],
+                bool(graded[index, column]),
+                block_metadata_utils.display_name_with_default_escaped(block),
+                block.location
+            )
+            for column, block in enumerate(self._blocks)
+            if scored[index, column] and graded_sections[index, self._column_sections[column]]
+        ]
+
+
+def _get_submissions_scores_for_users(course_key, anonymous_ids):
+    """
+    Returns a dict mapping each of the given anonymous user ids to the scores
+    registered with the submissions API for it in the course, in the format
+    returned by submissions.api.get_scores, loaded in a single query.
+    """
+    # Same as submissions.api.get_scores, for several students at once.
+    from submissions.models import ScoreSummary  # installed from the edx-submissions repository
+    summaries = ScoreSummary.objects.filter(
+        student_item__course_id=unicode(course_key),
+        student_item__student_id__in=anonymous_ids,
+    ).select_related('latest', 'student_item')
+
+    scores = defaultdict(dict)
+    for summary in summaries:
+        if not summary.latest.is_hidden():
+            scores[summary.student_item.student_id][summary.student_item.item_id] = (
+                summary.latest.points_earned, summary.latest.points_possible
+            )
+    return scores
+
+
+def iterate_grades_for(course_or_id, students, keep_raw_scores=False, include_breakdown=True):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -656,12 +1146,65 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    If include_breakdown is False, the section_breakdown and grade_breakdown
+    may be omitted, which saves running the grader on each student's scores.
     """
     if isinstance(course_or_id, (basestring, CourseKey)):
         course = courses.get_course_by_id(course_or_id)
     else:
         course = course_or_id
 
+    # Stored grades are read one student at a time by grade().
+    use_engine = (
+        settings.FEATURES.get('ENABLE_VECTORIZED_GRADING', False) and
+        not persistent_grades.is_enabled() and
+        not settings.GENERATE_PROFILE_SCORES
+    )
+    if use_engine:
+        for result in _iterate_grades_in_batches(course, students, keep_raw_scores, include_breakdown):
+            yield result
+        return
+
+    for result in _iterate_grades_one_by_one(course, students, keep_raw_scores):
+        yield result
+
+
+def _iterate_grades_in_batches(course, students, keep_raw_scores, include_breakdown=True):
+    """
+    Version of "iterate_grades_for" that grades GRADING_BATCH_SIZE students at
+    a time with a CourseGradingEngine.
+
+    If a batch can't be graded, its students are graded one by one, so that
+    errors are reported for the students that caused them.
+    """
+    engine = CourseGradingEngine(course)
+    students = iter(students)
+    while True:
+        batch = list(islice(students, GRADING_BATCH_SIZE))
+        if not batch:
+            break
+        with dog_stats_api.timer('lms.grades.iterate_grades_in_batches', tags=[u'action:{}'.format(course.id)]):
+            try:
+                gradesets = engine.grade_students(batch, keep_raw_scores, include_breakdown)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Cannot grade a batch of students in course %s, grading them one by one', course.id)
+                gradesets = None
+
+        if gradesets is None:
+            for result in _iterate_grades_one_by_one(course, batch, keep_raw_scores):
+                yield result
+            continue
+
+        for student, gradeset in zip(batch, gradesets):
+            _send_grades_updated(student, course, gradeset)
+            yield student, gradeset, ""
+
+
+def _iterate_grades_one_by_one(course, students, keep_raw_scores):
+    """
+    Version of "iterate_grades_for" that grades each student separately.
+    """
     for student in students:
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
             try:
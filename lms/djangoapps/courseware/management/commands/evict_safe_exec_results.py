@@ -0,0 +1,32 @@
+"""
+A Django command that evicts the oldest results from the safe_exec result
+store until its total size is under SAFE_EXEC_RESULT_STORE_MAX_SIZE bytes.
+
+The store doesn't evict results as they are stored, so this command should be
+run periodically, e.g. from cron, while the ENABLE_SAFE_EXEC_RESULT_STORE
+feature is enabled.
+"""
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from courseware import safe_exec_results
+
+
+class Command(BaseCommand):
+    """
+    Evicts the oldest results from the safe_exec result store.
+    """
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--max-size',
+                    action='store',
+                    type='int',
+                    default=None,
+                    help='Maximum total size of the stored results, in bytes, instead of the setting'),
+    )
+
+    def handle(self, *args, **options):
+        num_evicted = safe_exec_results.evict(options['max_size'])
+        self.stdout.write(u"Evicted {} stored results\n".format(num_evicted))
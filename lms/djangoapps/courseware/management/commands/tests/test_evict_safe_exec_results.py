@@ -0,0 +1,28 @@
+"""
+Tests of the evict_safe_exec_results management command.
+"""
+from django.core.management import call_command
+from django.test import TestCase
+
+from courseware.models import SafeExecResult
+
+
+class EvictSafeExecResultsTest(TestCase):
+    """
+    Tests of the evict_safe_exec_results management command.
+    """
+    def setUp(self):
+        super(EvictSafeExecResultsTest, self).setUp()
+        for index in range(4):
+            SafeExecResult.objects.create(key='safe_exec.{}'.format(index), result='[null, {}]', size=10)
+
+    def test_evicts_oldest_results(self):
+        call_command('evict_safe_exec_results', max_size=30)
+        self.assertEqual(
+            sorted(SafeExecResult.objects.values_list('key', flat=True)),
+            ['safe_exec.2', 'safe_exec.3'],
+        )
+
+    def test_under_max_size(self):
+        call_command('evict_safe_exec_results', max_size=40)
+        self.assertEqual(SafeExecResult.objects.count(), 4)
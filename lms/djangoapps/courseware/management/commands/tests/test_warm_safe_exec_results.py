@@ -0,0 +1,69 @@
+"""
+Tests of the warm_safe_exec_results management command.
+"""
+from django.core.management import call_command
+from django.core.management.base import CommandError
+import mock
+
+from capa.tests.response_xml_factory import CustomResponseXMLFactory, StringResponseXMLFactory
+from courseware.models import SafeExecResult, StudentModule
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+@mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_SAFE_EXEC_RESULT_STORE': True})
+class WarmSafeExecResultsTest(ModuleStoreTestCase):
+    """
+    Tests of the warm_safe_exec_results management command.
+    """
+    def setUp(self):
+        super(WarmSafeExecResultsTest, self).setUp()
+        self.course = CourseFactory.create()
+        self.scripted_xml = CustomResponseXMLFactory().build_xml(
+            script="answer = 17", cfn="check", expect="17",
+        )
+        self.users = [UserFactory.create() for __ in range(2)]
+        for user in self.users:
+            CourseEnrollmentFactory.create(user=user, course_id=self.course.id)
+
+    def _create_problem(self, data, rerandomize='never'):
+        """
+        Creates a problem with the given data and randomization in the course.
+        """
+        return ItemFactory.create(
+            parent_location=self.course.location,
+            category='problem',
+            data=data,
+            rerandomize=rerandomize,
+        )
+
+    def test_warm(self):
+        self._create_problem(self.scripted_xml)
+        self._create_problem(self.scripted_xml, rerandomize='per_student')
+        self._create_problem(StringResponseXMLFactory().build_xml(answer='Michigan'))
+        call_command('warm_safe_exec_results', unicode(self.course.id))
+        # One result for each learner and scripted problem, since the
+        # anonymous id of the learner is passed to the code.
+        self.assertEqual(SafeExecResult.objects.count(), 4)
+
+    def test_randomized_problem(self):
+        problem = self._create_problem(self.scripted_xml, rerandomize='always')
+        StudentModule.objects.create(
+            student=self.users[0],
+            course_id=self.course.id,
+            module_state_key=problem.location,
+            state='{"seed": 3}',
+        )
+        call_command('warm_safe_exec_results', unicode(self.course.id))
+        self.assertEqual(SafeExecResult.objects.count(), 1)
+        self.assertTrue(SafeExecResult.objects.get().key.startswith('safe_exec.3.'))
+
+    def test_no_course_id(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_safe_exec_results')
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_SAFE_EXEC_RESULT_STORE': False})
+    def test_disabled(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_safe_exec_results', unicode(self.course.id))
@@ -0,0 +1,129 @@
+"""
+A Django command that executes ahead of time the Python code of the problems
+of courses, for their enrolled learners, so that the results are found in the
+safe_exec result store when the learners view the problems.
+
+Only problems with a <script> and a customresponse or formularesponse are
+warmed. The code of a problem depends on the learner's seed and anonymous id:
+
+  * for problems that are never randomized or randomized per student, the
+    seed of each enrolled learner is known ahead of time, so all of them are
+    warmed, and
+  * for other problems, a new seed is drawn for learners who have not seen
+    the problem yet, so only learners with a saved seed are warmed.
+
+Requires the ENABLE_SAFE_EXEC_RESULT_STORE feature.
+"""
+from collections import defaultdict
+import logging
+from optparse import make_option
+import re
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
+from xblock.field_data import KvsFieldData
+
+from courseware import safe_exec_results
+from courseware.model_data import BulkFieldDataCache, DjangoKeyValueStore
+from courseware.models import StudentModule, chunks
+from courseware.module_render import get_module_for_descriptor_internal
+from student.models import CourseEnrollment
+from xmodule.capa_base_constants import RANDOMIZATION
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+SCRIPTED_RESPONSE_RE = re.compile(r'<(customresponse|formularesponse)\b')
+
+
+class Command(BaseCommand):
+    """
+    Executes the Python code of the problems of the given courses for their
+    enrolled learners, storing the results in the safe_exec result store.
+    """
+    args = "<course_id course_id ...>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    default=100,
+                    help='Number of learners whose data is loaded at once'),
+    )
+
+    def handle(self, *args, **options):
+        if not args:
+            raise CommandError("course_id not specified")
+        if not safe_exec_results.is_enabled():
+            raise CommandError("The ENABLE_SAFE_EXEC_RESULT_STORE feature is not enabled")
+
+        for course_id in args:
+            try:
+                course_key = CourseKey.from_string(course_id)
+            except InvalidKeyError:
+                raise CommandError("Invalid course_id: {}".format(course_id))
+
+            num_warmed, num_errors = warm_course(course_key, options['batch_size'])
+            self.stdout.write(u"{}: warmed {} problem views, {} errors\n".format(course_key, num_warmed, num_errors))
+
+        safe_exec_results.evict()
+
+
+def warm_course(course_key, batch_size):
+    """
+    Executes the Python code of the problems of the given course for its
+    enrolled learners, loading the data of batch_size learners at once.
+
+    Returns the number of problem views warmed and the number of errors.
+    """
+    course = modulestore().get_course(course_key, depth=0)
+    if course is None:
+        raise CommandError("Course not found: {}".format(course_key))
+
+    problems = [
+        problem for problem in modulestore().get_items(course_key, qualifiers={'category': 'problem'})
+        if '<script' in problem.data and SCRIPTED_RESPONSE_RE.search(problem.data)
+    ]
+    if not problems:
+        return 0, 0
+
+    # Learners who have seen the problems that draw new seeds.
+    randomized_locations = {
+        problem.location for problem in problems
+        if problem.rerandomize not in (RANDOMIZATION.NEVER, RANDOMIZATION.PER_STUDENT)
+    }
+    user_ids_by_location = defaultdict(set)
+    for user_id, module_state_key in StudentModule.objects.filter(
+            course_id=course_key,
+            module_state_key__in=randomized_locations,
+    ).values_list('student_id', 'module_state_key'):
+        user_ids_by_location[UsageKey.from_string(module_state_key).map_into_course(course_key)].add(user_id)
+
+    num_warmed = num_errors = 0
+    for users in chunks(CourseEnrollment.objects.users_enrolled_in(course_key), batch_size):
+        bulk_field_data_cache = BulkFieldDataCache(problems, course_key, users)
+        for user in users:
+            field_data_cache = bulk_field_data_cache.for_user(user)
+            for problem in problems:
+                if problem.location in randomized_locations and user.id not in user_ids_by_location[problem.location]:
+                    continue
+                try:
+                    # Binding the problem to the learner executes its code.
+                    get_module_for_descriptor_internal(
+                        user=user,
+                        descriptor=problem,
+                        student_data=KvsFieldData(DjangoKeyValueStore(field_data_cache)),
+                        course_id=course_key,
+                        track_function=lambda event_type, event: None,
+                        xqueue_callback_url_prefix='',
+                        request_token=None,
+                        course=course,
+                    )
+                except Exception:  # pylint: disable=broad-except
+                    log.exception(u'Error warming problem %s for user %s.', problem.location, user.id)
+                    num_errors += 1
+                else:
+                    num_warmed += 1
+    return num_warmed, num_errors
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+import xmodule_django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistentCourseGrade',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('user_id', models.IntegerField()),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255, db_index=True)),
+                ('percent_grade', models.FloatField()),
+                ('letter_grade', models.CharField(max_length=255, blank=True)),
+                ('grading_policy_hash', models.CharField(max_length=40)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PersistentSubsectionGrade',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('user_id', models.IntegerField()),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255)),
+                ('usage_key', xmodule_django.models.LocationKeyField(max_length=255)),
+                ('earned', models.FloatField()),
+                ('possible', models.FloatField()),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='persistentcoursegrade',
+            unique_together=set([('course_id', 'user_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='persistentsubsectiongrade',
+            unique_together=set([('course_id', 'user_id', 'usage_key')]),
+        ),
+    ]
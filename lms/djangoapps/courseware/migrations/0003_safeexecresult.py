@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0002_persistent_grades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SafeExecResult',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('key', models.CharField(unique=True, max_length=255)),
+                ('result', models.TextField()),
+                ('size', models.PositiveIntegerField()),
+            ],
+        ),
+    ]
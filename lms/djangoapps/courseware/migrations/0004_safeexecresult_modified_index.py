@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0003_safeexecresult'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='safeexecresult',
+            index_together=set([('modified', 'id')]),
+        ),
+    ]
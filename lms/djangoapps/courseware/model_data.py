@@ -86,6 +86,30 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _get_child_descriptors(descriptor, depth, descriptor_filter):
+    """
+    Return a list of all child descriptors down to the specified depth
+    that match the descriptor filter. Includes `descriptor`
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    if descriptor_filter(descriptor):
+        descriptors = [descriptor]
+    else:
+        descriptors = []
+
+    if depth is None or depth > 0:
+        new_depth = depth - 1 if depth is not None else depth
+
+        for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+            descriptors.extend(_get_child_descriptors(child, new_depth, descriptor_filter))
+
+    return descriptors
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -176,7 +200,14 @@ class DjangoOrmFieldCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        for field_object in self._read_objects(fields, xblocks, aside_types):
+        self.cache_field_objects(self._read_objects(fields, xblocks, aside_types))
+
+    def cache_field_objects(self, field_objects):
+        """
+        Add the supplied django model objects, which were read from the
+        underlying datastore, to this cache.
+        """
+        for field_object in field_objects:
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
@@ -365,11 +396,17 @@ class UserStateCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        block_field_state = self._client.get_many(
+        self.cache_user_states(self._client.get_many(
             self.user.username,
             _all_usage_keys(xblocks, aside_types),
-        )
-        for user_state in block_field_state:
+        ))
+
+    def cache_user_states(self, user_states):
+        """
+        Add the supplied :class:`XBlockUserState`s of this cache's user to
+        this cache.
+        """
+        for user_state in user_states:
             self._cache[user_state.block_key] = user_state.state
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
@@ -751,31 +788,8 @@ class FieldDataCache(object):
                 should be cached
         """
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+            descriptors = _get_child_descriptors(descriptor, depth, descriptor_filter)
 
         self.add_descriptors_to_cache(descriptors)
 
@@ -797,7 +811,8 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
-    def _fields_to_cache(self, descriptors):
+    @staticmethod
+    def _fields_to_cache(descriptors):
         """
         Returns a map of scopes to fields in that scope that should be cached
         """
@@ -930,6 +945,116 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+class BulkFieldDataCache(object):
+    """
+    A cache of django model objects needed to supply the data for a set of
+    modules to a number of users at once.
+
+    The data of all the users is loaded with a few queries, and
+    :meth:`for_user` then hands out a FieldDataCache for each user, which can
+    be used with a :class:`DjangoKeyValueStore` as usual without querying the
+    database again for the cached modules. Scope.user_state_summary data is
+    shared by the FieldDataCaches of all users.
+    """
+    def __init__(self, descriptors, course_id, users, asides=None):
+        """
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        """
+        assert isinstance(course_id, CourseKey)
+        self.course_id = course_id
+        self.asides = [] if asides is None else asides
+
+        self.descriptors = descriptors = list(descriptors)
+        self.users = [user for user in users if user.is_authenticated()]
+        self.scorable_locations = set(desc.location for desc in descriptors if desc.has_score)
+
+        user_ids = [user.id for user in self.users]
+        user_ids_by_username = {user.username: user.id for user in self.users}
+        self._user_states = defaultdict(list)
+        self._preferences = defaultdict(list)
+        self._user_infos = defaultdict(list)
+        self._user_state_summary_cache = UserStateSummaryCache(self.course_id)
+
+        fields_to_cache = FieldDataCache._fields_to_cache(descriptors)  # pylint: disable=protected-access
+        if self.users and Scope.user_state in fields_to_cache:
+            for user_state in DjangoXBlockUserStateClient().get_many_for_users(
+                    self.users, _all_usage_keys(descriptors, self.asides)
+            ):
+                self._user_states[user_ids_by_username[user_state.username]].append(user_state)
+
+        if Scope.user_state_summary in fields_to_cache:
+            self._user_state_summary_cache.cache_fields(
+                fields_to_cache[Scope.user_state_summary], descriptors, self.asides
+            )
+
+        if self.users and Scope.preferences in fields_to_cache:
+            for field_object in XModuleStudentPrefsField.objects.chunked_filter(
+                    'module_type__in',
+                    _all_block_types(descriptors, self.asides),
+                    student_id__in=user_ids,
+                    field_name__in=set(field.name for field in fields_to_cache[Scope.preferences]),
+            ):
+                self._preferences[field_object.student_id].append(field_object)
+
+        if self.users and Scope.user_info in fields_to_cache:
+            for field_object in XModuleStudentInfoField.objects.filter(
+                    student_id__in=user_ids,
+                    field_name__in=set(field.name for field in fields_to_cache[Scope.user_info]),
+            ):
+                self._user_infos[field_object.student_id].append(field_object)
+
+        self._scores_clients = ScoresClient.create_for_users(self.course_id, user_ids, self.scorable_locations)
+
+    @classmethod
+    def cache_for_descriptor_descendents(cls, course_id, users, descriptors, depth=None,
+                                         descriptor_filter=lambda descriptor: True, asides=None):
+        """
+        course_id: the course in the context of which we want StudentModules.
+        users: the django users for whom to load modules.
+        descriptors: A list of XModuleDescriptors
+        depth is the number of levels of descendant modules to load StudentModules for, in addition to
+            the supplied descriptors. If depth is None, load all descendant StudentModules
+        descriptor_filter is a function that accepts a descriptor and return whether the field data
+            should be cached
+        """
+        all_descriptors = []
+        for descriptor in descriptors:
+            with modulestore().bulk_operations(descriptor.location.course_key):
+                all_descriptors.extend(_get_child_descriptors(descriptor, depth, descriptor_filter))
+        return cls(all_descriptors, course_id, users, asides=asides)
+
+    def for_user(self, user):
+        """
+        Return a FieldDataCache for the given user, populated with the data
+        loaded for them by this cache. If the user isn't one of the users of
+        this cache, their data is loaded from the database.
+        """
+        if user.id not in self._scores_clients:
+            return FieldDataCache(self.descriptors, self.course_id, user, asides=self.asides)
+
+        field_data_cache = FieldDataCache([], self.course_id, user, asides=self.asides)
+        field_data_cache.scorable_locations.update(self.scorable_locations)
+        field_data_cache.cache[Scope.user_state].cache_user_states(self._user_states[user.id])
+        field_data_cache.cache[Scope.preferences].cache_field_objects(self._preferences[user.id])
+        field_data_cache.cache[Scope.user_info].cache_field_objects(self._user_infos[user.id])
+        field_data_cache.cache[Scope.user_state_summary] = self._user_state_summary_cache
+        return field_data_cache
+
+    def scores_client_for_user(self, user):
+        """
+        Return a ScoresClient for the given user, with pre-fetched data for
+        the scorable locations of this cache.
+        """
+        scores_client = self._scores_clients.get(user.id)
+        if scores_client is None:
+            scores_client = ScoresClient.create_for_locations(self.course_id, user.id, self.scorable_locations)
+        return scores_client
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
@@ -949,6 +1074,10 @@ class ScoresClient(object):
         """Return True if we have a score for this location."""
         return location in self._locations_to_scores
 
+    def __iter__(self):
+        """Iterate over the locations we have a score for."""
+        return iter(self._locations_to_scores)
+
     def fetch_scores(self, locations):
         """Grab score information."""
         scores_qset = StudentModule.objects.filter(
@@ -981,6 +1110,13 @@ class ScoresClient(object):
             )
         return self._locations_to_scores.get(location.replace(version=None, branch=None))
 
+    def set_score(self, location, correct, total):
+        """
+        Sets the score for a given location, overriding the fetched one, e.g.
+        for a score that is not committed to the database yet.
+        """
+        self._locations_to_scores[location.replace(version=None, branch=None)] = self.Score(correct, total)
+
     @classmethod
     def create_for_locations(cls, course_id, user_id, scorable_locations):
         """Create a ScoresClient with pre-fetched data for the given locations."""
@@ -988,6 +1124,30 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient for each of the given users, with pre-fetched
+        data for the given locations, using a single query.
+
+        Returns a dict mapping user ids to ScoresClients.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=clients.keys(),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade'
+        ):
+            clients[user_id]._locations_to_scores[  # pylint: disable=protected-access
+                UsageKey.from_string(location).map_into_course(course_id)
+            ] = cls.Score(correct, total)
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
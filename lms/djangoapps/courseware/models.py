@@ -343,6 +343,79 @@ class OfflineComputedGradeLog(models.Model):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    Stored grade of a user in a graded subsection of a course, that is the
+    score of the subsection that is passed to the course grader.
+
+    Every graded subsection that was visible to the user is stored,
+    including those worth nothing to them, with a possible score of 0, which
+    are not passed to the course grader.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('course_id', 'user_id', 'usage_key'),)
+
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(max_length=255, blank=False)
+    usage_key = LocationKeyField(max_length=255, blank=False)
+
+    earned = models.FloatField(blank=False)
+    possible = models.FloatField(blank=False)
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} ({}) = {}/{}".format(
+            self.user_id, self.usage_key, self.course_id, self.earned, self.possible
+        )
+
+
+class PersistentCourseGrade(TimeStampedModel):
+    """
+    Stored grade of a user in a course, computed from the user's
+    PersistentSubsectionGrades.
+
+    grading_policy_hash identifies the grading policy and the graded
+    content the grade was computed with, so that grades computed with an
+    outdated policy or content are recomputed.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('course_id', 'user_id'),)
+
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(max_length=255, blank=False, db_index=True)
+
+    percent_grade = models.FloatField(blank=False)
+    letter_grade = models.CharField(max_length=255, blank=True)
+    grading_policy_hash = models.CharField(max_length=40, blank=False)
+
+    def __unicode__(self):
+        return u"[PersistentCourseGrade] {}: {} = {} ({})".format(
+            self.user_id, self.course_id, self.percent_grade, self.letter_grade
+        )
+
+
+class SafeExecResult(TimeStampedModel):
+    """
+    Stored result of executing the Python code of a capa problem, as cached
+    by capa.safe_exec: a JSON list of the exception message, if any, and the
+    resulting globals.
+
+    See courseware.safe_exec_results for how results are stored and evicted.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        # For evicting the oldest results first
+        index_together = (('modified', 'id'),)
+
+    key = models.CharField(max_length=255, unique=True)
+    result = models.TextField()
+    size = models.PositiveIntegerField()
+
+    def __unicode__(self):
+        return u"[SafeExecResult] {}: {} bytes".format(self.key, self.size)
+
+
 class StudentFieldOverride(TimeStampedModel):
     """
     Holds the value of a specific field overriden for a student.  This is used
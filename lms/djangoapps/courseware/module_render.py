@@ -32,6 +32,7 @@ from xblock.exceptions import NoSuchHandlerError, NoSuchViewError
 from xblock.reference.plugins import FSService
 
 import static_replace
+from course_blocks.api import get_course_blocks
 from openedx.core.lib.gating import api as gating_api
 from courseware.access import has_access, get_user_role
 from courseware.entrance_exams import (
@@ -42,11 +43,13 @@ from courseware.entrance_exams import (
 from courseware.masquerade import (
     MasqueradingKeyValueStore,
     filter_displayed_blocks,
+    get_course_masquerade,
     is_masquerading_as_specific_student,
     setup_masquerade,
 )
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache, set_score
 from courseware.models import SCORE_CHANGED
+from courseware import safe_exec_results
 from edxmako.shortcuts import render_to_string
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
@@ -59,6 +62,7 @@ from openedx.core.lib.xblock_utils import (
     replace_course_urls,
     replace_jump_to_id_urls,
     replace_static_urls,
+    replace_urls,
     add_staff_markup,
     wrap_xblock,
     request_token as xblock_request_token,
@@ -78,6 +82,7 @@ from xmodule.lti_module import LTIModule
 from xmodule.mixin import wrap_with_license
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.block_metadata_utils import display_name_with_default_escaped
 from xmodule.x_module import XModuleDescriptor
 from .field_overrides import OverrideFieldData
 
@@ -148,17 +153,31 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
     None if this is not the case.
 
     field_data_cache must include data from the course module and 2 levels of its descendants
+
+    When the ENABLE_TOC_FROM_COURSE_BLOCKS feature is enabled, the chapters
+    and sections are read from the course's collected block structure,
+    transformed for the user, instead of being bound to the user. The course
+    module is still bound when the user is masquerading, or when field
+    override providers are enabled for the course, as the course block
+    transformers take neither masquerading nor overrides, such as individual
+    due dates and CCX, into account.
     '''
 
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(
-            user, request, course, field_data_cache, course.id, course=course
-        )
-        if course_module is None:
-            return None, None, None
+        if _use_course_blocks_for_toc(user, course):
+            course_blocks = get_course_blocks(user, course.location)
+            if course.location not in course_blocks:
+                return None, None, None
+            chapters = _TOCBlock(course_blocks, course.location).get_display_items()
+        else:
+            course_module = get_module_for_descriptor(
+                user, request, course, field_data_cache, course.id, course=course
+            )
+            if course_module is None:
+                return None, None, None
+            chapters = course_module.get_display_items()
 
         toc_chapters = list()
-        chapters = course_module.get_display_items()
 
         # Check for content which needs to be completed
         # before the rest of the content is made available
@@ -236,6 +255,96 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         }
 
 
+def _use_course_blocks_for_toc(user, course):
+    """
+    Returns whether the table of contents of the given course is built from
+    its collected block structure for the given user.
+    """
+    return (
+        settings.FEATURES.get('ENABLE_TOC_FROM_COURSE_BLOCKS', False) and
+        get_course_masquerade(user, course.id) is None and
+        not OverrideFieldData.overrides_enabled_for(course)
+    )
+
+
+class _TOCBlock(object):
+    """
+    Exposes the collected fields of a block of a transformed block
+    structure with the attributes of the XModule that toc_for_course reads,
+    so that the table of contents is built the same way from either.
+
+    The collected fields are requested by the TableOfContentsTransformer.
+    """
+    def __init__(self, block_structure, usage_key):
+        self.block_structure = block_structure
+        self.location = usage_key
+
+    @property
+    def url_name(self):
+        """
+        The url_name of the block.
+        """
+        return self.location.name
+
+    @property
+    def display_name(self):
+        """
+        The display_name of the block.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'display_name')
+
+    @property
+    def display_name_with_default_escaped(self):
+        """
+        The escaped display name of the block, defaulting to its url_name.
+        """
+        return display_name_with_default_escaped(self)
+
+    @property
+    def hide_from_toc(self):
+        """
+        Whether the block is hidden from the table of contents.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'hide_from_toc', False)
+
+    @property
+    def format(self):
+        """
+        The format of the block.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'format')
+
+    @property
+    def due(self):
+        """
+        The due date of the block.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'due')
+
+    @property
+    def graded(self):
+        """
+        Whether the block is graded.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'graded', False)
+
+    @property
+    def is_time_limited(self):
+        """
+        Whether the block is a timed exam.
+        """
+        return self.block_structure.get_xblock_field(self.location, 'is_time_limited', False)
+
+    def get_display_items(self):
+        """
+        Returns the children of the block that are accessible to the user.
+        """
+        return [
+            _TOCBlock(self.block_structure, child_key)
+            for child_key in self.block_structure.get_children(self.location)
+        ]
+
+
 def _add_timed_exam_info(user, course, section, section_context):
     """
     Add in rendering context if exam is a timed exam (which includes proctored)
@@ -649,28 +758,42 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
-    ))
+    jump_to_id_base_url = reverse(
+        'jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}
+    )
+
+    if settings.FEATURES.get('ENABLE_SINGLE_PASS_URL_REWRITING'):
+        # Rewrite the /static, /course and /jump_to_id urls described below in a single pass
+        block_wrappers.append(partial(
+            replace_urls,
+            getattr(descriptor, 'data_dir', None),
+            course_id=course_id,
+            static_asset_path=static_asset_path or descriptor.static_asset_path,
+            jump_to_id_base_url=jump_to_id_base_url,
+        ))
+    else:
+        # Rewrite urls beginning in /static to point to course-specific content
+        block_wrappers.append(partial(
+            replace_static_urls,
+            getattr(descriptor, 'data_dir', None),
+            course_id=course_id,
+            static_asset_path=static_asset_path or descriptor.static_asset_path
+        ))
+
+        # Allow URLs of the form '/course/' refer to the root of multicourse directory
+        #   hierarchy of this course
+        block_wrappers.append(partial(replace_course_urls, course_id))
+
+        # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
+        # is an improvement over the /course/... format for studio authored courses,
+        # because it is agnostic to course-hierarchy.
+        block_wrappers.append(partial(
+            replace_jump_to_id_urls,
+            course_id,
+            jump_to_id_base_url,
+        ))
 
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
         if is_masquerading_as_specific_student(user, course_id):
@@ -742,7 +865,7 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
         publish=publish,
         anonymous_student_id=anonymous_student_id,
         course_id=course_id,
-        cache=cache,
+        cache=safe_exec_results.SafeExecResultStore(cache) if safe_exec_results.is_enabled() else cache,
         can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
         get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
@@ -0,0 +1,155 @@
+"""
+Storage of the grades of users in courses.
+
+The grade of a user in each graded subsection of a course, that is the score
+passed to the course grader, is stored along with the resulting course
+grade. The stored course grade is stamped with a hash of the grading policy
+and of the graded content it was computed with, so that it is recomputed
+when either changes.
+
+See courseware.grades for how the stored grades are computed and read.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+
+from .models import PersistentCourseGrade, PersistentSubsectionGrade
+
+
+log = logging.getLogger("edx.courseware")
+
+
+def is_enabled():
+    """
+    Returns whether grades are stored and read from storage.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False)
+
+
+def grading_policy_hash(course, course_structure=None):
+    """
+    Returns the hash of the grading policy of the given course and of its
+    graded content: the graded subsections and the blocks that can be scored
+    within them, with their weights and maximum scores, as collected in the
+    given block structure of the course, which defaults to the cached one.
+    """
+    # Imported here to avoid a circular dependency with courseware.grades.
+    from .grades import grading_context
+    from .transformers.grades import GradesTransformer
+
+    if course_structure is None:
+        course_structure = get_course_in_cache(course.id)
+    graded_content = [
+        [
+            section_format,
+            [
+                [unicode(section_info['section_block'].location)] + [
+                    [
+                        unicode(block.location),
+                        getattr(block, 'graded', False),
+                        getattr(block, 'weight', None),
+                        block.transformer_data[GradesTransformer].max_score,
+                    ]
+                    for block in section_info['scored_descendants']
+                ]
+                for section_info in sections
+            ],
+        ]
+        for section_format, sections in sorted(grading_context(course_structure)['all_graded_sections'].iteritems())
+    ]
+    return hashlib.sha1(json.dumps([course.grading_policy, graded_content], sort_keys=True)).hexdigest()
+
+
+def get_course_grade(user_id, course, course_structure=None):
+    """
+    Returns the stored PersistentCourseGrade of the given user in the given
+    course, or None if not found or computed with an outdated grading policy
+    or graded content. See grading_policy_hash.
+    """
+    try:
+        course_grade = PersistentCourseGrade.objects.get(user_id=user_id, course_id=course.id)
+    except PersistentCourseGrade.DoesNotExist:
+        return None
+    if course_grade.grading_policy_hash != grading_policy_hash(course, course_structure):
+        return None
+    return course_grade
+
+
+def get_subsection_grades(user_id, course_key):
+    """
+    Returns a dict mapping the usage keys of the graded subsections of the
+    given course to the stored (earned, possible) scores of the given user.
+    """
+    return {
+        subsection_grade.usage_key.map_into_course(course_key): (subsection_grade.earned, subsection_grade.possible)
+        for subsection_grade in PersistentSubsectionGrade.objects.filter(user_id=user_id, course_id=course_key)
+    }
+
+
+def save_subsection_grades(user_id, course_key, section_scores, replace_all=False):
+    """
+    Stores the given grades of the given user in subsections of the given
+    course.
+
+    Arguments:
+        section_scores: a list of Scores whose module_id is the usage key of
+            their subsection. Scores with a possible score that is not
+            positive are stored too, although they are not passed to the
+            grader, so that every graded subsection visible to the user has
+            a stored grade.
+        replace_all: if True, the previously stored grades of the user in
+            the course are all replaced.
+    """
+    with transaction.atomic():
+        grades = PersistentSubsectionGrade.objects.filter(user_id=user_id, course_id=course_key)
+        if replace_all:
+            grades.delete()
+        else:
+            grades.filter(usage_key__in=[score.module_id for score in section_scores]).delete()
+        PersistentSubsectionGrade.objects.bulk_create([
+            PersistentSubsectionGrade(
+                user_id=user_id,
+                course_id=course_key,
+                usage_key=score.module_id,
+                earned=score.earned,
+                possible=score.possible,
+            )
+            for score in section_scores
+        ])
+
+
+def save_course_grade(user_id, course, grade_summary, course_structure=None):
+    """
+    Stores the course grade of the given user in the given course, from the
+    given grade summary, stamped with the hash of the grading policy and
+    graded content of the given block structure of the course. See
+    grading_policy_hash.
+    """
+    PersistentCourseGrade.objects.update_or_create(
+        user_id=user_id,
+        course_id=course.id,
+        defaults={
+            'percent_grade': grade_summary['percent'],
+            'letter_grade': grade_summary['grade'] or '',
+            'grading_policy_hash': grading_policy_hash(course, course_structure),
+        },
+    )
+
+
+def get_outdated_user_ids(course):
+    """
+    Returns the ids of the users whose stored grade in the given course was
+    computed with an outdated grading policy or graded content.
+    """
+    return list(
+        PersistentCourseGrade.objects.filter(
+            course_id=course.id,
+        ).exclude(
+            grading_policy_hash=grading_policy_hash(course),
+        ).values_list('user_id', flat=True)
+    )
@@ -0,0 +1,118 @@
+"""
+Durable store of the results of executing the Python code of capa problems.
+
+capa.safe_exec caches the result of each execution, keyed on the code, its
+globals and the random seed, in the cache it is given. By default that is the
+Django cache, whose entries are short-lived and lost on a cache flush, so
+learners viewing a problem then pay for a sandboxed execution again.
+
+SafeExecResultStore reads through the Django cache to the SafeExecResult
+table, so results survive cache flushes and deploys, and can be computed
+ahead of time with the warm_safe_exec_results management command. The table
+is kept under settings.SAFE_EXEC_RESULT_STORE_MAX_SIZE bytes by evicting the
+oldest results first, which the evict_safe_exec_results management command
+does and should be run periodically.
+"""
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+import dogstats_wrapper as dog_stats_api
+
+from .models import SafeExecResult
+
+
+log = logging.getLogger("edx.courseware")
+
+METRIC_NAME = 'capa.safe_exec.result_store'
+
+# When evicting, results are deleted until the size of the table is this
+# fraction of its maximum size, so that evictions are not run on every run of
+# the command.
+EVICTION_TARGET = 0.9
+
+
+def is_enabled():
+    """
+    Returns whether the results of executing the code of capa problems are
+    stored in the database.
+    """
+    return settings.FEATURES.get('ENABLE_SAFE_EXEC_RESULT_STORE', False)
+
+
+class SafeExecResultStore(object):
+    """
+    Implements the cache interface expected by capa.safe_exec, reading
+    through the given cache to the SafeExecResult table.
+    """
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key):
+        """
+        Returns the result stored for the given key, or None if not found.
+        """
+        start_time = time.time()
+        result = self.cache.get(key)
+        if result is not None:
+            source = 'cache'
+        else:
+            try:
+                result = json.loads(SafeExecResult.objects.get(key=key).result)
+            except SafeExecResult.DoesNotExist:
+                source = 'miss'
+            else:
+                source = 'store'
+                self.cache.set(key, result)
+        dog_stats_api.increment(METRIC_NAME, tags=[u'result:{}'.format(source)])
+        dog_stats_api.histogram(
+            u'{}.get_time'.format(METRIC_NAME), time.time() - start_time, tags=[u'result:{}'.format(source)]
+        )
+        return result
+
+    def set(self, key, result):
+        """
+        Stores the given JSON-serializable result for the given key.
+        """
+        self.cache.set(key, result)
+        serialized_result = json.dumps(result)
+        try:
+            with transaction.atomic():
+                SafeExecResult.objects.update_or_create(
+                    key=key,
+                    defaults={'result': serialized_result, 'size': len(serialized_result)},
+                )
+        except IntegrityError:
+            # Another process stored the same result concurrently.
+            pass
+        dog_stats_api.histogram(u'{}.result_size'.format(METRIC_NAME), len(serialized_result))
+
+
+def evict(max_size=None):
+    """
+    Deletes the oldest stored results until their total size is under
+    EVICTION_TARGET of max_size, if it is over max_size.
+
+    Returns the number of deleted results.
+    """
+    if max_size is None:
+        max_size = settings.SAFE_EXEC_RESULT_STORE_MAX_SIZE
+    total_size = SafeExecResult.objects.aggregate(total_size=Sum('size'))['total_size'] or 0
+    if total_size <= max_size:
+        return 0
+
+    size_to_free = total_size - int(max_size * EVICTION_TARGET)
+    ids_to_delete = []
+    for result_id, size in SafeExecResult.objects.order_by('modified', 'id').values_list('id', 'size').iterator():
+        if size_to_free <= 0:
+            break
+        ids_to_delete.append(result_id)
+        size_to_free -= size
+
+    SafeExecResult.objects.filter(id__in=ids_to_delete).delete()
+    dog_stats_api.increment(u'{}.evicted'.format(METRIC_NAME), len(ids_to_delete))
+    log.info(u'Evicted %d stored safe_exec results.', len(ids_to_delete))
+    return len(ids_to_delete)
@@ -0,0 +1,103 @@
+"""
+Signal handlers for keeping the stored grades of students and the memoized
+access checks up to date.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from student.models import CourseAccessRole, CourseEnrollment
+from xmodule.modulestore.django import SignalHandler
+
+from . import access_cache, persistent_grades
+from .models import SCORE_CHANGED
+from .tasks import recompute_outdated_grades, update_stored_grades
+
+
+@receiver(SCORE_CHANGED)
+def _listen_for_score_change(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Updates the stored grades of a user when their score for a block
+    changes. See the definition of courseware.models.SCORE_CHANGED.
+
+    The signal is sent within the transaction that changes the score, which
+    may not be committed when the task runs, so the new score is passed to
+    the task.
+    """
+    if not persistent_grades.is_enabled():
+        return
+    user_id = kwargs.get('user_id', None)
+    course_id = kwargs.get('course_id', None)
+    usage_id = kwargs.get('usage_id', None)
+    if None not in (user_id, course_id, usage_id):
+        update_stored_grades.delay(
+            user_id,
+            course_id,
+            usage_id,
+            kwargs.get('points_earned', None),
+            kwargs.get('points_possible', None),
+        )
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Recomputes the stored grades of a course when it is published with a
+    changed grading policy or graded content.
+    """
+    if persistent_grades.is_enabled():
+        recompute_outdated_grades.delay(unicode(course_key))
+
+
+@receiver(SignalHandler.course_published)
+@receiver(SignalHandler.course_deleted)
+def _invalidate_access_checks_for_course(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the memoized access checks of all users in a course when
+    the course is published or deleted.
+    """
+    if access_cache.is_enabled():
+        access_cache.invalidate_for_course(course_key)
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def _invalidate_access_checks_for_role_or_enrollment(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the memoized access checks of a user when their roles or
+    enrollments change.
+    """
+    if access_cache.is_enabled():
+        access_cache.invalidate_for_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def _invalidate_access_checks_for_user(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the memoized access checks of a user when the user changes,
+    as their global staff status may have changed.
+    """
+    if access_cache.is_enabled():
+        access_cache.invalidate_for_user(instance.id)
+
+
+@receiver(m2m_changed, sender=CourseUserGroup.users.through)
+def _invalidate_access_checks_for_group_membership(sender, instance, action, reverse, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the memoized access checks of users when their membership
+    in any course group, including cohorts, changes.
+    """
+    if not access_cache.is_enabled() or action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        # The instance is a user.
+        access_cache.invalidate_for_user(instance.id)
+    else:
+        # The instance is a group and pk_set holds user ids.
+        user_ids = instance.users.values_list('id', flat=True) if action == 'pre_clear' else pk_set
+        for user_id in user_ids:
+            access_cache.invalidate_for_user(user_id)
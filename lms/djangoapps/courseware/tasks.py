@@ -0,0 +1,36 @@
+"""
+Asynchronous tasks related to the stored grades of students.
+"""
+from celery.task import task
+from django.contrib.auth.models import User
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from courseware import grades
+from courseware.courses import get_course_by_id
+
+
+@task
+def update_stored_grades(user_id, course_id, usage_id, points_earned=None, points_possible=None):
+    """
+    Updates the stored grades of the specified user after their score for the
+    specified block changed to the specified one, if known.
+    """
+    course_key = CourseKey.from_string(course_id)
+    score = None
+    if points_earned is not None and points_possible is not None:
+        score = (points_earned, points_possible)
+    grades.update_stored_grades(
+        User.objects.get(id=user_id),
+        get_course_by_id(course_key),
+        UsageKey.from_string(usage_id).map_into_course(course_key),
+        score,
+    )
+
+
+@task
+def recompute_outdated_grades(course_id):
+    """
+    Recomputes the stored grades of the specified course that were computed
+    with an outdated grading policy or graded content.
+    """
+    grades.recompute_outdated_grades(get_course_by_id(CourseKey.from_string(course_id)))
@@ -0,0 +1,102 @@
+"""
+Tests of the memoization of access checks.
+"""
+from django.core.cache.backends.locmem import LocMemCache
+import mock
+
+from courseware import access_cache
+from courseware.access import has_access
+from courseware.masquerade import CourseMasquerade
+from courseware.tests.factories import UserFactory
+from request_cache.middleware import RequestCache
+from student.roles import CourseStaffRole
+from student.tests.factories import CourseEnrollmentFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+@mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_ACCESS_CHECK_CACHE': True})
+class AccessCacheTest(SharedModuleStoreTestCase):
+    """
+    Tests of the memoization of has_access.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(AccessCacheTest, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.chapter = ItemFactory.create(parent=cls.course, category='chapter', visible_to_staff_only=True)
+
+    def setUp(self):
+        super(AccessCacheTest, self).setUp()
+        self.user = UserFactory.create()
+        cache = LocMemCache('access_cache', {})
+        self.addCleanup(cache.clear)
+        patcher = mock.patch('courseware.access_cache.cache', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def assert_stats(self, request_hits=0, cache_hits=0, computed=0):
+        """
+        Asserts the access check counters of the current request.
+        """
+        self.assertEqual(
+            access_cache.get_request_stats(),
+            {'request_hits': request_hits, 'cache_hits': cache_hits, 'computed': computed},
+        )
+
+    def test_memoized_in_request(self):
+        self.assertFalse(has_access(self.user, 'load', self.chapter, self.course.id))
+        with mock.patch('courseware.access._has_access_descriptor') as mock_has_access:
+            self.assertFalse(has_access(self.user, 'load', self.chapter, self.course.id))
+        self.assertFalse(mock_has_access.called)
+        self.assert_stats(request_hits=1, computed=1)
+
+    def test_memoized_across_requests(self):
+        self.assertFalse(has_access(self.user, 'staff', self.course))
+        RequestCache.clear_request_cache()
+        self.assertFalse(has_access(self.user, 'staff', self.course))
+        self.assert_stats(cache_hits=1)
+
+    def test_generations_read_once_per_request(self):
+        has_access(self.user, 'load', self.chapter, self.course.id)
+        RequestCache.clear_request_cache()
+        with mock.patch.object(access_cache.cache, 'get_many', wraps=access_cache.cache.get_many) as mock_get_many:
+            has_access(self.user, 'staff', self.course)
+            has_access(self.user, 'load', self.chapter, self.course.id)
+        self.assertEqual(mock_get_many.call_count, 1)
+        self.assert_stats(cache_hits=1, computed=1)
+
+    def test_request_scoped_action(self):
+        has_access(self.user, 'view_courseware_with_prerequisites', self.course)
+        RequestCache.clear_request_cache()
+        has_access(self.user, 'view_courseware_with_prerequisites', self.course)
+        self.assert_stats(computed=1)
+
+    def test_role_change(self):
+        self.assertFalse(has_access(self.user, 'load', self.chapter, self.course.id))
+        CourseStaffRole(self.course.id).add_users(self.user)
+        self.assertTrue(has_access(self.user, 'load', self.chapter, self.course.id))
+        RequestCache.clear_request_cache()
+        self.assertTrue(has_access(self.user, 'load', self.chapter, self.course.id))
+
+    def test_enrollment_change(self):
+        has_access(self.user, 'staff', self.course)
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id)
+        RequestCache.clear_request_cache()
+        has_access(self.user, 'staff', self.course)
+        self.assert_stats(computed=1)
+
+    def test_masquerade(self):
+        staff = UserFactory.create(is_staff=True)
+        self.assertTrue(has_access(staff, 'staff', self.course))
+        staff.masquerade_settings = {self.course.id: CourseMasquerade(self.course.id, role='student')}
+        self.assertFalse(has_access(staff, 'staff', self.course))
+        self.assert_stats(computed=2)
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_ACCESS_CHECK_CACHE': False})
+    def test_disabled(self):
+        has_access(self.user, 'staff', self.course)
+        has_access(self.user, 'staff', self.course)
+        self.assert_stats()
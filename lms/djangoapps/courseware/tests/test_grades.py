@@ -13,18 +13,21 @@ from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
 from courseware.grades import (
     grade,
     iterate_grades_for,
+    CourseGradingEngine,
     ProgressSummary,
     get_module_score
 )
 from courseware.module_render import get_module
 from courseware.model_data import FieldDataCache, set_score
+from courseware.transformers.grades import GradesTransformer
 from courseware.tests.helpers import (
     LoginEnrollmentTestCase,
     get_request_for_user
 )
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from openedx.core.djangoapps.content.block_structure.api import update_course_in_cache
 from student.tests.factories import UserFactory
-from student.models import CourseEnrollment
+from student.models import CourseEnrollment, anonymous_id_for_user
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
@@ -468,6 +471,150 @@ class TestGetModuleScore(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
         self.assertEqual(score, 1.0)
 
 
+@attr('shard_1')
+class TestCourseGradingEngine(SharedModuleStoreTestCase):
+    """
+    Test that grading students in a batch matches grading them one by one.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestCourseGradingEngine, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        cls.problems = []
+        for section_index, section_format in enumerate(['Homework', 'Homework', 'Lab', 'Midterm Exam']):
+            sequential = ItemFactory.create(
+                parent=chapter,
+                category='sequential',
+                display_name="Test Sequential {}".format(section_index),
+                graded=True,
+                format=section_format,
+            )
+            vertical = ItemFactory.create(parent=sequential, category='vertical')
+            for problem_index in range(2):
+                cls.problems.append(ItemFactory.create(
+                    parent=vertical,
+                    category="problem",
+                    display_name="Test Problem {}.{}".format(section_index, problem_index),
+                    data=problem_xml,
+                    weight=problem_index + 1,
+                ))
+
+    def setUp(self):
+        super(TestCourseGradingEngine, self).setUp()
+        self.students = [UserFactory.create() for _ in range(3)]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+
+        # The first student hasn't answered anything.
+        set_score(self.students[1].id, self.problems[0].location, 1, 1)
+        set_score(self.students[1].id, self.problems[5].location, 0, 1)
+        for problem in self.problems:
+            set_score(self.students[2].id, problem.location, 1, 1)
+        set_score(self.students[2].id, self.problems[7].location, None, None)
+
+    def test_grade_students(self):
+        engine = CourseGradingEngine(self.course)
+        grade_summaries = engine.grade_students(self.students, keep_raw_scores=True)
+        self.assertEqual(len(grade_summaries), len(self.students))
+        for student, grade_summary in zip(self.students, grade_summaries):
+            expected = grade(student, self.course, keep_raw_scores=True)
+            self.assertEqual(grade_summary['percent'], expected['percent'])
+            self.assertEqual(grade_summary['grade'], expected['grade'])
+            self.assertEqual(grade_summary['section_breakdown'], expected['section_breakdown'])
+            self.assertEqual(grade_summary['grade_breakdown'], expected['grade_breakdown'])
+            self.assertEqual(
+                [tuple(score) for score in grade_summary['raw_scores']],
+                [tuple(score) for score in expected['raw_scores']],
+            )
+
+    def test_grade_students_without_breakdown(self):
+        engine = CourseGradingEngine(self.course)
+        grade_summaries = engine.grade_students(self.students, include_breakdown=False)
+        for student, grade_summary in zip(self.students, grade_summaries):
+            expected = grade(student, self.course)
+            self.assertNotIn('section_breakdown', grade_summary)
+            self.assertNotIn('grade_breakdown', grade_summary)
+            self.assertEqual(grade_summary['percent'], expected['percent'])
+            self.assertEqual(grade_summary['grade'], expected['grade'])
+
+    def test_grade_students_with_submissions_scores(self):
+        from submissions import api as sub_api
+        for student in self.students[:2]:
+            student_item = {
+                'student_id': anonymous_id_for_user(student, self.course.id),
+                'course_id': unicode(self.course.id),
+                'item_id': unicode(self.problems[2].location),
+                'item_type': 'problem',
+            }
+            submission = sub_api.create_submission(student_item, 'any answer')
+            sub_api.set_score(submission['uuid'], 1, 2)
+
+        engine = CourseGradingEngine(self.course)
+        grade_summaries = engine.grade_students(self.students, keep_raw_scores=True)
+        for student, grade_summary in zip(self.students, grade_summaries):
+            expected = grade(student, self.course, keep_raw_scores=True)
+            self.assertEqual(grade_summary['percent'], expected['percent'])
+            self.assertEqual(
+                [tuple(score) for score in grade_summary['raw_scores']],
+                [tuple(score) for score in expected['raw_scores']],
+            )
+
+    def test_grade_students_with_block_without_max_score(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category="chapter")
+        sequential = ItemFactory.create(parent=chapter, category='sequential', graded=True, format='Homework')
+        problems = [
+            ItemFactory.create(parent=sequential, category="problem", data=self.problems[0].data, weight=2)
+            for __ in range(2)
+        ]
+
+        def collect_max_score(block_structure, module):
+            """
+            Collects no max score for the second problem, as for an error module.
+            """
+            max_score = None if module.location == problems[1].location else module.max_score()
+            block_structure.set_transformer_block_field(module.location, GradesTransformer, 'max_score', max_score)
+
+        with patch.object(GradesTransformer, '_collect_max_score', side_effect=collect_max_score):
+            update_course_in_cache(course.id)
+
+        for student in self.students:
+            CourseEnrollment.enroll(student, course.id)
+        set_score(self.students[1].id, problems[0].location, 1, 1)
+
+        engine = CourseGradingEngine(course)
+        grade_summaries = engine.grade_students(self.students, keep_raw_scores=True)
+        for student, grade_summary in zip(self.students, grade_summaries):
+            expected = grade(student, course, keep_raw_scores=True)
+            self.assertEqual(grade_summary['percent'], expected['percent'])
+            self.assertEqual(
+                [tuple(score) for score in grade_summary['raw_scores']],
+                [tuple(score) for score in expected['raw_scores']],
+            )
+
+    def test_percents(self):
+        engine = CourseGradingEngine(self.course)
+        self.assertEqual(
+            list(engine.percents(self.students)),
+            [grade(student, self.course)['percent'] for student in self.students],
+        )
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_VECTORIZED_GRADING': True})
+    def test_iterate_grades_in_batches(self):
+        with patch('courseware.grades.GRADING_BATCH_SIZE', 2):
+            results = list(iterate_grades_for(self.course.id, self.students))
+        self.assertEqual([student for student, __, __ in results], self.students)
+        for student, gradeset, err_msg in results:
+            self.assertEqual(err_msg, "")
+            self.assertEqual(gradeset['percent'], grade(student, self.course)['percent'])
+
+
 def answer_problem(course, request, problem, score=1):
     """
     Records a correct answer for the given problem.
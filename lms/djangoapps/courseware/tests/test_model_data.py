@@ -6,7 +6,7 @@ from mock import Mock, patch
 from nose.plugins.attrib import attr
 from functools import partial
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import BulkFieldDataCache, DjangoKeyValueStore, FieldDataCache, InvalidScopeError
 from courseware.models import StudentModule, XModuleUserStateSummaryField
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
@@ -426,3 +426,43 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestBulkFieldDataCache(TestCase):
+    """Tests for BulkFieldDataCache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestBulkFieldDataCache, self).setUp()
+        self.users = [
+            StudentModuleFactory(state=json.dumps({'a_field': 'value_{}'.format(index)})).student
+            for index in range(3)
+        ]
+        self.user_without_state = UserFactory.create()
+        self.descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+        self.descriptor.has_score = False
+
+    def test_for_user(self):
+        # One query loads the user states of all users, and one their scores
+        with self.assertNumQueries(2):
+            bulk_field_data_cache = BulkFieldDataCache(
+                [self.descriptor], course_id, self.users + [self.user_without_state]
+            )
+
+        with self.assertNumQueries(0):
+            for index, user in enumerate(self.users):
+                kvs = DjangoKeyValueStore(bulk_field_data_cache.for_user(user))
+                self.assertEquals('value_{}'.format(index), kvs.get(DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')))
+
+            kvs = DjangoKeyValueStore(bulk_field_data_cache.for_user(self.user_without_state))
+            self.assertFalse(kvs.has(DjangoKeyValueStore.Key(
+                Scope.user_state, self.user_without_state.id, location('usage_id'), 'a_field'
+            )))
+
+    def test_for_unknown_user(self):
+        bulk_field_data_cache = BulkFieldDataCache([self.descriptor], course_id, self.users[:1])
+        user = self.users[1]
+        kvs = DjangoKeyValueStore(bulk_field_data_cache.for_user(user))
+        self.assertEquals('value_1', kvs.get(DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')))
@@ -31,9 +31,11 @@ from course_modes.models import CourseMode
 from courseware import module_render as render
 from courseware.courses import get_course_with_access, get_course_info_section
 from courseware.field_overrides import OverrideFieldData
+from courseware.masquerade import CourseMasquerade
 from courseware.model_data import FieldDataCache
 from courseware.module_render import hash_resource, get_module_for_descriptor
 from courseware.models import StudentModule
+from courseware.student_field_overrides import IndividualStudentOverrideProvider
 from courseware.tests.factories import StudentModuleFactory, UserFactory, GlobalStaffFactory
 from courseware.tests.tests import LoginEnrollmentTestCase
 from courseware.tests.test_submitting_problems import TestSubmittingProblems
@@ -41,6 +43,7 @@ from lms.djangoapps.lms_xblock.runtime import quote_slashes
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from openedx.core.lib.courses import course_image_url
 from openedx.core.lib.gating import api as gating_api
+from request_cache.middleware import RequestCache
 from student.models import anonymous_id_for_user
 from xmodule.modulestore.tests.django_utils import (
     ModuleStoreTestCase,
@@ -719,6 +722,96 @@ class TestTOC(ModuleStoreTestCase):
             self.assertEquals(actual['next_of_active_section']['url_name'], 'video_123456789012')
 
 
+@attr('shard_1')
+class TestTOCFromCourseBlocks(SharedModuleStoreTestCase):
+    """
+    Check the Table of Contents built from the course's collected block structure
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestTOCFromCourseBlocks, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.chapter = ItemFactory.create(parent=cls.course, category='chapter', display_name='Chapter')
+        cls.graded_seq = ItemFactory.create(
+            parent=cls.chapter, category='sequential', display_name='Graded <Sequential>',
+            metadata={'graded': True, 'format': 'Homework'},
+        )
+        cls.hidden_seq = ItemFactory.create(
+            parent=cls.chapter, category='sequential', display_name='Hidden', metadata={'hide_from_toc': True},
+        )
+        cls.staff_only_seq = ItemFactory.create(
+            parent=cls.chapter, category='sequential', display_name='Staff Only', visible_to_staff_only=True,
+        )
+        cls.open_seq = ItemFactory.create(parent=cls.chapter, category='sequential')
+        cls.hidden_chapter = ItemFactory.create(
+            parent=cls.course, category='chapter', display_name='Hidden Chapter', metadata={'hide_from_toc': True},
+        )
+
+    def setUp(self):
+        super(TestTOCFromCourseBlocks, self).setUp()
+        self.request = RequestFactory().get('/courses/{}/Chapter'.format(self.course.id))
+        self.request.user = UserFactory()
+        self.course = self.store.get_course(self.course.id, depth=2)
+        self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course.id, self.request.user, self.course, depth=2
+        )
+
+    def _toc_for_course(self, from_course_blocks):
+        """
+        Returns the table of contents of the course, with the section of
+        the graded sequential active.
+        """
+        with patch.dict(settings.FEATURES, {'ENABLE_TOC_FROM_COURSE_BLOCKS': from_course_blocks}):
+            return render.toc_for_course(
+                self.request.user,
+                self.request,
+                self.course,
+                self.chapter.location.name,
+                self.graded_seq.location.name,
+                self.field_data_cache,
+            )
+
+    def test_same_as_bound_course(self):
+        self.assertEqual(self._toc_for_course(True), self._toc_for_course(False))
+
+    def test_toc(self):
+        toc = self._toc_for_course(True)
+        self.assertEqual([chapter['url_name'] for chapter in toc['chapters']], [self.chapter.location.name])
+        sections = toc['chapters'][0]['sections']
+        self.assertEqual(
+            [section['url_name'] for section in sections],
+            [self.graded_seq.location.name, self.open_seq.location.name],
+        )
+        self.assertEqual(sections[0]['display_name'], 'Graded &lt;Sequential&gt;')
+        self.assertEqual(sections[0]['format'], 'Homework')
+        self.assertTrue(sections[0]['graded'])
+        self.assertTrue(sections[0]['active'])
+        self.assertEqual(toc['next_of_active_section']['url_name'], self.open_seq.location.name)
+
+    def test_course_is_not_bound(self):
+        with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+            self._toc_for_course(True)
+        self.assertFalse(mock_get_module.called)
+
+    def test_masquerading_binds_course(self):
+        self.request.user.masquerade_settings = {self.course.id: CourseMasquerade(self.course.id)}
+        with patch(
+            'courseware.module_render.get_module_for_descriptor', wraps=get_module_for_descriptor,
+        ) as mock_get_module:
+            self._toc_for_course(True)
+        self.assertTrue(mock_get_module.called)
+
+    def test_field_overrides_bind_course(self):
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+        with patch.object(OverrideFieldData, 'provider_classes', (IndividualStudentOverrideProvider,)):
+            with patch(
+                'courseware.module_render.get_module_for_descriptor', wraps=get_module_for_descriptor,
+            ) as mock_get_module:
+                self._toc_for_course(True)
+        self.assertTrue(mock_get_module.called)
+
+
 @attr('shard_1')
 @ddt.ddt
 @patch.dict('django.conf.settings.FEATURES', {'ENABLE_SPECIAL_EXAMS': True})
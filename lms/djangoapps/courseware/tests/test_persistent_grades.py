@@ -0,0 +1,197 @@
+"""
+Tests for the stored grades of students.
+"""
+from mock import patch
+from nose.plugins.attrib import attr
+
+from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from courseware import grades, persistent_grades
+from courseware.model_data import set_score
+from courseware.models import PersistentCourseGrade, PersistentSubsectionGrade, SCORE_CHANGED
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+@attr('shard_1')
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(SharedModuleStoreTestCase):
+    """
+    Test storing grades, and reading them from storage.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestPersistentGrades, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+        cls.problem_xml = problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        cls.sequentials = []
+        cls.problems = []
+        for index in range(2):
+            sequential = ItemFactory.create(
+                parent=chapter,
+                category='sequential',
+                display_name="Test Sequential {}".format(index),
+                graded=True,
+                format='Homework',
+            )
+            cls.sequentials.append(sequential)
+            cls.problems.append(ItemFactory.create(
+                parent=sequential,
+                category="problem",
+                display_name="Test Problem {}".format(index),
+                data=problem_xml,
+            ))
+
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.student = UserFactory.create()
+        CourseEnrollment.enroll(self.student, self.course.id)
+
+    def _stored_subsection_grades(self):
+        """
+        Returns the stored subsection grades of the student.
+        """
+        return persistent_grades.get_subsection_grades(self.student.id, self.course.id)
+
+    def test_grade_is_stored(self):
+        set_score(self.student.id, self.problems[0].location, 1, 1)
+        grade_summary = grades.grade(self.student, self.course)
+
+        course_grade = PersistentCourseGrade.objects.get(user_id=self.student.id, course_id=self.course.id)
+        self.assertEqual(course_grade.percent_grade, grade_summary['percent'])
+        self.assertEqual(
+            self._stored_subsection_grades(),
+            {self.sequentials[0].location: (1.0, 1.0), self.sequentials[1].location: (0.0, 1.0)},
+        )
+
+    def test_grade_is_read_from_storage(self):
+        set_score(self.student.id, self.problems[0].location, 1, 1)
+        expected = grades.grade(self.student, self.course)
+        with patch('courseware.grades._grade') as mock_grade:
+            grade_summary = grades.grade(self.student, self.course)
+        self.assertFalse(mock_grade.called)
+        self.assertEqual(grade_summary['percent'], expected['percent'])
+        self.assertEqual(grade_summary['section_breakdown'], expected['section_breakdown'])
+
+    def test_raw_scores_are_not_read_from_storage(self):
+        grades.grade(self.student, self.course)
+        with patch('courseware.grades._grade', wraps=grades._grade) as mock_grade:  # pylint: disable=protected-access
+            grades.grade(self.student, self.course, keep_raw_scores=True)
+        self.assertTrue(mock_grade.called)
+
+    def test_update_on_score_change(self):
+        grades.grade(self.student, self.course)
+        set_score(self.student.id, self.problems[1].location, 1, 2)
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=2,
+            points_earned=1,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problems[1].location),
+        )
+        self.assertEqual(
+            self._stored_subsection_grades(),
+            {self.sequentials[0].location: (0.0, 1.0), self.sequentials[1].location: (1.0, 2.0)},
+        )
+        course_grade = PersistentCourseGrade.objects.get(user_id=self.student.id, course_id=self.course.id)
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_PERSISTENT_GRADES': False}):
+            self.assertEqual(course_grade.percent_grade, grades.grade(self.student, self.course)['percent'])
+
+    def test_update_with_uncommitted_score(self):
+        grades.grade(self.student, self.course)
+        # The score isn't set in the database, as if the transaction that set
+        # it wasn't committed yet.
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=2,
+            points_earned=1,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problems[1].location),
+        )
+        self.assertEqual(
+            self._stored_subsection_grades(),
+            {self.sequentials[0].location: (0.0, 1.0), self.sequentials[1].location: (1.0, 2.0)},
+        )
+
+    def test_missing_subsection_grade_is_recomputed(self):
+        grades.grade(self.student, self.course)
+        PersistentSubsectionGrade.objects.filter(
+            user_id=self.student.id, usage_key=self.sequentials[1].location
+        ).delete()
+        with patch('courseware.grades._grade', wraps=grades._grade) as mock_grade:  # pylint: disable=protected-access
+            grades.grade(self.student, self.course)
+        self.assertTrue(mock_grade.called)
+        self.assertIn(self.sequentials[1].location, self._stored_subsection_grades())
+
+    def test_newly_visible_subsection_is_graded(self):
+        course = CourseFactory.create(
+            grading_policy={
+                "GRADER": [{
+                    "type": "Homework",
+                    "min_count": 1,
+                    "drop_count": 0,
+                    "short_label": "HW",
+                    "weight": 1.0
+                }]
+            }
+        )
+        chapter = ItemFactory.create(parent=course, category="chapter")
+        sequentials = [
+            ItemFactory.create(
+                parent=chapter,
+                category='sequential',
+                graded=True,
+                format='Homework',
+                visible_to_staff_only=bool(index),
+            )
+            for index in range(2)
+        ]
+        problem = ItemFactory.create(parent=sequentials[0], category="problem", data=self.problem_xml)
+        ItemFactory.create(parent=sequentials[1], category="problem", data=self.problem_xml)
+        CourseEnrollment.enroll(self.student, course.id)
+        set_score(self.student.id, problem.location, 1, 1)
+        self.assertEqual(grades.grade(self.student, course)['percent'], 1.0)
+        self.assertEqual(
+            persistent_grades.get_subsection_grades(self.student.id, course.id),
+            {sequentials[0].location: (1.0, 1.0)},
+        )
+
+        sequentials[1].visible_to_staff_only = False
+        self.store.update_item(sequentials[1], ModuleStoreEnum.UserID.test)
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_PERSISTENT_GRADES': False}):
+            expected = grades.grade(self.student, course)
+        self.assertEqual(expected['percent'], 0.5)
+        self.assertEqual(grades.grade(self.student, course)['percent'], expected['percent'])
+        self.assertIn(sequentials[1].location, persistent_grades.get_subsection_grades(self.student.id, course.id))
+
+    def test_graded_content_change_outdates_grades(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category="chapter")
+        sequential = ItemFactory.create(parent=chapter, category='sequential', graded=True, format='Homework')
+        ItemFactory.create(parent=sequential, category="problem", data=self.problem_xml)
+        grading_policy_hash = persistent_grades.grading_policy_hash(course)
+
+        ItemFactory.create(parent=sequential, category="problem", data=self.problem_xml)
+        self.assertNotEqual(persistent_grades.grading_policy_hash(course), grading_policy_hash)
+
+    def test_recompute_on_grading_policy_change(self):
+        grades.grade(self.student, self.course)
+        self.assertEqual(persistent_grades.get_outdated_user_ids(self.course), [])
+
+        course = self.store.get_course(self.course.id)
+        course.grading_policy = {'GRADE_CUTOFFS': {'Pass': 0.01}}
+        self.assertIsNone(persistent_grades.get_course_grade(self.student.id, course))
+        self.assertEqual(persistent_grades.get_outdated_user_ids(course), [self.student.id])
+
+        grades.recompute_outdated_grades(course)
+        self.assertIsNotNone(persistent_grades.get_course_grade(self.student.id, course))
+        self.assertEqual(PersistentSubsectionGrade.objects.filter(user_id=self.student.id).count(), 2)
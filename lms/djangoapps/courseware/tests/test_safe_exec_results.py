@@ -0,0 +1,61 @@
+"""
+Tests of the safe_exec result store.
+"""
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from courseware import safe_exec_results
+from courseware.models import SafeExecResult
+from courseware.safe_exec_results import SafeExecResultStore
+
+
+class SafeExecResultStoreTest(TestCase):
+    """
+    Tests of SafeExecResultStore.
+    """
+    def setUp(self):
+        super(SafeExecResultStoreTest, self).setUp()
+        self.cache = LocMemCache('safe_exec_results', {})
+        self.addCleanup(self.cache.clear)
+        self.store = SafeExecResultStore(self.cache)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.store.get('safe_exec.1.abc'))
+
+    def test_set_and_get(self):
+        self.store.set('safe_exec.1.abc', (None, {'a': 17}))
+        self.assertEqual(self.store.get('safe_exec.1.abc'), (None, {'a': 17}))
+        self.assertEqual(SafeExecResult.objects.get(key='safe_exec.1.abc').size, len('[null, {"a": 17}]'))
+
+    def test_get_after_cache_flush(self):
+        self.store.set('safe_exec.1.abc', ('ZeroDivisionError', {}))
+        self.cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.store.get('safe_exec.1.abc'), ['ZeroDivisionError', {}])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.store.get('safe_exec.1.abc'), ['ZeroDivisionError', {}])
+
+    def test_set_replaces(self):
+        self.store.set('safe_exec.1.abc', (None, {'a': 17}))
+        self.store.set('safe_exec.1.abc', (None, {'a': 23}))
+        self.cache.clear()
+        self.assertEqual(self.store.get('safe_exec.1.abc'), [None, {'a': 23}])
+
+    @override_settings(SAFE_EXEC_RESULT_STORE_MAX_SIZE=60)
+    def test_eviction(self):
+        for index in range(4):
+            self.store.set('safe_exec.{}'.format(index), (None, {'a': 17}))
+        # Each result is 17 bytes, so the oldest results are evicted until 54
+        # bytes at most are stored.
+        self.assertEqual(safe_exec_results.evict(), 1)
+        self.assertEqual(
+            sorted(SafeExecResult.objects.values_list('key', flat=True)),
+            ['safe_exec.1', 'safe_exec.2', 'safe_exec.3'],
+        )
+
+    @override_settings(SAFE_EXEC_RESULT_STORE_MAX_SIZE=1000)
+    def test_no_eviction_under_max_size(self):
+        self.store.set('safe_exec.1.abc', (None, {'a': 17}))
+        self.assertEqual(safe_exec_results.evict(), 0)
+        self.assertEqual(SafeExecResult.objects.count(), 1)
@@ -4,9 +4,9 @@ defined in edx_user_state_client.
 """
 
 from collections import defaultdict
-from unittest import skip
 
 from django.test import TestCase
+from mock import patch
 
 from edx_user_state_client.tests import UserStateClientTestBase
 from courseware.user_state_client import DjangoXBlockUserStateClient
@@ -34,36 +34,64 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
 
-    # We're skipping these tests because the iter_all_by_block and iter_all_by_course
-    # are not implemented in the DjangoXBlockUserStateClient
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_deleted_block(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_empty(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_many_users(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_blocks_single_user(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_deleted_block(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_empty(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_single_user(self):
-        pass
-
-    @skip("Not supported by DjangoXBlockUserStateClient")
-    def test_iter_course_many_users(self):
-        pass
+    def _set_states(self, block_key, num_users):
+        """
+        Store a state for the given block for `num_users` users.
+        """
+        for user_idx in range(num_users):
+            self.client.set_many(
+                self._user(user_idx), {block_key: {'field_a': user_idx, 'field_b': 'value'}}
+            )
+
+    def test_iter_all_for_block_in_batches(self):
+        block_key = self._block(0)
+        self._set_states(block_key, 5)
+
+        # One query per batch, stopping at the last, partial, batch
+        with self.assertNumQueries(3):
+            user_states = list(self.client.iter_all_for_block(block_key, batch_size=2))
+
+        self.assertEqual(
+            sorted((user_state.username, user_state.state['field_a']) for user_state in user_states),
+            [(self._user(user_idx), user_idx) for user_idx in range(5)],
+        )
+
+    def test_iter_all_for_block_fields(self):
+        block_key = self._block(0)
+        self._set_states(block_key, 2)
+        self.client.set_many(self._user(2), {block_key: {'field_c': 'value'}})
+
+        self.assertItemsEqual(
+            [
+                (user_state.username, user_state.state)
+                for user_state in self.client.iter_all_for_block(block_key, fields=['field_a'])
+            ],
+            [
+                (self._user(0), {'field_a': 0}),
+                (self._user(1), {'field_a': 1}),
+                (self._user(2), {}),
+            ],
+        )
+
+    def test_iter_all_for_blocks_concurrently(self):
+        block_keys = [self._block(0), self._block(1), self._block(2)]
+        states_by_block = {
+            block_key: [[self._block(block_idx)], [self._block(block_idx)] * 2]
+            for block_idx, block_key in enumerate(block_keys)
+        }
+
+        def iter_state_batches(_course_key, _scope, _batch_size, _fields, module_state_key):
+            """
+            Stand-in for the database, which the worker threads can't see inside the test transaction.
+            """
+            return iter(states_by_block[module_state_key])
+
+        with patch.object(self.client, '_iter_state_batches', side_effect=iter_state_batches):
+            user_states = list(self.client.iter_all_for_blocks(block_keys, num_workers=2))
+
+        self.assertItemsEqual(user_states, [self._block(0)] * 3 + [self._block(1)] * 3 + [self._block(2)] * 3)
+
+    def test_iter_all_for_blocks_concurrently_error(self):
+        with patch.object(self.client, '_iter_state_batches', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                list(self.client.iter_all_for_blocks([self._block(0), self._block(1)], num_workers=2))
@@ -31,6 +31,7 @@ class GradesTransformer(BlockStructureTransformer):
         max_score: (numeric)
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     FIELDS_TO_COLLECT = [u'due', u'format', u'graded', u'has_score', u'weight']
 
     @classmethod
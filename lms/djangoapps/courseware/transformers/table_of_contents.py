@@ -0,0 +1,50 @@
+"""
+Table of Contents Transformer
+"""
+from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
+
+
+class TableOfContentsTransformer(BlockStructureTransformer):
+    """
+    The TableOfContentsTransformer collects the fields needed to build the
+    courseware table of contents and stores them on the block structure, so
+    that the table of contents can be built without binding the course's
+    chapters and sequentials for the user.
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective blocks in the
+    block structure:
+
+        display_name: (string)
+        hide_from_toc: (boolean)
+        format: (string) what type of sequential it is
+        due: (datetime) when the sequential is due.
+        graded: (boolean)
+        is_time_limited: (boolean) whether the sequential is a timed exam.
+    """
+    VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    FIELDS_TO_COLLECT = [u'display_name', u'hide_from_toc', u'format', u'due', u'graded', u'is_time_limited']
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'table_of_contents'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+
+    def transform(self, block_structure, usage_context):
+        """
+        Perform no transformations.
+        """
+        pass
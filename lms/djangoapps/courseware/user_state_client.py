@@ -4,7 +4,10 @@ data in a Django ORM model.
 """
 
 import itertools
+import sys
 from operator import attrgetter
+from Queue import Empty, Full, Queue
+from threading import Event, Thread
 from time import time
 
 try:
@@ -14,6 +17,8 @@ except ImportError:
 
 import dogstats_wrapper as dog_stats_api
 from django.contrib.auth.models import User
+from django.db import connection
+from opaque_keys.edx.keys import UsageKey
 from xblock.fields import Scope
 from courseware.models import StudentModule, BaseStudentModuleHistory
 from edx_user_state_client.interface import XBlockUserStateClient, XBlockUserState
@@ -42,6 +47,9 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
     # Use this sample rate for DataDog events.
     API_DATADOG_SAMPLE_RATE = 0.1
 
+    # Default number of StudentModule rows fetched per query by the iter_all_* methods.
+    ITER_BATCH_SIZE = 1000
+
     class ServiceUnavailable(XBlockUserStateClient.ServiceUnavailable):
         """
         This error is raised if the service backing this client is currently unavailable.
@@ -169,6 +177,61 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'get_many.blks_out', block_count)
         self._ddog_histogram(evt_time, 'get_many.response_time', (finish_time - evt_time) * 1000)
 
+    def get_many_for_users(self, users, block_keys, scope=Scope.user_state, fields=None):
+        """
+        Retrieve the stored XBlock state of each of the specified users for the
+        specified XBlock usages, with one query per course and chunk of usages.
+
+        Arguments:
+            users ([User]): The users whose state should be retrieved
+            block_keys ([UsageKey]): A list of UsageKeys identifying which xblock states to load.
+            scope (Scope): The scope to load data from
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
+
+        Yields:
+            XBlockUserState tuples for each of the users and specified UsageKeys
+            that have stored state.
+        """
+        if scope != Scope.user_state:
+            raise ValueError("Only Scope.user_state is supported, not {}".format(scope))
+
+        usernames = {user.id: user.username for user in users}
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(block_keys, key=course_key_func),
+            course_key_func,
+        )
+
+        for course_key, usage_keys in by_course:
+            query = StudentModule.objects.chunked_filter(
+                'module_state_key__in',
+                list(usage_keys),
+                student_id__in=usernames.keys(),
+                course_id=course_key,
+            )
+
+            for student_module in query:
+                if student_module.state is None:
+                    continue
+
+                state = json.loads(student_module.state)
+
+                # If the state is the empty dict, then it has been deleted, and so
+                # conformant UserStateClients should treat it as if it doesn't exist.
+                if state == {}:
+                    continue
+
+                if fields is not None:
+                    state = {
+                        field: state[field]
+                        for field in fields
+                        if field in state
+                    }
+                usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                yield XBlockUserState(
+                    usernames[student_module.student_id], usage_key, state, student_module.modified, scope
+                )
+
     def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
         """
         Set fields for a particular XBlock.
@@ -342,22 +405,201 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
             yield XBlockUserState(username, block_key, state, history_entry.created, scope)
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state, batch_size=None):
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, batch_size=None, fields=None):
         """
-        You get no ordering guarantees. Fetching will happen in batch_size
-        increments. If you're using this method, you should be running in an
-        async task.
+        Yield XBlockUserState tuples for all users that have stored state for
+        the given block.
+
+        Rows are fetched in batches of `batch_size` (by ascending id), so that
+        memory use is bounded regardless of the number of users. You get no
+        ordering guarantees. If you're using this method, you should be
+        running in an async task.
+
+        Arguments:
+            block_key (UsageKey): The block to retrieve state for.
+            scope (Scope): The scope to load data from.
+            batch_size (int): The number of rows fetched per query. Defaults to ITER_BATCH_SIZE.
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
         """
-        if scope != Scope.user_state:
-            raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
+        for batch in self._iter_state_batches(
+                block_key.course_key, scope, batch_size, fields, module_state_key=block_key
+        ):
+            for user_state in batch:
+                yield user_state
+
+    def iter_all_for_blocks(self, block_keys, scope=Scope.user_state, batch_size=None, fields=None,
+                            num_workers=1):
+        """
+        Yield XBlockUserState tuples for all users that have stored state for
+        any of the given blocks.
+
+        If `num_workers` is greater than 1, the blocks are fetched concurrently
+        by that many threads, each using its own database connection. At most
+        `num_workers` batches are buffered at once, so memory use stays
+        bounded. You get no ordering guarantees.
+
+        Arguments:
+            block_keys ([UsageKey]): The blocks to retrieve state for.
+            scope (Scope): The scope to load data from.
+            batch_size (int): The number of rows fetched per query. Defaults to ITER_BATCH_SIZE.
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
+            num_workers (int): The number of blocks to fetch concurrently.
+        """
+        if num_workers <= 1:
+            for block_key in block_keys:
+                for user_state in self.iter_all_for_block(block_key, scope, batch_size, fields):
+                    yield user_state
+            return
+
+        for batch in self._iter_batches_concurrently(
+                [
+                    (block_key.course_key, scope, batch_size, fields, {'module_state_key': block_key})
+                    for block_key in block_keys
+                ],
+                num_workers,
+        ):
+            for user_state in batch:
+                yield user_state
+
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, batch_size=None,
+                            fields=None):
+        """
+        Yield XBlockUserState tuples for all users and blocks (optionally of
+        the given block_type) that have stored state in the given course.
 
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, batch_size=None):
+        Rows are fetched in batches of `batch_size` (by ascending id), so that
+        memory use is bounded regardless of the size of the course. You get no
+        ordering guarantees. If you're using this method, you should be
+        running in an async task.
+
+        Arguments:
+            course_key (CourseKey): The course to retrieve state for.
+            block_type (str): If given, only retrieve state of blocks of this type.
+            scope (Scope): The scope to load data from.
+            batch_size (int): The number of rows fetched per query. Defaults to ITER_BATCH_SIZE.
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
         """
-        You get no ordering guarantees. Fetching will happen in batch_size
-        increments. If you're using this method, you should be running in an
-        async task.
+        filters = {}
+        if block_type is not None:
+            filters['module_type'] = block_type
+        for batch in self._iter_state_batches(course_key, scope, batch_size, fields, **filters):
+            for user_state in batch:
+                yield user_state
+
+    def _iter_state_batches(self, course_key, scope, batch_size, fields, **filters):
+        """
+        Yield lists of XBlockUserState tuples for the StudentModules of the
+        given course matching the given filters.
+
+        The rows are paginated on their id rather than with an offset, so that
+        each query is an index range scan, and only the columns needed are
+        fetched, without instantiating models. If `fields` is given, states
+        that don't mention any of the fields are not decoded.
         """
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
+        if batch_size is None:
+            batch_size = self.ITER_BATCH_SIZE
+
+        field_markers = None if fields is None else ['"{}"'.format(field) for field in fields]
+        student_modules = StudentModule.objects.filter(
+            course_id=course_key, state__isnull=False, **filters
+        ).order_by('id')
+
+        last_id = 0
+        while True:
+            rows = list(
+                student_modules.filter(id__gt=last_id).values_list(
+                    'id', 'student__username', 'module_state_key', 'state', 'modified'
+                )[:batch_size]
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+
+            batch = []
+            for _, username, module_state_key, state, modified in rows:
+                if state == '{}':
+                    # If the state is the empty dict, then it has been deleted, and so
+                    # conformant UserStateClients should treat it as if it doesn't exist.
+                    continue
+                if field_markers is not None and not any(marker in state for marker in field_markers):
+                    state = {}
+                else:
+                    state = json.loads(state)
+                    if state == {}:
+                        continue
+                    if fields is not None:
+                        state = {
+                            field: state[field]
+                            for field in fields
+                            if field in state
+                        }
+                # Locations in StudentModule don't necessarily have course key info
+                # attached to them (since old mongo identifiers don't include runs).
+                usage_key = UsageKey.from_string(module_state_key).map_into_course(course_key)
+                batch.append(XBlockUserState(username, usage_key, state, modified, scope))
+            yield batch
+
+            if len(rows) < batch_size:
+                return
+
+    def _iter_batches_concurrently(self, batch_args, num_workers):
+        """
+        Yield the batches of :meth:`_iter_state_batches` for each of the given
+        tuples of (course_key, scope, batch_size, fields, filters), fetched by
+        `num_workers` threads.
+        """
+        pending = Queue()
+        for args in batch_args:
+            pending.put(args)
+        results = Queue(maxsize=num_workers)
+        stopped = Event()
+        done = object()
+
+        def put_result(result):
+            """
+            Hand the result over to the consumer, unless it has stopped.
+            """
+            while not stopped.is_set():
+                try:
+                    results.put(result, timeout=0.1)
+                    return
+                except Full:
+                    pass
+
+        def work():
+            """
+            Fetch the pending blocks until there are none left.
+            """
+            try:
+                while not stopped.is_set():
+                    try:
+                        course_key, scope, batch_size, fields, filters = pending.get_nowait()
+                    except Empty:
+                        break
+                    for batch in self._iter_state_batches(course_key, scope, batch_size, fields, **filters):
+                        put_result(batch)
+            except Exception:  # pylint: disable=broad-except
+                put_result(sys.exc_info())
+            finally:
+                connection.close()
+                put_result(done)
+
+        workers = [Thread(target=work) for _ in range(num_workers)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        try:
+            running = len(workers)
+            while running:
+                result = results.get()
+                if result is done:
+                    running -= 1
+                elif isinstance(result, tuple):
+                    raise result[0], result[1], result[2]
+                else:
+                    yield result
+        finally:
+            stopped.set()
@@ -21,6 +21,7 @@ from microsite_configuration import microsite
 from student.models import CourseEnrollmentAllowed
 from edx_proctoring.api import get_all_exam_attempts
 from courseware.models import StudentModule
+from courseware.user_state_client import DjangoXBlockUserStateClient
 from certificates.models import GeneratedCertificate
 from django.db.models import Count
 from certificates.models import CertificateStatuses
@@ -393,12 +394,8 @@ def list_problem_responses(course_key, problem_location):
     where `state` represents a student's response to the problem
     identified by `problem_location`.
     """
-    problem_key = UsageKey.from_string(problem_location)
-    # Are we dealing with an "old-style" problem location?
-    run = problem_key.run
-    if not run:
-        problem_key = course_key.make_usage_key_from_deprecated_string(problem_location)
-    if problem_key.course_key != course_key:
+    problem_key = _get_problem_key(course_key, problem_location)
+    if problem_key is None:
         return []
 
     smdat = StudentModule.objects.filter(
@@ -413,6 +410,39 @@ def list_problem_responses(course_key, problem_location):
     ]
 
 
+def iter_problem_responses(course_key, problem_location, batch_size=None):
+    """
+    Yield the responses to a given problem as dicts, like
+    list_problem_responses, but streaming them from the database in batches
+    of `batch_size`, so that memory use is bounded for courses of any size.
+
+    The responses are in no particular order, and users whose state for the
+    problem has been deleted are left out.
+    """
+    problem_key = _get_problem_key(course_key, problem_location)
+    if problem_key is None:
+        return
+
+    user_state_client = DjangoXBlockUserStateClient()
+    for user_state in user_state_client.iter_all_for_block(problem_key, batch_size=batch_size):
+        yield {'username': user_state.username, 'state': json.dumps(user_state.state)}
+
+
+def _get_problem_key(course_key, problem_location):
+    """
+    Return the usage key of the problem at the given location, or None if it
+    isn't in the given course.
+    """
+    problem_key = UsageKey.from_string(problem_location)
+    # Are we dealing with an "old-style" problem location?
+    run = problem_key.run
+    if not run:
+        problem_key = course_key.make_usage_key_from_deprecated_string(problem_location)
+    if problem_key.course_key != course_key:
+        return None
+    return problem_key
+
+
 def course_registration_features(features, registration_codes, csv_type):
     """
     Return list of Course Registration Codes as dictionaries.
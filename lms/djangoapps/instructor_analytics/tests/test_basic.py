@@ -11,11 +11,11 @@ from django.core.urlresolvers import reverse
 from django.db.models import Q
 
 from course_modes.models import CourseMode
-from courseware.tests.factories import InstructorFactory
+from courseware.tests.factories import InstructorFactory, StudentModuleFactory
 from instructor_analytics.basic import (
     StudentModule, sale_record_features, sale_order_record_features, enrolled_students_features,
     course_registration_features, coupon_codes_features, get_proctored_exam_results, list_may_enroll,
-    list_problem_responses, AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES
+    list_problem_responses, iter_problem_responses, AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES
 )
 from opaque_keys.edx.locator import UsageKey
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
@@ -97,6 +97,29 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
                         problem_responses
                     )
 
+    def test_iter_problem_responses(self):
+        problem_key = self.course_key.make_usage_key('problem', 'test_problem')
+        for index, user in enumerate(self.users[:5]):
+            StudentModuleFactory(
+                student=user,
+                course_id=self.course_key,
+                module_state_key=problem_key,
+                state=json.dumps({'attempts': index}),
+            )
+        # Deleted and missing states are left out
+        StudentModuleFactory(student=self.users[5], course_id=self.course_key, module_state_key=problem_key, state='{}')
+        StudentModuleFactory(student=self.users[6], course_id=self.course_key, module_state_key=problem_key)
+
+        problem_responses = list(iter_problem_responses(self.course_key, unicode(problem_key), batch_size=2))
+
+        self.assertItemsEqual(
+            problem_responses,
+            [
+                {'username': user.username, 'state': json.dumps({'attempts': index})}
+                for index, user in enumerate(self.users[:5])
+            ],
+        )
+
     def test_enrolled_students_features_username(self):
         self.assertIn('username', AVAILABLE_FEATURES)
         userreports = enrolled_students_features(self.course_key, ['username'])
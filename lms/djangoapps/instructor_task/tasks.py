@@ -73,13 +73,14 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    # Students with the same seed and answers are graded once.
+    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args, grading_memo={})
 
     def filter_fcn(modules_to_update):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn, preload_field_data=True)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
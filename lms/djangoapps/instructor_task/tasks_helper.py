@@ -47,14 +47,14 @@ from certificates.models import (
 from certificates.api import generate_user_certificates
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
-from courseware.models import StudentModule
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from courseware.models import StudentModule, chunks
+from courseware.model_data import BulkFieldDataCache, DjangoKeyValueStore, FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import (
     enrolled_students_features,
     get_proctored_exam_results,
+    iter_problem_responses,
     list_may_enroll,
-    list_problem_responses
 )
 from instructor_analytics.csvs import format_dictlist
 from openassessment.data import OraAggregateData
@@ -74,6 +74,10 @@ TASK_LOG = logging.getLogger('edx.celery.task')
 
 # define value to use when no task_id is provided:
 UNKNOWN_TASK_ID = 'unknown-task_id'
+
+# Number of student modules whose students' field data is loaded at once,
+# when updates preload field data.
+MODULE_STATE_UPDATE_CHUNK_SIZE = 100
 FILTERED_OUT_ROLES = ['staff', 'instructor', 'finance_admin', 'sales_admin']
 # define values for update functions to use to return status to perform_module_state_update
 UPDATE_STATUS_SUCCEEDED = 'succeeded'
@@ -298,7 +302,8 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                preload_field_data=False):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -316,6 +321,10 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `preload_field_data` is True, the field data of the students is loaded for chunks of
+    MODULE_STATE_UPDATE_CHUNK_SIZE student modules at once, and the `update_fcn` is also passed
+    the student's FieldDataCache as its `field_data_cache` keyword argument.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -376,23 +385,37 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for modules_chunk in chunks(modules_to_update.select_related('student'), MODULE_STATE_UPDATE_CHUNK_SIZE):
+        bulk_field_data_cache = None
+        if preload_field_data:
+            bulk_field_data_cache = BulkFieldDataCache.cache_for_descriptor_descendents(
+                course_id,
+                set(module_to_update.student for module_to_update in modules_chunk),
+                problems.values(),
+            )
+
+        for module_to_update in modules_chunk:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            update_kwargs = {}
+            if bulk_field_data_cache is not None:
+                update_kwargs['field_data_cache'] = bulk_field_data_cache.for_user(module_to_update.student)
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer(
+                    'instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]
+            ):
+                update_status = update_fcn(module_descriptor, module_to_update, **update_kwargs)
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
 
     return task_progress.update_task_state()
 
@@ -424,16 +447,19 @@ def _get_track_function_for_task(student, xmodule_instance_args=None, source_pag
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None, course=None):
+                                  grade_bucket_type=None, course=None, field_data_cache=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    `field_data_cache` is the student's preloaded FieldDataCache, if any.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
     student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
@@ -470,10 +496,14 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
 
 
 @outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, field_data_cache=None,
+                                 grading_memo=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
-    performs rescoring on the student's problem submission.
+    performs rescoring on the student's problem submission. The student's
+    preloaded FieldDataCache may be passed as `field_data_cache`, and a
+    `grading_memo` dict shared by the rescoring of all students, so that
+    students with the same seed and answers are graded once.
 
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
@@ -498,7 +528,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
             module_descriptor,
             xmodule_instance_args,
             grade_bucket_type='rescore',
-            course=course
+            course=course,
+            field_data_cache=field_data_cache,
         )
 
         if instance is None:
@@ -517,7 +548,10 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
             msg = "Specified problem does not support rescoring."
             raise UpdateProblemModuleStateError(msg)
 
-        result = instance.rescore_problem()
+        if grading_memo is not None:
+            result = instance.rescore_problem(grading_memo=grading_memo)
+        else:
+            result = instance.rescore_problem()
         instance.save()
         if 'success' not in result:
             # don't consider these fatal, but false means that the individual call didn't complete:
@@ -885,24 +919,28 @@ def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, t
     current_step = {'step': 'Calculating students answers to problem'}
     task_progress.update_task_state(extra_meta=current_step)
 
-    # Compute result table and format it
+    # Stream the result table into the report, so that it is never held in memory as a whole
     problem_location = task_input.get('problem_location')
-    student_data = list_problem_responses(course_id, problem_location)
     features = ['username', 'state']
-    header, rows = format_dictlist(student_data, features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
 
-    rows.insert(0, header)
+    def iter_rows():
+        """
+        Yield the header and then a row for each student answer, counting them.
+        """
+        yield features
+        for student_data in iter_problem_responses(course_id, problem_location):
+            task_progress.attempted += 1
+            yield [student_data[feature] for feature in features]
 
     current_step = {'step': 'Uploading CSV'}
     task_progress.update_task_state(extra_meta=current_step)
 
     # Perform the upload
-    problem_location = re.sub(r'[:/]', '_', problem_location)
-    csv_name = 'student_state_from_{}'.format(problem_location)
-    upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+    csv_name = 'student_state_from_{}'.format(re.sub(r'[:/]', '_', problem_location))
+    upload_csv_to_report_store(iter_rows(), csv_name, course_id, start_date)
+
+    task_progress.succeeded = task_progress.attempted
+    task_progress.skipped = task_progress.total - task_progress.attempted
 
     return task_progress.update_task_state(extra_meta=current_step)
 
@@ -937,7 +975,9 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    for student, gradeset, err_msg in iterate_grades_for(
+            course_id, enrolled_students, keep_raw_scores=True, include_breakdown=False
+    ):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -355,7 +355,7 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskCourseTestCase):
     def test_success(self):
         task_input = {'problem_location': ''}
         with patch('instructor_task.tasks_helper._get_current_task'):
-            with patch('instructor_task.tasks_helper.list_problem_responses') as patched_data_source:
+            with patch('instructor_task.tasks_helper.iter_problem_responses') as patched_data_source:
                 patched_data_source.return_value = [
                     {'username': 'user0', 'state': u'state0'},
                     {'username': 'user1', 'state': u'state1'},
@@ -218,6 +218,9 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE', COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE
+)
 
 # Email overrides
 DEFAULT_FROM_EMAIL = ENV_TOKENS.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
@@ -328,6 +331,15 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_RESULT_STORE_MAX_SIZE = ENV_TOKENS.get('SAFE_EXEC_RESULT_STORE_MAX_SIZE', SAFE_EXEC_RESULT_STORE_MAX_SIZE)
+ACCESS_CHECK_CACHE_TIMEOUT = ENV_TOKENS.get('ACCESS_CHECK_CACHE_TIMEOUT', ACCESS_CHECK_CACHE_TIMEOUT)
+DASHBOARD_DOCUMENT_TIMEOUT = ENV_TOKENS.get('DASHBOARD_DOCUMENT_TIMEOUT', DASHBOARD_DOCUMENT_TIMEOUT)
+ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT = ENV_TOKENS.get(
+    'ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT', ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT
+)
+ASSET_INDEX_CACHE_TIMEOUT = ENV_TOKENS.get('ASSET_INDEX_CACHE_TIMEOUT', ASSET_INDEX_CACHE_TIMEOUT)
+STATIC_REPLACE_CACHE_TIMEOUT = ENV_TOKENS.get('STATIC_REPLACE_CACHE_TIMEOUT', STATIC_REPLACE_CACHE_TIMEOUT)
+CONTENTSERVER_NODE_CACHE.update(ENV_TOKENS.get('CONTENTSERVER_NODE_CACHE', {}))
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -552,6 +564,7 @@ STUDENT_FILEUPLOAD_MAX_SIZE = ENV_TOKENS.get("STUDENT_FILEUPLOAD_MAX_SIZE", STUD
 
 # Event tracking
 TRACKING_BACKENDS.update(AUTH_TOKENS.get("TRACKING_BACKENDS", {}))
+TRACKING_BUFFER.update(ENV_TOKENS.get("TRACKING_BUFFER", {}))
 EVENT_TRACKING_BACKENDS['tracking_logs']['OPTIONS']['backends'].update(AUTH_TOKENS.get("EVENT_TRACKING_BACKENDS", {}))
 EVENT_TRACKING_BACKENDS['segmentio']['OPTIONS']['processors'][0]['OPTIONS']['whitelist'].extend(
     AUTH_TOKENS.get("EVENT_TRACKING_SEGMENTIO_EMIT_WHITELIST", []))
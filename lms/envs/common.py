@@ -363,6 +363,67 @@ FEATURES = {
 
     # WIP -- will be removed in Ticket #TNL-4750.
     'ENABLE_TIME_ZONE_PREFERENCE': False,
+
+    # Back the Block Structure cache with durable storage so that cache
+    # misses read the collected data from the database instead of
+    # re-collecting it from the modulestore.
+    'ENABLE_BLOCK_STRUCTURE_STORAGE': False,
+
+    # Cache the output of course block transformers per user, so repeated
+    # calls to get_course_blocks skip the transform phase.
+    'ENABLE_COURSE_BLOCKS_TRANSFORMED_CACHE': False,
+
+    # Grade batches of students at once with the vectorized grading engine
+    # when iterating over the grades of a course, e.g. for grade reports.
+    'ENABLE_VECTORIZED_GRADING': False,
+
+    # Store the subsection and course grades of students, update them when
+    # their scores change, and read grades from storage.
+    'ENABLE_PERSISTENT_GRADES': False,
+
+    # Store the results of executing the Python code of capa problems in the
+    # database, in addition to the default cache, so that they survive cache
+    # flushes and can be computed ahead of time with the
+    # warm_safe_exec_results management command.
+    'ENABLE_SAFE_EXEC_RESULT_STORE': False,
+
+    # Build the courseware table of contents from the course's collected
+    # block structure instead of binding its chapters and sections to the
+    # user on each page view.
+    'ENABLE_TOC_FROM_COURSE_BLOCKS': False,
+
+    # Memoize the results of courseware access checks for the rest of the
+    # request, and for ACCESS_CHECK_CACHE_TIMEOUT seconds in the cache.
+    'ENABLE_ACCESS_CHECK_CACHE': False,
+
+    # Render the learner dashboard from a precomputed per-user document of
+    # the data displayed for each enrollment, computing only stale entries.
+    'ENABLE_DASHBOARD_DOCUMENT': False,
+
+    # Answer enrollment checks from a per-user snapshot of all of the user's
+    # enrollments, loaded in one query and kept in the request cache and for
+    # ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT seconds in the cache.
+    'ENABLE_ENROLLMENT_SNAPSHOT_CACHE': False,
+
+    # Canonicalize course asset URLs from a per-course index of the assets'
+    # metadata, loaded in one query and cached until the course's assets
+    # change, instead of loading each asset from the contentstore.
+    'ENABLE_ASSET_INDEX': False,
+
+    # Rewrite the /static, /course and /jump_to_id urls of rendered blocks in
+    # a single pass, caching the rewritten html for
+    # STATIC_REPLACE_CACHE_TIMEOUT seconds.
+    'ENABLE_SINGLE_PASS_URL_REWRITING': False,
+
+    # Serve the contents of course assets from files cached on the node's
+    # local disk, configured by CONTENTSERVER_NODE_CACHE, instead of reading
+    # them from the contentstore on each request.
+    'ENABLE_CONTENTSERVER_NODE_CACHE': False,
+
+    # Send tracking events to the TRACKING_BACKENDS in batches from
+    # background threads, configured by TRACKING_BUFFER, instead of within
+    # the request.
+    'ENABLE_BUFFERED_TRACKING': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -605,6 +666,19 @@ TRACKING_BACKENDS = {
     }
 }
 
+# Buffer of the events sent to TRACKING_BACKENDS in batches, used when
+# FEATURES['ENABLE_BUFFERED_TRACKING'] is set. Batches of up to FLUSH_SIZE
+# events are sent at least every FLUSH_INTERVAL seconds by FLUSHER_THREADS
+# threads. Events are dropped once MAX_QUEUE_SIZE events are waiting and no
+# room frees up within ENQUEUE_TIMEOUT seconds.
+TRACKING_BUFFER = {
+    'MAX_QUEUE_SIZE': 10000,
+    'FLUSH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'FLUSHER_THREADS': 1,
+    'ENQUEUE_TIMEOUT': 0.1,
+}
+
 # We're already logging events, and we don't want to capture user
 # names/passwords.  Heartbeat events are likely not interesting.
 TRACKING_IGNORE_URL_PATTERNS = [r'^/event', r'^/login', r'^/heartbeat', r'^/segmentio/event', r'^/performance']
@@ -758,6 +832,20 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of warm sandboxed Python processes, kept by each LMS process to run
+    # the code of capa problems instead of starting a process per execution.
+    'pool': {
+        # How many processes?  0 disables the pool.
+        'size': 0,
+        # After how many executions is a process replaced?
+        'max_executions': 100,
+        # How many seconds can an execution take?  None uses the REALTIME
+        # limit, or else the CPU limit plus a second.
+        'timeout': None,
+        # How many seconds to wait for an idle process before starting one?
+        'queue_timeout': 1,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -770,6 +858,12 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Maximum total size, in bytes, of the results of executing the Python code of
+# capa problems kept in the database when the ENABLE_SAFE_EXEC_RESULT_STORE
+# feature is enabled. The oldest results are evicted first by the
+# evict_safe_exec_results management command.
+SAFE_EXEC_RESULT_STORE_MAX_SIZE = 256 * 1024 * 1024
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -2015,6 +2109,7 @@ INSTALLED_APPS = (
     'openedx.core.djangoapps.content.course_overviews',
     'openedx.core.djangoapps.content.course_structures',
     'lms.djangoapps.course_blocks',
+    'openedx.core.djangoapps.content.block_structure',
 
     # Old course structure API
     'course_structure_api',
@@ -2643,6 +2738,41 @@ COURSE_ABOUT_VISIBILITY_PERMISSION = 'see_exists'
 # Enrollment API Cache Timeout
 ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT = 60
 
+# Timeout, in seconds, of cached transformed course blocks. Time-based
+# access rules, such as start dates, may be stale for up to this long.
+COURSE_BLOCKS_TRANSFORMED_CACHE_TIMEOUT = 5 * 60
+
+# Timeout, in seconds, of memoized access checks. Time-based access rules,
+# such as start dates, may be stale for up to this long.
+ACCESS_CHECK_CACHE_TIMEOUT = 60
+
+# Timeout, in seconds, of the entries of precomputed learner dashboard
+# documents.
+DASHBOARD_DOCUMENT_TIMEOUT = 60 * 60
+
+# Timeout, in seconds, of cached snapshots of users' enrollments. Snapshots
+# are invalidated whenever an enrollment is saved or deleted, so this only
+# bounds staleness from bulk updates that bypass model signals.
+ENROLLMENT_SNAPSHOT_CACHE_TIMEOUT = 15 * 60
+
+# Timeout, in seconds, of cached course asset indexes. Indexes are
+# invalidated whenever the contentstore saves, modifies or deletes an asset.
+ASSET_INDEX_CACHE_TIMEOUT = 60 * 60
+
+# Timeout, in seconds, of cached html with rewritten urls. Rewritten course
+# asset urls may be stale for up to this long after the assets change.
+STATIC_REPLACE_CACHE_TIMEOUT = 5 * 60
+
+# Node-local cache of the contents of course assets served by the
+# contentserver, used when FEATURES['ENABLE_CONTENTSERVER_NODE_CACHE'] is set.
+# The least recently served assets are evicted once the cache holds more than
+# MAX_SIZE bytes, and assets larger than MAX_ASSET_SIZE bytes are not cached.
+CONTENTSERVER_NODE_CACHE = {
+    'DIRECTORY': os.path.join(tempfile.gettempdir(), 'contentserver_node_cache'),
+    'MAX_SIZE': 1024 * 1024 * 1024,
+    'MAX_ASSET_SIZE': 100 * 1024 * 1024,
+}
+
 
 OAUTH_ID_TOKEN_EXPIRATION = 60 * 60
 
@@ -2751,6 +2881,11 @@ FIELD_OVERRIDE_PROVIDERS = ()
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Maximum total size, in bytes, of the uncompressed course structures kept in
+# an in-process LRU cache in front of the 'course_structure_cache' cache of the
+# split modulestore. 0 disables the in-process cache.
+COURSE_STRUCTURE_CACHE_LRU_MAX_SIZE = 0
+
 # PROFILE IMAGE CONFIG
 # WARNING: Certain django storage backends do not support atomic
 # file overwrites (including the default, OverwriteStorage) - instead
@@ -61,6 +61,14 @@ def run():
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_stanford_theme()
 
+    # Keep the precomputed learner dashboard documents up to date.
+    import student.dashboard_signals  # pylint: disable=unused-import, unused-variable
+
+    # Keep a pool of warm sandboxed processes to run the code of capa problems.
+    if settings.CODE_JAIL.get('pool', {}).get('size'):
+        from capa.safe_exec import pool
+        pool.configure(**settings.CODE_JAIL['pool'])
+
     # Initialize Segment analytics module by setting the write_key.
     if settings.LMS_SEGMENT_KEY:
         analytics.write_key = settings.LMS_SEGMENT_KEY
@@ -1,6 +1,7 @@
 """
 Higher order functions built on the BlockStructureManager to interact with a django cache.
 """
+from django.conf import settings
 from django.core.cache import cache
 from openedx.core.lib.block_structure.manager import BlockStructureManager
 from xmodule.modulestore.django import modulestore
@@ -48,7 +49,7 @@ def get_block_structure_manager(course_key):
     """
     store = modulestore()
     course_usage_key = store.make_course_usage_key(course_key)
-    return BlockStructureManager(course_usage_key, store, get_cache())
+    return BlockStructureManager(course_usage_key, store, get_cache(), get_store())
 
 
 def get_cache():
@@ -56,3 +57,25 @@ def get_cache():
     Returns the storage for caching Block Structures.
     """
     return cache
+
+
+def get_store():
+    """
+    Returns the durable storage backing the Block Structures cache, or
+    None if it is not enabled.
+    """
+    if not is_storage_enabled():
+        return None
+
+    # Imported here to avoid loading models before the app registry is
+    # ready, since this module is imported by the app's signal handlers.
+    from .store import BlockStructureStore
+    return BlockStructureStore(modulestore())
+
+
+def is_storage_enabled():
+    """
+    Returns whether the Block Structures cache is backed by durable
+    storage.
+    """
+    return settings.FEATURES.get('ENABLE_BLOCK_STRUCTURE_STORAGE', False)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+import xmodule_django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockStructureModel',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('data_usage_key', xmodule_django.models.UsageKeyField(unique=True, max_length=255, verbose_name='Identifier of the data being collected.')),
+                ('data_edit_timestamp', models.DateTimeField(null=True, verbose_name='Edit timestamp of the data being collected.', blank=True)),
+                ('block_structure_schema_version', models.PositiveIntegerField(verbose_name='Version of the Block Structure schema used to serialize the data.')),
+                ('data', models.BinaryField(verbose_name='Serialized collected data of the block structure.')),
+            ],
+        ),
+    ]
@@ -0,0 +1,83 @@
+"""
+Django ORM model specifications for the Block Structure sub-application.
+"""
+from logging import getLogger
+
+from django.db import models
+from model_utils.models import TimeStampedModel
+
+from xmodule_django.models import UsageKeyField
+
+
+log = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class BlockStructureModel(TimeStampedModel):
+    """
+    Durable storage for collected Block Structures.
+
+    Each row holds the serialized (zlib compressed, in the binary format of
+    CompactBlockStructure) collected data for the block structure rooted at
+    data_usage_key, along with the version information of the data it was
+    collected from.  The Block Structure cache reads through to this table
+    on a cache miss so that the expensive collect phase is only needed when
+    the content changes.
+    """
+    class Meta(object):
+        app_label = 'block_structure'
+
+    data_usage_key = UsageKeyField(
+        u'Identifier of the data being collected.',
+        blank=False,
+        max_length=255,
+        unique=True,
+    )
+    data_edit_timestamp = models.DateTimeField(
+        u'Edit timestamp of the data being collected.',
+        blank=True,
+        null=True,
+    )
+    block_structure_schema_version = models.PositiveIntegerField(
+        u'Version of the Block Structure schema used to serialize the data.',
+    )
+    data = models.BinaryField(
+        u'Serialized collected data of the block structure.',
+    )
+
+    def __unicode__(self):
+        return u'BlockStructure: {}, edited on: {}, schema: {}'.format(
+            self.data_usage_key,
+            self.data_edit_timestamp,
+            self.block_structure_schema_version,
+        )
+
+    @classmethod
+    def get(cls, data_usage_key):
+        """
+        Returns the entry associated with the given data_usage_key.
+
+        Raises:
+            BlockStructureModel.DoesNotExist if an entry is not found.
+        """
+        return cls.objects.get(data_usage_key=data_usage_key)
+
+    @classmethod
+    def update_or_create(cls, data_usage_key, **kwargs):
+        """
+        Updates or creates the entry for the given data_usage_key with
+        the given field values.
+        """
+        entry, created = cls.objects.update_or_create(data_usage_key=data_usage_key, defaults=kwargs)
+        log.info(
+            u'BlockStructure: %s in store: %s.',
+            u'Added' if created else u'Updated',
+            entry,
+        )
+        return entry
+
+    @classmethod
+    def delete_by_usage_key(cls, data_usage_key):
+        """
+        Deletes the entry, if any, for the given data_usage_key.
+        """
+        cls.objects.filter(data_usage_key=data_usage_key).delete()
@@ -5,7 +5,7 @@ from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
-from .api import clear_course_from_cache
+from .api import clear_course_from_cache, is_storage_enabled
 from .tasks import update_course_in_cache
 
 
@@ -14,8 +14,15 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     """
     Catches the signal that a course has been published in the module
     store and creates/updates the corresponding cache entry.
+
+    When the cache is backed by durable storage, the previously collected
+    data is left in place, so readers are served from it until the update
+    task replaces it, and so the update task can reuse it for the blocks
+    that were not affected by the publish.  Otherwise it is cleared, so
+    readers are never served outdated data if the update task fails.
     """
-    clear_course_from_cache(course_key)
+    if not is_storage_enabled():
+        clear_course_from_cache(course_key)
 
     # The countdown=0 kwarg ensures the call occurs after the signal emitter
     # has finished all operations.
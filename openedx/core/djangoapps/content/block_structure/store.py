@@ -0,0 +1,82 @@
+"""
+Durable store for collected Block Structures, backed by the
+BlockStructureModel.
+"""
+from logging import getLogger
+
+from openedx.core.lib.block_structure.block_structure import BlockStructureBlockData
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+from .models import BlockStructureModel
+
+
+log = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class BlockStructureStore(object):
+    """
+    Database backed store that implements the store interface expected by
+    openedx.core.lib.block_structure.cache.BlockStructureCache.
+
+    Entries serialized with an older version of the Block Structure
+    schema, or collected from content that has been edited since, are
+    treated as missing, so that a lost or failed update after a publish
+    does not leave outdated data in use.
+    """
+    def __init__(self, modulestore):
+        """
+        Arguments:
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the current content of the stored block
+                structures.
+        """
+        self._modulestore = modulestore
+
+    def get(self, root_block_usage_key):
+        """
+        Returns the serialized data stored for the given
+        root_block_usage_key, or None if not found or outdated.
+        """
+        try:
+            entry = BlockStructureModel.get(root_block_usage_key)
+        except BlockStructureModel.DoesNotExist:
+            return None
+        if entry.block_structure_schema_version != BlockStructureBlockData.VERSION:
+            return None
+        if not self._is_current(entry):
+            log.info(u'BlockStructure: %s in store is outdated.', entry)
+            return None
+        return str(entry.data)
+
+    def set(self, root_block_usage_key, serialized_data, data_edit_timestamp):
+        """
+        Stores the given serialized data for the given
+        root_block_usage_key, replacing any previous entry.
+        """
+        BlockStructureModel.update_or_create(
+            root_block_usage_key,
+            data=serialized_data,
+            data_edit_timestamp=data_edit_timestamp,
+            block_structure_schema_version=BlockStructureBlockData.VERSION,
+        )
+
+    def delete(self, root_block_usage_key):
+        """
+        Deletes the entry stored for the given root_block_usage_key.
+        """
+        BlockStructureModel.delete_by_usage_key(root_block_usage_key)
+
+    def _is_current(self, entry):
+        """
+        Returns whether the given entry was collected from the current
+        content of its root block, as of its last edit.
+        """
+        try:
+            root_xblock = self._modulestore.get_item(entry.data_usage_key, depth=0)
+        except ItemNotFoundError:
+            return False
+        current_timestamp = getattr(root_xblock, 'subtree_edited_on', None)
+        if current_timestamp is None or entry.data_edit_timestamp is None:
+            return False
+        # The database may not store fractions of seconds.
+        return entry.data_edit_timestamp.replace(microsecond=0) == current_timestamp.replace(microsecond=0)
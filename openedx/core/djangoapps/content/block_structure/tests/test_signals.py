@@ -2,6 +2,8 @@
 Unit tests for the Course Blocks signals
 """
 
+from mock import patch
+
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -41,6 +43,27 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
             updated_block_structure.get_xblock_field(self.course_usage_key, 'display_name')
         )
 
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_STORAGE': False})
+    @patch('openedx.core.djangoapps.content.block_structure.signals.update_course_in_cache')
+    def test_course_publish_clears_cache(self, mock_update_task):
+        get_block_structure_manager(self.course.id).get_collected()
+        self.assertTrue(is_course_in_block_structure_cache(self.course.id, self.store))
+
+        self.store.update_item(self.course, self.user.id)
+
+        self.assertTrue(mock_update_task.apply_async.called)
+        self.assertFalse(is_course_in_block_structure_cache(self.course.id, self.store))
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_STORAGE': True})
+    @patch('openedx.core.djangoapps.content.block_structure.signals.update_course_in_cache')
+    def test_course_publish_keeps_stored_data(self, mock_update_task):
+        get_block_structure_manager(self.course.id).get_collected()
+
+        self.store.update_item(self.course, self.user.id)
+
+        self.assertTrue(mock_update_task.apply_async.called)
+        self.assertTrue(is_course_in_block_structure_cache(self.course.id, self.store))
+
     def test_course_delete(self):
         bs_manager = get_block_structure_manager(self.course.id)
         self.assertIsNotNone(bs_manager.get_collected())
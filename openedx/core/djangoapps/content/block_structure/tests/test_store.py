@@ -0,0 +1,65 @@
+"""
+Unit tests for the Block Structure store
+"""
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from mock import Mock
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from openedx.core.lib.block_structure.block_structure import BlockStructureBlockData
+
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+from ..models import BlockStructureModel
+from ..store import BlockStructureStore
+
+
+class BlockStructureStoreTest(TestCase):
+    """
+    Tests for BlockStructureStore
+    """
+    def setUp(self):
+        super(BlockStructureStoreTest, self).setUp()
+        self.usage_key = CourseLocator('org', 'course', 'run').make_usage_key('course', 'course')
+        self.edit_timestamp = datetime(2016, 3, 14, 15, 9, 26, tzinfo=UTC)
+        self.root_xblock = Mock(subtree_edited_on=self.edit_timestamp)
+        self.modulestore = Mock()
+        self.modulestore.get_item.return_value = self.root_xblock
+        self.store = BlockStructureStore(self.modulestore)
+
+    def test_get_none(self):
+        self.assertIsNone(self.store.get(self.usage_key))
+
+    def test_set_and_get(self):
+        self.store.set(self.usage_key, 'serialized data', self.edit_timestamp)
+        self.assertEqual(self.store.get(self.usage_key), 'serialized data')
+
+        self.store.set(self.usage_key, 'updated data', self.edit_timestamp)
+        self.assertEqual(self.store.get(self.usage_key), 'updated data')
+        self.assertEqual(BlockStructureModel.objects.count(), 1)
+
+    def test_outdated_schema(self):
+        self.store.set(self.usage_key, 'serialized data', self.edit_timestamp)
+        BlockStructureModel.objects.update(block_structure_schema_version=BlockStructureBlockData.VERSION - 1)
+        self.assertIsNone(self.store.get(self.usage_key))
+
+    def test_outdated_content(self):
+        self.store.set(self.usage_key, 'serialized data', self.edit_timestamp)
+        self.root_xblock.subtree_edited_on = self.edit_timestamp + timedelta(minutes=1)
+        self.assertIsNone(self.store.get(self.usage_key))
+
+    def test_unknown_edit_timestamp(self):
+        self.store.set(self.usage_key, 'serialized data', None)
+        self.assertIsNone(self.store.get(self.usage_key))
+
+    def test_deleted_content(self):
+        self.store.set(self.usage_key, 'serialized data', self.edit_timestamp)
+        self.modulestore.get_item.side_effect = ItemNotFoundError(self.usage_key)
+        self.assertIsNone(self.store.get(self.usage_key))
+
+    def test_delete(self):
+        self.store.set(self.usage_key, 'serialized data', self.edit_timestamp)
+        self.store.delete(self.usage_key)
+        self.assertIsNone(self.store.get(self.usage_key))
@@ -22,6 +22,10 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# The name of the xBlock field that is collected for every block so
+# changes to the block can be detected across collections.
+EDITED_ON_FIELD = 'edited_on'
+
 
 class _BlockRelations(object):
     """
@@ -400,7 +404,10 @@ class BlockStructureBlockData(BlockStructure):
     # update this value whenever the data structure changes. Dependent storage
     # layers can then use this value when serializing/deserializing block
     # structures, and invalidating any previously cached/stored data.
-    VERSION = 1
+    #
+    # Version 2: Serialized in the binary format of CompactBlockStructure
+    # rather than pickled.
+    VERSION = 2
 
     def __init__(self, root_block_usage_key):
         super(BlockStructureBlockData, self).__init__(root_block_usage_key)
@@ -828,3 +835,50 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         if hasattr(xblock, field_name):
             setattr(block_data, field_name, getattr(xblock, field_name))
+
+    def _get_changed_blocks(self, previous_block_structure):
+        """
+        Returns the set of usage keys of the blocks in this block
+        structure that were added or changed since the given previously
+        collected block structure.  A block is considered changed if
+        its relations or its edit timestamp differ, or if its edit
+        timestamp is not available.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A
+                previously collected block structure with the same root.
+        """
+        changed_blocks = set()
+        for usage_key in self:
+            if usage_key not in previous_block_structure:
+                changed_blocks.add(usage_key)
+                continue
+
+            edited_on = getattr(self.get_xblock(usage_key), EDITED_ON_FIELD, None)
+            if (
+                    edited_on is None or
+                    edited_on != previous_block_structure.get_xblock_field(usage_key, EDITED_ON_FIELD) or
+                    self.get_children(usage_key) != previous_block_structure.get_children(usage_key) or
+                    set(self.get_parents(usage_key)) != set(previous_block_structure.get_parents(usage_key))
+            ):
+                changed_blocks.add(usage_key)
+        return changed_blocks
+
+    def _create_substructure(self, usage_keys):
+        """
+        Returns a new block structure with the same root, containing
+        only the given blocks, their xBlocks, and the relations amongst
+        them.  The given blocks are expected to include all the
+        ancestors of each block.
+
+        Arguments:
+            usage_keys (set(UsageKey)) - Usage keys of the blocks to
+                include in the new block structure.
+        """
+        substructure = BlockStructureModulestoreData(self.root_block_usage_key)
+        for usage_key in self.topological_traversal(filter_func=lambda block_key: block_key in usage_keys):
+            substructure._add_xblock(usage_key, self.get_xblock(usage_key))
+            for child_key in self.get_children(usage_key):
+                if child_key in usage_keys:
+                    substructure._add_relation(usage_key, child_key)
+        return substructure
@@ -1,12 +1,10 @@
 """
 Module for the Cache class for BlockStructure objects.
 """
-# pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
 from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from .compact import CompactBlockStructure
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -16,19 +14,32 @@ class BlockStructureCache(object):
     """
     Cache for BlockStructure objects.
     """
-    def __init__(self, cache):
+    def __init__(self, cache, store=None):
         """
         Arguments:
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache into which cacheable data of the block structure
                 is to be serialized.
+
+            store (object) - An optional durable store that backs the
+                cache.  When provided, serialized block structures are
+                also written to the store and cache misses are read
+                through to it.  The store is expected to implement the
+                following methods:
+                    get(root_block_usage_key) - returns the serialized
+                        data or None if not found.
+                    set(root_block_usage_key, serialized_data,
+                        data_edit_timestamp)
+                    delete(root_block_usage_key)
         """
         self._cache = cache
+        self._store = store
 
     def add(self, block_structure):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compressed binary serialization of the given block
+        structure, in the format of CompactBlockStructure, into the
+        given cache.
 
         The key in the cache is 'root.key.<root_block_usage_key>'.
         The data stored in the cache includes the structure's
@@ -38,27 +49,21 @@ class BlockStructureCache(object):
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
-
-        # Set the timeout value for the cache to 1 day as a fail-safe
-        # in case the signal to invalidate the cache doesn't come through.
-        timeout_in_seconds = 60 * 60 * 24
-        self._cache.set(
-            self._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache,
-            timeout=timeout_in_seconds,
-        )
-
-        logger.info(
-            "Wrote BlockStructure %s to cache, size: %s",
-            block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
-        )
+        zp_data_to_cache = CompactBlockStructure.from_block_structure(block_structure).serialize()
+        self._add_to_cache(block_structure.root_block_usage_key, zp_data_to_cache)
+
+        if self._store is not None:
+            data_edit_timestamp = self._get_data_edit_timestamp(block_structure)
+            self._store.set(
+                block_structure.root_block_usage_key,
+                zp_data_to_cache,
+                data_edit_timestamp,
+            )
+            logger.info(
+                "Wrote BlockStructure %s to store, edited on: %s",
+                block_structure.root_block_usage_key,
+                data_edit_timestamp,
+            )
 
     def get(self, root_block_usage_key):
         """
@@ -87,7 +92,9 @@ class BlockStructureCache(object):
                 "Did not find BlockStructure %r in the cache.",
                 root_block_usage_key,
             )
-            return None
+            zp_data_from_cache = self._get_from_store(root_block_usage_key)
+            if not zp_data_from_cache:
+                return None
         else:
             logger.info(
                 "Read BlockStructure %r from cache, size: %s",
@@ -96,18 +103,13 @@ class BlockStructureCache(object):
             )
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
-        block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure.transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
-
-        return block_structure
+        compact_structure = CompactBlockStructure.deserialize(zp_data_from_cache)
+        return compact_structure.to_block_structure(BlockStructureModulestoreData)
 
     def delete(self, root_block_usage_key):
         """
         Deletes the block structure for the given root_block_usage_key
-        from the given cache.
+        from the given cache and from the backing store, if any.
 
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -119,6 +121,70 @@ class BlockStructureCache(object):
             "Deleted BlockStructure %r from the cache.",
             root_block_usage_key,
         )
+        if self._store is not None:
+            self._store.delete(root_block_usage_key)
+            logger.info(
+                "Deleted BlockStructure %r from the store.",
+                root_block_usage_key,
+            )
+
+    def _add_to_cache(self, root_block_usage_key, zp_data_to_cache):
+        """
+        Stores the given serialized data for the given
+        root_block_usage_key in the cache.
+        """
+        # Set the timeout value for the cache to 1 day as a fail-safe
+        # in case the signal to invalidate the cache doesn't come through.
+        timeout_in_seconds = 60 * 60 * 24
+        self._cache.set(
+            self._encode_root_cache_key(root_block_usage_key),
+            zp_data_to_cache,
+            timeout=timeout_in_seconds,
+        )
+
+        logger.info(
+            "Wrote BlockStructure %s to cache, size: %s",
+            root_block_usage_key,
+            len(zp_data_to_cache),
+        )
+
+    def _get_from_store(self, root_block_usage_key):
+        """
+        Returns the serialized data for the given root_block_usage_key
+        from the backing store, repopulating the cache with it.  Returns
+        None if there is no store or the data is not found in it.
+        """
+        if self._store is None:
+            return None
+
+        zp_data_from_store = self._store.get(root_block_usage_key)
+        if not zp_data_from_store:
+            logger.info(
+                "Did not find BlockStructure %r in the store.",
+                root_block_usage_key,
+            )
+            return None
+
+        logger.info(
+            "Read BlockStructure %r from store, size: %s",
+            root_block_usage_key,
+            len(zp_data_from_store),
+        )
+        self._add_to_cache(root_block_usage_key, zp_data_from_store)
+        return zp_data_from_store
+
+    @classmethod
+    def _get_data_edit_timestamp(cls, block_structure):
+        """
+        Returns the time of the last edit to the content from which the
+        given block structure was collected, or None if it is not
+        available from the root xBlock.
+        """
+        try:
+            root_xblock = block_structure.get_xblock(block_structure.root_block_usage_key)
+        except (AttributeError, KeyError):
+            return None
+        return getattr(root_xblock, 'subtree_edited_on', None)
 
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
@@ -0,0 +1,891 @@
+"""
+Module with a compact, array-backed representation of collected block
+structures, which is the format in which BlockStructureCache serializes
+them.
+
+    CompactBlockStructure - A read-only form of a BlockStructureBlockData
+        that interns usage keys into integer indexes, stores parent and
+        child relations in CSR-style arrays and stores xBlock fields and
+        transformer block fields in columns.
+
+Its binary serialization consists of a fixed header, the relation arrays
+as raw little-endian integers and the usage keys and field columns as
+typed columns, rather than a pickle of nested per-block objects:
+
+  * columns of booleans, integers, floats and UTC or naive datetimes are
+    packed as arrays of machine values,
+  * columns of strings and of opaque keys of a single type are packed as
+    an array of lengths followed by the concatenated encoded strings, and
+  * columns of other builtin types, such as lists and dicts, are written
+    with marshal, and
+  * the remaining columns are written with a tagged binary encoding of
+    each value, which packs datetimes and opaque keys as above.
+
+None values are recorded as an array of their positions in each column.
+Values whose types have no binary encoding, such as UserPartitions, are
+pickled individually.
+"""
+from array import array
+import cPickle as pickle
+from datetime import datetime, timedelta
+from itertools import izip
+import marshal
+import struct
+import sys
+import zlib
+
+from opaque_keys import OpaqueKey
+from opaque_keys.edx.keys import AssetKey, CourseKey, DefinitionKey, UsageKey
+from pytz import UTC
+
+from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
+
+from .block_structure import BlockData, BlockStructureBlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+
+# Identifies the serialization format and its version.
+_FORMAT_MAGIC = 'BSC2'
+
+# Header: magic, number of blocks, index of the root block.
+_HEADER_STRUCT = struct.Struct('<4sII')
+
+# Lengths, counts and single integer values.
+_UINT_STRUCT = struct.Struct('<I')
+_INT64_STRUCT = struct.Struct('<q')
+_FLOAT_STRUCT = struct.Struct('<d')
+
+# Array typecode for block indexes, offsets and string lengths.
+_INDEX_TYPECODE = 'i'
+
+# Datetimes are packed as the number of microseconds since the epoch.
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Version of the marshal format of builtin values.
+_MARSHAL_VERSION = 2
+
+# Types of the values that marshal writes and reads back as they were.
+_MARSHAL_TYPES = frozenset([type(None), bool, int, long, float, str, unicode, list, tuple, dict, set, frozenset])
+
+# Classes that parse serialized opaque keys, by the keys' KEY_TYPE.
+_KEY_CLASSES = {key_class.KEY_TYPE: key_class for key_class in (UsageKey, CourseKey, DefinitionKey, AssetKey)}
+
+# Kinds of packed columns.
+_BOOL_COLUMN = 'b'
+_INT_COLUMN = 'i'
+_FLOAT_COLUMN = 'd'
+_STR_COLUMN = 's'
+_UNICODE_COLUMN = 'u'
+_UTC_DATETIME_COLUMN = 'z'
+_NAIVE_DATETIME_COLUMN = 'n'
+_KEY_COLUMN = 'k'
+_MARSHAL_COLUMN = 'm'
+_VALUE_COLUMN = 'v'
+
+# Tags of values in the tagged encoding.
+_NONE_TAG = 'N'
+_TRUE_TAG = 'T'
+_FALSE_TAG = 'F'
+_INT_TAG = 'i'
+_LONG_TAG = 'L'
+_FLOAT_TAG = 'd'
+_STR_TAG = 's'
+_UNICODE_TAG = 'u'
+_LIST_TAG = 'l'
+_TUPLE_TAG = 't'
+_DICT_TAG = 'D'
+_SET_TAG = 'S'
+_FROZENSET_TAG = 'f'
+_UTC_DATETIME_TAG = 'z'
+_NAIVE_DATETIME_TAG = 'n'
+_KEY_TAG = 'k'
+_PICKLE_TAG = 'P'
+
+
+class _Missing(object):
+    """
+    Marker for a block without a value in a field column.
+    """
+    def __repr__(self):
+        return 'MISSING'
+
+
+_MISSING = _Missing()
+
+
+class CompactBlockStructure(object):
+    """
+    A compact, read-only representation of a collected block structure.
+
+    Blocks are identified by integer indexes in the order of a
+    topological traversal from the root, so the root block has index 0.
+    All traversal and filter methods operate on these indexes; use
+    get_index and get_usage_key to convert to and from usage keys.
+    """
+    def __init__(self, usage_keys, root_index, children_offsets, children, parents_offsets, parents):
+        # List of usage keys, indexed by block index.
+        # list [UsageKey]
+        self.usage_keys = usage_keys
+
+        # Map of a block's usage key to its block index.
+        # dict {UsageKey: int}
+        self._index_map = {usage_key: index for index, usage_key in enumerate(usage_keys)}
+
+        self.root_index = root_index
+
+        # CSR-style relations: the children of block i are
+        # children[children_offsets[i]:children_offsets[i + 1]], and
+        # likewise for parents.
+        # array(int)
+        self._children_offsets = children_offsets
+        self._children = children
+        self._parents_offsets = parents_offsets
+        self._parents = parents
+
+        # Indexes of the blocks that have collected data, even if it
+        # holds no fields.
+        # array(int)
+        self._block_data_indexes = array(_INDEX_TYPECODE)
+
+        # Map of a transformer's name to the indexes of the blocks that
+        # have data for the transformer, even if it holds no fields.
+        # dict {string: array(int)}
+        self._transformer_block_data_indexes = {}
+
+        # Map of an xBlock field name to its column of values.
+        # dict {string: list}
+        self._xblock_field_columns = {}
+
+        # Map of a (transformer name, key) pair to its column of values.
+        # dict {(string, string): list}
+        self._transformer_block_field_columns = {}
+
+        # Map of a transformer's name to its non-block-specific data.
+        self.transformer_data = TransformerDataMap()
+
+    def __len__(self):
+        return len(self.usage_keys)
+
+    def __contains__(self, usage_key):
+        return usage_key in self._index_map
+
+    def __iter__(self):
+        return iter(xrange(len(self.usage_keys)))
+
+    @property
+    def root_block_usage_key(self):
+        """
+        The usage key of the root block.
+        """
+        return self.usage_keys[self.root_index]
+
+    #--- Construction ---#
+
+    @classmethod
+    def from_block_structure(cls, block_structure):
+        """
+        Creates and returns a compact representation of the given
+        collected block structure.  Blocks that are unreachable from the
+        root block follow the reachable ones.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The collected
+                block structure.
+        """
+        # pylint: disable=protected-access
+        block_relations = block_structure._block_relations
+        usage_keys = list(block_structure.topological_traversal())
+        reachable = set(usage_keys)
+        usage_keys.extend(usage_key for usage_key in block_relations if usage_key not in reachable)
+        index_map = {usage_key: index for index, usage_key in enumerate(usage_keys)}
+
+        def build_csr(get_related):
+            """
+            Returns the offsets and values arrays of the given relation.
+            """
+            offsets = array(_INDEX_TYPECODE, [0])
+            values = array(_INDEX_TYPECODE)
+            for usage_key in usage_keys:
+                values.extend(index_map[related] for related in get_related(block_relations[usage_key]))
+                offsets.append(len(values))
+            return offsets, values
+
+        children_offsets, children = build_csr(lambda relations: relations.children)
+        parents_offsets, parents = build_csr(lambda relations: relations.parents)
+        compact_structure = cls(usage_keys, 0, children_offsets, children, parents_offsets, parents)
+        compact_structure.transformer_data = block_structure.transformer_data
+
+        num_blocks = len(usage_keys)
+        for index, usage_key in enumerate(usage_keys):
+            block_data = block_structure._block_data_map.get(usage_key)
+            if block_data is None:
+                continue
+            compact_structure._block_data_indexes.append(index)
+            for field_name, value in block_data.fields.iteritems():
+                _get_column(compact_structure._xblock_field_columns, field_name, num_blocks)[index] = value
+            for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+                compact_structure._transformer_block_data_indexes.setdefault(
+                    transformer_name, array(_INDEX_TYPECODE)
+                ).append(index)
+                for key, value in transformer_data.fields.iteritems():
+                    _get_column(
+                        compact_structure._transformer_block_field_columns, (transformer_name, key), num_blocks
+                    )[index] = value
+        return compact_structure
+
+    def to_block_structure(self, block_structure_class=BlockStructureBlockData):
+        """
+        Creates and returns a mutable block structure of the given class
+        with the same blocks, relations and collected data as this
+        compact structure.
+        """
+        # pylint: disable=protected-access
+        usage_keys = self.usage_keys
+        block_structure = block_structure_class(self.root_block_usage_key)
+
+        block_relations = {}
+        for index, usage_key in enumerate(usage_keys):
+            relations = _BlockRelations()
+            relations.children = [usage_keys[child] for child in self.get_children(index)]
+            relations.parents = [usage_keys[parent] for parent in self.get_parents(index)]
+            block_relations[usage_key] = relations
+        block_structure._block_relations = block_relations
+        block_structure.transformer_data = self.transformer_data
+
+        # The BlockData of each block, and the maps of the fields of its
+        # data and of its transformer data, by block index.  The maps of
+        # transformer data are keyed on transformer names, so their
+        # translation of keys is bypassed.
+        num_blocks = len(usage_keys)
+        block_datas = [None] * num_blocks
+        for index in self._block_data_indexes:
+            block_datas[index] = _create_field_data(
+                BlockData, location=usage_keys[index], fields={}, transformer_data=TransformerDataMap()
+            )
+        block_fields = [block_data.fields if block_data is not None else None for block_data in block_datas]
+        transformer_block_fields = {}
+        for transformer_name, indexes in self._transformer_block_data_indexes.iteritems():
+            transformer_fields = transformer_block_fields[transformer_name] = [None] * num_blocks
+            for index in indexes:
+                transformer_block_data = _create_field_data(TransformerData, fields={})
+                dict.__setitem__(block_datas[index].transformer_data, transformer_name, transformer_block_data)
+                transformer_fields[index] = transformer_block_data.fields
+
+        for field_name, column in self._xblock_field_columns.iteritems():
+            for fields, value in izip(block_fields, column):
+                if value is not _MISSING:
+                    fields[field_name] = value
+        for (transformer_name, key), column in self._transformer_block_field_columns.iteritems():
+            for fields, value in izip(transformer_block_fields[transformer_name], column):
+                if value is not _MISSING:
+                    fields[key] = value
+        block_structure._block_data_map = {
+            usage_keys[index]: block_datas[index] for index in self._block_data_indexes
+        }
+        return block_structure
+
+    #--- Accessors ---#
+
+    def get_index(self, usage_key):
+        """
+        Returns the block index of the given usage key.
+
+        Raises KeyError if the block is not in the structure.
+        """
+        return self._index_map[usage_key]
+
+    def get_usage_key(self, index):
+        """
+        Returns the usage key of the block with the given index.
+        """
+        return self.usage_keys[index]
+
+    def get_children(self, index):
+        """
+        Returns an array of the indexes of the children of the block
+        with the given index.
+        """
+        return self._children[self._children_offsets[index]:self._children_offsets[index + 1]]
+
+    def get_parents(self, index):
+        """
+        Returns an array of the indexes of the parents of the block
+        with the given index.
+        """
+        return self._parents[self._parents_offsets[index]:self._parents_offsets[index + 1]]
+
+    def get_xblock_field(self, index, field_name, default=None):
+        """
+        Returns the collected value of the xBlock field for the block
+        with the given index; returns default if not found.
+        """
+        return _get_value(self._xblock_field_columns.get(field_name), index, default)
+
+    def get_transformer_block_field(self, index, transformer, key, default=None):
+        """
+        Returns the value associated with the given key for the given
+        transformer for the block with the given index; returns default
+        if not found.
+        """
+        column = self._transformer_block_field_columns.get((_transformer_name(transformer), key))
+        return _get_value(column, index, default)
+
+    def get_transformer_data(self, transformer, key, default=None):
+        """
+        Returns the value associated with the given key from the given
+        transformer's non-block-specific data; returns default if not
+        found.
+        """
+        try:
+            return getattr(self.transformer_data[transformer], key, default)
+        except KeyError:
+            return default
+
+    #--- Traversal methods ---#
+
+    def topological_traversal(self, filter_func=None, yield_descendants_of_unyielded=False, start_index=None):
+        """
+        Performs a topological sort of the structure and yields the index
+        of each block as it is encountered.
+
+        Arguments:
+            filter_func ((int)->bool) - Function that returns whether or
+                not to yield the block with the given index.
+
+            See the description of the other arguments in
+            openedx.core.lib.graph_traversals.traverse_topologically.
+        """
+        return traverse_topologically(
+            start_node=self.root_index if start_index is None else start_index,
+            get_parents=self.get_parents,
+            get_children=self.get_children,
+            filter_func=filter_func,
+            yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+        )
+
+    def post_order_traversal(self, filter_func=None, start_index=None):
+        """
+        Performs a post-order sort of the structure and yields the index
+        of each block as it is encountered.
+
+        Arguments:
+            filter_func ((int)->bool) - Function that returns whether or
+                not to yield the block with the given index.
+
+            start_index (int) - The index of the block from which to
+                start the traversal.  Defaults to the root block.
+        """
+        return traverse_post_order(
+            start_node=self.root_index if start_index is None else start_index,
+            get_children=self.get_children,
+            filter_func=filter_func,
+        )
+
+    def filter_blocks(self, filter_func, start_index=None):
+        """
+        Returns the set of indexes of the blocks that are retained by a
+        topological traversal with the given filter.  Descendants of
+        blocks that are not retained are not retained either.
+
+        Arguments:
+            filter_func ((int)->bool) - Function that returns whether or
+                not to retain the block with the given index.
+        """
+        return set(self.topological_traversal(filter_func=filter_func, start_index=start_index))
+
+    #--- Serialization ---#
+
+    def serialize(self):
+        """
+        Returns a compressed binary serialization of this structure.
+        """
+        writer = _Writer()
+        writer.write(_HEADER_STRUCT.pack(_FORMAT_MAGIC, len(self.usage_keys), self.root_index))
+        writer.write_values(self.usage_keys)
+        for values in (self._children_offsets, self._children, self._parents_offsets, self._parents):
+            writer.write_array(values)
+        writer.write_array(self._block_data_indexes)
+
+        writer.write_uint(len(self._transformer_block_data_indexes))
+        for transformer_name, indexes in sorted(self._transformer_block_data_indexes.iteritems()):
+            writer.write_value(transformer_name)
+            writer.write_array(indexes)
+
+        writer.write_uint(len(self.transformer_data))
+        for transformer_name, transformer_data in sorted(self.transformer_data.iteritems()):
+            writer.write_value(transformer_name)
+            writer.write_value(transformer_data.fields)
+
+        for columns in (self._xblock_field_columns, self._transformer_block_field_columns):
+            writer.write_uint(len(columns))
+            for name, column in sorted(columns.iteritems()):
+                writer.write_value(name)
+                writer.write_column(column)
+        return zlib.compress(writer.getvalue())
+
+    @classmethod
+    def deserialize(cls, data):
+        """
+        Returns the CompactBlockStructure serialized in the given data.
+
+        Arguments:
+            data (str) - The output of a prior call to serialize.
+
+        Raises:
+            ValueError - if the data is not in the expected format.
+        """
+        try:
+            payload = zlib.decompress(data)
+            magic, num_blocks, root_index = _HEADER_STRUCT.unpack_from(payload)
+        except (zlib.error, struct.error) as error:
+            raise ValueError('Invalid CompactBlockStructure data: {}'.format(error))
+        if magic != _FORMAT_MAGIC:
+            raise ValueError('Unsupported CompactBlockStructure format: {!r}'.format(magic))
+
+        reader = _Reader(payload, _HEADER_STRUCT.size)
+        usage_keys = reader.read_values()
+        compact_structure = cls(
+            usage_keys,
+            root_index,
+            reader.read_array(),
+            reader.read_array(),
+            reader.read_array(),
+            reader.read_array(),
+        )
+        # pylint: disable=protected-access
+        compact_structure._block_data_indexes = reader.read_array()
+
+        for __ in xrange(reader.read_uint()):
+            transformer_name = reader.read_value()
+            compact_structure._transformer_block_data_indexes[transformer_name] = reader.read_array()
+
+        for __ in xrange(reader.read_uint()):
+            transformer_name = reader.read_value()
+            transformer_data = TransformerData()
+            transformer_data.fields = reader.read_value()
+            compact_structure.transformer_data[transformer_name] = transformer_data
+
+        for columns in (compact_structure._xblock_field_columns, compact_structure._transformer_block_field_columns):
+            for __ in xrange(reader.read_uint()):
+                name = reader.read_value()
+                columns[name] = reader.read_column(num_blocks)
+        return compact_structure
+
+
+class _Writer(object):
+    """
+    Writes the binary serialization of a CompactBlockStructure.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def getvalue(self):
+        """
+        Returns the bytes written so far.
+        """
+        return ''.join(self._chunks)
+
+    def write(self, data):
+        """
+        Writes the given bytes.
+        """
+        self._chunks.append(data)
+
+    def write_uint(self, value):
+        """
+        Writes the given non-negative integer.
+        """
+        self._chunks.append(_UINT_STRUCT.pack(value))
+
+    def write_bytes(self, data):
+        """
+        Writes the given bytes, prefixed by their length.
+        """
+        self.write_uint(len(data))
+        self._chunks.append(data)
+
+    def write_array(self, values):
+        """
+        Writes the given integers as a little-endian index array.
+        """
+        values = array(_INDEX_TYPECODE, values)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        self.write_bytes(values.tostring())
+
+    def write_column(self, column):
+        """
+        Writes the given sparse column of block values: the indexes of
+        the blocks with values, followed by their values.
+        """
+        indexes = array(_INDEX_TYPECODE, (index for index, value in enumerate(column) if value is not _MISSING))
+        self.write_array(indexes)
+        self.write_values([column[index] for index in indexes])
+
+    def write_values(self, values):
+        """
+        Writes the given list of values, packed according to their common
+        type.
+        """
+        none_positions = [position for position, value in enumerate(values) if value is None]
+        if none_positions:
+            values = [value for value in values if value is not None]
+        self.write_array(none_positions)
+        self.write_uint(len(values))
+
+        kind = _get_column_kind(values)
+        self.write(kind)
+        if kind == _BOOL_COLUMN:
+            self.write_bytes(array('b', values).tostring())
+        elif kind == _INT_COLUMN:
+            self.write(struct.pack('<{}q'.format(len(values)), *values))
+        elif kind == _FLOAT_COLUMN:
+            self.write(struct.pack('<{}d'.format(len(values)), *values))
+        elif kind in (_UTC_DATETIME_COLUMN, _NAIVE_DATETIME_COLUMN):
+            epoch = _UTC_EPOCH if kind == _UTC_DATETIME_COLUMN else _NAIVE_EPOCH
+            self.write(struct.pack('<{}q'.format(len(values)), *(_to_microseconds(value - epoch) for value in values)))
+        elif kind == _STR_COLUMN:
+            self._write_strings(values)
+        elif kind == _UNICODE_COLUMN:
+            self._write_strings([value.encode('utf-8') for value in values])
+        elif kind == _KEY_COLUMN:
+            self.write_value(values[0].KEY_TYPE)
+            self._write_strings([unicode(value).encode('utf-8') for value in values])
+        elif kind == _MARSHAL_COLUMN:
+            self.write_bytes(marshal.dumps(values, _MARSHAL_VERSION))
+        else:
+            for value in values:
+                self.write_value(value)
+
+    def write_value(self, value):
+        """
+        Writes the given value with the tagged encoding.
+        """
+        value_type = type(value)
+        if value is None:
+            self.write(_NONE_TAG)
+        elif value is True:
+            self.write(_TRUE_TAG)
+        elif value is False:
+            self.write(_FALSE_TAG)
+        elif value_type is int:
+            self.write(_INT_TAG + _INT64_STRUCT.pack(value))
+        elif value_type is long:
+            self.write(_LONG_TAG)
+            self.write_bytes(str(value))
+        elif value_type is float:
+            self.write(_FLOAT_TAG + _FLOAT_STRUCT.pack(value))
+        elif value_type is str:
+            self.write(_STR_TAG)
+            self.write_bytes(value)
+        elif value_type is unicode:
+            self.write(_UNICODE_TAG)
+            self.write_bytes(value.encode('utf-8'))
+        elif value_type in (list, tuple, set, frozenset):
+            self.write(_SEQUENCE_TAGS[value_type])
+            self.write_uint(len(value))
+            for item in value:
+                self.write_value(item)
+        elif value_type is dict:
+            self.write(_DICT_TAG)
+            self.write_uint(len(value))
+            for key, item in value.iteritems():
+                self.write_value(key)
+                self.write_value(item)
+        elif _is_utc_datetime(value):
+            self.write(_UTC_DATETIME_TAG + _INT64_STRUCT.pack(_to_microseconds(value - _UTC_EPOCH)))
+        elif _is_naive_datetime(value):
+            self.write(_NAIVE_DATETIME_TAG + _INT64_STRUCT.pack(_to_microseconds(value - _NAIVE_EPOCH)))
+        elif _is_serializable_key(value):
+            self.write(_KEY_TAG)
+            self.write_bytes(value.KEY_TYPE)
+            self.write_bytes(unicode(value).encode('utf-8'))
+        else:
+            self.write(_PICKLE_TAG)
+            self.write_bytes(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _write_strings(self, values):
+        """
+        Writes the given byte strings as an array of their lengths
+        followed by their concatenation.
+        """
+        self.write_array([len(value) for value in values])
+        self.write_bytes(''.join(values))
+
+
+class _Reader(object):
+    """
+    Reads the binary serialization of a CompactBlockStructure.
+    """
+    def __init__(self, data, offset=0):
+        self._data = data
+        self._offset = offset
+
+    def read(self, size):
+        """
+        Reads the given number of bytes.
+        """
+        start = self._offset
+        self._offset += size
+        if self._offset > len(self._data):
+            raise ValueError('Truncated CompactBlockStructure data.')
+        return self._data[start:self._offset]
+
+    def read_uint(self):
+        """
+        Reads a non-negative integer.
+        """
+        return _UINT_STRUCT.unpack(self.read(_UINT_STRUCT.size))[0]
+
+    def read_bytes(self):
+        """
+        Reads bytes prefixed by their length.
+        """
+        return self.read(self.read_uint())
+
+    def read_array(self):
+        """
+        Reads a little-endian index array.
+        """
+        values = array(_INDEX_TYPECODE)
+        values.fromstring(self.read_bytes())
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def read_column(self, num_blocks):
+        """
+        Reads a sparse column of block values.
+        """
+        indexes = self.read_array()
+        column = [_MISSING] * num_blocks
+        for index, value in izip(indexes, self.read_values()):
+            column[index] = value
+        return column
+
+    def read_values(self):
+        """
+        Reads a list of values written by _Writer.write_values.
+        """
+        none_positions = self.read_array()
+        count = self.read_uint()
+        kind = self.read(1)
+        if kind == _BOOL_COLUMN:
+            packed = array('b')
+            packed.fromstring(self.read_bytes())
+            values = [bool(value) for value in packed]
+        elif kind == _INT_COLUMN:
+            values = list(struct.unpack('<{}q'.format(count), self.read(8 * count)))
+        elif kind == _FLOAT_COLUMN:
+            values = list(struct.unpack('<{}d'.format(count), self.read(8 * count)))
+        elif kind in (_UTC_DATETIME_COLUMN, _NAIVE_DATETIME_COLUMN):
+            epoch = _UTC_EPOCH if kind == _UTC_DATETIME_COLUMN else _NAIVE_EPOCH
+            values = [
+                epoch + timedelta(microseconds=microseconds)
+                for microseconds in struct.unpack('<{}q'.format(count), self.read(8 * count))
+            ]
+        elif kind == _STR_COLUMN:
+            values = self._read_strings()
+        elif kind == _UNICODE_COLUMN:
+            values = [value.decode('utf-8') for value in self._read_strings()]
+        elif kind == _KEY_COLUMN:
+            from_string = _KEY_CLASSES[self.read_value()].from_string
+            values = [from_string(value.decode('utf-8')) for value in self._read_strings()]
+        elif kind == _MARSHAL_COLUMN:
+            values = marshal.loads(self.read_bytes())
+        elif kind == _VALUE_COLUMN:
+            values = [self.read_value() for __ in xrange(count)]
+        else:
+            raise ValueError('Unsupported CompactBlockStructure column: {!r}'.format(kind))
+
+        if none_positions:
+            none_positions = set(none_positions)
+            present_values = iter(values)
+            values = [
+                None if position in none_positions else next(present_values)
+                for position in xrange(count + len(none_positions))
+            ]
+        return values
+
+    def read_value(self):
+        """
+        Reads a value written with the tagged encoding.
+        """
+        tag = self.read(1)
+        if tag == _NONE_TAG:
+            return None
+        elif tag == _TRUE_TAG:
+            return True
+        elif tag == _FALSE_TAG:
+            return False
+        elif tag == _INT_TAG:
+            return _INT64_STRUCT.unpack(self.read(_INT64_STRUCT.size))[0]
+        elif tag == _LONG_TAG:
+            return long(self.read_bytes())
+        elif tag == _FLOAT_TAG:
+            return _FLOAT_STRUCT.unpack(self.read(_FLOAT_STRUCT.size))[0]
+        elif tag == _STR_TAG:
+            return self.read_bytes()
+        elif tag == _UNICODE_TAG:
+            return self.read_bytes().decode('utf-8')
+        elif tag in _SEQUENCE_TYPES:
+            return _SEQUENCE_TYPES[tag](self.read_value() for __ in xrange(self.read_uint()))
+        elif tag == _DICT_TAG:
+            value = {}
+            for __ in xrange(self.read_uint()):
+                # Keys are written before their values.
+                key = self.read_value()
+                value[key] = self.read_value()
+            return value
+        elif tag == _UTC_DATETIME_TAG:
+            return _UTC_EPOCH + timedelta(microseconds=_INT64_STRUCT.unpack(self.read(_INT64_STRUCT.size))[0])
+        elif tag == _NAIVE_DATETIME_TAG:
+            return _NAIVE_EPOCH + timedelta(microseconds=_INT64_STRUCT.unpack(self.read(_INT64_STRUCT.size))[0])
+        elif tag == _KEY_TAG:
+            key_class = _KEY_CLASSES[self.read_bytes()]
+            return key_class.from_string(self.read_bytes().decode('utf-8'))
+        elif tag == _PICKLE_TAG:
+            return pickle.loads(self.read_bytes())
+        raise ValueError('Unsupported CompactBlockStructure value: {!r}'.format(tag))
+
+    def _read_strings(self):
+        """
+        Reads byte strings written by _Writer._write_strings.
+        """
+        lengths = self.read_array()
+        data = self.read_bytes()
+        values = []
+        offset = 0
+        for length in lengths:
+            values.append(data[offset:offset + length])
+            offset += length
+        return values
+
+
+_SEQUENCE_TAGS = {list: _LIST_TAG, tuple: _TUPLE_TAG, set: _SET_TAG, frozenset: _FROZENSET_TAG}
+_SEQUENCE_TYPES = {tag: sequence_type for sequence_type, tag in _SEQUENCE_TAGS.iteritems()}
+
+
+def _get_column_kind(values):
+    """
+    Returns the kind of packed column in which the given non-None values
+    can be written.
+    """
+    if not values:
+        return _VALUE_COLUMN
+    value_types = set(type(value) for value in values)
+    if len(value_types) != 1:
+        return _MARSHAL_COLUMN if all(_is_marshallable(value) for value in values) else _VALUE_COLUMN
+
+    value_type = value_types.pop()
+    if value_type is bool:
+        return _BOOL_COLUMN
+    if value_type is int:
+        return _INT_COLUMN
+    if value_type is float:
+        return _FLOAT_COLUMN
+    if value_type is str:
+        return _STR_COLUMN
+    if value_type is unicode:
+        return _UNICODE_COLUMN
+    if all(_is_utc_datetime(value) for value in values):
+        return _UTC_DATETIME_COLUMN
+    if all(_is_naive_datetime(value) for value in values):
+        return _NAIVE_DATETIME_COLUMN
+    if all(_is_serializable_key(value) for value in values):
+        return _KEY_COLUMN
+    if all(_is_marshallable(value) for value in values):
+        return _MARSHAL_COLUMN
+    return _VALUE_COLUMN
+
+
+def _is_marshallable(value):
+    """
+    Returns whether the given value, and any values it contains, are of
+    types that marshal reads back as they were.  Subclasses, such as
+    OrderedDicts, are not.
+    """
+    value_type = type(value)
+    if value_type not in _MARSHAL_TYPES:
+        return False
+    if value_type is dict:
+        return all(_is_marshallable(key) and _is_marshallable(item) for key, item in value.iteritems())
+    if value_type in _SEQUENCE_TAGS:
+        return all(_is_marshallable(item) for item in value)
+    return True
+
+
+def _is_utc_datetime(value):
+    """
+    Returns whether the given value is a datetime in pytz's UTC.
+    """
+    return type(value) is datetime and value.tzinfo is UTC
+
+
+def _is_naive_datetime(value):
+    """
+    Returns whether the given value is a datetime without a timezone.
+    """
+    return type(value) is datetime and value.tzinfo is None
+
+
+def _is_serializable_key(value):
+    """
+    Returns whether the given value is an opaque key that is parsed back
+    into an equal key of the same class from its string.
+    """
+    if not isinstance(value, OpaqueKey) or getattr(value, 'KEY_TYPE', None) not in _KEY_CLASSES:
+        return False
+    try:
+        parsed_value = _KEY_CLASSES[value.KEY_TYPE].from_string(unicode(value))
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return type(parsed_value) is type(value) and parsed_value == value
+
+
+def _to_microseconds(delta):
+    """
+    Returns the number of microseconds of the given timedelta.
+    """
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _create_field_data(field_data_class, **attributes):
+    """
+    Returns a new FieldData of the given class with the given attributes,
+    which are set directly rather than through FieldData.__setattr__.
+    """
+    field_data = field_data_class.__new__(field_data_class)
+    field_data.__dict__.update(attributes)
+    return field_data
+
+
+def _get_column(columns, name, num_blocks):
+    """
+    Returns the column with the given name, creating it if needed.
+    """
+    column = columns.get(name)
+    if column is None:
+        column = columns[name] = [_MISSING] * num_blocks
+    return column
+
+
+def _get_value(column, index, default):
+    """
+    Returns the value at the given index of the given column, or
+    default if there is no such value.
+    """
+    if column is None:
+        return default
+    value = column[index]
+    return default if value is _MISSING else value
+
+
+def _transformer_name(transformer):
+    """
+    Returns the name of the given transformer class, instance or name.
+    """
+    try:
+        return transformer.name()
+    except AttributeError:
+        return transformer
@@ -15,7 +15,7 @@ class BlockStructureManager(object):
     Top-level class for managing Block Structures.
     """
 
-    def __init__(self, root_block_usage_key, modulestore, cache):
+    def __init__(self, root_block_usage_key, modulestore, cache, store=None):
         """
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -28,10 +28,13 @@ class BlockStructureManager(object):
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache to use for storing/retrieving the block structure's
                 collected data.
+
+            store (object) - An optional durable store backing the
+                cache.  See BlockStructureCache for its interface.
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
-        self.block_structure_cache = BlockStructureCache(cache)
+        self.block_structure_cache = BlockStructureCache(cache, store)
 
     def get_transformed(self, transformers, starting_block_usage_key=None):
         """
@@ -75,8 +78,8 @@ class BlockStructureManager(object):
         getting block data from the cache and modulestore, as needed.
 
         Details: The cache is updated if needed (if outdated or empty),
-        the modulestore is accessed if needed (at cache miss), and the
-        transformers data is collected if needed.
+        the modulestore is accessed if needed (at cache and store miss),
+        and the transformers data is collected if needed.
 
         Returns:
             BlockStructureBlockData - A collected block structure,
@@ -89,32 +92,53 @@ class BlockStructureManager(object):
         )
         cache_miss = block_structure is None
         if cache_miss or BlockStructureTransformers.is_collected_outdated(block_structure):
-            with self._bulk_operations():
-                block_structure = BlockStructureFactory.create_from_modulestore(
-                    self.root_block_usage_key,
-                    self.modulestore
-                )
-                BlockStructureTransformers.collect(block_structure)
-                self.block_structure_cache.add(block_structure)
+            block_structure = self._collect_from_modulestore()
         return block_structure
 
     def update_collected(self):
         """
         Updates the collected Block Structure for the root_block_usage_key.
 
-        Details: The cache is cleared and updated by collecting transformers
-        data from the modulestore.
+        Details: The cache (and store, if any) is overwritten with newly
+        collected transformers data from the modulestore.  Previously
+        stored data remains available to readers until then, and is
+        reused for the blocks that are unaffected by any changes since
+        its collection.
         """
-        self.clear()
-        self.get_collected()
+        previous_block_structure = self.block_structure_cache.get(self.root_block_usage_key)
+        self._collect_from_modulestore(previous_block_structure)
 
     def clear(self):
         """
-        Removes cached data for the block structure associated with the given
-        root block key.
+        Removes cached and stored data for the block structure associated
+        with the given root block key.
         """
         self.block_structure_cache.delete(self.root_block_usage_key)
 
+    def _collect_from_modulestore(self, previous_block_structure=None):
+        """
+        Creates the block structure from the modulestore, collects the
+        data of all registered transformers and writes the result to the
+        cache.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A
+                previously collected block structure whose data is to be
+                reused where possible, or None to collect all data anew.
+
+        Returns:
+            BlockStructureModulestoreData - The newly collected block
+                structure.
+        """
+        with self._bulk_operations():
+            block_structure = BlockStructureFactory.create_from_modulestore(
+                self.root_block_usage_key,
+                self.modulestore
+            )
+            BlockStructureTransformers.collect_incrementally(block_structure, previous_block_structure)
+            self.block_structure_cache.add(block_structure)
+        return block_structure
+
     @contextmanager
     def _bulk_operations(self):
         """
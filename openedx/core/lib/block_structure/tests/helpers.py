@@ -109,6 +109,41 @@ class MockCache(object):
         del self.map[key]
 
 
+class MockStore(object):
+    """
+    A mock durable Block Structure store, providing only the minimum
+    features needed by the block cache framework.
+    """
+    def __init__(self):
+        # An in-memory map of root block keys to a tuple of the schema
+        # version and serialized data.
+        self.map = {}
+        self.set_call_count = 0
+        self.get_call_count = 0
+
+    def set(self, root_block_usage_key, serialized_data, data_edit_timestamp):  # pylint: disable=unused-argument
+        """
+        Associates the given root block key with the given data.
+        """
+        self.set_call_count += 1
+        self.map[root_block_usage_key] = (BlockStructureBlockData.VERSION, serialized_data)
+
+    def get(self, root_block_usage_key):
+        """
+        Returns the data associated with the given root block key;
+        returns None if not found or stored with an outdated schema.
+        """
+        self.get_call_count += 1
+        version, serialized_data = self.map.get(root_block_usage_key, (None, None))
+        return serialized_data if version == BlockStructureBlockData.VERSION else None
+
+    def delete(self, root_block_usage_key):
+        """
+        Deletes the given root block key from the store.
+        """
+        self.map.pop(root_block_usage_key, None)
+
+
 class MockModulestoreFactory(object):
     """
     A factory for creating MockModulestore objects.
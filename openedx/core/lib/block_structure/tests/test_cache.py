@@ -5,7 +5,7 @@ from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from ..cache import BlockStructureCache
-from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer
+from .helpers import ChildrenMapTestMixin, MockCache, MockStore, MockTransformer
 
 
 @attr('shard_2')
@@ -54,3 +54,49 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         self.assertIsNone(
             self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         )
+
+
+@attr('shard_2')
+class TestBlockStructureCacheWithStore(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureCache backed by a durable store
+    """
+    def setUp(self):
+        super(TestBlockStructureCacheWithStore, self).setUp()
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.mock_cache = MockCache()
+        self.mock_store = MockStore()
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, self.mock_store)
+
+    def test_add_writes_through(self):
+        self.block_structure_cache.add(self.block_structure)
+        self.assertEquals(self.mock_cache.set_call_count, 1)
+        self.assertEquals(self.mock_store.set_call_count, 1)
+
+    def test_get_reads_through_on_cache_miss(self):
+        self.block_structure_cache.add(self.block_structure)
+        self.mock_cache.map.clear()
+
+        stored_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        self.assertIsNotNone(stored_value)
+        self.assert_block_structure(stored_value, self.children_map)
+        self.assertEquals(self.mock_store.get_call_count, 1)
+
+        # The cache is repopulated from the store.
+        self.assertEquals(self.mock_cache.set_call_count, 2)
+        self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        self.assertEquals(self.mock_store.get_call_count, 1)
+
+    def test_get_none(self):
+        self.assertIsNone(
+            self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        )
+        self.assertEquals(self.mock_store.get_call_count, 1)
+
+    def test_delete(self):
+        self.block_structure_cache.add(self.block_structure)
+        self.block_structure_cache.delete(self.block_structure.root_block_usage_key)
+        self.assertIsNone(
+            self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        )
@@ -0,0 +1,216 @@
+"""
+Tests for block_structure/compact.py
+"""
+from collections import OrderedDict
+from datetime import datetime
+import zlib
+
+import ddt
+from nose.plugins.attrib import attr
+from opaque_keys.edx.keys import CourseKey, UsageKey
+from pytz import UTC
+from unittest import TestCase
+
+from ..block_structure import BlockStructureBlockData, BlockStructureModulestoreData
+from ..compact import CompactBlockStructure
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@attr('shard_2')
+@ddt.ddt
+class TestCompactBlockStructure(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for CompactBlockStructure
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        xBlock fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        block_structure.set_transformer_data(MockTransformer, 'course_wide', 'value')
+        for block_key in block_structure:
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = u'Block {}'.format(block_key)
+            if block_key % 2:
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', [block_key])
+        return block_structure
+
+    def round_trip(self, block_structure, block_structure_class=BlockStructureBlockData):
+        """
+        Returns the given block structure after serializing and
+        deserializing it.
+        """
+        serialized = CompactBlockStructure.from_block_structure(block_structure).serialize()
+        return CompactBlockStructure.deserialize(serialized).to_block_structure(block_structure_class)
+
+    def assert_compact_structure(self, compact_structure, block_structure, children_map):
+        """
+        Verifies the relations and collected data of the given compact
+        structure against the given block structure.
+        """
+        self.assertEquals(len(compact_structure), len(children_map))
+        self.assertEquals(compact_structure.root_block_usage_key, 0)
+        self.assertEquals(compact_structure.get_transformer_data(MockTransformer, 'course_wide'), 'value')
+        for block_key, children in enumerate(children_map):
+            index = compact_structure.get_index(block_key)
+            self.assertEquals(
+                [compact_structure.get_usage_key(child) for child in compact_structure.get_children(index)],
+                children,
+            )
+            self.assertEquals(
+                [compact_structure.get_usage_key(parent) for parent in compact_structure.get_parents(index)],
+                block_structure.get_parents(block_key),
+            )
+            self.assertEquals(
+                compact_structure.get_xblock_field(index, 'display_name'),
+                block_structure.get_xblock_field(block_key, 'display_name'),
+            )
+            self.assertEquals(
+                compact_structure.get_transformer_block_field(index, MockTransformer, 'odd', 'default'),
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd', 'default'),
+            )
+
+    def assert_same_data(self, new_block_structure, block_structure):
+        """
+        Verifies that the given block structures have the same blocks,
+        relations and collected data.
+        """
+        # pylint: disable=protected-access
+        self.assertEquals(new_block_structure.root_block_usage_key, block_structure.root_block_usage_key)
+        self.assertEquals(set(new_block_structure), set(block_structure))
+        for block_key in block_structure:
+            self.assertEquals(new_block_structure.get_children(block_key), block_structure.get_children(block_key))
+            self.assertEquals(new_block_structure.get_parents(block_key), block_structure.get_parents(block_key))
+        self.assertEquals(set(new_block_structure._block_data_map), set(block_structure._block_data_map))
+        for block_key, block_data in block_structure.iteritems():
+            new_block_data = new_block_structure[block_key]
+            self.assertEquals(new_block_data.location, block_key)
+            self.assertEquals(new_block_data.fields, block_data.fields)
+            self.assertEquals(set(new_block_data.transformer_data), set(block_data.transformer_data))
+            for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+                self.assertEquals(new_block_data.transformer_data[transformer_name].fields, transformer_data.fields)
+        self.assertEquals(set(new_block_structure.transformer_data), set(block_structure.transformer_data))
+        for transformer_name, transformer_data in block_structure.transformer_data.iteritems():
+            self.assertEquals(new_block_structure.transformer_data[transformer_name].fields, transformer_data.fields)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_from_block_structure(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        self.assert_compact_structure(compact_structure, block_structure, children_map)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_serialization(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        serialized = CompactBlockStructure.from_block_structure(block_structure).serialize()
+        compact_structure = CompactBlockStructure.deserialize(serialized)
+        self.assert_compact_structure(compact_structure, block_structure, children_map)
+
+    def test_deserialize_invalid(self):
+        with self.assertRaises(ValueError):
+            CompactBlockStructure.deserialize(zlib.compress('not a serialized structure'))
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_to_block_structure(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        new_block_structure = self.round_trip(block_structure, BlockStructureModulestoreData)
+        self.assertIsInstance(new_block_structure, BlockStructureModulestoreData)
+        self.assert_block_structure(new_block_structure, children_map)
+        self.assert_same_data(new_block_structure, block_structure)
+
+    def test_root_without_children_or_fields(self):
+        block_structure = BlockStructureBlockData(root_block_usage_key=0)
+        block_structure._get_or_create_block(0)  # pylint: disable=protected-access
+        new_block_structure = self.round_trip(block_structure)
+        self.assertEquals(list(new_block_structure), [0])
+        self.assertIsNotNone(new_block_structure[0])
+        self.assert_same_data(new_block_structure, block_structure)
+
+    def test_empty_transformer_block_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_data = block_structure._get_or_create_block(1)  # pylint: disable=protected-access
+        block_data.transformer_data.get_or_create(MockTransformer)
+        new_block_structure = self.round_trip(block_structure)
+        self.assertEquals(new_block_structure.get_transformer_block_data(1, MockTransformer).fields, {})
+        self.assert_same_data(new_block_structure, block_structure)
+
+    def test_unreachable_blocks(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure._add_relation(5, 6)  # pylint: disable=protected-access
+        self.assert_same_data(self.round_trip(block_structure), block_structure)
+
+    def test_field_types(self):
+        usage_key = UsageKey.from_string('block-v1:edX+DemoX+Demo_Course+type@problem+block@test')
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.set_transformer_data(MockTransformer, 'ordered', OrderedDict([('a', 1), ('b', 2)]))
+        field_values = {
+            'bool': [True, False, None, True, False],
+            'int': [1, -2, 2 ** 40, None, 0],
+            'long': [2 ** 70, 1L, None, 0L, 3L],
+            'float': [0.5, None, -1.25, 1e100, 0.0],
+            'str': ['problem', '', None, 'a\nb', 'c'],
+            'unicode': [u'\xe9t\xe9', u'', u'a', None, u'b'],
+            'utc_datetime': [datetime(2016, 3, 14, 15, 9, 26, 535, tzinfo=UTC), None, datetime(1900, 1, 1, tzinfo=UTC),
+                             datetime(2016, 1, 1, tzinfo=UTC), None],
+            'naive_datetime': [datetime(2016, 3, 14, 15, 9, 26), None, None, datetime(1969, 12, 31), None],
+            'key': [usage_key, None, usage_key, usage_key, None],
+            'course_key': [usage_key.course_key, None, None, None, usage_key.course_key],
+            'builtins': [{1: [2, 3]}, (u'a', 'b'), set([1]), frozenset(['x']), {'a': {'b': None}}],
+            'mixed': [[usage_key], {u'start': datetime(2016, 1, 1, tzinfo=UTC)}, OrderedDict(a=1), 'a', 1],
+        }
+        for field_name, values in field_values.iteritems():
+            for block_key, value in enumerate(values):
+                if value is not None or block_key % 2:
+                    block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+                    setattr(block_data, field_name, value)
+                block_structure.set_transformer_block_field(block_key, MockTransformer, field_name, value)
+
+        new_block_structure = self.round_trip(block_structure)
+        self.assert_same_data(new_block_structure, block_structure)
+        for field_name, values in field_values.iteritems():
+            for block_key, value in enumerate(values):
+                new_value = new_block_structure.get_transformer_block_field(block_key, MockTransformer, field_name)
+                self.assertIs(type(new_value), type(value))
+        self.assertIs(new_block_structure.get_transformer_block_field(0, MockTransformer, 'utc_datetime').tzinfo, UTC)
+        self.assertIsInstance(
+            new_block_structure.get_transformer_block_field(4, MockTransformer, 'course_key'),
+            CourseKey,
+        )
+        self.assertIsInstance(new_block_structure.get_transformer_data(MockTransformer, 'ordered'), OrderedDict)
+
+    def test_traversals(self):
+        block_structure = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        to_keys = lambda indexes: [compact_structure.get_usage_key(index) for index in indexes]
+
+        self.assertEquals(
+            to_keys(compact_structure.topological_traversal()),
+            list(block_structure.topological_traversal()),
+        )
+        self.assertEquals(
+            to_keys(compact_structure.post_order_traversal()),
+            list(block_structure.post_order_traversal()),
+        )
+
+    def test_filter_blocks(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        removed_index = compact_structure.get_index(1)
+        retained = compact_structure.filter_blocks(lambda index: index != removed_index)
+        self.assertEquals(
+            set(compact_structure.get_usage_key(index) for index in retained),
+            {0, 2},
+        )
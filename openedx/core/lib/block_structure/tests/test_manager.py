@@ -9,7 +9,7 @@ from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
 from .helpers import (
-    MockModulestoreFactory, MockCache, MockTransformer, ChildrenMapTestMixin, mock_registered_transformers
+    MockModulestoreFactory, MockCache, MockStore, MockTransformer, ChildrenMapTestMixin, mock_registered_transformers
 )
 
 
@@ -101,10 +101,12 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         self.children_map = self.SIMPLE_CHILDREN_MAP
         self.modulestore = MockModulestoreFactory.create(self.children_map)
         self.cache = MockCache()
+        self.store = MockStore()
         self.bs_manager = BlockStructureManager(
             root_block_usage_key=0,
             modulestore=self.modulestore,
             cache=self.cache,
+            store=self.store,
         )
 
     def collect_and_verify(self, expect_modulestore_called, expect_cache_updated):
@@ -166,3 +168,118 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def test_get_collected_from_store(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.cache.map.clear()
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=True)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
+    def test_update_collected(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected()
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+        self.assertEquals(self.store.set_call_count, 2)
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+
+class TestIncrementalTransformer(MockTransformer):
+    """
+    Test Transformer class that supports incremental collection and
+    records the blocks it collected.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_blocks = []
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the edit timestamp of each block in the block structure.
+        """
+        for block_key in block_structure.topological_traversal():
+            cls.collected_blocks.append(block_key)
+            block_structure.set_transformer_block_field(
+                block_key, cls, 'edited_on', block_structure.get_xblock(block_key).edited_on
+            )
+
+
+@attr('shard_2')
+class TestBlockStructureManagerIncrementalCollect(TestCase, ChildrenMapTestMixin):
+    """
+    Test class for incremental collection by the BlockStructureManager.
+    """
+    def setUp(self):
+        super(TestBlockStructureManagerIncrementalCollect, self).setUp()
+
+        TestIncrementalTransformer.collected_blocks = []
+        self.registered_transformers = [TestIncrementalTransformer()]
+
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.modulestore = MockModulestoreFactory.create(self.children_map)
+        for block_key in range(len(self.children_map)):
+            self.set_edited_on(block_key, 1)
+        self.bs_manager = BlockStructureManager(
+            root_block_usage_key=0,
+            modulestore=self.modulestore,
+            cache=MockCache(),
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.get_collected()
+
+    def set_edited_on(self, block_key, edited_on):
+        """
+        Sets the edit timestamp of the given block in the modulestore.
+        """
+        self.modulestore.blocks[block_key].field_map['edited_on'] = edited_on
+
+    def update_and_verify(self, expected_collected_blocks):
+        """
+        Calls the manager's update_collected method and verifies the
+        blocks that were collected and the resulting collected data.
+        """
+        TestIncrementalTransformer.collected_blocks = []
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected()
+            block_structure = self.bs_manager.get_collected()
+
+        self.assertEquals(set(TestIncrementalTransformer.collected_blocks), set(expected_collected_blocks))
+        self.assert_block_structure(block_structure, self.children_map)
+        for block_key in block_structure:
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block_key, TestIncrementalTransformer, 'edited_on'),
+                self.modulestore.blocks[block_key].edited_on,
+            )
+
+    def test_no_changes(self):
+        self.update_and_verify(expected_collected_blocks=[0])
+
+    def test_changed_leaf(self):
+        self.set_edited_on(3, 2)
+        self.update_and_verify(expected_collected_blocks=[0, 1, 3])
+
+    def test_changed_subtree(self):
+        self.set_edited_on(1, 2)
+        self.update_and_verify(expected_collected_blocks=[0, 1, 3, 4])
+
+    def test_changed_root(self):
+        self.set_edited_on(0, 2)
+        self.update_and_verify(expected_collected_blocks=[0, 1, 2, 3, 4])
+
+    def test_changed_relations(self):
+        self.modulestore.blocks[2].children = [4]
+        self.children_map = [[1, 2], [3, 4], [4], [], []]
+        self.update_and_verify(expected_collected_blocks=[0, 1, 2, 4])
+
+    def test_outdated_transformer(self):
+        self.set_edited_on(3, 2)
+        TestIncrementalTransformer.VERSION += 1
+        self.update_and_verify(expected_collected_blocks=[0, 1, 2, 3, 4])
+
+    def test_unsupported_transformer(self):
+        self.set_edited_on(3, 2)
+        TestIncrementalTransformer.SUPPORTS_INCREMENTAL_COLLECT = False
+        try:
+            self.update_and_verify(expected_collected_blocks=[0, 1, 2, 3, 4])
+        finally:
+            TestIncrementalTransformer.SUPPORTS_INCREMENTAL_COLLECT = True
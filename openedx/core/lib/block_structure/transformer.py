@@ -28,6 +28,19 @@ class BlockStructureTransformer(object):
     #
     VERSION = 0
 
+    # Transformers may set this class attribute to True if their
+    # collected data for a block depends only on the block itself and on
+    # its ancestors, and their non-block-specific data depends only on
+    # the root block.
+    #
+    # When all registered transformers support incremental collection,
+    # the block_structure framework re-runs their collect methods on
+    # only the changed sub-structures of an updated block structure
+    # (along with the ancestors of those sub-structures), reusing the
+    # previously collected data for all other blocks.
+    #
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -4,6 +4,7 @@ Module for a collection of BlockStructureTransformers.
 import functools
 from logging import getLogger
 
+from .block_structure import EDITED_ON_FIELD
 from .exceptions import TransformerException
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -70,29 +71,137 @@ class BlockStructureTransformers(object):
                 self._transformers['no_filter'].append(transformer)
         return self
 
+    def __iter__(self):
+        """
+        Iterates over the transformers in the collection, in the order
+        in which their transforms are applied.
+        """
+        for transformer in self._transformers['supports_filter']:
+            yield transformer
+        for transformer in self._transformers['no_filter']:
+            yield transformer
+
     @classmethod
     def collect(cls, block_structure):
         """
         Collects data for each registered transformer.
         """
-        for transformer in TransformerRegistry.get_registered_transformers():
+        cls._collect(block_structure, TransformerRegistry.get_registered_transformers())
+
+    @classmethod
+    def collect_incrementally(cls, block_structure, previous_block_structure):
+        """
+        Collects data for each registered transformer, reusing the data
+        in the given previously collected block structure for all blocks
+        that are unaffected by changes since its collection.
+
+        Details: A block is affected if it or any of its ancestors was
+        added or changed.  The collect methods of up-to-date transformers
+        are run only on the sub-structure of affected blocks and their
+        ancestors.  The collect methods of transformers whose collected
+        data is outdated are run on the entire block structure.  If any
+        registered transformer does not support incremental collection,
+        or if the root block is affected, all data is collected anew.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - The newly
+                created block structure whose data is to be collected.
+
+            previous_block_structure (BlockStructureBlockData) - The
+                previously collected block structure with the same root,
+                or None if not available.
+        """
+        registered_transformers = TransformerRegistry.get_registered_transformers()
+        if previous_block_structure is None or not all(
+                transformer.SUPPORTS_INCREMENTAL_COLLECT for transformer in registered_transformers
+        ):
+            cls.collect(block_structure)
+            return
+
+        changed_blocks = block_structure._get_changed_blocks(previous_block_structure)  # pylint: disable=protected-access
+        affected_blocks = set()
+        for block_key in block_structure.topological_traversal():
+            if block_key in changed_blocks or any(
+                    parent_key in affected_blocks for parent_key in block_structure.get_parents(block_key)
+            ):
+                affected_blocks.add(block_key)
+
+        if block_structure.root_block_usage_key in affected_blocks:
+            cls.collect(block_structure)
+            return
+
+        outdated_transformers = cls._get_outdated_transformers(previous_block_structure)
+        up_to_date_transformers = registered_transformers - outdated_transformers
+
+        # Collect the data of up-to-date transformers for the affected
+        # blocks, along with their ancestors so data percolated down from
+        # ancestors is available, and reuse previous data for the rest.
+        # The root block is always included since non-block-specific
+        # data is collected from it.
+        blocks_to_collect = cls._get_ancestors(block_structure, affected_blocks) | affected_blocks
+        blocks_to_collect.add(block_structure.root_block_usage_key)
+        substructure = block_structure._create_substructure(blocks_to_collect)  # pylint: disable=protected-access
+        cls._collect(substructure, up_to_date_transformers)
+        block_structure.transformer_data = substructure.transformer_data
+        for block_key in block_structure:
+            source_block_structure = substructure if block_key in affected_blocks else previous_block_structure
+            block_data = source_block_structure._block_data_map.get(block_key)  # pylint: disable=protected-access
+            if block_data is not None:
+                block_structure._block_data_map[block_key] = block_data  # pylint: disable=protected-access
+
+        # Collect the data of outdated transformers for all blocks,
+        # removing any of their previously collected data first.
+        if outdated_transformers:
+            for block_data in block_structure.itervalues():
+                for transformer in outdated_transformers:
+                    block_data.transformer_data.pop(transformer.name(), None)
+            cls._collect(block_structure, outdated_transformers)
+
+        logger.info(
+            "Incrementally collected Block Structure %s: %d of %d blocks affected, outdated transformers: %s.",
+            block_structure.root_block_usage_key,
+            len(affected_blocks),
+            len(block_structure),
+            [transformer.name() for transformer in outdated_transformers],
+        )
+
+    @classmethod
+    def _collect(cls, block_structure, transformers):
+        """
+        Collects data for each of the given transformers.
+        """
+        # The edit timestamp of each block is needed for detecting
+        # changes when collecting incrementally.
+        block_structure.request_xblock_fields(EDITED_ON_FIELD)
+
+        for transformer in transformers:
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             transformer.collect(block_structure)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @staticmethod
+    def _get_ancestors(block_structure, block_keys):
+        """
+        Returns the set of usage keys of all ancestors of the given
+        blocks in the given block structure.
+        """
+        ancestors = set()
+        blocks_to_visit = list(block_keys)
+        while blocks_to_visit:
+            for parent_key in block_structure.get_parents(blocks_to_visit.pop()):
+                if parent_key not in ancestors:
+                    ancestors.add(parent_key)
+                    blocks_to_visit.append(parent_key)
+        return ancestors
+
     @classmethod
     def is_collected_outdated(cls, block_structure):
         """
         Returns whether the collected data in the block structure is outdated.
         """
-        outdated_transformers = []
-        for transformer in TransformerRegistry.get_registered_transformers():
-            version_in_block_structure = block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
-            if transformer.VERSION != version_in_block_structure:
-                outdated_transformers.append(transformer)
-
+        outdated_transformers = cls._get_outdated_transformers(block_structure)
         if outdated_transformers:
             logger.info(
                 "Collected Block Structure data for the following transformers is outdated: '%s'.",
@@ -101,6 +210,17 @@ class BlockStructureTransformers(object):
 
         return bool(outdated_transformers)
 
+    @classmethod
+    def _get_outdated_transformers(cls, block_structure):
+        """
+        Returns the set of registered transformers whose collected data
+        in the block structure is outdated or missing.
+        """
+        return {
+            transformer for transformer in TransformerRegistry.get_registered_transformers()
+            if transformer.VERSION != block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
+        }
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
@@ -52,6 +52,7 @@ setup(
             "course_blocks_api = lms.djangoapps.course_api.blocks.transformers.blocks_api:BlocksAPITransformer",
             "proctored_exam = lms.djangoapps.course_api.blocks.transformers.proctored_exam:ProctoredExamTransformer",
             "grades = lms.djangoapps.courseware.transformers.grades:GradesTransformer",
+            "table_of_contents = lms.djangoapps.courseware.transformers.table_of_contents:TableOfContentsTransformer",
         ],
     }
 )